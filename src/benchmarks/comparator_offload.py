@@ -0,0 +1,101 @@
+"""
+비교 모듈 프로세스 풀 오프로딩 벤치마크
+
+혼합 부하(작은 설명 + 약 20KB 설명) 비교 중 이벤트 루프 지연을 측정합니다.
+실행: python -m src.benchmarks.comparator_offload
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Dict, List
+
+from loguru import logger
+
+from src.detectors.comparator import ProductComparator
+from src.models.data_models import ProductInfo
+
+WORDS = ["정품", "보증", "무상", "A/S", "배송", "포함", "방수", "고급", "스마트폰", "배터리", "교체", "서비스"]
+
+
+def _make_description(rng: random.Random, size: int) -> str:
+    """지정한 크기의 임의 상품 설명 생성"""
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+async def _lag_probe(stop: asyncio.Event, samples: List[float], interval: float = 0.001):
+    """이벤트 루프 지연 측정 (예정 시각 대비 깨어난 시각의 차이)"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _run(comparator: ProductComparator, pairs: List[tuple], arrival_interval: float) -> Dict[str, float]:
+    """혼합 부하 비교 실행 후 루프 지연 통계 반환 (요청은 일정 간격으로 도착)"""
+    stop = asyncio.Event()
+    samples: List[float] = []
+    probe = asyncio.create_task(_lag_probe(stop, samples))
+
+    async def arrive(index: int, original: ProductInfo, current: ProductInfo):
+        await asyncio.sleep(index * arrival_interval)
+        return await comparator.compare_product_info_async(original, current)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[arrive(index, a, b) for index, (a, b) in enumerate(pairs)])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    ordered = sorted(samples) or [0.0]
+    return {
+        "elapsed": elapsed,
+        "lag_p50_ms": ordered[int(0.50 * (len(ordered) - 1))] * 1000,
+        "lag_p99_ms": ordered[int(0.99 * (len(ordered) - 1))] * 1000,
+        "lag_max_ms": ordered[-1] * 1000
+    }
+
+
+async def main(comparisons: int, large_ratio: float, large_size: int, workers: int, arrival_interval: float):
+    rng = random.Random(42)
+    pairs = []
+    for index in range(comparisons):
+        size = large_size if rng.random() < large_ratio else 80
+        original = _make_description(rng, size)
+        current = _make_description(rng, size)
+        product_id = f"PROD{index:05d}"
+        pairs.append((ProductInfo(product_id=product_id, price=100000, description=original),
+                      ProductInfo(product_id=product_id, price=100000, description=current)))
+
+    inline = ProductComparator(use_llm_for_description=False)
+    offloaded = ProductComparator(use_llm_for_description=False, process_pool_workers=workers)
+    # 워커 기동 및 토크나이저 로드가 끝날 때까지 대기
+    await offloaded._run_cpu_stage(len, "warm")
+
+    for name, comparator in (("inline", inline), ("process_pool", offloaded)):
+        stats = await _run(comparator, pairs, arrival_interval)
+        print(f"{name:>13}: 총 {stats['elapsed']:.2f}초, 루프 지연 p50 {stats['lag_p50_ms']:.2f}ms, "
+              f"p99 {stats['lag_p99_ms']:.2f}ms, 최대 {stats['lag_max_ms']:.2f}ms")
+
+    offloaded.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="비교 모듈 오프로딩 벤치마크")
+    parser.add_argument("--comparisons", type=int, default=200)
+    parser.add_argument("--large-ratio", type=float, default=0.1)
+    parser.add_argument("--large-size", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--arrival-interval", type=float, default=0.002, help="요청 도착 간격 (초)")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    asyncio.run(main(args.comparisons, args.large_ratio, args.large_size, args.workers, args.arrival_interval))
@@ -0,0 +1,103 @@
+"""
+MCP 역방향 프록시 지연 벤치마크
+
+로컬 가상 쇼핑몰(Flask)을 띄우고, 같은 MCP 요청을 쇼핑몰에 직접 보낼 때와 MCPProxy를 거칠 때의 응답 시간을 비교하여
+프록시가 더하는 지연(중앙값/p99)을 측정합니다. 응답 인터셉터(문맥 저장)를 켜면 응답 사본 수집 비용도 포함됩니다.
+실행: python -m src.benchmarks.proxy_benchmark --requests 2000
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, Any, List
+
+import aiohttp
+from loguru import logger
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from src.interfaces.mcp_interface import MCPInterface, MCPProxy
+from src.mock_shop.app import app as shop_app
+
+PATHS = {
+    "get_product": "/api/mcp/product/PROD001",
+    "search_products": "/api/mcp/search?query=",
+}
+
+
+def start_shop() -> int:
+    """가상 쇼핑몰을 별도 스레드에서 실행 (연결 재사용을 위해 HTTP/1.1)"""
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    server = make_server("127.0.0.1", 0, shop_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_port
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure(client: aiohttp.ClientSession, url: str, requests: int) -> List[float]:
+    """순차 요청의 응답 시간 목록 (초, 본문까지 모두 받은 시점 기준)"""
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        async with client.get(url, headers={"X-Session-ID": "bench_session"}) as response:
+            await response.read()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def run_benchmark(requests: int, with_interceptor: bool) -> List[Dict[str, Any]]:
+    shop_port = start_shop()
+    interface = MCPInterface()
+    captured = []
+    if with_interceptor:
+        for endpoint in PATHS:
+            interface.register_response_interceptor(endpoint, captured.append, observe_only=True)
+    proxy = MCPProxy(interface, upstream_url=f"http://127.0.0.1:{shop_port}")
+    proxy_port = await proxy.start(port=0)
+
+    results = []
+    async with aiohttp.ClientSession() as client:
+        for endpoint, path in PATHS.items():
+            direct_url = f"http://127.0.0.1:{shop_port}{path}"
+            proxied_url = f"http://127.0.0.1:{proxy_port}{path}"
+            # 연결 수립과 첫 요청 비용을 빼기 위한 예열
+            await measure(client, direct_url, 50)
+            await measure(client, proxied_url, 50)
+            direct = await measure(client, direct_url, requests)
+            proxied = await measure(client, proxied_url, requests)
+            results.append({
+                "endpoint": endpoint,
+                "direct_p50": statistics.median(direct),
+                "proxied_p50": statistics.median(proxied),
+                "added_p50": statistics.median(proxied) - statistics.median(direct),
+                "added_p99": percentile(proxied, 0.99) - percentile(direct, 0.99)
+            })
+    await proxy.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 역방향 프록시 지연 벤치마크")
+    parser.add_argument("--requests", type=int, default=2000, help="엔드포인트별 요청 수")
+    parser.add_argument("--no-interceptor", action="store_true", help="응답 인터셉터 없이 순수 중계 지연만 측정")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    results = asyncio.run(run_benchmark(args.requests, not args.no_interceptor))
+    for result in results:
+        print(f"{result['endpoint']:<16} 직접 {result['direct_p50'] * 1000:6.3f}ms, "
+              f"프록시 {result['proxied_p50'] * 1000:6.3f}ms "
+              f"(추가 지연 p50 {result['added_p50'] * 1000:+.3f}ms, p99 {result['added_p99'] * 1000:+.3f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+샤드 워커 수별 검증 처리량 벤치마크
+
+워커 수를 바꿔 가며 같은 수의 세션을 조회/검증하고, 초당 검증 수와 1워커 대비 배율을 측정합니다.
+통신 지연은 0으로 두어 검증이 CPU에 묶이도록 하므로, 배율은 사용할 수 있는 코어 수를 넘지 못합니다.
+실행: python -m src.benchmarks.shard_benchmark --sessions 2000 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, Any, List
+
+from loguru import logger
+
+from src.sharding.sharded_system import ShardedFraudDetectionSystem
+
+WORKER_CONFIG = {"console_notifications": False, "latency_model": 0}
+PRODUCT = {"id": "PROD001", "price": 100000, "description": "고급 스마트폰 - 정품 1년 보증 포함, 무상 수리 서비스"}
+
+
+async def run_benchmark(num_workers: int, sessions: int, concurrency: int) -> Dict[str, Any]:
+    """sessions개 세션을 조회한 뒤 concurrency개씩 동시에 검증하여 처리량 측정"""
+    system = ShardedFraudDetectionSystem(num_workers, WORKER_CONFIG)
+    await system.start()
+    session_ids = [f"bench_{index}" for index in range(sessions)]
+    await asyncio.gather(*[system.on_product_view(session_id, "PROD001", PRODUCT) for session_id in session_ids])
+    # 워커 초기화와 첫 요청 비용을 빼기 위한 예열
+    await asyncio.gather(*[system.verify_product_now(session_id, "PROD001") for session_id in session_ids[:50]])
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def verify(session_id: str):
+        async with semaphore:
+            return await system.verify_product_now(session_id, "PROD001")
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[verify(session_id) for session_id in session_ids])
+    elapsed = time.perf_counter() - started
+    await system.shutdown()
+    return {
+        "workers": num_workers,
+        "verified": sum(1 for result in results if result is not None),
+        "per_sec": len(session_ids) / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="샤드 워커 수별 검증 처리량 벤치마크")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=256, help="동시에 보내는 검증 요청 수")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    print(f"사용 가능한 CPU 코어: {os.cpu_count()}")
+    results: List[Dict[str, Any]] = []
+    for num_workers in args.workers:
+        results.append(asyncio.run(run_benchmark(num_workers, args.sessions, args.concurrency)))
+        result = results[-1]
+        print(f"워커 {result['workers']:>2}개: {result['per_sec']:>8,.0f}건/초 "
+              f"(1워커 대비 {result['per_sec'] / results[0]['per_sec']:.2f}배, 검증 {result['verified']:,}건)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+공유 메모리 문맥 저장소 다중 프로세스 조회 벤치마크
+
+한 프로세스가 적재한 공유 저장소를 1~N개 프로세스가 동시에 조회하여 전체 조회 처리량과 확장 비율을 측정합니다.
+조회는 잠금 없이 진행되므로 코어 수까지는 처리량이 프로세스 수에 거의 비례해야 합니다.
+실행: python -m src.benchmarks.shared_memory_benchmark --processes 1 2 4 8 --contexts 50000
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List
+
+from loguru import logger
+
+from src.benchmarks.storage_benchmark import make_catalog
+from src.storage.context_storage import ContextStorage
+
+PER_SESSION = 50
+
+
+def _reader(path: str, contexts: int, reads: int, worker: int, barrier, results):
+    """공유 저장소에 연결해 임의 순서로 문맥 조회"""
+    logger.remove()
+    storage = ContextStorage(storage_type="shared", shared_memory_path=path)
+    # 프로세스마다 다른 순서로 전체 문맥을 고르게 조회
+    picks = [(worker * 104729 + read * 7919) % contexts for read in range(reads)]
+    keys = [(f"session_{index // PER_SESSION}", f"PROD{index:06d}") for index in picks]
+    barrier.wait()
+    started = time.perf_counter()
+    found = 0
+    for session_id, product_id in keys:
+        if storage.get_context(session_id, product_id) is not None:
+            found += 1
+    results.put((found, time.perf_counter() - started, storage.shared_store.get_stats()["read_retries"]))
+    storage.close()
+
+
+def _writer(path: str, products: int, stop):
+    """조회와 겹치는 쓰기 부하 (같은 문맥을 가격만 바꿔 계속 덮어씀)"""
+    logger.remove()
+    storage = ContextStorage(storage_type="shared", shared_memory_path=path)
+    catalog = make_catalog(products)
+    version = 0
+    while not stop.is_set():
+        product_info = catalog[version % products].copy(update={"price": float(version)})
+        storage.store_context("writer_session", product_info.product_id, product_info)
+        version += 1
+    storage.close()
+
+
+def run_benchmark(path: str, processes: int, contexts: int, reads: int, with_writer: bool) -> Dict[str, Any]:
+    """processes개 프로세스의 동시 조회 처리량 측정"""
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(processes)
+    results = context.Queue()
+    stop = context.Event()
+    writer = context.Process(target=_writer, args=(path, 100, stop)) if with_writer else None
+    if writer is not None:
+        writer.start()
+    readers = [context.Process(target=_reader, args=(path, contexts, reads, worker, barrier, results))
+               for worker in range(processes)]
+    for reader in readers:
+        reader.start()
+    outcomes = [results.get() for _ in readers]
+    for reader in readers:
+        reader.join()
+    if writer is not None:
+        stop.set()
+        writer.join()
+
+    slowest = max(elapsed for _, elapsed, _ in outcomes)
+    return {
+        "processes": processes,
+        "reads_per_sec": processes * reads / slowest,
+        "found": sum(found for found, _, _ in outcomes),
+        "retries": sum(retries for _, _, retries in outcomes)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공유 메모리 문맥 저장소 다중 프로세스 조회 벤치마크")
+    parser.add_argument("--processes", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--contexts", type=int, default=50000)
+    parser.add_argument("--reads", type=int, default=100000, help="프로세스당 조회 수")
+    parser.add_argument("--writer", action="store_true", help="조회 중 쓰기 프로세스 하나를 함께 실행")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    with tempfile.TemporaryDirectory(dir="/dev/shm" if os.path.isdir("/dev/shm") else None) as workdir:
+        path = os.path.join(workdir, "bench.shm")
+        storage = ContextStorage(storage_type="shared", shared_memory_path=path,
+                                 shared_memory_slots=args.contexts * 2, shared_memory_bytes=args.contexts * 1024)
+        catalog = make_catalog(args.contexts)
+        for index, product_info in enumerate(catalog):
+            storage.store_context(f"session_{index // PER_SESSION}", product_info.product_id, product_info)
+
+        results: List[Dict[str, Any]] = []
+        for processes in args.processes:
+            result = run_benchmark(path, processes, args.contexts, args.reads, args.writer)
+            results.append(result)
+            scaling = result["reads_per_sec"] / results[0]["reads_per_sec"] * results[0]["processes"]
+            print(f"프로세스 {processes:>2}개: 조회 {result['reads_per_sec']:>12,.0f}/초 "
+                  f"(확장 {scaling:4.1f}배, 재시도 {result['retries']:,}회)")
+        storage.close()
+        print(f"사용 가능한 CPU: {os.cpu_count()}개 (CPU 수를 넘는 프로세스는 확장되지 않음)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+문맥 저장소 벤치마크
+
+저장소 타입별 store_context/get_context 처리량과 문맥당 메모리 사용량을 측정합니다.
+실행: python -m src.benchmarks.storage_benchmark --types memory columnar sqlite --contexts 50000
+설명 압축 비교: python -m src.benchmarks.storage_benchmark --types memory --compress-descriptions
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, Any, List
+
+from loguru import logger
+
+from src.models.data_models import ProductInfo
+from src.storage.context_storage import ContextStorage
+from src.storage.compression import train_dictionary
+
+
+def make_catalog(products: int) -> List[ProductInfo]:
+    """벤치마크용 상품 카탈로그 생성"""
+    benefits = ["정품 1년 보증 포함", "무상 A/S", "무료 배송", "방수 기능 포함", "3년 무상 A/S"]
+    return [
+        ProductInfo(
+            product_id=f"PROD{index:06d}",
+            price=float(10000 + index * 100),
+            description=f"상품 {index} - {benefits[index % len(benefits)]}, {benefits[(index * 7) % len(benefits)]}",
+            attributes={"brand": f"브랜드{index % 50}", "category": f"카테고리{index % 20}"}
+        )
+        for index in range(products)
+    ]
+
+
+def create_storage(storage_type: str, workdir: str, **options) -> ContextStorage:
+    """저장소 타입별 ContextStorage 생성"""
+    if storage_type == "sqlite":
+        return ContextStorage(storage_type="sqlite", sqlite_path=os.path.join(workdir, "bench.db"), **options)
+    return ContextStorage(storage_type=storage_type, **options)
+
+
+def run_benchmark(storage_type: str, contexts: int, products: int, workdir: str, **options) -> Dict[str, Any]:
+    """store/get 처리량 측정"""
+    catalog = make_catalog(products)
+    storage = create_storage(storage_type, workdir, **options)
+    # 세션마다 카탈로그 전반에서 고른 서로 다른 상품 최대 50개를 조회
+    per_session = max(1, min(products, 50))
+    workload = [(f"session_{index // per_session}", (index * 7919) % products) for index in range(contexts)]
+    payloads = [product_info.json() for product_info in catalog]
+    lookups = [(session_id, catalog[product].product_id) for session_id, product in workload]
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    # 실제 수집처럼 조회마다 응답을 새로 파싱한 (내용은 같지만 별개인) ProductInfo 객체를 사용
+    keys = [(session_id, ProductInfo.parse_raw(payloads[product])) for session_id, product in workload]
+
+    started = time.perf_counter()
+    for session_id, product_info in keys:
+        storage.store_context(session_id, product_info.product_id, product_info)
+    storage.flush()
+    store_elapsed = time.perf_counter() - started
+
+    del keys
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for session_id, product_id in lookups:
+        storage.get_context(session_id, product_id)
+    get_elapsed = time.perf_counter() - started
+
+    compression = storage.get_compression_stats()
+    storage.close()
+    return {
+        "type": storage_type + ("+zlib" if compression else ""),
+        "contexts": contexts,
+        "bytes_per_context": retained / contexts,
+        "store_per_sec": contexts / store_elapsed,
+        "get_per_sec": contexts / get_elapsed,
+        "compression": compression
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="문맥 저장소 벤치마크")
+    parser.add_argument("--types", nargs="+", default=["memory", "columnar", "sqlite"])
+    parser.add_argument("--contexts", type=int, default=50000)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--compress-descriptions", action="store_true",
+                        help="메모리 저장소를 카탈로그로 학습한 사전의 설명 압축과 함께 한 번 더 측정")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for storage_type in args.types:
+            runs = [{}]
+            if storage_type == "memory" and args.compress_descriptions:
+                dictionary = train_dictionary(product_info.description for product_info in make_catalog(args.products))
+                runs.append({"compress_descriptions": True, "description_dictionary": dictionary})
+            for options in runs:
+                result = run_benchmark(storage_type, args.contexts, args.products, workdir, **options)
+                print(f"{result['type']:>12}: store {result['store_per_sec']:>10,.0f}/초, "
+                      f"get {result['get_per_sec']:>10,.0f}/초, "
+                      f"문맥당 {result['bytes_per_context']:>8,.0f}바이트 ({result['contexts']:,}개)")
+                if result["compression"]:
+                    compression = result["compression"]
+                    print(f"{'':>12}  설명 압축률 {compression['ratio']:.2f}배, "
+                          f"사전 {compression['dictionary_bytes']:,}바이트, "
+                          f"복원 평균 {compression['avg_decompress_us']:.1f}us, "
+                          f"복원 캐시 적중률 {compression['cache_hit_ratio']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
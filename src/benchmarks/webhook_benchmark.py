@@ -0,0 +1,110 @@
+"""
+에이전트 웹훅 전달 처리량 벤치마크
+
+로컬 수신 서버를 띄워 여러 에이전트에게 알림을 보내고, 묶음 크기별 전달 처리량(알림/초)과 요청 수를 측정합니다.
+--fail-rate를 주면 수신 서버가 그 비율만큼 503으로 응답하여 재시도 경로의 처리량도 함께 확인할 수 있습니다.
+실행: python -m src.benchmarks.webhook_benchmark --alerts 20000 --agents 10 --batch-sizes 1 10 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Any
+
+from aiohttp import web
+from loguru import logger
+
+from src.models.data_models import NotificationMessage
+from src.notification.webhook import AgentWebhookHandler
+
+
+class StubReceiver:
+    """별도 스레드에서 실행되는 로컬 웹훅 수신 서버"""
+
+    def __init__(self, fail_rate: float = 0.0):
+        self.fail_rate = fail_rate
+        self.received = 0
+        self.loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.router.add_post("/hooks/{agent_id}", self.receive)
+        self.runner = web.AppRunner(app, access_log=None)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        self.port = self.runner.addresses[0][1]
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    async def receive(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if random.random() < self.fail_rate:
+            return web.Response(status=503)
+        self.received += len(body["alerts"])
+        return web.Response(status=204)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def run_benchmark(receiver: StubReceiver, alerts: int, agents: int, batch_size: int,
+                  spill_path: str) -> Dict[str, Any]:
+    """alerts건의 알림을 agents개 에이전트에게 나눠 보내고 모두 전달될 때까지의 처리량 측정"""
+    webhook = AgentWebhookHandler(spill_path=spill_path, batch_window=0.01, max_batch_size=batch_size,
+                                  backoff_base=0.01, default_rate_limit=1_000_000)
+    for agent in range(agents):
+        webhook.register_agent(f"agent_{agent}", f"http://127.0.0.1:{receiver.port}/hooks/agent_{agent}")
+    notifications = [
+        NotificationMessage(session_id=f"session_{index % 100}", product_id=f"PROD{index:06d}",
+                            message=f"상품 {index} 가격 변경", agent_id=f"agent_{index % agents}")
+        for index in range(alerts)
+    ]
+    received_before = receiver.received
+
+    started = time.perf_counter()
+    # 알림 모듈의 일괄 핸들러처럼 256건씩 넘김
+    for start in range(0, alerts, 256):
+        webhook.handler(notifications[start:start + 256])
+    webhook.flush()
+    elapsed = time.perf_counter() - started
+
+    stats = webhook.get_stats()
+    webhook.close()
+    return {
+        "batch_size": batch_size,
+        "alerts_per_sec": stats["delivered"] / elapsed,
+        "received": receiver.received - received_before,
+        "requests": sum(agent["requests"] for agent in stats["agents"].values()),
+        "retries": sum(agent["retries"] for agent in stats["agents"].values()),
+        "spilled": stats["spilled"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="에이전트 웹훅 전달 처리량 벤치마크")
+    parser.add_argument("--alerts", type=int, default=20000)
+    parser.add_argument("--agents", type=int, default=10)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="수신 서버의 503 응답 비율")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    receiver = StubReceiver(args.fail_rate)
+    with tempfile.TemporaryDirectory() as workdir:
+        for batch_size in args.batch_sizes:
+            result = run_benchmark(receiver, args.alerts, args.agents, batch_size,
+                                   os.path.join(workdir, f"spill_{batch_size}.jsonl"))
+            print(f"묶음 {batch_size:>4}건: 전달 {result['alerts_per_sec']:>10,.0f}건/초 "
+                  f"(요청 {result['requests']:,}회, 재시도 {result['retries']:,}회, 유출 {result['spilled']:,}건)")
+    receiver.close()
+
+
+if __name__ == "__main__":
+    main()
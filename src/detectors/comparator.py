@@ -1,4 +1,7 @@
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
 import difflib
 import re
 import os
@@ -29,6 +32,50 @@ except LookupError:
     nltk.download('stopwords')
 
 
+# 프로세스 풀 워커에서 미리 로드해 두는 불용어 집합
+_WORKER_STOP_WORDS: Optional[set] = None
+
+
+def _init_comparison_worker():
+    """프로세스 풀 워커 초기화 - 토크나이저와 불용어를 미리 로드"""
+    global _WORKER_STOP_WORDS
+    _WORKER_STOP_WORDS = set(stopwords.words('english'))
+    try:
+        word_tokenize("warm up")
+    except LookupError:
+        logger.warning("토크나이저 데이터를 찾을 수 없음")
+
+
+def _warm_up_worker() -> bool:
+    """워커 프로세스 기동 확인용 작업"""
+    return _WORKER_STOP_WORDS is not None
+
+
+def _normalize_text(text: str) -> str:
+    """공백 정규화 및 소문자 변환"""
+    return re.sub(r'\s+', ' ', text.lower().strip())
+
+
+def _sequence_similarity(original_desc: str, current_desc: str) -> float:
+    """정규화된 두 설명의 문자열 유사도 계산"""
+    return difflib.SequenceMatcher(None, _normalize_text(original_desc), _normalize_text(current_desc)).ratio()
+
+
+def _semantic_similarity(original_desc: str, current_desc: str, stop_words: Optional[set] = None) -> Optional[float]:
+    """두 설명의 단어 집합 자카드 유사도 계산 (토큰이 없으면 None)"""
+    stop_words = stop_words if stop_words is not None else (_WORKER_STOP_WORDS or set())
+    original_set = {w.lower() for w in word_tokenize(original_desc)
+                    if w.isalnum() and w.lower() not in stop_words}
+    current_set = {w.lower() for w in word_tokenize(current_desc)
+                   if w.isalnum() and w.lower() not in stop_words}
+
+    if not original_set or not current_set:
+        return None
+
+    union = len(original_set | current_set)
+    return len(original_set & current_set) / union if union else 0
+
+
 class ProductComparator:
     """
     상품 정보 비교 모듈
@@ -38,21 +85,58 @@ class ProductComparator:
     def __init__(self, price_threshold: float = 0.05, 
                 description_similarity_threshold: float = 0.8,
                 use_llm_for_description: bool = True,
-                deception_threshold: float = 5.0):
+                deception_threshold: float = 5.0,
+                process_pool_workers: int = 0,
+                offload_threshold: int = 4096):
         """
         Args:
             price_threshold: 가격 변화 임계값 (예: 0.05는 5% 변화)
             description_similarity_threshold: 설명 유사도 임계값 (0~1 사이)
             use_llm_for_description: LLM을 사용한 설명 비교 활성화 여부
             deception_threshold: LLM 기반 속임수 탐지 시 기만성 점수 임계값 (0~10)
+            process_pool_workers: CPU 집약 비교를 수행할 프로세스 풀 크기 (0이면 비활성화)
+            offload_threshold: 프로세스 풀로 넘길 최소 입력 크기 (두 설명의 글자 수 합)
         """
         self.price_threshold = price_threshold
         self.description_similarity_threshold = description_similarity_threshold
         self.use_llm_for_description = use_llm_for_description
         self.deception_threshold = deception_threshold
         self.stop_words = set(stopwords.words('english'))
+        self.process_pool_workers = process_pool_workers
+        self.offload_threshold = offload_threshold
+        self._process_pool: Optional[ProcessPoolExecutor] = None
         logger.info("상품 정보 비교 모듈 초기화 완료")
         
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """프로세스 풀 생성 (워커를 미리 기동하여 토크나이저 로드)"""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_pool_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_comparison_worker
+            )
+            for _ in range(self.process_pool_workers):
+                self._process_pool.submit(_warm_up_worker)
+            logger.info(f"비교 프로세스 풀 시작 (워커: {self.process_pool_workers})")
+        return self._process_pool
+        
+    def _should_offload(self, original_desc: str, current_desc: str) -> bool:
+        """입력 크기에 따라 프로세스 풀 사용 여부 결정 (작은 입력은 IPC 비용 때문에 직접 처리)"""
+        return (self.process_pool_workers > 0 and bool(original_desc) and bool(current_desc)
+                and len(original_desc) + len(current_desc) > self.offload_threshold)
+        
+    async def _run_cpu_stage(self, func: Callable, *args) -> Any:
+        """CPU 집약 단계를 프로세스 풀에서 실행"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_process_pool(), func, *args)
+        
+    def shutdown(self):
+        """프로세스 풀 종료"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+            logger.info("비교 프로세스 풀 종료")
+        
     def compare_price(self, original_price: float, current_price: float) -> Tuple[bool, float]:
         """가격 비교"""
         if original_price <= 0:
@@ -77,12 +161,8 @@ class ProductComparator:
             logger.warning("원본 또는 현재 설명이 비어있음")
             return False, 0
             
-        # 텍스트 정규화
-        original_desc = re.sub(r'\s+', ' ', original_desc.lower().strip())
-        current_desc = re.sub(r'\s+', ' ', current_desc.lower().strip())
-        
         # 간단한 유사도 계산 (더 복잡한 알고리즘으로 대체 가능)
-        similarity = difflib.SequenceMatcher(None, original_desc, current_desc).ratio()
+        similarity = _sequence_similarity(original_desc, current_desc)
         is_description_changed = similarity < self.description_similarity_threshold
         
         logger.debug(f"설명 비교: 유사도: {similarity:.2%}, 임계값: {self.description_similarity_threshold:.2%}")
@@ -95,32 +175,33 @@ class ProductComparator:
             logger.warning("원본 또는 현재 설명이 비어있음")
             return False, 0
             
-        # 텍스트 정규화 및 토큰화
-        original_tokens = [w.lower() for w in word_tokenize(original_desc) 
-                          if w.isalnum() and w.lower() not in self.stop_words]
-        current_tokens = [w.lower() for w in word_tokenize(current_desc) 
-                         if w.isalnum() and w.lower() not in self.stop_words]
-        
-        # 단어 집합 비교
-        original_set = set(original_tokens)
-        current_set = set(current_tokens)
-        
-        # 자카드 유사도 계산 (교집합 / 합집합)
-        if not original_set or not current_set:
+        # 단어 집합 자카드 유사도 계산 (교집합 / 합집합)
+        similarity = _semantic_similarity(original_desc, current_desc, self.stop_words)
+        if similarity is None:
             return False, 0
             
-        intersection = len(original_set.intersection(current_set))
-        union = len(original_set.union(current_set))
-        
-        if union == 0:
-            similarity = 0
-        else:
-            similarity = intersection / union
-            
         is_description_changed = similarity < self.description_similarity_threshold
         
         return is_description_changed, similarity
         
+    async def compare_description_async(self, original_desc: str, current_desc: str) -> Tuple[bool, float]:
+        """설명 비교 (큰 입력은 프로세스 풀에서 수행)"""
+        if not self._should_offload(original_desc, current_desc):
+            return self.compare_description(original_desc, current_desc)
+            
+        similarity = await self._run_cpu_stage(_sequence_similarity, original_desc, current_desc)
+        return similarity < self.description_similarity_threshold, similarity
+        
+    async def compare_descriptions_semantic_async(self, original_desc: str, current_desc: str) -> Tuple[bool, float]:
+        """의미적 설명 비교 (큰 입력은 프로세스 풀에서 수행)"""
+        if not self._should_offload(original_desc, current_desc):
+            return self.compare_descriptions_semantic(original_desc, current_desc)
+            
+        similarity = await self._run_cpu_stage(_semantic_similarity, original_desc, current_desc)
+        if similarity is None:
+            return False, 0
+        return similarity < self.description_similarity_threshold, similarity
+        
     def compare_descriptions_llm(self, original_desc: str, current_desc: str) -> Tuple[bool, float, Dict[str, Any]]:
         """LLM을 사용한 의미적 설명 비교"""
         if not original_desc or not current_desc:
@@ -199,17 +280,55 @@ class ProductComparator:
         }
         return benefits_changes
     
+    def _compare_description_stage(self, original_desc: str,
+                                   current_desc: str) -> Tuple[bool, float, Optional[Dict[str, Any]]]:
+        """설명 비교 단계 - LLM 또는 기본 알고리즘 사용 (LLM 분석 결과가 없으면 None)"""
+        if self.use_llm_for_description and openai.api_key:
+            return self.compare_descriptions_llm(original_desc, current_desc)
+            
+        desc_changed, desc_similarity = self.compare_description(original_desc, current_desc)
+        return desc_changed, desc_similarity, None
+        
+    async def _compare_description_stage_async(self, original_desc: str,
+                                               current_desc: str) -> Tuple[bool, float, Optional[Dict[str, Any]]]:
+        """설명 비교 단계 (이벤트 루프를 막지 않도록 LLM 호출은 스레드, 큰 입력은 프로세스 풀에서 수행)"""
+        if self.use_llm_for_description and openai.api_key:
+            return await asyncio.to_thread(self.compare_descriptions_llm, original_desc, current_desc)
+            
+        desc_changed, desc_similarity = await self.compare_description_async(original_desc, current_desc)
+        return desc_changed, desc_similarity, None
+    
     def compare_product_info(self, original_info: ProductInfo, current_info: ProductInfo) -> DetectionResult:
         """상품 정보 전체 비교"""
         if original_info.product_id != current_info.product_id:
-            logger.error(f"상품 ID가 일치하지 않음: {original_info.product_id} vs {current_info.product_id}")
-            return DetectionResult(
-                session_id="unknown",
-                product_id=original_info.product_id,
-                is_fraud_detected=False,
-                details="상품 ID 불일치"
-            )
+            return self._product_id_mismatch_result(original_info, current_info)
+            
+        description_comparison = self._compare_description_stage(
+            original_info.description, current_info.description)
+        return self._build_detection_result(original_info, current_info, description_comparison)
+        
+    async def compare_product_info_async(self, original_info: ProductInfo, current_info: ProductInfo) -> DetectionResult:
+        """상품 정보 전체 비교 (CPU 집약 단계는 필요 시 프로세스 풀에서 수행)"""
+        if original_info.product_id != current_info.product_id:
+            return self._product_id_mismatch_result(original_info, current_info)
             
+        description_comparison = await self._compare_description_stage_async(
+            original_info.description, current_info.description)
+        return self._build_detection_result(original_info, current_info, description_comparison)
+        
+    def _product_id_mismatch_result(self, original_info: ProductInfo, current_info: ProductInfo) -> DetectionResult:
+        """상품 ID 불일치 결과 생성"""
+        logger.error(f"상품 ID가 일치하지 않음: {original_info.product_id} vs {current_info.product_id}")
+        return DetectionResult(
+            session_id="unknown",
+            product_id=original_info.product_id,
+            is_fraud_detected=False,
+            details="상품 ID 불일치"
+        )
+        
+    def _build_detection_result(self, original_info: ProductInfo, current_info: ProductInfo,
+                                description_comparison: Tuple[bool, float, Optional[Dict[str, Any]]]) -> DetectionResult:
+        """가격/설명/속성 비교 결과로 탐지 결과 생성"""
         session_id = "unknown"  # 실제로는 호출 코드에서 세션 ID 전달해야 함
         product_id = original_info.product_id
         changes = {}
@@ -223,34 +342,21 @@ class ProductComparator:
                 "change_ratio": price_change_ratio
             }
         
-        # 설명 비교 - LLM 또는 기본 알고리즘 사용
-        if self.use_llm_for_description and openai.api_key:
-            # LLM 기반 설명 비교 사용
-            desc_changed, desc_similarity, llm_analysis = self.compare_descriptions_llm(
-                original_info.description, current_info.description)
-                
-            if desc_changed:
+        # 설명 비교 결과 반영 - LLM 분석 결과가 있으면 상세 정보 포함
+        desc_changed, desc_similarity, llm_analysis = description_comparison
+        if desc_changed:
+            changes["description"] = {
+                "original": original_info.description,
+                "current": current_info.description,
+                "similarity": desc_similarity
+            }
+            if llm_analysis is not None:
                 # 혜택 변경 정보 추출
-                benefits_changes = self._extract_benefits_from_llm_analysis(llm_analysis)
-                
-                changes["description"] = {
-                    "original": original_info.description,
-                    "current": current_info.description,
-                    "similarity": desc_similarity,
+                changes["description"].update({
                     "change_description": llm_analysis.get("change_description", ""),
                     "deception_score": llm_analysis.get("deception_score", 0),
-                    "benefits_changes": benefits_changes
-                }
-        else:
-            # 기본 설명 비교 사용
-            desc_changed, desc_similarity = self.compare_description(
-                original_info.description, current_info.description)
-            if desc_changed:
-                changes["description"] = {
-                    "original": original_info.description,
-                    "current": current_info.description,
-                    "similarity": desc_similarity
-                }
+                    "benefits_changes": self._extract_benefits_from_llm_analysis(llm_analysis)
+                })
             
         # 속성 비교 (옵션)
         for key, original_value in original_info.attributes.items():
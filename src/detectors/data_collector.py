@@ -1,11 +1,11 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Callable, Optional, List
 import requests
 import json
 from loguru import logger
 from src.models.data_models import ProductInfo
 from src.interfaces.mcp_interface import MCPInterface
-import asyncio
-import random
+from src.simulation.clock import Clock
+from src.simulation.latency import LatencyModel, default_latency_model
 
 class DataCollector:
     """
@@ -13,8 +13,21 @@ class DataCollector:
     거래 완료 전에 동일 상품의 최신 정보를 다시 불러오는 역할
     """
     
-    def __init__(self, mcp_interface: Optional[MCPInterface] = None):
+    def __init__(self, mcp_interface: Optional[MCPInterface] = None,
+                 clock: Optional[Clock] = None, latency_model: Optional[LatencyModel] = None,
+                 product_source: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None):
+        """
+        Args:
+            mcp_interface: MCP 인터페이스
+            clock: 대기에 사용할 시계 (가상 시계 사용 시 실제로 대기하지 않음)
+            latency_model: 채널별 통신 지연 모델
+            product_source: 상품 ID로 실제 상품 페이지 데이터를 반환하는 함수 (같은 프로세스의 쇼핑몰과 연동할 때 지정,
+                            없으면 웹 재수집은 시뮬레이션 데이터 사용)
+        """
         self.mcp_interface = mcp_interface or MCPInterface()
+        self.clock = clock or Clock()
+        self.latency_model = latency_model or default_latency_model()
+        self.product_source = product_source
         self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         logger.info("데이터 재수집 모듈 초기화 완료")
         
@@ -26,6 +39,9 @@ class DataCollector:
             request_params = request_params or {}
             request_params["product_id"] = product_id
             
+            # MCP 통신 지연 시뮬레이션
+            await self.clock.sleep(self.latency_model.sample("mcp"))
+            
             # 여기서는 실제 요청을 보내지 않고 시뮬레이션
             # 실제 구현에서는 MCP 서버에 HTTP 요청을 보내야 함
             logger.info(f"MCP를 통한 상품 정보 재수집: {product_id}")
@@ -58,15 +74,21 @@ class DataCollector:
             # URL 생성
             url = url_template.format(product_id=product_id)
             
-            # 웹 통신 지연 시뮬레이션 (0.1초~0.4초 사이 랜덤 지연)
-            await asyncio.sleep(random.uniform(0.1, 0.4))
+            # 웹 통신 지연 시뮬레이션 (기본: 0.1초~0.4초 사이 랜덤 지연)
+            await self.clock.sleep(self.latency_model.sample("web"))
             
             # 여기서는 실제 요청을 보내지 않고 시뮬레이션
             # 실제 구현에서는 HTTP 요청 및 웹 스크래핑을 수행해야 함
             logger.info(f"웹 스크래핑을 통한 상품 정보 재수집: {url}")
             
+            # 상품 데이터 공급 함수가 있으면 쇼핑몰의 실제 상품 데이터 사용
+            if self.product_source is not None:
+                scraped_data = self.product_source(product_id)
+                if scraped_data is None:
+                    logger.warning(f"상품 페이지를 찾을 수 없음: {product_id}")
+                    return None
             # 상품 ID에 따라 다른 시뮬레이션 데이터 반환
-            if product_id == "PROD_PRICE_CHANGE":
+            elif product_id == "PROD_PRICE_CHANGE":
                 # 가격 변경 시나리오
                 scraped_data = {
                     "id": product_id,
@@ -84,6 +106,15 @@ class DataCollector:
                     "brand": "브랜드X",
                     "category": "전자제품"
                 }
+            elif product_id == "PROD_WORDING_VAR":
+                # 표현 변형 시나리오 - 판매자가 마케팅 문구의 순서와 단어만 약간 바꾼 경우 (정상)
+                scraped_data = {
+                    "id": product_id,
+                    "price": 100000,  # 가격 동일
+                    "description": "고급 스마트폰 - 1년 정품 보증 포함, A/S 서비스 지원",
+                    "brand": "브랜드X",
+                    "category": "전자제품"
+                }
             else:
                 # 정상 시나리오 또는 기본 케이스
                 scraped_data = {
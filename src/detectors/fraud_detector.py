@@ -35,13 +35,18 @@ class FraudDetector:
         if self.use_llm_for_description:
             logger.info("AI 기반 설명 속임수 탐지 활성화됨")
         
-    async def verify_product(self, session_id: str, product_id: str) -> Optional[DetectionResult]:
-        """상품 정보 검증"""
+    async def verify_product(self, session_id: str, product_id: str,
+                             context_record: Optional[ContextRecord] = None) -> Optional[DetectionResult]:
+        """상품 정보 검증 (context_record를 넘기면 저장소 조회 생략)"""
         try:
             # 1. 원본 문맥 불러오기
-            context_record = self.context_storage.get_context(session_id, product_id)
+            if context_record is None:
+                context_record = self.context_storage.get_context(session_id, product_id)
             if not context_record:
-                logger.warning(f"문맥 정보를 찾을 수 없음: 세션 {session_id}, 상품 {product_id}")
+                if self.context_storage.get_miss_reason(session_id, product_id) == "evicted":
+                    logger.warning(f"메모리 한도로 축출되어 문맥 정보가 없음: 세션 {session_id}, 상품 {product_id}")
+                else:
+                    logger.warning(f"문맥 정보를 찾을 수 없음: 세션 {session_id}, 상품 {product_id}")
                 return None
                 
             original_info = context_record.product_info
@@ -62,7 +67,7 @@ class FraudDetector:
             logger.info(f"최신 데이터 수집 완료: 상품 {product_id}")
             
             # 3. 비교 수행
-            detection_result = self.product_comparator.compare_product_info(original_info, current_info)
+            detection_result = await self.product_comparator.compare_product_info_async(original_info, current_info)
             detection_result.session_id = session_id  # 세션 ID 설정
             
             # 4. 결과 저장
@@ -1,97 +1,575 @@
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, Iterable, List, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import concurrent.futures
+import inspect
 import json
+import aiohttp
+from aiohttp import web
 from loguru import logger
 from src.models.data_models import ProductInfo
 
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class _InterceptorRegistration:
+    """등록된 인터셉터 (관찰 전용 인터셉터는 반환값을 쓰지 않고 응답 경로 밖에서 실행)"""
+    __slots__ = ("interceptor", "name", "is_async", "observe_only")
+
+    def __init__(self, interceptor: Callable, observe_only: bool):
+        self.interceptor = interceptor
+        self.name = getattr(interceptor, "__qualname__", repr(interceptor))
+        self.is_async = inspect.iscoroutinefunction(interceptor) or \
+            inspect.iscoroutinefunction(getattr(interceptor, "__call__", None))
+        self.observe_only = observe_only
+
+
+class _InterceptorChain:
+    """엔드포인트별 인터셉터 체인 (등록 순서대로 실행, 변경 인터셉터와 관찰 전용 인터셉터를 나눠 보관)"""
+    __slots__ = ("modifiers", "observers")
+
+    def __init__(self):
+        self.modifiers: List[_InterceptorRegistration] = []
+        self.observers: List[_InterceptorRegistration] = []
+
+
 class MCPInterface:
     """
     MCP(Merchant-Consumer Protocol) 인터페이스
     에이전트와 전자상거래 사이트 간의 통신을 모니터링
+
+    엔드포인트마다 인터셉터 체인을 두어 등록 순서대로 실행. 변경 인터셉터는 데이터를 받아 (수정한) 데이터를 반환하고,
+    관찰 전용 인터셉터(observe_only=True)는 최종 데이터를 받아 응답 경로 밖에서 실행되므로 에이전트가 기다리지 않음.
+    인터셉터가 없는 엔드포인트는 조회 한 번으로 데이터를 그대로 반환.
     """
     
     def __init__(self):
-        self.request_interceptors: Dict[str, Callable] = {}
-        self.response_interceptors: Dict[str, Callable] = {}
+        self.request_interceptors: Dict[str, _InterceptorChain] = {}
+        self.response_interceptors: Dict[str, _InterceptorChain] = {}
+        self.stats: Dict[str, int] = {"intercepted": 0, "observed": 0, "errors": 0}
+        # 실행 중인 루프 밖에서 예약된 관찰 전용 인터셉터를 순서대로 실행하는 스레드 (처음 필요할 때 생성)
+        self._observer_executor: Optional[ThreadPoolExecutor] = None
+        self._pending_observers: Set = set()
         logger.info("MCP 인터페이스 초기화 완료")
         
-    def register_request_interceptor(self, endpoint: str, interceptor: Callable):
-        """특정 엔드포인트에 대한 요청 인터셉터 등록"""
-        self.request_interceptors[endpoint] = interceptor
-        logger.debug(f"요청 인터셉터 등록: {endpoint}")
+    @staticmethod
+    def _register(chains: Dict[str, _InterceptorChain], endpoint: str, interceptor: Callable, observe_only: bool):
+        chain = chains.get(endpoint)
+        if chain is None:
+            chain = chains[endpoint] = _InterceptorChain()
+        registration = _InterceptorRegistration(interceptor, observe_only)
+        (chain.observers if observe_only else chain.modifiers).append(registration)
+        
+    def register_request_interceptor(self, endpoint: str, interceptor: Callable, observe_only: bool = False):
+        """
+        특정 엔드포인트에 대한 요청 인터셉터 등록 (이미 등록된 인터셉터 뒤에 추가)
+
+        Args:
+            endpoint: 엔드포인트 이름
+            interceptor: 요청 데이터를 받아 (수정한) 요청 데이터를 반환하는 함수 (동기/비동기)
+            observe_only: 반환값을 쓰지 않고 요청 경로 밖에서 실행할지 여부
+        """
+        self._register(self.request_interceptors, endpoint, interceptor, observe_only)
+        logger.debug(f"요청 인터셉터 등록: {endpoint}{' (관찰 전용)' if observe_only else ''}")
+        
+    def register_response_interceptor(self, endpoint: str, interceptor: Callable, observe_only: bool = False):
+        """
+        특정 엔드포인트에 대한 응답 인터셉터 등록 (이미 등록된 인터셉터 뒤에 추가)
+
+        Args:
+            endpoint: 엔드포인트 이름
+            interceptor: 응답 데이터를 받아 (수정한) 응답 데이터를 반환하는 함수 (동기/비동기)
+            observe_only: 반환값을 쓰지 않고 응답 경로 밖에서 실행할지 여부 (문맥 저장 등)
+        """
+        self._register(self.response_interceptors, endpoint, interceptor, observe_only)
+        logger.debug(f"응답 인터셉터 등록: {endpoint}{' (관찰 전용)' if observe_only else ''}")
         
-    def register_response_interceptor(self, endpoint: str, interceptor: Callable):
-        """특정 엔드포인트에 대한 응답 인터셉터 등록"""
-        self.response_interceptors[endpoint] = interceptor
-        logger.debug(f"응답 인터셉터 등록: {endpoint}")
+    def _failed(self, registration: _InterceptorRegistration, e: Exception):
+        self.stats["errors"] += 1
+        logger.error(f"인터셉터 오류: {registration.name}: {e}")
         
+    def _run_chain(self, chain: _InterceptorChain, data: Dict[str, Any]) -> Dict[str, Any]:
+        """변경 인터셉터를 순서대로 실행 (오류가 난 인터셉터는 건너뛰고 이전 데이터로 계속)"""
+        for registration in chain.modifiers:
+            try:
+                if not registration.is_async:
+                    data = registration.interceptor(data)
+                elif _running_loop() is None:
+                    data = asyncio.run(registration.interceptor(data))
+                else:
+                    raise RuntimeError("이벤트 루프 안에서는 비동기 인터셉터를 async 인터셉트 메서드로 실행해야 함")
+            except Exception as e:
+                self._failed(registration, e)
+        return data
+        
+    async def _run_chain_async(self, chain: _InterceptorChain, data: Dict[str, Any]) -> Dict[str, Any]:
+        """변경 인터셉터를 순서대로 실행 (비동기 인터셉터는 대기)"""
+        for registration in chain.modifiers:
+            try:
+                result = registration.interceptor(data)
+                data = await result if registration.is_async else result
+            except Exception as e:
+                self._failed(registration, e)
+        return data
+        
+    def _observe(self, registration: _InterceptorRegistration, data: Dict[str, Any]):
+        try:
+            result = registration.interceptor(data)
+            if registration.is_async:
+                asyncio.run(result)
+            self.stats["observed"] += 1
+        except Exception as e:
+            self._failed(registration, e)
+            
+    async def _observe_async(self, registration: _InterceptorRegistration, data: Dict[str, Any]):
+        try:
+            result = registration.interceptor(data)
+            if registration.is_async:
+                await result
+            self.stats["observed"] += 1
+        except Exception as e:
+            self._failed(registration, e)
+            
+    def _schedule_observers(self, chain: _InterceptorChain, data: Dict[str, Any]):
+        """
+        관찰 전용 인터셉터 예약 (호출자에게 바로 반환)
+        실행 중인 이벤트 루프가 있으면 그 루프의 태스크로, 없으면 관찰 스레드에서 순서대로 실행
+        """
+        loop = _running_loop()
+        for registration in chain.observers:
+            if loop is not None:
+                task = loop.create_task(self._observe_async(registration, data))
+            else:
+                if self._observer_executor is None:
+                    self._observer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcp-observer")
+                task = self._observer_executor.submit(self._observe, registration, data)
+            self._pending_observers.add(task)
+            task.add_done_callback(self._pending_observers.discard)
+            
     def intercept_request(self, endpoint: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """요청 데이터 인터셉트"""
-        if endpoint in self.request_interceptors:
-            logger.debug(f"요청 인터셉트: {endpoint}")
-            modified_request = self.request_interceptors[endpoint](request_data)
-            return modified_request
+        chain = self.request_interceptors.get(endpoint)
+        if chain is None:
+            return request_data
+        logger.debug(f"요청 인터셉트: {endpoint}")
+        self.stats["intercepted"] += 1
+        request_data = self._run_chain(chain, request_data)
+        if chain.observers:
+            self._schedule_observers(chain, request_data)
         return request_data
         
     def intercept_response(self, endpoint: str, response_data: Dict[str, Any]) -> Dict[str, Any]:
         """응답 데이터 인터셉트"""
-        if endpoint in self.response_interceptors:
-            logger.debug(f"응답 인터셉트: {endpoint}")
-            modified_response = self.response_interceptors[endpoint](response_data)
-            return modified_response
+        chain = self.response_interceptors.get(endpoint)
+        if chain is None:
+            return response_data
+        logger.debug(f"응답 인터셉트: {endpoint}")
+        self.stats["intercepted"] += 1
+        response_data = self._run_chain(chain, response_data)
+        if chain.observers:
+            self._schedule_observers(chain, response_data)
+        return response_data
+        
+    async def intercept_request_async(self, endpoint: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """요청 데이터 인터셉트 (비동기 인터셉터 대기, 관찰 전용 인터셉터는 현재 루프의 태스크로 예약)"""
+        chain = self.request_interceptors.get(endpoint)
+        if chain is None:
+            return request_data
+        logger.debug(f"요청 인터셉트: {endpoint}")
+        self.stats["intercepted"] += 1
+        request_data = await self._run_chain_async(chain, request_data)
+        if chain.observers:
+            self._schedule_observers(chain, request_data)
+        return request_data
+        
+    async def intercept_response_async(self, endpoint: str, response_data: Dict[str, Any]) -> Dict[str, Any]:
+        """응답 데이터 인터셉트 (비동기 인터셉터 대기, 관찰 전용 인터셉터는 현재 루프의 태스크로 예약)"""
+        chain = self.response_interceptors.get(endpoint)
+        if chain is None:
+            return response_data
+        logger.debug(f"응답 인터셉트: {endpoint}")
+        self.stats["intercepted"] += 1
+        response_data = await self._run_chain_async(chain, response_data)
+        if chain.observers:
+            self._schedule_observers(chain, response_data)
         return response_data
+        
+    def observe_response(self, endpoint: str, response_data: Dict[str, Any]):
+        """이미 전달된 응답 데이터를 관찰 전용 인터셉터에만 넘김 (변경 인터셉터는 실행하지 않음)"""
+        chain = self.response_interceptors.get(endpoint)
+        if chain is not None and chain.observers:
+            self._schedule_observers(chain, response_data)
+            
+    async def drain_observers(self):
+        """예약된 관찰 전용 인터셉터가 모두 끝날 때까지 대기"""
+        while self._pending_observers:
+            pending = list(self._pending_observers)
+            await asyncio.gather(*[task if isinstance(task, asyncio.Future) else asyncio.wrap_future(task)
+                                   for task in pending], return_exceptions=True)
+            
+    def flush_observers(self, timeout: Optional[float] = None) -> bool:
+        """
+        관찰 스레드에 예약된 관찰 전용 인터셉터가 끝날 때까지 대기 (루프 태스크는 drain_observers 사용)
+
+        Returns:
+            제한 시간 안에 모두 끝났는지 여부
+        """
+        pending = [task for task in list(self._pending_observers) if isinstance(task, concurrent.futures.Future)]
+        _, not_done = concurrent.futures.wait(pending, timeout)
+        return not not_done
+        
+    def close(self):
+        """관찰 스레드 종료 (예약된 관찰 전용 인터셉터는 마저 실행)"""
+        if self._observer_executor is not None:
+            self._observer_executor.shutdown(wait=True)
+            self._observer_executor = None
     
+    @staticmethod
+    def _parse_product(product_data: Dict[str, Any]) -> Optional[ProductInfo]:
+        """상품 데이터 하나를 ProductInfo로 변환 (ID가 없으면 None, 형식 오류는 예외)"""
+        # MCP 응답 형식에 맞게 제품 정보 파싱
+        product_id = product_data.get("id") or product_data.get("product_id")
+        if not product_id:
+            return None
+            
+        price = float(product_data.get("price", 0))
+        description = product_data.get("description", "")
+        
+        # 추가 속성 및 메타데이터 추출
+        attributes = {}
+        for key, value in product_data.items():
+            if key not in ["id", "product_id", "price", "description"]:
+                attributes[key] = value
+        
+        return ProductInfo(
+            product_id=product_id,
+            price=price,
+            description=description,
+            attributes=attributes
+        )
+        
     def extract_product_info(self, product_data: Dict[str, Any]) -> Optional[ProductInfo]:
         """MCP 응답에서 상품 정보 추출"""
         try:
-            # MCP 응답 형식에 맞게 제품 정보 파싱
-            product_id = product_data.get("id") or product_data.get("product_id")
-            if not product_id:
+            product_info = self._parse_product(product_data)
+            if product_info is None:
                 logger.warning("제품 ID를 찾을 수 없음")
-                return None
-                
-            price = float(product_data.get("price", 0))
-            description = product_data.get("description", "")
-            
-            # 추가 속성 및 메타데이터 추출
-            attributes = {}
-            for key, value in product_data.items():
-                if key not in ["id", "product_id", "price", "description"]:
-                    attributes[key] = value
-            
-            return ProductInfo(
-                product_id=product_id,
-                price=price,
-                description=description,
-                attributes=attributes
-            )
+            return product_info
         except Exception as e:
             logger.error(f"제품 정보 추출 중 오류 발생: {e}")
             return None
+            
+    def extract_product_infos(self, products: Iterable[Dict[str, Any]]) -> List[ProductInfo]:
+        """
+        목록형 MCP 응답(검색 결과, 장바구니 항목)에서 상품 정보를 한 번에 추출
+        추출할 수 없는 항목은 건너뛰고 건너뛴 개수만 한 번 기록
+        """
+        product_infos = []
+        skipped = 0
+        for product_data in products:
+            try:
+                product_info = self._parse_product(product_data)
+            except Exception:
+                product_info = None
+            if product_info is None:
+                skipped += 1
+            else:
+                product_infos.append(product_info)
+        if skipped:
+            logger.warning(f"상품 정보를 추출할 수 없는 항목 {skipped}개 건너뜀")
+        return product_infos
+
+# MCP API 경로와 인터셉터 엔드포인트 이름 ({method} {경로 첫 부분})
+MCP_ROUTES: Dict[Tuple[str, str], str] = {
+    ("GET", "product"): "get_product",
+    ("GET", "search"): "search_products",
+    ("GET", "cart"): "get_cart",
+    ("POST", "cart"): "add_to_cart",
+}
+
+# 엔드포인트별 업스트림 요청 (forward_request용 경로 템플릿)
+MCP_ENDPOINT_PATHS: Dict[str, Tuple[str, str]] = {
+    "get_product": ("GET", "/api/mcp/product/{product_id}"),
+    "search_products": ("GET", "/api/mcp/search"),
+    "get_cart": ("GET", "/api/mcp/cart"),
+    "add_to_cart": ("POST", "/api/mcp/cart"),
+}
+
+# 프록시가 전달하지 않는 연결 단위(hop-by-hop) 헤더
+_HOP_HEADERS = frozenset(("connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailer",
+                          "trailers", "transfer-encoding", "upgrade", "host"))
+
+
+def mcp_endpoint(method: str, path: str) -> str:
+    """요청 경로(/api/mcp/...)에 해당하는 인터셉터 엔드포인트 이름 (모르는 경로는 경로 그대로)"""
+    parts = path.split("/", 4)
+    resource = parts[3] if len(parts) > 3 and parts[1] == "api" and parts[2] == "mcp" else path
+    return MCP_ROUTES.get((method, resource), path)
+
 
 class MCPProxy:
     """
     MCP 프록시
     에이전트와 서버 사이에서 통신을 중개하는 역할
+
+    upstream_url을 지정하면 역방향 프록시로 동작: 에이전트의 MCP 요청을 공유 커넥션 풀로 업스트림 쇼핑몰에 전달하고,
+    응답 본문은 받는 대로 청크 단위로 에이전트에게 흘려보냄. 관찰 전용 응답 인터셉터만 등록된 엔드포인트는 본문 사본을
+    모아 응답 전송이 끝난 뒤 관찰 전용 인터셉터에만 넘기므로, 문맥 저장이 에이전트 응답을 지연시키지 않음.
+    변경 인터셉터가 등록된 엔드포인트는 반환값이 에이전트에게 전달되어야 하므로 본문을 모두 받아 체인을 실행한 뒤 응답함
+    (tap_limit을 넘는 본문은 인터셉트하지 않고 그대로 중계).
     """
     
-    def __init__(self, mcp_interface: MCPInterface):
+    def __init__(self, mcp_interface: MCPInterface, upstream_url: Optional[str] = None, pool_size: int = 100,
+                 request_timeout: float = 30.0, chunk_size: int = 64 * 1024, tap_limit: int = 8 * 1024 * 1024):
+        """
+        Args:
+            mcp_interface: 인터셉터를 실행할 MCP 인터페이스
+            upstream_url: 요청을 전달할 쇼핑몰 주소 (None이면 요청을 그대로 응답으로 반환하는 시뮬레이션 모드)
+            pool_size: 업스트림 최대 동시 연결 수
+            request_timeout: 업스트림 요청 제한 시간 (초)
+            chunk_size: 응답 본문을 에이전트에게 흘려보내는 청크 크기 (바이트)
+            tap_limit: 인터셉터용으로 모으는 응답 본문 최대 크기 (넘으면 사본을 버리고 그대로 중계만 함)
+        """
         self.mcp_interface = mcp_interface
-        logger.info("MCP 프록시 초기화 완료")
+        self.upstream_url = upstream_url.rstrip("/") if upstream_url else None
+        self.pool_size = pool_size
+        self.request_timeout = request_timeout
+        self.chunk_size = chunk_size
+        self.tap_limit = tap_limit
+        self.stats: Dict[str, int] = {"requests": 0, "upstream_errors": 0, "tapped": 0, "tap_skipped": 0,
+                                      "bytes": 0}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._tap_tasks: Set[asyncio.Task] = set()
+        logger.info("MCP 프록시 초기화 완료" + (f" (업스트림: {self.upstream_url})" if self.upstream_url else ""))
+        
+    def _client(self) -> aiohttp.ClientSession:
+        """업스트림 커넥션 풀 (현재 루프에서 처음 사용할 때 생성)"""
+        if self._session is None or self._session.closed:
+            # 압축된 응답도 바이트 그대로 중계하도록 자동 해제 비활성화
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                auto_decompress=False
+            )
+        return self._session
+        
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> int:
+        """
+        역방향 프록시 서버 시작 (/api/mcp/ 아래 모든 요청을 업스트림으로 전달)
+
+        Returns:
+            수신 중인 포트 (port=0이면 임의로 배정된 포트)
+        """
+        if self.upstream_url is None:
+            raise ValueError("역방향 프록시 모드에는 upstream_url이 필요함")
+        app = web.Application()
+        app.router.add_route("*", "/api/mcp/{tail:.*}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self._client()
+        logger.info(f"MCP 역방향 프록시 시작: {host}:{port} -> {self.upstream_url}")
+        return port
+        
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        """에이전트 요청 하나를 업스트림으로 전달하고 응답을 스트리밍으로 중계"""
+        self.stats["requests"] += 1
+        endpoint = mcp_endpoint(request.method, request.path)
+        session_id = request.headers.get("X-Session-ID", "unknown")
+        headers = {key: value for key, value in request.headers.items() if key.lower() not in _HOP_HEADERS}
+        params = request.query
+        body: Any = request.content if request.can_read_body else None
+        
+        # 요청 인터셉터가 있는 엔드포인트만 본문을 읽어 인터셉트 (없으면 요청 본문도 스트리밍으로 전달)
+        # JSON이 아닌 본문은 인터셉트하지 않고 읽은 바이트 그대로 전달
+        if endpoint in self.mcp_interface.request_interceptors:
+            raw = await request.read() if request.can_read_body else b""
+            try:
+                parsed = json.loads(raw) if raw else None
+            except ValueError:
+                logger.debug(f"JSON이 아닌 요청 본문은 인터셉트하지 않음: {endpoint}")
+                body = raw
+            else:
+                request_data = {"session_id": session_id, "query": dict(request.query), "body": parsed}
+                request_data = await self.mcp_interface.intercept_request_async(endpoint, request_data)
+                params = request_data.get("query") or {}
+                body = json.dumps(request_data["body"]).encode("utf-8") \
+                    if request_data.get("body") is not None else None
+                headers.pop("Content-Length", None)
+            
+        try:
+            upstream = await self._client().request(request.method, self.upstream_url + request.path,
+                                                    params=params, data=body, headers=headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.stats["upstream_errors"] += 1
+            logger.error(f"업스트림 요청 실패: {endpoint}: {e}")
+            return web.json_response({"error": "Upstream unavailable"}, status=502)
+            
+        # 응답 인터셉터가 있고 해석할 수 있는 응답만 인터셉트
+        chain = self.mcp_interface.response_interceptors.get(endpoint)
+        if upstream.status >= 300 or "Content-Encoding" in upstream.headers:
+            chain = None
+        context = {"session_id": session_id, "agent_id": request.headers.get("X-Agent-ID"),
+                   "source_url": str(upstream.url)}
+            
+        async with upstream:
+            # 변경 인터셉터가 있으면 반환값이 에이전트에게 전달되도록 본문을 모아 인터셉트한 뒤 응답
+            # (tap_limit을 넘는 본문은 인터셉트하지 않고 읽은 부분부터 그대로 중계)
+            head: List[bytes] = []
+            if chain is not None and chain.modifiers:
+                head, complete = await self._read_limited(upstream)
+                if complete:
+                    return await self._intercepted_response(endpoint, context, upstream, b"".join(head))
+                    
+            response = web.StreamResponse(status=upstream.status, reason=upstream.reason)
+            for key, value in upstream.headers.items():
+                if key.lower() not in _HOP_HEADERS:
+                    response.headers.add(key, value)
+            await response.prepare(request)
+            
+            # 관찰 전용 인터셉터만 있으면 그대로 스트리밍하면서 사본을 모음
+            tap: Optional[List[bytes]] = [] if chain is not None and not chain.modifiers else None
+            tapped = 0
+            for chunk in head:
+                await response.write(chunk)
+                self.stats["bytes"] += len(chunk)
+            async for chunk in upstream.content.iter_chunked(self.chunk_size):
+                await response.write(chunk)
+                self.stats["bytes"] += len(chunk)
+                if tap is not None:
+                    tapped += len(chunk)
+                    if tapped > self.tap_limit:
+                        self.stats["tap_skipped"] += 1
+                        tap = None
+                    else:
+                        tap.append(chunk)
+            await response.write_eof()
+            
+        if tap is not None:
+            task = asyncio.get_running_loop().create_task(self._tap(endpoint, context, b"".join(tap)))
+            self._tap_tasks.add(task)
+            task.add_done_callback(self._tap_tasks.discard)
+        return response
+        
+    async def _read_limited(self, upstream: aiohttp.ClientResponse) -> Tuple[List[bytes], bool]:
+        """
+        응답 본문을 tap_limit까지 읽음
+
+        Returns:
+            (읽은 청크, 본문을 끝까지 읽었는지 여부) - tap_limit을 넘으면 넘은 청크까지만 읽고 중단
+        """
+        chunks: List[bytes] = []
+        size = 0
+        async for chunk in upstream.content.iter_chunked(self.chunk_size):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self.tap_limit:
+                self.stats["tap_skipped"] += 1
+                return chunks, False
+        return chunks, True
+        
+    @staticmethod
+    def _wrap(endpoint: str, context: Dict[str, Any], payload: Any) -> Dict[str, Any]:
+        """응답 본문을 인터셉터 입력으로 변환 (상품 조회 응답은 product 키, 나머지는 응답 필드를 그대로 병합)"""
+        data = dict(context)
+        if endpoint == "get_product":
+            data["product"] = payload
+        elif isinstance(payload, dict):
+            data.update(payload)
+        return data
+        
+    @staticmethod
+    def _unwrap(endpoint: str, context: Dict[str, Any], payload: Any, data: Dict[str, Any]) -> Any:
+        """인터셉터 결과를 응답 본문으로 되돌림 (프록시가 덧붙인 문맥 필드는 제외)"""
+        if endpoint == "get_product":
+            return data.get("product", payload)
+        if not isinstance(payload, dict):
+            return payload
+        return {key: value for key, value in data.items() if key not in context or key in payload}
+        
+    async def _intercepted_response(self, endpoint: str, context: Dict[str, Any],
+                                    upstream: aiohttp.ClientResponse, body: bytes) -> web.Response:
+        """모은 응답 본문을 인터셉터 체인에 통과시킨 결과로 응답 (JSON이 아니면 받은 그대로 응답)"""
+        self.stats["bytes"] += len(body)
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            logger.debug(f"JSON이 아닌 응답은 인터셉트하지 않음: {endpoint}")
+        else:
+            self.stats["tapped"] += 1
+            data = await self.mcp_interface.intercept_response_async(endpoint, self._wrap(endpoint, context, payload))
+            body = json.dumps(self._unwrap(endpoint, context, payload, data)).encode("utf-8")
+        response = web.Response(status=upstream.status, reason=upstream.reason, body=body)
+        for key, value in upstream.headers.items():
+            if key.lower() not in _HOP_HEADERS and key.lower() != "content-length":
+                response.headers.add(key, value)
+        return response
+        
+    async def _tap(self, endpoint: str, context: Dict[str, Any], body: bytes):
+        """중계가 끝난 응답 사본을 관찰 전용 인터셉터에 전달 (이미 보낸 응답이므로 변경 인터셉터는 실행하지 않음)"""
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            logger.debug(f"JSON이 아닌 응답은 인터셉트하지 않음: {endpoint}")
+            return
+        self.stats["tapped"] += 1
+        self.mcp_interface.observe_response(endpoint, self._wrap(endpoint, context, payload))
+        
+    async def drain(self):
+        """진행 중인 응답 사본 인터셉트와 관찰 전용 인터셉터가 끝날 때까지 대기"""
+        if self._tap_tasks:
+            await asyncio.gather(*list(self._tap_tasks), return_exceptions=True)
+        await self.mcp_interface.drain_observers()
+        
+    @property
+    def is_open(self) -> bool:
+        """프록시 서버나 업스트림 커넥션 풀이 열려 있는지 여부"""
+        return self._runner is not None or (self._session is not None and not self._session.closed)
+        
+    async def close(self):
+        """프록시 서버와 업스트림 커넥션 풀 종료"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        await self.drain()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
         
     async def forward_request(self, endpoint: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
-        """에이전트의 요청을 서버로 전달"""
+        """
+        에이전트의 요청을 서버로 전달
+        업스트림이 설정되어 있으면 엔드포인트에 맞는 MCP API를 호출하여 응답 JSON을 반환
+        (request_data: session_id, product_id, query, body)
+        """
         # 요청 인터셉트
-        modified_request = self.mcp_interface.intercept_request(endpoint, request_data)
+        modified_request = await self.mcp_interface.intercept_request_async(endpoint, request_data)
+        
+        if self.upstream_url is None or endpoint not in MCP_ENDPOINT_PATHS:
+            # 업스트림이 없으면 시뮬레이션을 위해 요청을 그대로 응답으로 반환
+            logger.info(f"요청 전달: {endpoint}")
+            return modified_request
         
-        # 실제 API 호출은 구현하지 않음 (실제로는 여기서 HTTP 요청 수행)
-        # 여기서는 시뮬레이션을 위해 요청을 그대로 응답으로 반환
-        logger.info(f"요청 전달: {endpoint}")
-        return modified_request
+        method, path = MCP_ENDPOINT_PATHS[endpoint]
+        url = self.upstream_url + path.format(product_id=modified_request.get("product_id", ""))
+        headers = {"X-Session-ID": modified_request.get("session_id", "unknown")}
+        async with self._client().request(method, url, params=modified_request.get("query"),
+                                          json=modified_request.get("body"), headers=headers) as response:
+            logger.info(f"요청 전달: {endpoint} ({response.status})")
+            return await response.json(content_type=None)
         
     async def forward_response(self, endpoint: str, response_data: Dict[str, Any]) -> Dict[str, Any]:
         """서버의 응답을 에이전트로 전달"""
         # 응답 인터셉트
-        modified_response = self.mcp_interface.intercept_response(endpoint, response_data)
+        modified_response = await self.mcp_interface.intercept_response_async(endpoint, response_data)
         
         logger.info(f"응답 전달: {endpoint}")
-        return modified_response 
\ No newline at end of file
+        return modified_response
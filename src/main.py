@@ -3,6 +3,7 @@ import json
 import argparse
 import os
 import sys
+import math
 import time
 import random
 from datetime import datetime
@@ -70,7 +71,7 @@ async def run_simulation(scenario_type: str):
     print("=========================\n")
     
     # 시스템 정리
-    system.cleanup()
+    await system.aclose()
     return result
 
 async def run_all_simulations():
@@ -132,181 +133,168 @@ async def run_interactive_demo():
             print("잘못된 선택입니다. 다시 시도하세요.")
     
     print("데모를 종료합니다.")
-    system.cleanup()
+    await system.aclose()
 
-async def run_large_scale_test():
-    """대규모 테스트 실행 및 성능 평가"""
-    # 테스트 설정
-    normal_count = 30
-    price_fraud_count = 20
-    description_fraud_count = 15
+DEFAULT_SCENARIO_COUNTS = {
+    "normal": 30,
+    "price_change": 20,
+    "description_change": 14,
+    "wording_variation": 1
+}
+
+# 속임수가 있어 탐지되어야 하는 시나리오 (나머지는 정상으로 간주)
+FRAUD_SCENARIOS = {"price_change", "description_change"}
+
+SCENARIO_LABELS = {
+    "normal": "정상 시나리오",
+    "price_change": "가격 변경 시나리오",
+    "description_change": "설명 변경 시나리오",
+    "wording_variation": "표현 변형 시나리오"
+}
+
+def _percentile(sorted_values, q):
+    """정렬된 값 목록의 분위수 (nearest-rank)"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+async def _run_scenarios_concurrently(system, plan, concurrency):
+    """하나의 시스템 인스턴스에서 시나리오를 지정한 동시성으로 실행"""
+    results = []
+    pending = iter(plan)
+    total = len(plan)
+    progress_step = max(1, total // 10)
+    
+    async def worker():
+        for scenario in pending:
+            started = time.perf_counter()
+            result = await system.simulate_fraud_scenario(scenario)
+            # 대규모 실행 시 메모리를 아끼기 위해 집계에 필요한 값만 보관
+            results.append({
+                "scenario": scenario,
+                "is_fraud_detected": result["is_fraud_detected"],
+                "detection_time": time.perf_counter() - started,
+                "simulated_latency": result.get("simulated_latency", 0.0)
+            })
+            if len(results) % progress_step == 0:
+                print(f"진행 중: {len(results)}/{total}")
+    
+    await asyncio.gather(*[worker() for _ in range(max(1, min(concurrency, total)))])
+    return results
+
+async def run_large_scale_test(counts=None, concurrency=50, virtual_clock=False, seed=42):
+    """
+    대규모 테스트 실행 및 성능 평가
+    
+    Args:
+        counts: 시나리오별 실행 횟수 (기본: DEFAULT_SCENARIO_COUNTS)
+        concurrency: 동시에 실행할 시나리오 수
+        virtual_clock: 가상 시계 사용 여부 (대기 없이 CPU 속도로 실행하고 시뮬레이션 지연을 보고)
+        seed: 시나리오 실행 순서를 섞는 난수 시드
+    """
+    counts = counts or DEFAULT_SCENARIO_COUNTS
+    counts = {scenario: count for scenario, count in counts.items() if count > 0}
+    total_count = sum(counts.values())
+    if total_count == 0:
+        print("실행할 시나리오가 없습니다.")
+        return None
     
     print(f"\n===== 대규모 성능 평가 테스트 시작 =====")
-    print(f"정상 시나리오: {normal_count}회")
-    print(f"가격 속임수 시나리오: {price_fraud_count}회")
-    print(f"설명 속임수 시나리오: {description_fraud_count}회")
+    for scenario, count in counts.items():
+        print(f"{SCENARIO_LABELS.get(scenario, scenario)}: {count}회")
+    print(f"동시 실행 수: {concurrency}, 시계: {'가상' if virtual_clock else '실제'}")
     print("테스트가 진행 중입니다. 잠시 기다려주세요...\n")
     
-    # 결과 저장 변수
-    normal_results = []
-    price_fraud_results = []
-    desc_fraud_results = []
-    
-    # 1. 정상 시나리오 테스트
-    for i in range(normal_count):
-        result = await run_simulation("normal")
-        normal_results.append(result)
-        # 진행 상황 표시
-        print(f"정상 시나리오 테스트 진행 중: {i+1}/{normal_count}")
-    
-    # 2. 가격 속임수 시나리오 테스트
-    for i in range(price_fraud_count):
-        result = await run_simulation("price_change")
-        price_fraud_results.append(result)
-        # 진행 상황 표시
-        print(f"가격 속임수 시나리오 테스트 진행 중: {i+1}/{price_fraud_count}")
-    
-    # 3. 설명 속임수 시나리오 테스트
-    for i in range(description_fraud_count):
-        # 랜덤하게 표현 변형 시나리오 1개 생성 (탐지되지 않아야 함)
-        if i == 7:  # 중간 즈음에 표현 변형 시나리오 배치
-            system = FraudDetectionSystem()
-            result = await system.simulate_fraud_scenario("wording_variation")
-            system.cleanup()
-        else:
-            result = await run_simulation("description_change")
-        desc_fraud_results.append(result)
-        # 진행 상황 표시
-        print(f"설명 속임수 시나리오 테스트 진행 중: {i+1}/{description_fraud_count}")
+    # 실행 계획 (시나리오 유형을 섞어 실제 트래픽처럼 구성)
+    plan = [scenario for scenario, count in counts.items() for _ in range(count)]
+    random.Random(seed).shuffle(plan)
+    
+    # 모든 시나리오가 하나의 시스템 인스턴스를 공유
+    system = FraudDetectionSystem({
+        "clock": "virtual" if virtual_clock else "real",
+        "verification_workers": max(8, concurrency),
+        "console_notifications": total_count <= 1000
+    })
+    
+    started = time.perf_counter()
+    results = await _run_scenarios_concurrently(system, plan, concurrency)
+    elapsed = time.perf_counter() - started
+    await system.aclose()
     
     # 결과 분석
-    # 1. 정상 시나리오 오탐지율 (False Positive)
-    normal_fp_count = sum(1 for r in normal_results if r["is_fraud_detected"])
-    normal_fp_rate = normal_fp_count / normal_count if normal_count > 0 else 0
-    
-    # 2. 가격 속임수 탐지율 (True Positive)
-    price_tp_count = sum(1 for r in price_fraud_results if r["is_fraud_detected"])
-    price_tp_rate = price_tp_count / price_fraud_count if price_fraud_count > 0 else 0
-    
-    # 3. 설명 속임수 탐지율 (True Positive)
-    desc_tp_count = sum(1 for r in desc_fraud_results if r["is_fraud_detected"])
-    desc_tp_rate = desc_tp_count / description_fraud_count if description_fraud_count > 0 else 0
-    
-    # 4. 전체 정밀도와 재현율 계산
-    all_fraud_results = price_fraud_results + desc_fraud_results
-    all_fraud_count = len(all_fraud_results)
-    all_tp_count = price_tp_count + desc_tp_count
-    
-    # 정밀도 (Precision): TP / (TP + FP)
-    if (all_tp_count + normal_fp_count) > 0:
-        precision = all_tp_count / (all_tp_count + normal_fp_count)
-    else:
-        precision = 1.0  # 0으로 나누기 방지
+    by_scenario = {scenario: [r for r in results if r["scenario"] == scenario] for scenario in counts}
+    detected = {scenario: sum(1 for r in items if r["is_fraud_detected"]) for scenario, items in by_scenario.items()}
     
-    # 재현율 (Recall): TP / (TP + FN)
-    if all_fraud_count > 0:
-        recall = all_tp_count / all_fraud_count
-    else:
-        recall = 1.0  # 0으로 나누기 방지
+    true_positive = sum(detected[s] for s in counts if s in FRAUD_SCENARIOS)
+    false_positive = sum(detected[s] for s in counts if s not in FRAUD_SCENARIOS)
+    fraud_total = sum(counts[s] for s in counts if s in FRAUD_SCENARIOS)
+    normal_total = total_count - fraud_total
     
-    # 5. 반응 시간 분석
-    all_detection_times = [r["detection_time"] for r in normal_results + price_fraud_results + desc_fraud_results if "detection_time" in r]
-    fraud_detection_times = [r["detection_time"] for r in price_fraud_results + desc_fraud_results if "detection_time" in r and r["is_fraud_detected"]]
+    # 정밀도 (Precision): TP / (TP + FP), 재현율 (Recall): TP / (TP + FN)
+    precision = true_positive / (true_positive + false_positive) if (true_positive + false_positive) > 0 else 1.0
+    recall = true_positive / fraud_total if fraud_total > 0 else 1.0
+    false_positive_rate = false_positive / normal_total if normal_total > 0 else 0.0
     
-    avg_detection_time = statistics.mean(all_detection_times) if all_detection_times else 0
-    fraud_avg_detection_time = statistics.mean(fraud_detection_times) if fraud_detection_times else 0
-    max_detection_time = max(all_detection_times) if all_detection_times else 0
+    # 처리량 및 지연 분위수
+    throughput = total_count / elapsed if elapsed > 0 else 0.0
+    wall_latencies = sorted(r["detection_time"] for r in results)
+    simulated_latencies = sorted(r["simulated_latency"] for r in results)
     
     # 결과 출력
     print("\n===== 대규모 테스트 결과 =====")
-    print(f"1. 정상 시나리오 ({normal_count}회):")
-    print(f"   - 잘못된 경고 발생: {normal_fp_count}건")
-    print(f"   - 오탐지율: {normal_fp_rate:.1%}")
-    
-    print(f"\n2. 가격 속임수 시나리오 ({price_fraud_count}회):")
-    print(f"   - 탐지 성공: {price_tp_count}건")
-    print(f"   - 탐지율: {price_tp_rate:.1%}")
-    
-    print(f"\n3. 설명 속임수 시나리오 ({description_fraud_count}회):")
-    print(f"   - 탐지 성공: {desc_tp_count}건")
-    print(f"   - 탐지율: {desc_tp_rate:.1%}")
-    print(f"   - 미탐지 사례: {description_fraud_count - desc_tp_count}건")
-    
-    print(f"\n4. 종합 성능:")
-    print(f"   - 정밀도(Precision): {precision:.1%}")
-    print(f"   - 재현율(Recall): {recall:.1%}")
-    
-    print(f"\n5. 반응 시간:")
-    print(f"   - 평균 탐지 소요 시간: {avg_detection_time:.3f}초")
-    print(f"   - 속임수 탐지 평균 소요 시간: {fraud_avg_detection_time:.3f}초")
-    print(f"   - 최대 탐지 소요 시간: {max_detection_time:.3f}초")
-    
-    print("\n===== 테스트 요약 =====")
-    
-    # 시스템 결과 요약 테이블 출력
-    summary_table = [
-        ["테스트 유형", "테스트 건수", "탐지 건수", "탐지율(%)", "평균 처리시간(초)"],
-        ["정상 시나리오", str(normal_count), str(normal_fp_count), f"{normal_fp_rate:.1%}", f"{avg_detection_time:.3f}"],
-        ["가격 변경 시나리오", str(price_fraud_count), str(price_tp_count), f"{price_tp_rate:.1%}", f"{fraud_avg_detection_time:.3f}"],
-        ["설명 변경 시나리오", str(description_fraud_count), str(desc_tp_count), f"{desc_tp_rate:.1%}", f"{fraud_avg_detection_time:.3f}"],
-        ["종합 평가", str(normal_count+price_fraud_count+description_fraud_count), 
-         str(all_tp_count), f"P:{precision:.1%}/R:{recall:.1%}", f"{avg_detection_time:.3f}"]
-    ]
+    summary_table = [["테스트 유형", "테스트 건수", "탐지 건수", "탐지율(%)", "평균 처리시간(초)"]]
+    for scenario, items in by_scenario.items():
+        rate = detected[scenario] / len(items) if items else 0.0
+        avg_time = statistics.mean(r["detection_time"] for r in items) if items else 0.0
+        summary_table.append([SCENARIO_LABELS.get(scenario, scenario), str(len(items)), str(detected[scenario]),
+                              f"{rate:.1%}", f"{avg_time:.3f}"])
+    summary_table.append(["종합 평가", str(total_count), str(true_positive),
+                          f"P:{precision:.1%}/R:{recall:.1%}", f"{statistics.mean(wall_latencies):.3f}"])
     
     # 테이블 행 너비 계산 및 테이블 출력
     col_widths = [max(len(row[i]) for row in summary_table) for i in range(len(summary_table[0]))]
-    
-    # 헤더 출력
-    header = "| " + " | ".join(summary_table[0][i].ljust(col_widths[i]) for i in range(len(summary_table[0]))) + " |"
     separator = "+" + "+".join("-" * (col_widths[i] + 2) for i in range(len(col_widths))) + "+"
-    
     print(separator)
-    print(header)
-    print(separator)
-    
-    # 데이터 행 출력
-    for row_idx in range(1, len(summary_table)):
-        row = summary_table[row_idx]
+    for row_idx, row in enumerate(summary_table):
         print("| " + " | ".join(row[i].ljust(col_widths[i]) for i in range(len(row))) + " |")
-    
+        if row_idx == 0:
+            print(separator)
     print(separator)
     
-    # 시스템 성능 분석 결과 출력 (체계적 형식)
     print("\n[시스템 성능 분석]")
     print(f"1. 탐지 정확도")
     print(f"   - 정밀도(Precision): {precision:.1%}")
     print(f"   - 재현율(Recall): {recall:.1%}")
-    print(f"   - 가격 변경 탐지율: {price_tp_rate:.1%}")
-    print(f"   - 설명 변경 탐지율: {desc_tp_rate:.1%}")
+    print(f"   - 오탐지율: {false_positive_rate:.1%} ({false_positive}/{normal_total})")
     
-    if description_fraud_count - desc_tp_count > 0:
-        print(f"\n2. 미탐지 분석")
-        print(f"   - 설명 변경 미탐지: {description_fraud_count - desc_tp_count}건")
-        print(f"   - 원인: 경미한 표현 변화로 소비자 구매 결정에 유의미한 영향 없음")
-        print(f"   - 조치: 현재 임계값 유지 (과민 탐지로 인한 오탐지 방지)")
+    print(f"\n2. 처리량")
+    print(f"   - 전체 소요 시간: {elapsed:.2f}초")
+    print(f"   - 처리량: {throughput:.1f} 시나리오/초 (동시 실행 {concurrency})")
     
-    print(f"\n3. 오탐지 분석") 
-    print(f"   - 정상 시나리오 오탐지: {normal_fp_count}건 ({normal_fp_rate:.1%})")
-    print(f"   - 평가: {'낮은 오탐지율로 우수한 성능' if normal_fp_rate < 0.05 else '개선 필요'}")
+    print(f"\n3. 시나리오당 지연 (실제 시간)")
+    print(f"   - p50: {_percentile(wall_latencies, 0.50):.3f}초")
+    print(f"   - p95: {_percentile(wall_latencies, 0.95):.3f}초")
+    print(f"   - p99: {_percentile(wall_latencies, 0.99):.3f}초")
     
-    print(f"\n4. 시스템 효율성")
-    print(f"   - 평균 처리시간: {avg_detection_time:.3f}초")
-    print(f"   - 속임수 탐지 평균: {fraud_avg_detection_time:.3f}초")
-    print(f"   - 최대 처리시간: {max_detection_time:.3f}초")
-    print(f"   - 시스템 오버헤드: 전체 거래 소요시간 대비 5% 미만")
+    if virtual_clock:
+        print(f"\n4. 시나리오당 지연 (시뮬레이션 시간)")
+        print(f"   - p50: {_percentile(simulated_latencies, 0.50):.3f}초")
+        print(f"   - p95: {_percentile(simulated_latencies, 0.95):.3f}초")
+        print(f"   - p99: {_percentile(simulated_latencies, 0.99):.3f}초")
     
-    print(f"\n5. 결론")
-    efficiency_rating = "매우 우수" if avg_detection_time < 0.5 else "우수" if avg_detection_time < 1.0 else "양호"
-    accuracy_rating = "매우 우수" if precision > 0.95 and recall > 0.95 else "우수" if precision > 0.9 and recall > 0.9 else "양호"
-    
-    print(f"   - 탐지 정확도: {accuracy_rating}")
-    print(f"   - 시스템 효율성: {efficiency_rating}")
-    print(f"   - 실시간 처리 적합성: 모든 시나리오에서 1초 이내 처리로 사용자 경험 영향 없음")
-    print(f"   - 실제 구현 시 고려사항: 네트워크 지연, 서버 부하에 따른 성능 변화 모니터링 필요")
-    
-    logger.info(f"테스트 완료: 정밀도={precision:.1%}, 재현율={recall:.1%}, 평균처리시간={avg_detection_time:.3f}초")
+    logger.info(f"테스트 완료: 정밀도={precision:.1%}, 재현율={recall:.1%}, "
+                f"처리량={throughput:.1f}/초, p99={_percentile(wall_latencies, 0.99):.3f}초")
     
     print("\n=========================\n")
+    return {
+        "precision": precision,
+        "recall": recall,
+        "throughput": throughput,
+        "elapsed": elapsed,
+        "latency": {q: _percentile(wall_latencies, v) for q, v in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))},
+        "simulated_latency": {q: _percentile(simulated_latencies, v) for q, v in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))}
+    }
 
 def main():
     """메인 함수"""
@@ -320,6 +308,19 @@ def main():
     parser = argparse.ArgumentParser(description="AI 쇼핑 속임수 탐지 시스템")
     parser.add_argument("--scenario", choices=["normal", "price_change", "description_change", "all", "large_scale"],
                       help="실행할 시나리오 (기본: 대화형 모드)")
+    large_scale = parser.add_argument_group("대규모 테스트 옵션 (--scenario large_scale)")
+    large_scale.add_argument("--normal", type=int, default=DEFAULT_SCENARIO_COUNTS["normal"],
+                             help="정상 시나리오 실행 횟수")
+    large_scale.add_argument("--price", type=int, default=DEFAULT_SCENARIO_COUNTS["price_change"],
+                             help="가격 속임수 시나리오 실행 횟수")
+    large_scale.add_argument("--description", type=int, default=DEFAULT_SCENARIO_COUNTS["description_change"],
+                             help="설명 속임수 시나리오 실행 횟수")
+    large_scale.add_argument("--wording", type=int, default=DEFAULT_SCENARIO_COUNTS["wording_variation"],
+                             help="표현 변형(정상) 시나리오 실행 횟수")
+    large_scale.add_argument("--concurrency", type=int, default=50, help="동시에 실행할 시나리오 수")
+    large_scale.add_argument("--virtual-clock", action="store_true",
+                             help="가상 시계 사용 (대기 없이 실행하고 시뮬레이션 지연 보고)")
+    large_scale.add_argument("--seed", type=int, default=42, help="시나리오 순서 난수 시드")
     args = parser.parse_args()
     
     # 시나리오 실행
@@ -327,7 +328,14 @@ def main():
         if args.scenario == "all":
             asyncio.run(run_all_simulations())
         elif args.scenario == "large_scale":
-            asyncio.run(run_large_scale_test())
+            counts = {
+                "normal": args.normal,
+                "price_change": args.price,
+                "description_change": args.description,
+                "wording_variation": args.wording
+            }
+            asyncio.run(run_large_scale_test(counts, concurrency=args.concurrency,
+                                             virtual_clock=args.virtual_clock, seed=args.seed))
         else:
             asyncio.run(run_simulation(args.scenario))
     else:
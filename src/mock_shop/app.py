@@ -1,6 +1,9 @@
-from flask import Flask, jsonify, request, render_template, session, redirect, url_for
+from flask import Flask, Response, jsonify, request, render_template, session, redirect, url_for, stream_with_context
+import asyncio
 import json
 import os
+import sys
+import threading
 import uuid
 from datetime import datetime
 import random
@@ -54,9 +57,26 @@ PRODUCTS = {
 # 세션별 장바구니 (실제로는 DB를 사용하겠지만 여기서는 메모리에 저장)
 CARTS = {}
 
+# 상품별 장바구니 역방향 인덱스 {product_id: {session_id}} - 상품 변경 시 전체 장바구니를 순회하지 않기 위함
+PRODUCT_CARTS = {}
+
 # MCP API 로그 (실제로는 DB를 사용하겠지만 여기서는 메모리에 저장)
 MCP_LOGS = []
 
+# 탐지 이벤트 스트림에 연결된 속임수 탐지 시스템 (attach_fraud_system으로 연결)
+FRAUD_SYSTEM = None
+
+# connect_fraud_system으로 만든 탐지 시스템의 비동기 작업(검증)을 실행하는 이벤트 루프와 스레드
+DETECTOR_LOOP = None
+DETECTOR_THREAD = None
+
+# 쇼핑몰과 같은 프로세스에서 실행하는 탐지 시스템의 기본 설정
+# (Flask 요청 스레드와 검증 루프 스레드가 문맥 저장소를 공유하므로 잠금 분할 저장소 사용)
+DEFAULT_DETECTOR_CONFIG = {"context_storage_stripes": 16}
+
+# 이벤트가 없을 때 연결 유지를 위해 주석 행을 보내는 간격 (초)
+SSE_KEEPALIVE_SECONDS = 15
+
 @app.route('/')
 def index():
     """쇼핑몰 메인 페이지"""
@@ -109,7 +129,7 @@ def add_to_cart(product_id):
         CARTS[session['session_id']] = []
         
     if product_id in PRODUCTS:
-        CARTS[session['session_id']].append(product_id)
+        add_cart_item(session['session_id'], product_id)
         return redirect(url_for('cart'))
     
     return render_template('error.html', message="상품을 찾을 수 없습니다."), 404
@@ -185,7 +205,7 @@ def checkout():
         # 결제 처리 (실제로는 결제 시스템과 연동)
         order_id = str(uuid.uuid4())
         # 장바구니 비우기
-        CARTS[session['session_id']] = []
+        clear_cart(session['session_id'])
         return render_template('order_complete.html', order_id=order_id)
         
     return render_template('checkout.html', cart_items=cart_items, total_price=total_price, has_fraud=has_fraud)
@@ -239,6 +259,7 @@ def mcp_get_product(product_id):
     
     # 응답 로깅
     log_mcp_response('get_product', response_data)
+    report_mcp_response('get_product', request.headers.get('X-Session-ID', 'unknown'), {"product": response_data})
     
     return jsonify(response_data)
 
@@ -275,6 +296,7 @@ def mcp_search_products():
     
     # 응답 로깅
     log_mcp_response('search_products', response_data)
+    report_mcp_response('search_products', request.headers.get('X-Session-ID', 'unknown'), response_data)
     
     return jsonify(response_data)
 
@@ -312,6 +334,7 @@ def mcp_cart():
         
         # 응답 로깅
         log_mcp_response('get_cart', response_data)
+        report_mcp_response('get_cart', session_id, response_data)
         
         return jsonify(response_data)
     
@@ -328,18 +351,124 @@ def mcp_cart():
         if not product_id or product_id not in PRODUCTS:
             return jsonify({"error": "Invalid product ID"}), 400
             
-        if session_id not in CARTS:
-            CARTS[session_id] = []
-            
-        CARTS[session_id].append(product_id)
+        add_cart_item(session_id, product_id)
         
         response_data = {"success": True, "message": "Product added to cart"}
         
         # 응답 로깅
         log_mcp_response('add_to_cart', response_data)
+        # 장바구니 담기 검증 (결과는 탐지 이벤트 스트림으로 전달되므로 응답은 기다리지 않음)
+        report_add_to_cart(session_id, product_id)
         
         return jsonify(response_data)
 
+# ===== 탐지 이벤트 스트림 =====
+# 속임수 탐지 시스템이 같은 프로세스에서 실행될 때 attach_fraud_system()으로 연결하면,
+# 브라우저와 원격 에이전트가 Server-Sent Events로 세션의 알림과 탐지 결과를 바로 받을 수 있습니다.
+# 관리자 페이지나 알림 기록 API를 주기적으로 조회(폴링)하지 않아도 됩니다.
+# connect_fraud_system()은 탐지 시스템을 만들어 연결하고, MCP API 응답을 문맥으로 저장하며
+# MCP 장바구니 담기마다 검증을 실행합니다 (쇼핑몰을 직접 실행하면 자동으로 연결).
+
+SSE_EVENT_TYPES = {"NotificationMessage": "notification", "DetectionResult": "detection"}
+
+def attach_fraud_system(fraud_system):
+    """이벤트 스트림에 속임수 탐지 시스템 연결"""
+    global FRAUD_SYSTEM
+    FRAUD_SYSTEM = fraud_system
+
+def connect_fraud_system(config=None):
+    """
+    같은 프로세스에서 실행할 속임수 탐지 시스템을 만들어 연결
+    
+    검증은 별도 스레드의 이벤트 루프에서 실행하고, 재수집한 최신 상품 정보로는
+    MCP 표시 정보가 아닌 실제 결제 가격/설명(current_product)을 사용합니다.
+    """
+    global DETECTOR_LOOP, DETECTOR_THREAD
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    from src.system import FraudDetectionSystem
+    
+    disconnect_fraud_system()
+    fraud_system = FraudDetectionSystem({**DEFAULT_DETECTOR_CONFIG, **(config or {})})
+    fraud_system.data_collector.product_source = current_product
+    DETECTOR_LOOP = asyncio.new_event_loop()
+    DETECTOR_THREAD = threading.Thread(target=DETECTOR_LOOP.run_forever, name="fraud-detector-loop", daemon=True)
+    DETECTOR_THREAD.start()
+    attach_fraud_system(fraud_system)
+    return fraud_system
+
+def disconnect_fraud_system(timeout=10.0):
+    """connect_fraud_system으로 연결한 탐지 시스템 종료 및 연결 해제"""
+    global DETECTOR_LOOP, DETECTOR_THREAD
+    fraud_system = FRAUD_SYSTEM
+    attach_fraud_system(None)
+    if DETECTOR_LOOP is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(fraud_system.aclose(), DETECTOR_LOOP).result(timeout)
+    except Exception as e:
+        app.logger.warning(f"탐지 시스템 종료 중 오류 발생: {e}")
+    DETECTOR_LOOP.call_soon_threadsafe(DETECTOR_LOOP.stop)
+    DETECTOR_THREAD.join(timeout)
+    DETECTOR_LOOP.close()
+    DETECTOR_LOOP = None
+    DETECTOR_THREAD = None
+
+def report_mcp_response(endpoint, session_id, response_data):
+    """MCP 응답을 탐지 시스템의 응답 인터셉터에 전달 (상품 문맥 저장)"""
+    if DETECTOR_LOOP is None:
+        return
+    try:
+        FRAUD_SYSTEM.mcp_interface.intercept_response(endpoint, {**response_data, "session_id": session_id})
+    except Exception as e:
+        app.logger.error(f"MCP 응답 전달 중 오류 발생: {e}")
+
+def report_add_to_cart(session_id, product_id):
+    """
+    장바구니 담기 검증을 탐지 시스템 루프에서 실행
+    
+    반환값:
+    - 검증 결과를 기다릴 수 있는 Future (탐지 시스템이 연결되지 않았으면 None)
+    """
+    if DETECTOR_LOOP is None:
+        return None
+    return asyncio.run_coroutine_threadsafe(FRAUD_SYSTEM.on_add_to_cart(session_id, product_id), DETECTOR_LOOP)
+
+@app.route('/api/events', methods=['GET'])
+@app.route('/api/events/<session_id>', methods=['GET'])
+def event_stream(session_id=None):
+    """
+    탐지 이벤트 스트림 (SSE)
+    
+    세션의 알림(event: notification)과 탐지 결과(event: detection)를 JSON으로 전송합니다.
+    세션 ID를 생략하면 모든 세션의 이벤트를 전송합니다.
+    구독 대기열이 가득 차면 가장 오래된 이벤트부터 버려지므로, 느린 클라이언트는 최신 이벤트 위주로 받게 됩니다.
+    """
+    if FRAUD_SYSTEM is None:
+        return jsonify({"error": "Fraud detection system not attached"}), 503
+    
+    subscription = FRAUD_SYSTEM.subscribe(session_id)
+    
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                if event is None:
+                    if subscription.closed:
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                event_type = SSE_EVENT_TYPES.get(type(event).__name__, "message")
+                yield f"id: {subscription.delivered}\nevent: {event_type}\ndata: {event.json(ensure_ascii=False)}\n\n"
+        finally:
+            # 클라이언트 연결이 끊기면 구독 해지
+            subscription.close()
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 # ===== 관리자 페이지 =====
 
 @app.route('/admin')
@@ -442,12 +571,10 @@ def toggle_fraud(product_id, fraud_type):
     app.logger.info(f"속임수 변경 후: 상품 {product_id}, is_fraud={PRODUCTS[product_id]['is_fraud']}, fraud_type={PRODUCTS[product_id]['fraud_type']}")
     app.logger.info(f"속임수 변경 후 상품 데이터: {PRODUCTS[product_id]}")
     
-    # 해당 상품이 이미 장바구니에 있는 세션에 대해서도 변경을 반영
-    cart_sessions = []
-    for session_id, cart in CARTS.items():
-        if product_id in cart:
-            cart_sessions.append(session_id)
-            app.logger.info(f"세션 {session_id}의 장바구니에 있는 상품 {product_id}의 속임수 정보가 업데이트되었습니다.")
+    # 해당 상품이 이미 장바구니에 있는 세션에 대해서도 변경을 반영 (역방향 인덱스로 영향받는 세션만 조회)
+    cart_sessions = list(PRODUCT_CARTS.get(product_id, ()))
+    for session_id in cart_sessions:
+        app.logger.info(f"세션 {session_id}의 장바구니에 있는 상품 {product_id}의 속임수 정보가 업데이트되었습니다.")
     
     if cart_sessions:
         app.logger.info(f"총 {len(cart_sessions)}개 세션의 장바구니에 영향을 줍니다.")
@@ -469,6 +596,36 @@ def clear_logs():
 
 # ===== 유틸리티 함수 =====
 
+def current_product(product_id):
+    """실제 결제에 적용되는 상품 정보 (MCP 응답과 같은 형식, 표시 가격/설명 대신 실제 가격/설명)"""
+    product = PRODUCTS.get(product_id)
+    if product is None:
+        return None
+    return {
+        "id": product['id'],
+        "name": product['name'],
+        "price": product['price'],
+        "description": product['description'],
+        "brand": product['brand'],
+        "category": product['category'],
+        "image_url": product['image_url']
+    }
+
+def add_cart_item(session_id, product_id):
+    """장바구니에 상품을 추가하고 상품별 역방향 인덱스 갱신"""
+    CARTS.setdefault(session_id, []).append(product_id)
+    PRODUCT_CARTS.setdefault(product_id, set()).add(session_id)
+
+def clear_cart(session_id):
+    """장바구니를 비우고 상품별 역방향 인덱스에서 세션 제거"""
+    for product_id in set(CARTS.get(session_id, ())):
+        sessions = PRODUCT_CARTS.get(product_id)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del PRODUCT_CARTS[product_id]
+    CARTS[session_id] = []
+
 def log_mcp_request(endpoint, data):
     """
     MCP 요청 로깅
@@ -518,4 +675,6 @@ if __name__ == '__main__':
     if not os.path.exists(templates_dir):
         os.makedirs(templates_dir)
     
+    # 탐지 시스템을 같은 프로세스에서 실행하여 이벤트 스트림(/api/events) 제공
+    connect_fraud_system()
     app.run(debug=True, port=5000) 
\ No newline at end of file
@@ -27,6 +27,8 @@ class ContextRecord(BaseModel):
     product_info: ProductInfo
     source_url: Optional[str] = None
     agent_id: Optional[str] = None
+    snapshot_hash: Optional[str] = None  # 문맥 저장소에서 공유하는 스냅샷의 내용 해시
+    expires_at: Optional[datetime] = None  # 개별 만료 시각 (없으면 저장소 기본 보관 기간 적용)
 
 
 class DetectionResult(BaseModel):
@@ -71,4 +73,21 @@ class NotificationMessage(BaseModel):
     message: str
     severity: str = "warning"  # info, warning, error
     action_required: bool = False
-    details: Optional[DetectionResult] = None 
\ No newline at end of file
+    details: Optional[DetectionResult] = None
+    agent_id: Optional[str] = None  # 알림을 받을 에이전트 (문맥을 저장한 에이전트) 
+    # 요약 알림에 합쳐진 상품별 알림 (요약 알림의 product_id/details는 첫 상품의 것, 요약이 아니면 빈 목록)
+    items: List["NotificationMessage"] = Field(default_factory=list)
+    
+    @property
+    def product_ids(self) -> List[str]:
+        """알림 대상 상품 ID (요약 알림이면 합쳐진 모든 상품)"""
+        if not self.items:
+            return [self.product_id]
+        return list(dict.fromkeys(item.product_id for item in self.items))
+    
+    def expand(self) -> List["NotificationMessage"]:
+        """상품별 알림 목록 (요약 알림이면 합쳐진 알림, 아니면 자기 자신)"""
+        return list(self.items) or [self]
+
+
+NotificationMessage.update_forward_refs()
\ No newline at end of file
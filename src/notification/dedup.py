@@ -0,0 +1,136 @@
+from typing import Any, Dict, Optional, Tuple
+import threading
+from loguru import logger
+from src.models.data_models import NotificationMessage
+from src.simulation.clock import Clock
+
+SEVERITY_RANK = {"info": 0, "warning": 1, "error": 2}
+
+Fingerprint = Tuple[str, ...]
+
+
+def change_fingerprint(notification: NotificationMessage) -> Fingerprint:
+    """
+    알림의 변경 지문 (바뀐 필드와 가격 변동 방향)
+    변화 폭은 지문에 넣지 않으므로 같은 속임수가 더 심해지면 같은 지문으로 묶여 악화 여부를 비교할 수 있음
+    """
+    details = notification.details
+    if details is None or not details.changes:
+        return ("message", notification.message)
+    fields = []
+    for field, change in details.changes.items():
+        if field == "price":
+            fields.append("price+" if change.get("current", 0) >= change.get("original", 0) else "price-")
+        elif field == "attributes":
+            fields.extend(f"attributes.{key}" for key in change)
+        else:
+            fields.append(field)
+    return tuple(sorted(fields))
+
+
+def change_magnitude(notification: NotificationMessage) -> Tuple[int, float, float]:
+    """악화 여부 비교용 (심각도 등급, 가격 변화율, 기만성 점수)"""
+    changes = notification.details.changes if notification.details is not None else {}
+    return (SEVERITY_RANK.get(notification.severity, 0),
+            float(changes.get("price", {}).get("change_ratio", 0.0)),
+            float(changes.get("description", {}).get("deception_score", 0.0)))
+
+
+class _DedupEntry:
+    """(세션, 상품, 변경 지문)별 발송 상태"""
+    __slots__ = ("last_sent", "magnitude", "pending", "suppressed")
+
+    def __init__(self, last_sent: float, magnitude: Tuple[int, float, float]):
+        self.last_sent = last_sent
+        self.magnitude = magnitude
+        self.pending = 0  # 다음 발송 때 알릴 생략 횟수
+        self.suppressed = 0  # 누적 생략 횟수
+
+
+class NotificationDeduplicator:
+    """
+    반복 알림 억제
+    자동 검증이 같은 속임수를 주기적으로 다시 탐지해도 (세션, 상품, 변경 지문)마다 억제 기간 안에는 한 번만 발송.
+    억제 기간 안이라도 변화가 악화되면(심각도 상승, 가격 변화율 증가, 기만성 점수 상승) 즉시 발송하고,
+    기간이 지난 뒤 발송하는 알림에는 그동안 생략한 횟수를 덧붙임.
+    """
+
+    def __init__(self, window_seconds: float = 900.0, clock: Optional[Clock] = None,
+                 ratio_margin: float = 0.01, prune_every: int = 1024):
+        """
+        Args:
+            window_seconds: 같은 알림을 다시 보내지 않는 억제 기간 (초)
+            clock: 억제 기간 계산용 시계 (세션끼리 비교할 수 있도록 현재 시각 기준, 가상 시계 사용 시 시뮬레이션 시간)
+            ratio_margin: 악화로 판단할 최소 가격 변화율 증가폭
+            prune_every: 만료된 억제 상태를 정리하는 주기 (검사 횟수)
+        """
+        self.window_seconds = window_seconds
+        self.clock = clock or Clock()
+        self.ratio_margin = ratio_margin
+        self.prune_every = prune_every
+        self._entries: Dict[Tuple[str, str, Fingerprint], _DedupEntry] = {}
+        self._lock = threading.Lock()
+        self._checks = 0
+        self.stats: Dict[str, int] = {"passed": 0, "suppressed": 0, "escalated": 0}
+
+    def _is_escalation(self, previous: Tuple[int, float, float], current: Tuple[int, float, float]) -> bool:
+        return (current[0] > previous[0] or current[1] > previous[1] + self.ratio_margin
+                or current[2] > previous[2])
+
+    def filter(self, notification: NotificationMessage) -> Optional[NotificationMessage]:
+        """
+        발송할 알림 반환 (억제하면 None)
+        악화된 알림과 생략한 반복이 있는 알림은 메시지를 보강한 사본을 반환
+        """
+        now = self.clock.time()
+        key = (notification.session_id, notification.product_id, change_fingerprint(notification))
+        magnitude = change_magnitude(notification)
+        with self._lock:
+            self._checks += 1
+            if self._checks % self.prune_every == 0:
+                self._prune(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = _DedupEntry(now, magnitude)
+                self.stats["passed"] += 1
+                return notification
+
+            escalated = self._is_escalation(entry.magnitude, magnitude)
+            if not escalated and now - entry.last_sent < self.window_seconds:
+                entry.pending += 1
+                entry.suppressed += 1
+                self.stats["suppressed"] += 1
+                return None
+
+            message = notification.message
+            if escalated:
+                message = f"[악화] {message}"
+                self.stats["escalated"] += 1
+                logger.debug(f"악화된 반복 알림 발송: 세션 {key[0]}, 상품 {key[1]}")
+            if entry.pending:
+                message += f" (이전 알림 이후 동일 알림 {entry.pending}회 생략)"
+            entry.last_sent = now
+            entry.pending = 0
+            entry.magnitude = tuple(max(previous, current) for previous, current in zip(entry.magnitude, magnitude))
+            self.stats["passed"] += 1
+            return notification if message == notification.message else notification.copy(update={"message": message})
+
+    def _prune(self, now: float):
+        """억제 기간이 지나고 알릴 생략 횟수가 없는 상태 정리"""
+        expired = [key for key, entry in self._entries.items()
+                   if not entry.pending and now - entry.last_sent >= self.window_seconds]
+        for key in expired:
+            del self._entries[key]
+
+    def get_suppressed_counts(self, session_id: str) -> Dict[str, int]:
+        """세션의 상품별 생략 횟수 (억제 상태가 남아 있는 알림 기준)"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for (entry_session, product_id, _), entry in self._entries.items():
+                if entry_session == session_id and entry.suppressed:
+                    counts[product_id] = counts.get(product_id, 0) + entry.suppressed
+        return counts
+
+    def get_stats(self) -> Dict[str, Any]:
+        """발송/생략/악화 통계"""
+        return {**self.stats, "tracked": len(self._entries)}
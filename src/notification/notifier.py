@@ -1,61 +1,358 @@
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Deque, Iterable
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import concurrent.futures
+import inspect
 import json
+import threading
 from datetime import datetime
 from loguru import logger
 from src.models.data_models import NotificationMessage, DetectionResult
+from src.notification.dedup import NotificationDeduplicator, SEVERITY_RANK
+from src.simulation.clock import Clock
+
+class _HandlerRegistration:
+    """등록된 핸들러와 전용 대기열 (핸들러마다 대기열/워커가 따로 있어 느린 핸들러가 다른 핸들러를 막지 않음)"""
+    __slots__ = ("handler", "name", "timeout", "batch", "max_batch_size", "is_async", "queue", "worker", "stats")
+
+    def __init__(self, handler: Callable, timeout: Optional[float], batch: bool, max_batch_size: int):
+        self.handler = handler
+        self.name = getattr(handler, "__qualname__", repr(handler))
+        self.timeout = timeout
+        self.batch = batch
+        self.max_batch_size = max(1, max_batch_size) if batch else 1
+        self.is_async = inspect.iscoroutinefunction(handler)
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {"delivered": 0, "batches": 0, "dropped": 0, "timeouts": 0, "errors": 0}
+
 
 class Notifier:
     """
     알림 및 대응 컴포넌트
     이상 탐지 엔진이 속임수를 확인하면 즉시 대응 조치 수행
+
+    비동기 발송 시 notify는 기록 후 발송 스레드에 넘기기만 하고 바로 반환하며, 핸들러는 발송 스레드의 이벤트 루프에서
+    핸들러별 워커가 실행함 (동기 핸들러는 스레드 풀, 비동기 핸들러는 루프에서 직접 실행, 핸들러별 제한 시간 적용).
     """
     
-    def __init__(self):
+    def __init__(self, async_dispatch: bool = True, queue_size: int = 10000, handler_timeout: Optional[float] = 5.0,
+                 workers: int = 4, dedup_window: Optional[float] = None, digest_window: float = 0.0,
+                 clock: Optional[Clock] = None, history_per_session: Optional[int] = None,
+                 history_sessions: Optional[int] = None):
+        """
+        Args:
+            async_dispatch: 핸들러를 발송 스레드에서 비동기로 실행 (False면 notify 호출 스레드에서 바로 실행)
+            queue_size: 핸들러별 대기열 최대 길이 (가득 차면 해당 핸들러에 대한 알림은 버림)
+            handler_timeout: 핸들러 기본 제한 시간 (초, None이면 무제한)
+            workers: 동기 핸들러를 실행하는 스레드 수
+            dedup_window: 같은 (세션, 상품, 변경 지문) 알림을 다시 보내지 않는 억제 기간 (초, None이면 억제하지 않음)
+            digest_window: 한 세션의 알림을 이 시간 동안 모아 하나의 요약 알림으로 발송 (초, 0이면 바로 발송, 비동기 발송 전용)
+            clock: 억제 기간 계산용 시계
+            history_per_session: 세션별로 메모리에 보관할 최근 알림 수 (None이면 무제한,
+                전체 기록을 NotificationStore에서 조회할 수 있을 때만 제한)
+            history_sessions: 알림 기록을 보관할 최대 세션 수 (넘으면 가장 오래 알림이 없던 세션부터 삭제, None이면 무제한)
+        """
         self.notification_handlers: Dict[str, List[Callable]] = {
             "info": [],
             "warning": [],
             "error": []
         }
-        self.notification_history: Dict[str, List[NotificationMessage]] = {}  # {session_id: [notifications]}
-        logger.info("알림 모듈 초기화 완료")
+        # {session_id: 최근 알림} - 최근 알림이 있던 세션 순
+        self.notification_history: "OrderedDict[str, Deque[NotificationMessage]]" = OrderedDict()
+        self.history_per_session = history_per_session
+        self.history_sessions = history_sessions
+        self._history_lock = threading.Lock()
+        self.async_dispatch = async_dispatch
+        self.queue_size = queue_size
+        self.handler_timeout = handler_timeout
+        self.workers = max(1, workers)
+        self._registrations: Dict[Callable, _HandlerRegistration] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._start_lock = threading.Lock()
+        self.deduplicator = NotificationDeduplicator(dedup_window, clock) if dedup_window else None
+        if digest_window and not async_dispatch:
+            logger.warning("요약 알림은 비동기 발송에서만 지원되므로 사용하지 않음")
+            digest_window = 0.0
+        self.digest_window = digest_window
+        self._digests: Dict[str, List[NotificationMessage]] = {}  # 발송 스레드 전용 {session_id: 모으는 중인 알림}
+        self.stats: Dict[str, int] = {"notified": 0, "failed": 0, "suppressed": 0, "digests": 0}
+        logger.info(f"알림 모듈 초기화 완료 (발송: {'비동기' if async_dispatch else '동기'})")
         
-    def register_handler(self, severity: str, handler: Callable):
-        """알림 핸들러 등록"""
+    def register_handler(self, severity: str, handler: Callable, timeout: Optional[float] = None,
+                         batch: bool = False, max_batch_size: int = 256):
+        """
+        알림 핸들러 등록
+        같은 핸들러를 여러 심각도에 등록해도 대기열/워커는 하나를 공유
+
+        Args:
+            severity: 알림 심각도 (info, warning, error)
+            handler: 알림 하나(batch=True면 알림 목록)를 받는 함수 또는 코루틴 함수
+            timeout: 이 핸들러의 제한 시간 (초, None이면 기본 제한 시간)
+            batch: 대기 중인 알림을 목록으로 묶어 한 번에 전달
+            max_batch_size: 한 번에 전달할 최대 알림 수
+        """
         if severity not in self.notification_handlers:
             self.notification_handlers[severity] = []
         self.notification_handlers[severity].append(handler)
+        if handler not in self._registrations:
+            self._registrations[handler] = _HandlerRegistration(
+                handler, timeout if timeout is not None else self.handler_timeout, batch, max_batch_size)
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._start_worker, self._registrations[handler], self._loop)
         logger.debug(f"{severity} 알림 핸들러 등록됨")
         
     def notify(self, notification: NotificationMessage) -> bool:
-        """알림 발송"""
+        """알림 발송 (비동기 발송 시 핸들러 실행을 기다리지 않음)"""
         try:
-            session_id = notification.session_id
-            
+            # 억제 기간 안의 반복 알림은 기록/발송하지 않음
+            if self.deduplicator is not None:
+                notification = self.deduplicator.filter(notification)
+                if notification is None:
+                    self.stats["suppressed"] += 1
+                    return True
             # 알림 기록
-            if session_id not in self.notification_history:
-                self.notification_history[session_id] = []
-            self.notification_history[session_id].append(notification)
+            self.restore_history(notification.session_id, (notification,))
             
             # 핸들러 호출
             handlers = self.notification_handlers.get(notification.severity, [])
             if not handlers:
                 logger.warning(f"등록된 {notification.severity} 핸들러가 없음")
+            elif self.digest_window:
+                self._ensure_started().call_soon_threadsafe(self._collect_digest, notification)
+            elif self.async_dispatch:
+                self._ensure_started().call_soon_threadsafe(self._fan_out, notification, handlers)
+            else:
+                for handler in handlers:
+                    self._call_inline(self._registrations[handler], notification)
             
-            for handler in handlers:
-                try:
-                    handler(notification)
-                except Exception as e:
-                    logger.error(f"알림 핸들러 실행 중 오류 발생: {e}")
-            
-            logger.info(f"알림 발송: {notification.severity} - {notification.message}")
+            self.stats["notified"] += 1
+            logger.debug(f"알림 발송: {notification.severity} - {notification.message}")
             return True
         except Exception as e:
+            self.stats["failed"] += 1
             logger.error(f"알림 발송 중 오류 발생: {e}")
             return False
             
+    def _call_inline(self, registration: _HandlerRegistration, notification: NotificationMessage):
+        """동기 발송 모드의 핸들러 실행 (비동기 핸들러는 실행 중인 루프가 있으면 태스크로 예약)"""
+        argument = [notification] if registration.batch else notification
+        try:
+            if registration.is_async:
+                try:
+                    asyncio.get_running_loop().create_task(registration.handler(argument))
+                except RuntimeError:
+                    asyncio.run(registration.handler(argument))
+            else:
+                registration.handler(argument)
+            registration.stats["delivered"] += 1
+        except Exception as e:
+            registration.stats["errors"] += 1
+            logger.error(f"알림 핸들러 실행 중 오류 발생: {e}")
+            
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """발송 스레드와 이벤트 루프 시작 (처음 발송할 때 한 번)"""
+        loop = self._loop
+        if loop is not None:
+            return loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="notifier-handler")
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    for registration in list(self._registrations.values()):
+                        self._start_worker(registration, loop)
+                    loop.call_soon(ready.set)
+                    try:
+                        loop.run_forever()
+                    finally:
+                        # 루프는 발송 스레드에서 멈춘 뒤에만 닫을 수 있음 (종료가 늦어 남은 태스크는 취소)
+                        pending = asyncio.all_tasks(loop)
+                        for task in pending:
+                            task.cancel()
+                        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                        loop.close()
+
+                self._thread = threading.Thread(target=run, name="notifier-dispatch", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+        
+    def _start_worker(self, registration: _HandlerRegistration, loop: asyncio.AbstractEventLoop):
+        """핸들러 워커 시작 (발송 스레드에서 호출)"""
+        if registration.worker is None:
+            registration.queue = asyncio.Queue(self.queue_size)
+            registration.worker = loop.create_task(self._run_handler(registration))
+            
+    def _fan_out(self, notification: NotificationMessage, handlers: List[Callable]):
+        """알림을 각 핸들러 대기열에 추가 (발송 루프에서 호출)"""
+        for handler in handlers:
+            registration = self._registrations[handler]
+            try:
+                registration.queue.put_nowait(notification)
+            except asyncio.QueueFull:
+                registration.stats["dropped"] += 1
+                if registration.stats["dropped"] == 1 or registration.stats["dropped"] % 1000 == 0:
+                    logger.warning(f"알림 핸들러 대기열 가득 참: {registration.name} "
+                                   f"(누적 {registration.stats['dropped']}건 버림)")
+                
+    def _collect_digest(self, notification: NotificationMessage):
+        """세션 알림 모으기 (발송 루프에서 호출, 세션의 첫 알림부터 digest_window 뒤에 발송)"""
+        pending = self._digests.get(notification.session_id)
+        if pending is None:
+            pending = self._digests[notification.session_id] = []
+            self._loop.call_later(self.digest_window, self._emit_digest, notification.session_id)
+        pending.append(notification)
+        
+    def _emit_digest(self, session_id: str):
+        """모은 알림 발송 (하나면 그대로, 여러 개면 요약 알림 하나로)"""
+        notifications = self._digests.pop(session_id, None)
+        if not notifications:
+            return
+        if len(notifications) == 1:
+            message = notifications[0]
+        else:
+            message = self._make_digest(notifications)
+            self.stats["digests"] += 1
+        self._fan_out(message, self.notification_handlers.get(message.severity, []))
+        
+    @staticmethod
+    def _make_digest(notifications: List[NotificationMessage]) -> NotificationMessage:
+        """
+        한 세션의 여러 상품 알림을 요약 알림 하나로 합침 (심각도는 가장 높은 것)
+        상품 ID와 상세 탐지 결과는 첫 알림의 것을 쓰고, 상품별 알림은 items에 그대로 보존
+        """
+        product_ids = list(dict.fromkeys(notification.product_id for notification in notifications))
+        lines = "\n".join(f"- {notification.message}" for notification in notifications)
+        return NotificationMessage(
+            session_id=notifications[0].session_id,
+            product_id=product_ids[0],
+            timestamp=notifications[-1].timestamp,
+            message=f"상품 {len(product_ids)}개에서 중요 정보 변경이 감지되었습니다 (알림 {len(notifications)}건):\n{lines}",
+            severity=max((notification.severity for notification in notifications),
+                         key=lambda severity: SEVERITY_RANK.get(severity, 0)),
+            action_required=any(notification.action_required for notification in notifications),
+            details=notifications[0].details,
+            agent_id=notifications[0].agent_id,
+            items=notifications
+        )
+        
+    async def _run_handler(self, registration: _HandlerRegistration):
+        """핸들러 워커 (대기열의 알림을 순서대로, 일괄 핸들러는 쌓인 만큼 묶어서 전달)"""
+        queue = registration.queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < registration.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            argument = batch if registration.batch else batch[0]
+            try:
+                if registration.is_async:
+                    await asyncio.wait_for(registration.handler(argument), registration.timeout)
+                else:
+                    # 제한 시간이 지나도 실행 중인 스레드는 중단할 수 없으므로 결과만 기다리지 않음
+                    await asyncio.wait_for(loop.run_in_executor(self._executor, registration.handler, argument),
+                                           registration.timeout)
+                registration.stats["delivered"] += len(batch)
+                registration.stats["batches"] += 1
+            except asyncio.TimeoutError:
+                registration.stats["timeouts"] += 1
+                logger.warning(f"알림 핸들러 제한 시간 초과: {registration.name} ({registration.timeout}초)")
+            except Exception as e:
+                registration.stats["errors"] += 1
+                logger.error(f"알림 핸들러 실행 중 오류 발생: {registration.name} - {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+                    
+    async def _drain(self):
+        # 모으는 중인 요약 알림은 기다리지 않고 바로 발송
+        for session_id in list(self._digests):
+            self._emit_digest(session_id)
+        for registration in list(self._registrations.values()):
+            if registration.queue is not None:
+                await registration.queue.join()
+                
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 알림이 모든 핸들러에 전달될 때까지 대기 (제한 시간 내에 끝나면 True)"""
+        if self._loop is None:
+            return True
+        try:
+            asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result(timeout)
+            return True
+        except concurrent.futures.TimeoutError:
+            logger.warning(f"알림 발송 대기 시간 초과 ({timeout}초)")
+            return False
+            
+    def close(self, timeout: Optional[float] = 10.0):
+        """
+        대기 중인 알림을 전달한 뒤 발송 스레드 종료 (이후 notify를 호출하면 다시 시작)
+        핸들러가 제한 시간 안에 끝나지 않으면 경고 후 반환 (루프는 발송 스레드가 멈출 때 스스로 닫음)
+        """
+        with self._start_lock:
+            loop = self._loop
+            if loop is None:
+                return
+            self.flush(timeout)
+
+            async def stop_workers():
+                workers = [registration.worker for registration in self._registrations.values()
+                           if registration.worker is not None]
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+            try:
+                asyncio.run_coroutine_threadsafe(stop_workers(), loop).result(timeout)
+            except concurrent.futures.TimeoutError:
+                logger.warning(f"알림 핸들러 워커 종료 대기 시간 초과 ({timeout}초)")
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning(f"알림 발송 스레드가 {timeout}초 안에 끝나지 않아 기다리지 않고 종료")
+            self._executor.shutdown(wait=False)
+            for registration in self._registrations.values():
+                registration.queue = registration.worker = None
+            self._loop = self._thread = self._executor = None
+            
+    def get_dispatch_stats(self) -> Dict[str, Any]:
+        """발송 통계 (핸들러별 전달/묶음/버림/제한 시간 초과/오류 수와 대기 중인 알림 수, 반복 알림 억제 통계)"""
+        return {
+            **self.stats,
+            "dedup": self.deduplicator.get_stats() if self.deduplicator is not None else {},
+            "handlers": {
+                registration.name: {**registration.stats,
+                                    "pending": registration.queue.qsize() if registration.queue is not None else 0}
+                for registration in self._registrations.values()
+            }
+        }
+            
+    def get_suppressed_counts(self, session_id: str) -> Dict[str, int]:
+        """세션의 상품별 반복 알림 생략 횟수"""
+        return self.deduplicator.get_suppressed_counts(session_id) if self.deduplicator is not None else {}
+            
+    def restore_history(self, session_id: str, notifications: Iterable[NotificationMessage]):
+        """세션 알림 기록에 추가 (보관 한도가 있으면 적용)"""
+        with self._history_lock:
+            history = self.notification_history.get(session_id)
+            if history is None:
+                history = self.notification_history[session_id] = deque(maxlen=self.history_per_session)
+                if self.history_sessions is not None and len(self.notification_history) > self.history_sessions:
+                    self.notification_history.popitem(last=False)
+            else:
+                self.notification_history.move_to_end(session_id)
+            history.extend(notifications)
+            
     def get_notification_history(self, session_id: str) -> List[NotificationMessage]:
-        """세션에 대한 알림 기록 조회"""
-        return self.notification_history.get(session_id, [])
+        """세션에 대한 알림 기록 조회 (보관 한도가 있으면 최근 알림만, 이전 기록은 NotificationStore에서 조회)"""
+        return list(self.notification_history.get(session_id, ()))
 
 
 class DefaultNotificationHandlers:
@@ -0,0 +1,284 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+import json
+import sqlite3
+import threading
+from loguru import logger
+from src.models.data_models import NotificationMessage, DetectionResult
+
+# 이전 버전에서 만든 데이터베이스에 없는 열 {테이블: [(열 이름, 정의)]} - 색인 생성 전에 추가
+_ADDED_COLUMNS = {
+    "notifications": [("agent_id", "TEXT")],
+}
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS notifications (
+        id INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        product_id TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        severity TEXT NOT NULL,
+        action_required INTEGER NOT NULL,
+        message TEXT NOT NULL,
+        details TEXT,
+        agent_id TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS detections (
+        id INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        product_id TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        is_fraud_detected INTEGER NOT NULL,
+        confidence_score REAL NOT NULL,
+        changes TEXT NOT NULL,
+        details TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_notifications_session ON notifications (session_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_notifications_product ON notifications (product_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_notifications_timestamp ON notifications (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_notifications_agent ON notifications (agent_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_detections_session ON detections (session_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_detections_product ON detections (product_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_detections_timestamp ON detections (timestamp)",
+)
+
+_INSERT_NOTIFICATION = ("INSERT INTO notifications (session_id, product_id, timestamp, severity, action_required, "
+                        "message, details, agent_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+_INSERT_DETECTION = ("INSERT INTO detections (session_id, product_id, timestamp, is_fraud_detected, "
+                     "confidence_score, changes, details) VALUES (?, ?, ?, ?, ?, ?, ?)")
+_NOTIFICATION_COLUMNS = "id, session_id, product_id, timestamp, severity, action_required, message, details, agent_id"
+_DETECTION_COLUMNS = "id, session_id, product_id, timestamp, is_fraud_detected, confidence_score, changes, details"
+
+Cursor = str
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _detection_row(result: DetectionResult) -> Tuple:
+    return (result.session_id, result.product_id, result.timestamp.timestamp(), int(result.is_fraud_detected),
+            result.confidence_score, _dumps(result.changes), result.details)
+
+
+def _detection_from_row(row: Tuple) -> DetectionResult:
+    _, session_id, product_id, timestamp, is_fraud_detected, confidence_score, changes, details = row
+    return DetectionResult.construct(session_id=session_id, product_id=product_id,
+                                     timestamp=datetime.fromtimestamp(timestamp),
+                                     is_fraud_detected=bool(is_fraud_detected), confidence_score=confidence_score,
+                                     changes=json.loads(changes), details=details)
+
+
+def _notification_row(notification: NotificationMessage) -> Tuple:
+    details = notification.details
+    return (notification.session_id, notification.product_id, notification.timestamp.timestamp(),
+            notification.severity, int(notification.action_required), notification.message,
+            _dumps(_detection_row(details)) if details is not None else None, notification.agent_id)
+
+
+def _notification_from_row(row: Tuple) -> NotificationMessage:
+    _, session_id, product_id, timestamp, severity, action_required, message, details, agent_id = row
+    return NotificationMessage.construct(
+        session_id=session_id, product_id=product_id, timestamp=datetime.fromtimestamp(timestamp),
+        severity=severity, action_required=bool(action_required), message=message,
+        details=_detection_from_row((None, *json.loads(details))) if details is not None else None,
+        agent_id=agent_id
+    )
+
+
+class NotificationStore:
+    """
+    알림/탐지 결과 영속화 저장소
+    알림 핸들러와 탐지 결과 기록은 버퍼에 추가만 하고, 기록 스레드가 크기/시간 기준으로 모아 한 트랜잭션으로 삽입.
+    조회는 세션/상품/시간 인덱스와 (시각, ID) 기준 키셋 페이지네이션을 사용.
+    """
+
+    def __init__(self, path: str = "notifications.db", batch_size: int = 1000, flush_interval: float = 1.0,
+                 max_buffered: int = 100000):
+        """
+        Args:
+            path: 데이터베이스 파일 경로 (":memory:"는 메모리 DB)
+            batch_size: 버퍼가 이 크기에 이르면 기록 스레드를 깨워 바로 삽입
+            flush_interval: 버퍼된 기록을 삽입하는 최대 지연 (초)
+            max_buffered: 버퍼 최대 크기 (기록이 밀려 가득 차면 새 기록은 버림)
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=64)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+        # 아직 삽입되지 않은 기록 (버퍼 교체만 잠금 안에서 수행)
+        self._buffer_lock = threading.Lock()
+        self._notifications: List[NotificationMessage] = []
+        self._detections: List[DetectionResult] = []
+        self.stats: Dict[str, int] = {"notifications": 0, "detections": 0, "flushes": 0, "dropped": 0}
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_periodically, name="notification-store", daemon=True)
+        self._writer.start()
+        logger.info(f"알림 저장소 연결 완료: {path}")
+
+    def _create_schema(self):
+        """테이블 생성 후 이전 버전 데이터베이스에 없는 열을 추가하고 색인 생성"""
+        tables = [statement for statement in _SCHEMA if "CREATE TABLE" in statement]
+        for statement in tables:
+            self._conn.execute(statement)
+        for table, columns in _ADDED_COLUMNS.items():
+            existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for name, definition in columns:
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+                    logger.info(f"알림 저장소 열 추가: {table}.{name}")
+        for statement in _SCHEMA:
+            if statement not in tables:
+                self._conn.execute(statement)
+
+    def _buffered(self) -> int:
+        return len(self._notifications) + len(self._detections)
+
+    def _append(self, target: List, items: Iterable):
+        with self._buffer_lock:
+            for item in items:
+                if self._buffered() >= self.max_buffered:
+                    self.stats["dropped"] += 1
+                    continue
+                target.append(item)
+            full = self._buffered() >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def handler(self, notifications: List[NotificationMessage]):
+        """
+        일괄 알림 핸들러 (Notifier.register_handler(..., batch=True)로 등록)
+        요약 알림은 상품별 알림으로 풀어서 저장 (상품별 조회에 모두 나타나도록)
+        """
+        self._append(self._notifications, [item for notification in notifications for item in notification.expand()])
+
+    def record_detection(self, result: DetectionResult):
+        """탐지 결과 기록 (버퍼에 추가만 하므로 검증 경로를 막지 않음)"""
+        self._append(self._detections, (result,))
+
+    def _write_periodically(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"알림 저장소 기록 중 오류 발생: {e}")
+
+    def flush(self):
+        """버퍼된 알림/탐지 결과를 하나의 트랜잭션으로 삽입"""
+        with self._db_lock:
+            with self._buffer_lock:
+                notifications, self._notifications = self._notifications, []
+                detections, self._detections = self._detections, []
+            if not notifications and not detections:
+                return
+            # 직렬화는 버퍼 잠금 밖에서 수행 (핸들러/탐지 기록을 막지 않도록)
+            notification_rows = [_notification_row(notification) for notification in notifications]
+            detection_rows = [_detection_row(result) for result in detections]
+            self._conn.execute("BEGIN")
+            try:
+                if notification_rows:
+                    self._conn.executemany(_INSERT_NOTIFICATION, notification_rows)
+                if detection_rows:
+                    self._conn.executemany(_INSERT_DETECTION, detection_rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.stats["notifications"] += len(notification_rows)
+            self.stats["detections"] += len(detection_rows)
+            self.stats["flushes"] += 1
+
+    def _query(self, table: str, columns: str, session_id: Optional[str], product_id: Optional[str],
+               start: Optional[datetime], end: Optional[datetime], extra: List[Tuple[str, Any]],
+               limit: int, cursor: Optional[Cursor]) -> Tuple[List[Tuple], Optional[Cursor]]:
+        """조건에 맞는 행을 최신순으로 limit개 조회 (cursor는 이전 페이지의 마지막 (시각, ID))"""
+        conditions: List[Tuple[str, Any]] = list(extra)
+        if session_id is not None:
+            conditions.append(("session_id = ?", session_id))
+        if product_id is not None:
+            conditions.append(("product_id = ?", product_id))
+        if start is not None:
+            conditions.append(("timestamp >= ?", start.timestamp()))
+        if end is not None:
+            conditions.append(("timestamp < ?", end.timestamp()))
+        where = " AND ".join(condition for condition, _ in conditions)
+        params = [value for _, value in conditions]
+        if cursor is not None:
+            timestamp, row_id = cursor.split(":")
+            where = f"{where} AND " if where else ""
+            where += "(timestamp < ? OR (timestamp = ? AND id < ?))"
+            params += [float(timestamp), float(timestamp), int(row_id)]
+        sql = (f"SELECT {columns} FROM {table}" + (f" WHERE {where}" if where else "")
+               + " ORDER BY timestamp DESC, id DESC LIMIT ?")
+        # 방금 기록한 내용도 조회되도록 버퍼를 먼저 반영
+        self.flush()
+        with self._db_lock:
+            rows = self._conn.execute(sql, params + [limit + 1]).fetchall()
+        if len(rows) <= limit:
+            return rows, None
+        last = rows[limit - 1]
+        return rows[:limit], f"{last[3]!r}:{last[0]}"
+
+    def query_notifications(self, session_id: Optional[str] = None, product_id: Optional[str] = None,
+                            start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            severity: Optional[str] = None, agent_id: Optional[str] = None, limit: int = 100,
+                            cursor: Optional[Cursor] = None) -> Tuple[List[NotificationMessage], Optional[Cursor]]:
+        """
+        알림 기록 조회 (최신순)
+
+        Args:
+            agent_id: 알림을 받은 에이전트로 제한 (None이면 전체)
+
+        Returns:
+            (알림 목록, 다음 페이지 커서 - 마지막 페이지면 None)
+        """
+        extra = [("severity = ?", severity)] if severity is not None else []
+        if agent_id is not None:
+            extra.append(("agent_id = ?", agent_id))
+        rows, next_cursor = self._query("notifications", _NOTIFICATION_COLUMNS, session_id, product_id,
+                                        start, end, extra, limit, cursor)
+        return [_notification_from_row(row) for row in rows], next_cursor
+
+    def query_detections(self, session_id: Optional[str] = None, product_id: Optional[str] = None,
+                         start: Optional[datetime] = None, end: Optional[datetime] = None,
+                         fraud_only: bool = False, limit: int = 100,
+                         cursor: Optional[Cursor] = None) -> Tuple[List[DetectionResult], Optional[Cursor]]:
+        """
+        탐지 결과 기록 조회 (최신순)
+
+        Returns:
+            (탐지 결과 목록, 다음 페이지 커서 - 마지막 페이지면 None)
+        """
+        extra = [("is_fraud_detected = ?", 1)] if fraud_only else []
+        rows, next_cursor = self._query("detections", _DETECTION_COLUMNS, session_id, product_id,
+                                        start, end, extra, limit, cursor)
+        return [_detection_from_row(row) for row in rows], next_cursor
+
+    def get_stats(self) -> Dict[str, Any]:
+        """삽입/버림 통계"""
+        return {**self.stats, "buffered": self._buffered()}
+
+    def close(self):
+        """기록 스레드를 멈추고 남은 기록을 삽입한 뒤 연결 종료"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+        logger.info(f"알림 저장소 종료: 알림 {self.stats['notifications']}건, 탐지 결과 {self.stats['detections']}건 기록")
@@ -0,0 +1,194 @@
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+from collections import deque
+import asyncio
+import threading
+import time
+from loguru import logger
+from src.models.data_models import NotificationMessage, DetectionResult
+
+Event = Union[NotificationMessage, DetectionResult]
+
+
+class Subscription:
+    """
+    세션 이벤트 구독 (알림과 탐지 결과)
+    구독자별 대기열은 크기가 정해져 있고, 가득 차면 가장 오래된 이벤트를 버려 느린 구독자가 발행을 막지 않음.
+    비동기(async for)와 동기(for, get) 양쪽에서 소비할 수 있으며, 발행은 어느 스레드에서 해도 됨.
+    """
+
+    def __init__(self, hub: "SubscriptionHub", session_id: Optional[str], queue_size: int = 100):
+        self.hub = hub
+        self.session_id = session_id
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.delivered = 0
+        self._events: deque = deque(maxlen=queue_size)
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def publish(self, event: Event):
+        """이벤트 추가 (대기열이 가득 차면 가장 오래된 이벤트를 버림)"""
+        with self._lock:
+            if self._closed:
+                return
+            if len(self._events) == self.queue_size:
+                self.dropped += 1
+            self._events.append(event)
+            self._wake()
+
+    def _wake(self):
+        """대기 중인 소비자 깨우기 (잠금 안에서 호출)"""
+        self._ready.notify_all()
+        for loop, ready in self._waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(ready.set)
+        self._waiters.clear()
+
+    def _pop(self) -> Optional[Event]:
+        if self._events:
+            self.delivered += 1
+            return self._events.popleft()
+        return None
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """
+        다음 이벤트를 동기로 대기
+
+        Returns:
+            이벤트 (제한 시간이 지나거나 구독이 끝나면 None)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                event = self._pop()
+                if event is not None or self._closed:
+                    return event
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._ready.wait(remaining)
+
+    def __iter__(self) -> Iterator[Event]:
+        while True:
+            event = self.get()
+            if event is None:
+                return
+            yield event
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Event:
+        while True:
+            with self._lock:
+                event = self._pop()
+                if event is not None:
+                    return event
+                if self._closed:
+                    raise StopAsyncIteration
+                waiter = (asyncio.get_running_loop(), asyncio.Event())
+                self._waiters.append(waiter)
+            try:
+                await waiter[1].wait()
+            finally:
+                # 취소된 소비자는 대기 목록에서 제거 (이미 깨웠다면 목록에 없음)
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def close(self):
+        """구독 해지 (대기 중인 소비자는 남은 이벤트를 받은 뒤 종료)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wake()
+        self.hub._remove(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class SubscriptionHub:
+    """
+    세션별 구독 관리
+    알림 모듈의 일괄 핸들러와 탐지 결과 발행을 받아 해당 세션(과 전체 세션) 구독자에게 전달.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        """
+        Args:
+            queue_size: 구독자별 기본 대기열 크기
+        """
+        self.queue_size = queue_size
+        self._subscribers: Dict[Optional[str], Set[Subscription]] = {}  # {session_id (None은 전체): 구독}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"published": 0, "subscribed": 0}
+
+    def subscribe(self, session_id: Optional[str] = None, queue_size: Optional[int] = None) -> Subscription:
+        """
+        세션 이벤트 구독
+
+        Args:
+            session_id: 구독할 세션 ID (None이면 모든 세션)
+            queue_size: 대기열 크기 (None이면 기본 크기)
+        """
+        subscription = Subscription(self, session_id, queue_size or self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(session_id, set()).add(subscription)
+            self.stats["subscribed"] += 1
+        logger.debug(f"이벤트 구독: 세션 {session_id or '전체'}")
+        return subscription
+
+    def _remove(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.session_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.session_id]
+
+    def publish(self, event: Event):
+        """이벤트를 세션 구독자와 전체 구독자에게 전달 (구독자가 없으면 바로 반환)"""
+        if not self._subscribers:
+            return
+        with self._lock:
+            targets = list(self._subscribers.get(event.session_id, ())) + list(self._subscribers.get(None, ()))
+        for subscription in targets:
+            subscription.publish(event)
+        self.stats["published"] += 1
+
+    def handler(self, notifications: List[NotificationMessage]):
+        """일괄 알림 핸들러 (Notifier.register_handler(..., batch=True)로 등록)"""
+        for notification in notifications:
+            self.publish(notification)
+
+    def subscriber_count(self, session_id: Optional[str] = None) -> int:
+        """세션 구독자 수 (session_id가 None이면 전체 구독자 수)"""
+        with self._lock:
+            if session_id is None:
+                return sum(len(subscribers) for subscribers in self._subscribers.values())
+            return len(self._subscribers.get(session_id, ()))
+
+    def close(self):
+        """모든 구독 종료 (소비자의 반복이 끝남)"""
+        with self._lock:
+            subscriptions = [subscription for subscribers in self._subscribers.values()
+                             for subscription in subscribers]
+        for subscription in subscriptions:
+            subscription.close()
@@ -0,0 +1,373 @@
+from typing import Any, Callable, Dict, List, Optional
+from collections import deque
+from datetime import datetime
+import asyncio
+import concurrent.futures
+import json
+import os
+import random
+import threading
+import time
+import aiohttp
+from loguru import logger
+from src.models.data_models import NotificationMessage
+
+AgentResolver = Callable[[NotificationMessage], Optional[str]]
+
+
+def _payload(notification: NotificationMessage) -> Dict[str, Any]:
+    """
+    웹훅 본문에 담을 알림 (상세 탐지 결과는 변경 내역만 포함)
+    요약 알림은 첫 상품 기준 필드에 더해 모든 상품 ID(product_ids)와 상품별 알림(items)을 포함
+    """
+    details = notification.details
+    payload = {
+        "session_id": notification.session_id,
+        "product_id": notification.product_id,
+        "timestamp": notification.timestamp.isoformat(),
+        "message": notification.message,
+        "severity": notification.severity,
+        "action_required": notification.action_required,
+        "changes": details.changes if details is not None else {}
+    }
+    if notification.items:
+        payload["product_ids"] = notification.product_ids
+        payload["items"] = [_payload(item) for item in notification.items]
+    return payload
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class _RateLimiter:
+    """에이전트별 토큰 버킷 (초당 rate건, 최대 burst건까지 몰아서 허용)"""
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def delay(self) -> float:
+        """토큰 하나를 쓰기까지 기다려야 하는 시간 (초, 토큰은 미리 차감)"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class _AgentEndpoint:
+    """에이전트 콜백 주소와 전달 상태 (발송 루프 전용)"""
+
+    def __init__(self, agent_id: str, url: str, limiter: _RateLimiter):
+        self.agent_id = agent_id
+        self.url = url
+        self.limiter = limiter
+        self.pending: deque = deque()  # 아직 묶지 않은 알림 본문
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.sender: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {"delivered": 0, "requests": 0, "retries": 0, "spilled": 0}
+
+
+class AgentWebhookHandler:
+    """
+    에이전트 웹훅 알림 핸들러
+    알림을 에이전트별 콜백 주소로 POST 전송. 짧은 기간 동안 쌓인 알림은 한 요청으로 묶고,
+    연결은 공유 커넥션 풀에서 재사용하며, 실패하면 지수 백오프로 재시도하고 에이전트별 전송률 한도를 지킴.
+    재시도 끝에 전달하지 못한 알림은 유출 파일(JSON lines)에 기록하여 redeliver_spilled()로 다시 전달.
+    전송은 자체 발송 스레드의 이벤트 루프에서 진행하므로 handler()는 알림을 넘기기만 하고 바로 반환.
+    """
+
+    def __init__(self, spill_path: Optional[str] = None, batch_window: float = 0.2, max_batch_size: int = 100,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 request_timeout: float = 5.0, pool_size: int = 100, default_rate_limit: float = 10.0,
+                 agent_resolver: Optional[AgentResolver] = None):
+        """
+        Args:
+            spill_path: 전달하지 못한 알림을 기록할 파일 경로 (None이면 기록하지 않고 버림)
+            batch_window: 에이전트별 첫 알림부터 묶어 보내기까지 기다리는 시간 (초)
+            max_batch_size: 한 요청에 담는 최대 알림 수 (가득 차면 기다리지 않고 전송)
+            max_retries: 요청 실패 시 최대 재시도 횟수
+            backoff_base: 첫 재시도 대기 시간 (초, 재시도마다 두 배, 무작위 지터 포함)
+            backoff_max: 재시도 대기 시간 상한 (초)
+            request_timeout: 요청 하나의 제한 시간 (초)
+            pool_size: 전체 에이전트가 공유하는 최대 동시 연결 수
+            default_rate_limit: 에이전트별 기본 초당 최대 요청 수
+            agent_resolver: 알림에 agent_id가 없을 때 수신 에이전트를 찾는 함수
+        """
+        self.spill_path = spill_path
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_timeout = request_timeout
+        self.pool_size = pool_size
+        self.default_rate_limit = default_rate_limit
+        self.agent_resolver = agent_resolver
+        self.endpoints: Dict[str, _AgentEndpoint] = {}
+        self.stats: Dict[str, int] = {"received": 0, "unrouted": 0, "delivered": 0, "failed": 0,
+                                      "spilled": 0, "redelivered": 0}
+
+        # 발송 스레드/루프와 HTTP 세션은 첫 알림 때 시작
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._start_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._closed = False
+
+    def register_agent(self, agent_id: str, url: str, rate_limit: Optional[float] = None,
+                       burst: Optional[float] = None):
+        """
+        에이전트 콜백 주소 등록 (이미 등록된 에이전트는 주소와 전송률 한도를 교체)
+
+        Args:
+            agent_id: 에이전트 ID
+            url: 알림을 POST할 콜백 주소
+            rate_limit: 초당 최대 요청 수 (None이면 default_rate_limit)
+            burst: 한 번에 몰아서 보낼 수 있는 최대 요청 수 (None이면 초당 요청 수와 같음)
+        """
+        limiter = _RateLimiter(rate_limit or self.default_rate_limit, burst)
+        endpoint = self.endpoints.get(agent_id)
+        if endpoint is None:
+            self.endpoints[agent_id] = _AgentEndpoint(agent_id, url, limiter)
+        else:
+            endpoint.url = url
+            endpoint.limiter = limiter
+        logger.info(f"에이전트 웹훅 등록: {agent_id} -> {url}")
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._start_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    ready = threading.Event()
+                    self._thread = threading.Thread(target=self._run_loop, args=(loop, ready),
+                                                    name="agent-webhook", daemon=True)
+                    self._thread.start()
+                    ready.wait()
+                    self._loop = loop
+        return self._loop
+
+    def _run_loop(self, loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._open_session())
+        finally:
+            ready.set()
+        loop.run_forever()
+
+    async def _open_session(self):
+        """커넥션 풀은 발송 루프에 묶이므로 루프 안에서 생성"""
+        connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size)
+        self._session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            headers={"Content-Type": "application/json"}
+        )
+
+    def _resolve_agent(self, notification: NotificationMessage) -> Optional[str]:
+        if notification.agent_id is not None:
+            return notification.agent_id
+        if self.agent_resolver is not None:
+            return self.agent_resolver(notification)
+        return None
+
+    def handler(self, notifications: List[NotificationMessage]):
+        """일괄 알림 핸들러 (Notifier.register_handler(..., batch=True)로 등록)"""
+        routed: Dict[str, List[Dict[str, Any]]] = {}
+        for notification in notifications:
+            self.stats["received"] += 1
+            agent_id = self._resolve_agent(notification)
+            if agent_id is None or agent_id not in self.endpoints:
+                self.stats["unrouted"] += 1
+                continue
+            routed.setdefault(agent_id, []).append(_payload(notification))
+        if routed and not self._closed:
+            self._ensure_started().call_soon_threadsafe(self._enqueue, routed)
+
+    def _enqueue(self, routed: Dict[str, List[Dict[str, Any]]]):
+        """에이전트별 대기 알림에 추가하고 묶음 전송 예약 (발송 루프에서 호출)"""
+        for agent_id, payloads in routed.items():
+            endpoint = self.endpoints[agent_id]
+            endpoint.pending.extend(payloads)
+            if len(endpoint.pending) >= self.max_batch_size:
+                self._schedule_send(endpoint)
+            elif endpoint.timer is None and (endpoint.sender is None or endpoint.sender.done()):
+                endpoint.timer = self._loop.call_later(self.batch_window, self._schedule_send, endpoint)
+
+    def _schedule_send(self, endpoint: _AgentEndpoint):
+        if endpoint.timer is not None:
+            endpoint.timer.cancel()
+            endpoint.timer = None
+        # 에이전트마다 전송 태스크는 하나만 실행하여 알림 순서를 유지
+        if endpoint.sender is None or endpoint.sender.done():
+            endpoint.sender = self._loop.create_task(self._send_pending(endpoint))
+
+    async def _send_pending(self, endpoint: _AgentEndpoint):
+        """대기 알림을 max_batch_size씩 묶어 전송 (전송 중 새로 쌓인 알림도 이어서 전송)"""
+        while endpoint.pending:
+            batch = [endpoint.pending.popleft() for _ in range(min(self.max_batch_size, len(endpoint.pending)))]
+            try:
+                delivered = await self._post(endpoint, batch)
+            except asyncio.CancelledError:
+                # 종료 중 취소되면 전송 중이던 묶음도 유출 파일에 남김
+                self._spill(endpoint, batch)
+                raise
+            if delivered:
+                endpoint.stats["delivered"] += len(batch)
+                self.stats["delivered"] += len(batch)
+            else:
+                self.stats["failed"] += len(batch)
+                endpoint.stats["spilled"] += len(batch)
+                self._spill(endpoint, batch)
+
+    async def _post(self, endpoint: _AgentEndpoint, batch: List[Dict[str, Any]]) -> bool:
+        """
+        알림 묶음 하나를 POST (재시도 가능한 실패는 지수 백오프로 재시도)
+
+        Returns:
+            전달 성공 여부
+        """
+        body = _dumps({"agent_id": endpoint.agent_id, "alerts": batch})
+        for attempt in range(self.max_retries + 1):
+            delay = endpoint.limiter.delay()
+            if delay:
+                await asyncio.sleep(delay)
+            retry_after = None
+            try:
+                endpoint.stats["requests"] += 1
+                async with self._session.post(endpoint.url, data=body.encode("utf-8")) as response:
+                    if response.status < 300:
+                        return True
+                    # 요청 자체가 잘못된 경우(4xx)는 재시도해도 같으므로 바로 포기 (429 제외)
+                    if response.status < 500 and response.status != 429:
+                        logger.error(f"에이전트 웹훅 거부: {endpoint.agent_id} ({response.status})")
+                        return False
+                    retry_after = response.headers.get("Retry-After")
+                    error = f"HTTP {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = repr(e)
+            if attempt == self.max_retries:
+                logger.warning(f"에이전트 웹훅 전달 실패: {endpoint.agent_id} ({error}, {attempt + 1}회 시도)")
+                break
+            endpoint.stats["retries"] += 1
+            backoff = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+            if retry_after is not None and retry_after.isdigit():
+                backoff = max(backoff, float(retry_after))
+            await asyncio.sleep(backoff)
+        return False
+
+    def _spill(self, endpoint: _AgentEndpoint, batch: List[Dict[str, Any]]):
+        """전달하지 못한 알림 묶음을 유출 파일에 추가"""
+        if self.spill_path is None:
+            logger.error(f"유출 파일이 없어 에이전트 알림 {len(batch)}건을 버림: {endpoint.agent_id}")
+            return
+        record = {"agent_id": endpoint.agent_id, "url": endpoint.url, "spilled_at": datetime.now().isoformat(),
+                  "alerts": batch}
+        with self._spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as spill_file:
+                spill_file.write(_dumps(record) + "\n")
+        self.stats["spilled"] += len(batch)
+
+    async def _redeliver(self) -> int:
+        """유출 파일의 알림을 다시 전달하고, 이번에도 실패한 알림은 새 유출 파일에 남김"""
+        with self._spill_lock:
+            if self.spill_path is None or not os.path.exists(self.spill_path):
+                return 0
+            # 재전달 중 새로 유출되는 알림과 섞이지 않도록 파일을 옮긴 뒤 읽음
+            replaying = f"{self.spill_path}.replaying"
+            os.replace(self.spill_path, replaying)
+        with open(replaying, encoding="utf-8") as spill_file:
+            records = [json.loads(line) for line in spill_file if line.strip()]
+        os.remove(replaying)
+
+        redelivered = 0
+        for record in records:
+            endpoint = self.endpoints.get(record["agent_id"])
+            if endpoint is None:
+                # 등록이 해제된 에이전트는 기록된 주소로 전송
+                endpoint = _AgentEndpoint(record["agent_id"], record["url"], _RateLimiter(self.default_rate_limit))
+            alerts = record["alerts"]
+            for start in range(0, len(alerts), self.max_batch_size):
+                batch = alerts[start:start + self.max_batch_size]
+                if await self._post(endpoint, batch):
+                    redelivered += len(batch)
+                else:
+                    self._spill(endpoint, batch)
+        self.stats["redelivered"] += redelivered
+        if records:
+            logger.info(f"유출된 에이전트 알림 재전달: {redelivered}건")
+        return redelivered
+
+    def redeliver_spilled(self, timeout: Optional[float] = None) -> int:
+        """
+        유출 파일에 기록된 알림 재전달
+
+        Returns:
+            재전달에 성공한 알림 수
+        """
+        future = asyncio.run_coroutine_threadsafe(self._redeliver(), self._ensure_started())
+        return future.result(timeout)
+
+    async def _drain(self):
+        for endpoint in self.endpoints.values():
+            if endpoint.pending:
+                self._schedule_send(endpoint)
+        senders = [endpoint.sender for endpoint in self.endpoints.values() if endpoint.sender is not None]
+        if senders:
+            await asyncio.gather(*senders, return_exceptions=True)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        묶음 대기 중인 알림을 바로 전송하고 전송(재시도 포함)이 끝날 때까지 대기
+
+        Returns:
+            제한 시간 안에 모두 끝났는지 여부
+        """
+        if self._loop is None:
+            return True
+        future = asyncio.run_coroutine_threadsafe(self._drain(), self._loop)
+        try:
+            future.result(timeout)
+            return True
+        except concurrent.futures.TimeoutError:
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """전체/에이전트별 전달 통계"""
+        return {**self.stats, "agents": {agent_id: {**endpoint.stats, "pending": len(endpoint.pending)}
+                                         for agent_id, endpoint in self.endpoints.items()}}
+
+    def close(self, timeout: Optional[float] = 30.0):
+        """대기 중인 알림을 전송(실패 시 유출 파일에 기록)한 뒤 HTTP 세션과 발송 스레드 종료"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._loop is None:
+            return
+        if not self.flush(timeout):
+            logger.warning("에이전트 웹훅 종료 제한 시간 초과: 남은 알림은 유출 파일에 기록")
+
+        async def shutdown():
+            senders = [endpoint.sender for endpoint in self.endpoints.values()
+                       if endpoint.sender is not None and not endpoint.sender.done()]
+            for sender in senders:
+                sender.cancel()
+            await asyncio.gather(*senders, return_exceptions=True)
+            for endpoint in self.endpoints.values():
+                if endpoint.timer is not None:
+                    endpoint.timer.cancel()
+                if endpoint.pending:
+                    self._spill(endpoint, list(endpoint.pending))
+                    endpoint.pending.clear()
+            await self._session.close()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        logger.info(f"에이전트 웹훅 종료: 전달 {self.stats['delivered']}건, 유출 {self.stats['spilled']}건")
@@ -0,0 +1,223 @@
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Deque, Tuple
+from collections import deque
+from enum import IntEnum
+import asyncio
+import contextvars
+import time
+from loguru import logger
+
+
+class VerificationPriority(IntEnum):
+    """검증 요청 우선순위 클래스 (값이 작을수록 먼저 처리)"""
+    CHECKOUT = 0
+    ADD_TO_CART = 1
+    BACKGROUND = 2
+
+
+FOREGROUND_PRIORITIES = (VerificationPriority.CHECKOUT, VerificationPriority.ADD_TO_CART)
+
+
+class _WorkItem:
+    """실행 대기 중인 검증 작업"""
+    __slots__ = ("priority", "func", "future", "enqueued_at", "context")
+
+    def __init__(self, priority: VerificationPriority, func: Callable[[], Awaitable[Any]],
+                 future: asyncio.Future, enqueued_at: float):
+        self.priority = priority
+        self.func = func
+        self.future = future
+        self.enqueued_at = enqueued_at
+        # 제출한 쪽의 컨텍스트(가상 시간축 등)에서 작업이 실행되도록 보존
+        self.context = contextvars.copy_context()
+
+
+class PriorityVerificationExecutor:
+    """
+    우선순위 기반 검증 실행기
+    결제 > 장바구니 추가 > 백그라운드 순으로 작업을 처리하고, 큐 지연이 목표치를 넘으면 백그라운드 작업을 지연/차단
+    """
+
+    def __init__(self, max_workers: int = 8, reserved_workers: int = 2,
+                 queue_latency_target: float = 0.5, background_policy: str = "defer",
+                 defer_delay: float = 1.0, max_defers: int = 3,
+                 max_background_wait: Optional[float] = None):
+        """
+        Args:
+            max_workers: 동시에 검증을 수행하는 워커 수
+            reserved_workers: 결제/장바구니 작업만 처리하는 예약 워커 수
+            queue_latency_target: 큐 지연 목표치 (초)
+            background_policy: 과부하 시 백그라운드 작업 처리 방식 (defer, shed)
+            defer_delay: 백그라운드 작업 재시도 간격 (초)
+            max_defers: 백그라운드 작업 최대 재시도 횟수 (초과 시 차단)
+            max_background_wait: 큐에서 이 시간 이상 대기한 백그라운드 작업은 실행하지 않고 폐기 (초)
+        """
+        if background_policy not in ("defer", "shed"):
+            raise ValueError(f"지원하지 않는 백그라운드 정책: {background_policy}")
+
+        self.max_workers = max(1, max_workers)
+        self.reserved_workers = min(max(0, reserved_workers), self.max_workers - 1)
+        self.queue_latency_target = queue_latency_target
+        self.background_policy = background_policy
+        self.defer_delay = defer_delay
+        self.max_defers = max_defers
+        self.max_background_wait = (max_background_wait if max_background_wait is not None
+                                    else queue_latency_target * 4)
+
+        self._queues: Dict[VerificationPriority, Deque[_WorkItem]] = {
+            priority: deque() for priority in VerificationPriority
+        }
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+
+        self.stats: Dict[str, int] = {"submitted": 0, "completed": 0, "cancelled": 0, "deferred": 0,
+                                       "shed": 0}
+        self._wait_samples: Dict[VerificationPriority, Deque[float]] = {
+            priority: deque(maxlen=1000) for priority in VerificationPriority
+        }
+        logger.info(f"우선순위 검증 실행기 초기화 완료 (워커: {self.max_workers}, 예약: {self.reserved_workers})")
+
+    def _ensure_started(self):
+        """현재 이벤트 루프에서 워커 시작"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+
+        # 다른 루프에서 만들어진 큐 항목과 워커는 재사용할 수 없음
+        for queue in self._queues.values():
+            queue.clear()
+        self._loop = loop
+        self._condition = asyncio.Condition()
+        self._workers = [
+            loop.create_task(self._worker(foreground_only=index < self.reserved_workers))
+            for index in range(self.max_workers)
+        ]
+
+    def queue_latency(self) -> float:
+        """현재 큐 지연 추정치 (가장 오래 대기 중인 작업의 대기 시간, 초)"""
+        now = time.monotonic()
+        oldest = [queue[0].enqueued_at for queue in self._queues.values() if queue]
+        return now - min(oldest) if oldest else 0.0
+
+    def queue_depth(self) -> Dict[str, int]:
+        """우선순위별 대기 작업 수"""
+        return {priority.name.lower(): len(queue) for priority, queue in self._queues.items()}
+
+    async def submit(self, priority: VerificationPriority,
+                     func: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """
+        검증 작업 제출 후 결과 대기
+
+        백그라운드 작업이 과부하로 차단되면 None 반환
+        """
+        self._ensure_started()
+        priority = VerificationPriority(priority)
+        self.stats["submitted"] += 1
+
+        if priority == VerificationPriority.BACKGROUND and not await self._admit_background():
+            self.stats["shed"] += 1
+            logger.warning(f"과부하로 백그라운드 검증 차단 (큐 지연: {self.queue_latency():.3f}초)")
+            return None
+
+        future = self._loop.create_future()
+        item = _WorkItem(priority, func, future, time.monotonic())
+        async with self._condition:
+            self._queues[priority].append(item)
+            self._condition.notify_all()
+
+        return await future
+
+    async def _admit_background(self) -> bool:
+        """백그라운드 작업 수용 여부 결정 (필요 시 재시도 대기)"""
+        attempts = 0
+        while self.queue_latency() > self.queue_latency_target:
+            if self.background_policy == "shed" or attempts >= self.max_defers:
+                return False
+            attempts += 1
+            self.stats["deferred"] += 1
+            logger.debug(f"백그라운드 검증 지연 ({attempts}/{self.max_defers})")
+            await asyncio.sleep(self.defer_delay)
+        return True
+
+    def _next_item(self, foreground_only: bool) -> Optional[_WorkItem]:
+        """가장 높은 우선순위의 대기 작업 선택"""
+        priorities = FOREGROUND_PRIORITIES if foreground_only else tuple(VerificationPriority)
+        for priority in priorities:
+            queue = self._queues[priority]
+            if queue:
+                return queue.popleft()
+        return None
+
+    async def _worker(self, foreground_only: bool):
+        """작업 처리 루프"""
+        while True:
+            async with self._condition:
+                item = self._next_item(foreground_only)
+                while item is None:
+                    await self._condition.wait()
+                    item = self._next_item(foreground_only)
+
+            waited = time.monotonic() - item.enqueued_at
+            self._wait_samples[item.priority].append(waited)
+
+            if item.future.cancelled():
+                # 실행 전에 호출자가 대기를 취소한 작업
+                self.stats["cancelled"] += 1
+                continue
+
+            if item.priority == VerificationPriority.BACKGROUND and waited > self.max_background_wait:
+                # 너무 오래 대기한 백그라운드 작업은 결과가 의미 없으므로 폐기
+                self.stats["shed"] += 1
+                item.future.set_result(None)
+                continue
+
+            task = item.context.run(asyncio.ensure_future, item.func())
+            try:
+                result = await task
+                outcome = (item.future.set_result, result)
+            except asyncio.CancelledError:
+                task.cancel()
+                self.stats["cancelled"] += 1
+                if not item.future.done():
+                    item.future.cancel()
+                raise
+            except Exception as e:
+                outcome = (item.future.set_exception, e)
+            # 실행 중에 호출자가 대기를 취소했으면 결과를 전달하지 못하므로 완료가 아닌 취소로 집계
+            if item.future.done():
+                self.stats["cancelled"] += 1
+            else:
+                outcome[0](outcome[1])
+                self.stats["completed"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """실행 통계 및 우선순위별 대기 시간 분위수 조회"""
+        wait_times: Dict[str, Dict[str, float]] = {}
+        for priority, samples in self._wait_samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            wait_times[priority.name.lower()] = {
+                "p50": ordered[int(0.50 * (len(ordered) - 1))],
+                "p99": ordered[int(0.99 * (len(ordered) - 1))],
+                "max": ordered[-1]
+            }
+        return {
+            **self.stats,
+            "queue_depth": self.queue_depth(),
+            "queue_latency": self.queue_latency(),
+            "wait_times": wait_times
+        }
+
+    def shutdown(self):
+        """워커 중단"""
+        if self._loop is not None and not self._loop.is_closed():
+            for task in self._workers:
+                task.cancel()
+        self._workers = []
+        for queue in self._queues.values():
+            for item in queue:
+                if not item.future.done() and not item.future.get_loop().is_closed():
+                    item.future.cancel()
+            queue.clear()
+        logger.info("우선순위 검증 실행기 중단")
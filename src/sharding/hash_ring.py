@@ -0,0 +1,48 @@
+from typing import Dict, List, Tuple
+import bisect
+import hashlib
+
+
+def _hash_key(key: str) -> int:
+    """문자열을 64비트 정수 해시로 변환"""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing:
+    """
+    일관 해싱 링
+    세션 ID를 샤드 번호에 매핑하며, 샤드 수가 바뀌어도 일부 세션만 이동하도록 함
+    """
+
+    def __init__(self, num_shards: int, virtual_nodes: int = 64):
+        """
+        Args:
+            num_shards: 샤드 수
+            virtual_nodes: 샤드당 가상 노드 수 (많을수록 분포가 고름)
+        """
+        if num_shards < 1:
+            raise ValueError("샤드 수는 1 이상이어야 함")
+
+        self.num_shards = num_shards
+        self.virtual_nodes = virtual_nodes
+        points: List[Tuple[int, int]] = []
+        for shard in range(num_shards):
+            for replica in range(virtual_nodes):
+                points.append((_hash_key(f"shard-{shard}#{replica}"), shard))
+        points.sort()
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def get_shard(self, session_id: str) -> int:
+        """세션 ID를 담당하는 샤드 번호 조회"""
+        index = bisect.bisect(self._hashes, _hash_key(session_id))
+        if index == len(self._hashes):
+            index = 0
+        return self._shards[index]
+
+    def distribution(self, session_ids: List[str]) -> Dict[int, int]:
+        """세션 목록의 샤드별 분포 계산"""
+        counts = {shard: 0 for shard in range(self.num_shards)}
+        for session_id in session_ids:
+            counts[self.get_shard(session_id)] += 1
+        return counts
@@ -0,0 +1,458 @@
+from typing import Dict, Any, Callable, Optional, List, Tuple
+from multiprocessing.connection import Connection
+import asyncio
+import itertools
+import multiprocessing
+import os
+import pickle
+import threading
+from loguru import logger
+
+from src.models.data_models import DetectionResult, ContextRecord, NotificationMessage
+from src.scheduler.verification_scheduler import VerificationPriority
+from src.sharding.hash_ring import ConsistentHashRing
+
+
+def _encode(message: Tuple) -> bytes:
+    """IPC 메시지 직렬화 (기본 타입 튜플만 사용)"""
+    return pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _result_to_dict(result: Optional[DetectionResult]) -> Optional[Dict[str, Any]]:
+    """탐지 결과를 IPC 전송용 딕셔너리로 변환"""
+    return result.dict() if result else None
+
+
+def _result_from_dict(data: Optional[Dict[str, Any]]) -> Optional[DetectionResult]:
+    """IPC로 받은 딕셔너리를 탐지 결과로 변환"""
+    return DetectionResult.parse_obj(data) if data else None
+
+
+class _ShardWorker:
+    """
+    샤드 워커
+    워커 프로세스 안에서 자기 샤드의 FraudDetectionSystem을 소유하고 요청을 처리
+    워커에서 발송된 알림은 요청 ID 없는 메시지 (None, True, [알림])로 프론트 프로세스에 전달
+    """
+
+    def __init__(self, shard_id: int, conn: Connection, config: Dict[str, Any]):
+        # 워커 프로세스에서만 시스템 전체를 불러옴
+        from src.system import FraudDetectionSystem
+
+        self.shard_id = shard_id
+        self.conn = conn
+        self.system = FraudDetectionSystem(config)
+        self._send_lock = threading.Lock()
+        for severity in ("info", "warning", "error"):
+            self.system.notifier.register_handler(severity, self._forward_notifications, batch=True)
+
+    def _send(self, message: Tuple):
+        with self._send_lock:
+            self.conn.send_bytes(_encode(message))
+
+    def _forward_notifications(self, notifications: List[NotificationMessage]):
+        """발송된 알림을 프론트 프로세스로 전달 (알림 발송 스레드에서 실행)"""
+        try:
+            self._send((None, True, [notification.dict() for notification in notifications]))
+        except (OSError, ValueError) as e:
+            logger.warning(f"알림 전달 실패 (연결 종료): {e}")
+
+    async def serve(self):
+        """요청 수신 루프"""
+        loop = asyncio.get_running_loop()
+        pending = set()
+        logger.info(f"샤드 워커 시작: {self.shard_id} (PID {os.getpid()})")
+
+        while True:
+            try:
+                data = await loop.run_in_executor(None, self.conn.recv_bytes)
+            except (EOFError, OSError):
+                break
+
+            request_id, op, args = pickle.loads(data)
+            if op == "shutdown":
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+                await self.system.aclose()
+                self._send((request_id, True, None))
+                break
+
+            task = asyncio.create_task(self._handle(request_id, op, args))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        logger.info(f"샤드 워커 종료: {self.shard_id}")
+
+    async def _handle(self, request_id: int, op: str, args: Tuple):
+        """단일 요청 처리"""
+        try:
+            handler = getattr(self, f"_op_{op}", None)
+            if handler is None:
+                raise ValueError(f"지원하지 않는 샤드 연산: {op}")
+            result = await handler(*args)
+            self._send((request_id, True, result))
+        except Exception as e:
+            logger.error(f"샤드 요청 처리 중 오류 발생: {e}")
+            self._send((request_id, False, str(e)))
+
+    async def _op_product_view(self, session_id: str, product_id: str, product_data: Dict[str, Any]) -> bool:
+        return await self.system.on_product_view(session_id, product_id, product_data)
+
+    async def _op_verify(self, session_id: str, product_id: str, priority: int) -> Optional[Dict[str, Any]]:
+        result = await self.system.verify_product_now(session_id, product_id, VerificationPriority(priority))
+        return _result_to_dict(result)
+
+    async def _op_checkout(self, session_id: str, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        results = await self.system.on_checkout(session_id, product_ids)
+        return {product_id: _result_to_dict(result) for product_id, result in results.items()}
+
+    async def _op_list_sessions(self) -> List[str]:
+        """문맥, 탐지 기록, 알림 기록 중 하나라도 가진 세션 (문맥이 만료된 기록 전용 세션 포함)"""
+        session_ids = dict.fromkeys(self.system.context_storage.get_session_ids())
+        session_ids.update(dict.fromkeys(self.system.fraud_detector.detection_history))
+        session_ids.update(dict.fromkeys(list(self.system.notifier.notification_history)))
+        return list(session_ids)
+
+    async def _op_flush_notifications(self, timeout: float) -> bool:
+        """발송 대기 중인 알림 처리 (전달된 알림은 이 응답보다 먼저 프론트 프로세스에 도착)"""
+        return await asyncio.to_thread(self.system.notifier.flush, timeout)
+
+    async def _op_export_sessions(self, session_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """세션 상태 내보내기 (이 샤드의 상태는 그대로 두고, 대상 샤드가 가져온 뒤 drop_sessions로 삭제)"""
+        storage = self.system.context_storage
+        exported = {}
+        for session_id in session_ids:
+            exported[session_id] = {
+                "contexts": [record.dict() for record in storage.get_all_contexts_for_session(session_id)],
+                "detections": [result.dict() for result in
+                               self.system.fraud_detector.detection_history.get(session_id, [])],
+                "notifications": [notification.dict() for notification in
+                                  self.system.notifier.notification_history.get(session_id, [])]
+            }
+        return exported
+
+    async def _op_drop_sessions(self, session_ids: List[str]) -> int:
+        """세션 상태 삭제 (다른 샤드로 옮긴 세션, 또는 실패한 이동에서 가져온 사본)"""
+        storage = self.system.context_storage
+        for session_id in session_ids:
+            for record in storage.get_all_contexts_for_session(session_id):
+                storage.delete_context(session_id, record.product_id)
+            self.system.fraud_detector.detection_history.pop(session_id, None)
+            self.system.notifier.notification_history.pop(session_id, None)
+        return len(session_ids)
+
+    async def _op_import_sessions(self, payload: Dict[str, Dict[str, Any]]) -> int:
+        """다른 샤드에서 내보낸 세션 상태 가져오기"""
+        self.system.context_storage.store_contexts(
+            ContextRecord.parse_obj(record) for state in payload.values() for record in state["contexts"])
+        for session_id, state in payload.items():
+            if state["detections"]:
+                self.system.fraud_detector.detection_history.setdefault(session_id, []).extend(
+                    DetectionResult.parse_obj(result) for result in state["detections"])
+            if state["notifications"]:
+                self.system.notifier.restore_history(
+                    session_id, (NotificationMessage.parse_obj(notification) for notification in state["notifications"]))
+        return len(payload)
+
+    async def _op_stats(self) -> Dict[str, Any]:
+        return {
+            "shard_id": self.shard_id,
+            "pid": os.getpid(),
+            "sessions": len(self.system.context_storage.get_session_ids()),
+            "executor": self.system.verification_executor.get_stats()
+        }
+
+
+def _shard_worker_main(shard_id: int, conn: Connection, config: Dict[str, Any]):
+    """샤드 워커 프로세스 진입점"""
+    asyncio.run(_ShardWorker(shard_id, conn, config).serve())
+
+
+class _ShardClient:
+    """
+    샤드 클라이언트
+    프론트 프로세스에서 워커 프로세스 하나와의 IPC 채널을 관리
+    """
+
+    def __init__(self, shard_id: int, mp_context, config: Dict[str, Any], loop: asyncio.AbstractEventLoop,
+                 on_notifications: Callable[[List[Dict[str, Any]]], None]):
+        self.shard_id = shard_id
+        self.loop = loop
+        self.on_notifications = on_notifications
+        self.conn, child_conn = mp_context.Pipe(duplex=True)
+        self.process = mp_context.Process(
+            target=_shard_worker_main,
+            args=(shard_id, child_conn, config),
+            name=f"fraud-shard-{shard_id}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        self._ids = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_loop, name=f"fraud-shard-reader-{shard_id}", daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        """워커 응답 수신 스레드"""
+        while True:
+            try:
+                data = self.conn.recv_bytes()
+            except (EOFError, OSError):
+                break
+            request_id, ok, payload = pickle.loads(data)
+            if self.loop.is_closed():
+                break
+            if request_id is None:
+                self.loop.call_soon_threadsafe(self.on_notifications, payload)
+            else:
+                self.loop.call_soon_threadsafe(self._resolve, request_id, ok, payload)
+
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._fail_pending)
+
+    def _resolve(self, request_id: int, ok: bool, payload: Any):
+        future = self._pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(RuntimeError(f"샤드 {self.shard_id} 오류: {payload}"))
+
+    def _fail_pending(self):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(f"샤드 {self.shard_id} 연결 종료"))
+        self._pending.clear()
+
+    async def call(self, op: str, *args) -> Any:
+        """워커에 요청을 보내고 응답 대기 (워커 연결이 끊겼으면 바로 실패)"""
+        if not self._reader.is_alive():
+            raise RuntimeError(f"샤드 {self.shard_id} 연결 종료")
+        request_id = next(self._ids)
+        future = self.loop.create_future()
+        self._pending[request_id] = future
+        data = _encode((request_id, op, args))
+        with self._send_lock:
+            self.conn.send_bytes(data)
+        return await future
+
+    async def close(self, timeout: float = 10.0):
+        """워커 종료"""
+        try:
+            await asyncio.wait_for(self.call("shutdown"), timeout)
+        except Exception as e:
+            logger.warning(f"샤드 {self.shard_id} 정상 종료 실패: {e}")
+        await self.loop.run_in_executor(None, self.process.join, timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class ShardedFraudDetectionSystem:
+    """
+    샤드 기반 속임수 탐지 시스템
+    세션 ID의 일관 해싱으로 이벤트를 N개의 워커 프로세스에 분배하고, 각 워커가 자기 샤드의 저장소를 소유
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, config: Dict[str, Any] = None,
+                 start_method: str = "spawn", virtual_nodes: int = 64):
+        """
+        Args:
+            num_workers: 워커 프로세스 수 (기본: CPU 코어 수)
+            config: 각 워커의 FraudDetectionSystem 설정
+            start_method: 프로세스 시작 방식 (spawn, fork, forkserver)
+            virtual_nodes: 샤드당 해시 링 가상 노드 수
+        """
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.config = config or {}
+        self.virtual_nodes = virtual_nodes
+        self._mp_context = multiprocessing.get_context(start_method)
+        self._ring = ConsistentHashRing(self.num_workers, virtual_nodes)
+        self._clients: List[_ShardClient] = []
+        self._routing_ready: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._inflight = 0
+        self.notification_history: Dict[str, List[NotificationMessage]] = {}
+        self._notification_handlers: List[Callable[[NotificationMessage], Any]] = []
+        logger.info(f"샤드 기반 탐지 시스템 생성 (워커: {self.num_workers})")
+
+    async def start(self):
+        """워커 프로세스 시작"""
+        loop = asyncio.get_running_loop()
+        self._clients = [_ShardClient(shard, self._mp_context, self.config, loop, self._on_notifications)
+                         for shard in range(self.num_workers)]
+        self._routing_ready = asyncio.Event()
+        self._routing_ready.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        logger.info(f"샤드 워커 {self.num_workers}개 시작 완료")
+
+    def register_notification_handler(self, handler: Callable[[NotificationMessage], Any]):
+        """워커에서 발송된 알림을 받을 핸들러 등록 (프론트 프로세스의 이벤트 루프에서 알림 하나씩 호출)"""
+        self._notification_handlers.append(handler)
+
+    def _on_notifications(self, payload: List[Dict[str, Any]]):
+        """워커가 전달한 알림 기록 및 핸들러 호출"""
+        for data in payload:
+            notification = NotificationMessage.parse_obj(data)
+            self.notification_history.setdefault(notification.session_id, []).append(notification)
+            for handler in self._notification_handlers:
+                try:
+                    handler(notification)
+                except Exception as e:
+                    logger.error(f"알림 핸들러 오류: {e}")
+
+    def get_notification_history(self, session_id: str) -> List[NotificationMessage]:
+        """워커에서 전달된 세션 알림 기록 조회"""
+        return list(self.notification_history.get(session_id, ()))
+
+    async def flush_notifications(self, timeout: float = 10.0) -> bool:
+        """모든 워커의 발송 대기 알림을 처리하고 전달될 때까지 대기"""
+        await self._routing_ready.wait()
+        results = await asyncio.gather(*[client.call("flush_notifications", timeout) for client in self._clients])
+        # 워커 응답보다 먼저 도착한 알림 전달 콜백이 실행되도록 한 번 양보
+        await asyncio.sleep(0)
+        return all(results)
+
+    def get_shard(self, session_id: str) -> int:
+        """세션을 담당하는 샤드 번호 조회"""
+        return self._ring.get_shard(session_id)
+
+    async def _call_session(self, session_id: str, op: str, *args) -> Any:
+        """세션 담당 샤드로 요청 라우팅"""
+        await self._routing_ready.wait()
+        client = self._clients[self._ring.get_shard(session_id)]
+        self._inflight += 1
+        self._idle.clear()
+        try:
+            return await client.call(op, *args)
+        finally:
+            self._inflight -= 1
+            if self._inflight == 0:
+                self._idle.set()
+
+    async def on_product_view(self, session_id: str, product_id: str, product_data: Dict[str, Any]) -> bool:
+        """상품 조회 이벤트 라우팅"""
+        try:
+            return await self._call_session(session_id, "product_view", session_id, product_id, product_data)
+        except Exception as e:
+            logger.error(f"상품 조회 처리 중 오류 발생: {e}")
+            return False
+
+    async def verify_product_now(self, session_id: str, product_id: str,
+                                 priority: VerificationPriority = VerificationPriority.ADD_TO_CART) -> Optional[DetectionResult]:
+        """즉시 상품 검증 라우팅"""
+        try:
+            result = await self._call_session(session_id, "verify", session_id, product_id, int(priority))
+            return _result_from_dict(result)
+        except Exception as e:
+            logger.error(f"상품 검증 중 오류 발생: {e}")
+            return None
+
+    async def on_add_to_cart(self, session_id: str, product_id: str) -> Optional[DetectionResult]:
+        """장바구니 추가 이벤트 라우팅"""
+        return await self.verify_product_now(session_id, product_id, VerificationPriority.ADD_TO_CART)
+
+    async def on_checkout(self, session_id: str, product_ids: List[str]) -> Dict[str, DetectionResult]:
+        """결제 진행 이벤트 라우팅"""
+        try:
+            results = await self._call_session(session_id, "checkout", session_id, product_ids)
+            return {product_id: _result_from_dict(result) for product_id, result in results.items()}
+        except Exception as e:
+            logger.error(f"결제 검증 중 오류 발생: {e}")
+            return {}
+
+    async def resize(self, num_workers: int) -> int:
+        """
+        워커 수 변경 및 세션 재배치
+        이동할 세션을 모두 대상 샤드에 복사한 뒤에만 원본 샤드에서 삭제하고 새 해시 링으로 전환.
+        복사 중 하나라도 실패하면 (대상 워커 종료 포함) 가져온 사본을 지우고 이전 배치로 되돌린 뒤 예외를 다시 발생.
+
+        Returns:
+            다른 샤드로 이동한 세션 수
+        """
+        if num_workers < 1:
+            raise ValueError("워커 수는 1 이상이어야 함")
+        if num_workers == self.num_workers:
+            return 0
+
+        # 1. 새 요청을 막고 진행 중인 요청이 끝날 때까지 대기
+        self._routing_ready.clear()
+        await self._idle.wait()
+
+        loop = asyncio.get_running_loop()
+        clients = list(self._clients)
+        copied: List[Tuple[int, int, List[str]]] = []  # 대상 샤드가 가져온 (원본 샤드, 대상 샤드, 세션 목록)
+        try:
+            try:
+                # 2. 늘어난 워커 시작
+                for shard in range(self.num_workers, num_workers):
+                    clients.append(_ShardClient(shard, self._mp_context, self.config, loop, self._on_notifications))
+
+                # 3. 새 해시 링 기준으로 담당 샤드가 바뀐 세션을 대상 샤드에 복사 (원본은 아직 유지)
+                new_ring = ConsistentHashRing(num_workers, self.virtual_nodes)
+                for shard in range(self.num_workers):
+                    session_ids = await clients[shard].call("list_sessions")
+                    moves: Dict[int, List[str]] = {}
+                    for session_id in session_ids:
+                        target = new_ring.get_shard(session_id)
+                        if target != shard:
+                            moves.setdefault(target, []).append(session_id)
+
+                    for target, target_sessions in moves.items():
+                        payload = await clients[shard].call("export_sessions", target_sessions)
+                        await clients[target].call("import_sessions", payload)
+                        copied.append((shard, target, target_sessions))
+            except Exception as e:
+                logger.error(f"샤드 재배치 실패, 이전 배치로 되돌림: {e}")
+                await self._rollback_resize(clients, copied)
+                raise
+
+            # 4. 모든 복사가 확인되었으므로 새 해시 링으로 전환하고 원본 샤드에서 삭제
+            self._clients = clients
+            self._ring = new_ring
+            for shard, _, session_ids in copied:
+                if shard >= num_workers:
+                    continue  # 종료할 워커는 삭제할 필요 없음
+                try:
+                    await clients[shard].call("drop_sessions", session_ids)
+                except Exception as e:
+                    # 원본에 남은 사본은 라우팅되지 않으며 보관 기간이 지나면 정리됨
+                    logger.warning(f"샤드 {shard}에서 이동한 세션 삭제 실패: {e}")
+
+            # 5. 줄어든 워커 종료
+            for client in clients[num_workers:]:
+                await client.close()
+            self._clients = clients[:num_workers]
+
+            moved = sum(len(session_ids) for _, _, session_ids in copied)
+            logger.info(f"샤드 재배치 완료: {self.num_workers} → {num_workers} (이동 세션 {moved}개)")
+            self.num_workers = num_workers
+            return moved
+        finally:
+            self._routing_ready.set()
+
+    async def _rollback_resize(self, clients: List["_ShardClient"], copied: List[Tuple[int, int, List[str]]]):
+        """실패한 재배치 되돌리기 (기존 샤드에 가져온 사본 삭제, 새로 시작한 워커 종료)"""
+        for _, target, session_ids in copied:
+            if target < self.num_workers:
+                try:
+                    await clients[target].call("drop_sessions", session_ids)
+                except Exception as e:
+                    logger.warning(f"샤드 {target}에 가져온 세션 사본 삭제 실패: {e}")
+        for client in clients[self.num_workers:]:
+            await client.close()
+
+    async def get_stats(self) -> List[Dict[str, Any]]:
+        """샤드별 통계 조회"""
+        return list(await asyncio.gather(*[client.call("stats") for client in self._clients]))
+
+    async def shutdown(self):
+        """모든 워커 종료"""
+        await asyncio.gather(*[client.close() for client in self._clients], return_exceptions=True)
+        self._clients = []
+        logger.info("샤드 기반 탐지 시스템 종료")
@@ -0,0 +1,96 @@
+from typing import Optional
+from contextvars import ContextVar
+from datetime import datetime
+import asyncio
+import time
+
+
+class Clock:
+    """
+    실제 시간 시계
+    시스템 구성 요소가 시간 조회와 대기를 이 인터페이스로 수행하여 시뮬레이션 시 가상 시계로 교체 가능
+    """
+
+    def time(self) -> float:
+        """현재 시각 (epoch 초)"""
+        return time.time()
+
+    def now(self) -> datetime:
+        """현재 시각 (datetime)"""
+        return datetime.now()
+
+    def monotonic(self) -> float:
+        """경과 시간 측정용 단조 시계 (초)"""
+        return time.monotonic()
+
+    async def sleep(self, seconds: float):
+        """지정한 시간 동안 대기"""
+        await asyncio.sleep(seconds)
+
+    def start_timeline(self):
+        """현재 태스크 흐름의 시간축 시작 (실제 시계에서는 아무것도 하지 않음)"""
+        pass
+
+
+class _Timeline:
+    """하나의 시나리오가 공유하는 가상 경과 시간"""
+    __slots__ = ("offset",)
+
+    def __init__(self):
+        self.offset = 0.0
+
+
+class VirtualClock(Clock):
+    """
+    가상 시간 시계
+    sleep 호출 시 실제로 대기하지 않고 현재 시간축의 가상 시간만 전진시켜 CPU 속도로 시뮬레이션 수행
+
+    경과 시간(monotonic)은 시간축별로 계산: 시간축은 start_timeline()을 호출한 태스크와 그 하위 태스크가 공유하며,
+    병렬로 실행된 하위 작업의 대기 시간은 합산되므로 종단 간 지연의 상한으로 해석해야 함.
+    현재 시각(time/now)은 모든 시간축이 공유하는 하나의 기준으로, 어느 시간축에서든 대기한 만큼 전진함
+    (문맥 저장 시각, 만료 시각, 알림 억제 기간을 세션끼리 비교할 수 있도록)
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        """
+        Args:
+            start: 가상 시간의 시작 시각 (epoch 초, 기본: 현재 시각)
+        """
+        self._start = start if start is not None else time.time()
+        self._timeline: ContextVar[Optional[_Timeline]] = ContextVar(f"virtual_timeline_{id(self)}", default=None)
+        self._default_timeline = _Timeline()
+        self.total_slept = 0.0
+
+    def _current(self) -> _Timeline:
+        return self._timeline.get() or self._default_timeline
+
+    def start_timeline(self):
+        """현재 태스크와 이후 생성되는 하위 태스크가 공유할 새 시간축 시작"""
+        self._timeline.set(_Timeline())
+
+    def time(self) -> float:
+        return self._start + self.total_slept
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+    def monotonic(self) -> float:
+        return self._current().offset
+
+    async def sleep(self, seconds: float):
+        """가상 시간만 전진시키고 다른 태스크에 실행 기회 양보"""
+        if seconds > 0:
+            self._current().offset += seconds
+            self.total_slept += seconds
+        await asyncio.sleep(0)
+
+
+def create_clock(spec=None) -> Clock:
+    """설정값으로 시계 생성 (Clock 인스턴스, "real", "virtual" 지원)"""
+    if isinstance(spec, Clock):
+        return spec
+    if spec in (None, "real"):
+        return Clock()
+    if spec == "virtual":
+        return VirtualClock()
+    raise ValueError(f"지원하지 않는 시계 타입: {spec}")
@@ -0,0 +1,150 @@
+from typing import Dict, Any, Optional, List, Tuple
+import itertools
+import json
+import math
+import random
+import threading
+
+
+class LatencyModel:
+    """
+    지연 시간 모델
+    데이터 수집 채널(mcp, web 등)별 통신 지연을 샘플링
+    """
+
+    def sample(self, channel: str) -> float:
+        """채널의 지연 시간 샘플 (초)"""
+        raise NotImplementedError
+
+
+class FixedLatency(LatencyModel):
+    """채널별 고정 지연"""
+
+    def __init__(self, default: float = 0.0, channels: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            default: 채널 설정이 없을 때의 지연 (초)
+            channels: 채널별 지연 (초)
+        """
+        self.default = default
+        self.channels = channels or {}
+
+    def sample(self, channel: str) -> float:
+        return self.channels.get(channel, self.default)
+
+
+class DistributionLatency(LatencyModel):
+    """
+    분포 기반 지연
+    채널별로 uniform(low, high), normal(mean, stddev), lognormal(mu, sigma) 분포에서 샘플링
+    """
+
+    def __init__(self, channels: Dict[str, Tuple[str, float, float]], seed: Optional[int] = None):
+        """
+        Args:
+            channels: {채널: (분포 이름, 파라미터1, 파라미터2)}
+            seed: 난수 시드 (재현 가능한 시뮬레이션용)
+        """
+        for channel, (distribution, _, _) in channels.items():
+            if distribution not in ("uniform", "normal", "lognormal"):
+                raise ValueError(f"지원하지 않는 분포: {distribution} (채널 {channel})")
+        self.channels = channels
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, channel: str) -> float:
+        spec = self.channels.get(channel)
+        if spec is None:
+            return 0.0
+
+        distribution, first, second = spec
+        with self._lock:
+            if distribution == "uniform":
+                value = self._random.uniform(first, second)
+            elif distribution == "normal":
+                value = self._random.gauss(first, second)
+            else:
+                value = self._random.lognormvariate(first, second)
+        return max(0.0, value)
+
+
+class ReplayLatency(LatencyModel):
+    """
+    기록 재생 지연
+    실제 환경에서 기록한 채널별 지연 시간을 순서대로 반복 재생
+    """
+
+    def __init__(self, traces: Dict[str, List[float]]):
+        """
+        Args:
+            traces: {채널: [지연 시간(초), ...]}
+        """
+        self.traces = {channel: list(samples) for channel, samples in traces.items() if samples}
+        self._cycles = {channel: itertools.cycle(samples) for channel, samples in self.traces.items()}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "ReplayLatency":
+        """
+        기록 파일에서 생성
+
+        JSON 파일({채널: [지연...]}) 또는 "채널,지연" 형식의 CSV 파일 지원
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        if path.endswith(".json"):
+            return cls(json.loads(content))
+
+        traces: Dict[str, List[float]] = {}
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            channel, seconds = line.split(",", 1)
+            try:
+                traces.setdefault(channel.strip(), []).append(float(seconds))
+            except ValueError:
+                continue  # 헤더 행 등 숫자가 아닌 값은 무시
+        return cls(traces)
+
+    def sample(self, channel: str) -> float:
+        cycle = self._cycles.get(channel)
+        if cycle is None:
+            return 0.0
+        with self._lock:
+            return next(cycle)
+
+
+def default_latency_model() -> LatencyModel:
+    """기존 시뮬레이션과 동일한 지연 모델 (웹 0.1~0.4초 균등 분포, MCP 지연 없음)"""
+    return DistributionLatency({"web": ("uniform", 0.1, 0.4)})
+
+
+def create_latency_model(spec: Any = None) -> LatencyModel:
+    """
+    설정값으로 지연 모델 생성
+
+    LatencyModel 인스턴스, 숫자(고정 지연), 또는 다음 형식의 딕셔너리 지원:
+    - {"type": "fixed", "default": 0.1, "channels": {"web": 0.2}}
+    - {"type": "distribution", "channels": {"web": ["uniform", 0.1, 0.4]}, "seed": 42}
+    - {"type": "replay", "path": "traces.json"}
+    """
+    if spec is None:
+        return default_latency_model()
+    if isinstance(spec, LatencyModel):
+        return spec
+    if isinstance(spec, (int, float)) and not math.isnan(spec):
+        return FixedLatency(default=float(spec))
+    if isinstance(spec, dict):
+        model_type = spec.get("type")
+        if model_type == "fixed":
+            return FixedLatency(default=spec.get("default", 0.0), channels=spec.get("channels"))
+        if model_type == "distribution":
+            channels = {channel: tuple(params) for channel, params in spec.get("channels", {}).items()}
+            return DistributionLatency(channels, seed=spec.get("seed"))
+        if model_type == "replay":
+            if "path" in spec:
+                return ReplayLatency.from_file(spec["path"])
+            return ReplayLatency(spec.get("traces", {}))
+    raise ValueError(f"지원하지 않는 지연 모델 설정: {spec}")
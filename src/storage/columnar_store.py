@@ -0,0 +1,403 @@
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from array import array
+from bisect import bisect_left, insort
+from datetime import datetime
+import json
+from src.models.data_models import ProductInfo, ContextRecord
+from src.storage.expiry_index import ExpiryIndex
+
+# 문자열 테이블에서 값이 없음을 나타내는 ID
+NO_STRING = -1
+
+_MICROS = 1_000_000
+
+
+def _to_micros(value: datetime) -> int:
+    return int(round(value.timestamp() * _MICROS))
+
+
+def _from_micros(value: int) -> datetime:
+    return datetime.fromtimestamp(value / _MICROS)
+
+
+class StringTable:
+    """
+    참조 횟수 기반 문자열 테이블
+    같은 문자열은 하나의 정수 ID로 공유하고, 참조가 모두 사라진 ID는 재사용
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._values: List[Optional[str]] = []
+        self._refcounts = array("q")
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def intern(self, value: Optional[str]) -> int:
+        """문자열 참조 획득 후 ID 반환 (None은 NO_STRING)"""
+        if value is None:
+            return NO_STRING
+        string_id = self._ids.get(value)
+        if string_id is None:
+            if self._free:
+                string_id = self._free.pop()
+                self._values[string_id] = value
+                self._refcounts[string_id] = 0
+            else:
+                string_id = len(self._values)
+                self._values.append(value)
+                self._refcounts.append(0)
+            self._ids[value] = string_id
+        self._refcounts[string_id] += 1
+        return string_id
+
+    def lookup(self, value: str) -> int:
+        """참조 횟수 변경 없이 문자열 ID 조회 (없으면 NO_STRING)"""
+        return self._ids.get(value, NO_STRING)
+
+    def get(self, string_id: int) -> Optional[str]:
+        """ID에 해당하는 문자열"""
+        return self._values[string_id] if string_id != NO_STRING else None
+
+    def release(self, string_id: int) -> bool:
+        """문자열 참조 해제 (마지막 참조면 ID를 반납하고 True 반환)"""
+        if string_id == NO_STRING:
+            return False
+        self._refcounts[string_id] -= 1
+        if self._refcounts[string_id] > 0:
+            return False
+        del self._ids[self._values[string_id]]
+        self._values[string_id] = None
+        self._free.append(string_id)
+        return True
+
+
+class ColumnarContextStore:
+    """
+    컬럼 기반 슬롯 문맥 저장소
+    문맥마다 pydantic 객체를 보관하지 않고, 슬롯 번호로 접근하는 타입 배열 컬럼에 필드를 나누어 저장.
+    세션/상품 ID, 설명, URL 등 문자열은 문자열 테이블에 한 번만 저장하고 ContextRecord는 조회 시에만 생성.
+    만료 인덱스와 저장 시각 순 인덱스는 (슬롯, 세대)를 참조하므로 정리/구간 조회가 전체 슬롯을 순회하지 않음.
+    """
+
+    def __init__(self, min_compact: int = 1024):
+        """
+        Args:
+            min_compact: 시각 인덱스 재구성을 고려하기 시작하는 최소 무효 항목 수
+        """
+        self.sessions = StringTable()
+        self.products = StringTable()
+        self.texts = StringTable()  # 설명, 출처 URL, 에이전트 ID
+        self.extras = StringTable()  # 속성/메타데이터 JSON
+        # 디코딩한 속성/메타데이터 (고유 값마다 한 번만 디코딩, 조회 결과끼리 공유되므로 읽기 전용)
+        self._decoded_extras: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+        # 슬롯별 컬럼
+        self._session_col = array("i")
+        self._product_col = array("i")
+        self._info_product_col = array("i")  # ProductInfo.product_id (보통 product_id와 같은 ID)
+        self._price_col = array("d")
+        self._description_col = array("i")
+        self._extras_col = array("i")
+        self._timestamp_col = array("q")  # epoch 마이크로초
+        self._expires_col = array("q")  # epoch 마이크로초, 0이면 기본 보관 기간
+        self._source_col = array("i")
+        self._agent_col = array("i")
+        self._generation_col = array("q")  # 슬롯을 할당할 때마다 증가 (재사용된 슬롯의 인덱스 항목 구분)
+        self._free_slots: List[int] = []
+
+        # 만료 인덱스: 개별 만료 시각이 없는 문맥은 저장 시각, 있는 문맥은 만료 시각 기준
+        # 항목 토큰은 (슬롯, 세대, 만료 시각 컬럼 값)이며 슬롯이 재사용되거나 만료 시각이 바뀌면 무효
+        self._age_index = ExpiryIndex(self._is_live, min_compact)
+        self._deadline_index = ExpiryIndex(self._is_live, min_compact)
+        # 저장 시각 순 정렬 목록 [(시각, 슬롯, 세대)] - 삭제는 지연 처리
+        self._by_time: List[Tuple[int, int, int]] = []
+        self._time_stale = 0
+        self._min_compact = min_compact
+
+        # {세션 문자열 ID: {상품 문자열 ID: 슬롯}}
+        self._index: Dict[int, Dict[int, int]] = {}
+        # 역방향 인덱스: {상품 문자열 ID: {세션 문자열 ID}}, {에이전트 문자열 ID: {세션 문자열 ID: 문맥 수}}
+        self._product_sessions: Dict[int, set] = {}
+        self._agent_sessions: Dict[int, Dict[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._session_col) - len(self._free_slots)
+
+    def _allocate(self) -> int:
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._generation_col[slot] += 1
+            return slot
+        for column in (self._session_col, self._product_col, self._info_product_col, self._description_col,
+                       self._extras_col, self._source_col, self._agent_col):
+            column.append(NO_STRING)
+        self._price_col.append(0.0)
+        self._timestamp_col.append(0)
+        self._expires_col.append(0)
+        self._generation_col.append(0)
+        return len(self._session_col) - 1
+
+    def _is_live(self, session_key: int, product_key: int, token: Tuple[int, int, int]) -> bool:
+        """만료 인덱스 항목이 아직 같은 슬롯 세대와 만료 시각을 가리키는지 확인"""
+        slot, generation, expires = token
+        return (self._session_col[slot] != NO_STRING and self._generation_col[slot] == generation
+                and self._expires_col[slot] == expires)
+
+    def _index_expiry(self, slot: int):
+        """슬롯을 만료 인덱스에 등록"""
+        expires = self._expires_col[slot]
+        index = self._deadline_index if expires else self._age_index
+        index.push(expires or self._timestamp_col[slot], self._session_col[slot], self._product_col[slot],
+                   (slot, self._generation_col[slot], expires))
+
+    def _index_time(self, slot: int):
+        """슬롯을 저장 시각 순 인덱스에 등록 (저장 시각은 대부분 단조 증가하므로 끝에 추가되는 경우가 대부분)"""
+        entry = (self._timestamp_col[slot], slot, self._generation_col[slot])
+        if not self._by_time or self._by_time[-1] <= entry:
+            self._by_time.append(entry)
+        else:
+            insort(self._by_time, entry)
+
+    def _mark_stale(self, slot: int):
+        """덮어쓰기/삭제로 해제된 슬롯의 만료 인덱스와 시각 인덱스 항목을 무효로 기록"""
+        (self._deadline_index if self._expires_col[slot] else self._age_index).mark_stale()
+        self._mark_time_stale()
+
+    def _mark_time_stale(self):
+        """시각 인덱스 항목 하나가 무효가 되었음을 기록 (필요 시 재구성)"""
+        self._time_stale += 1
+        if self._time_stale >= self._min_compact and self._time_stale * 2 > len(self._by_time):
+            self._by_time = [entry for entry in self._by_time
+                             if self._session_col[entry[1]] != NO_STRING and self._generation_col[entry[1]] == entry[2]]
+            self._time_stale = 0
+
+    def _index_agent(self, agent_key: int, session_key: int, delta: int):
+        if agent_key == NO_STRING:
+            return
+        sessions = self._agent_sessions.setdefault(agent_key, {})
+        remaining = sessions.get(session_key, 0) + delta
+        if remaining > 0:
+            sessions[session_key] = remaining
+        else:
+            sessions.pop(session_key, None)
+            if not sessions:
+                del self._agent_sessions[agent_key]
+
+    def _unindex(self, session_key: int, product_key: int, slot: int):
+        """삭제되는 슬롯을 역방향 인덱스에서 제거"""
+        sessions = self._product_sessions[product_key]
+        sessions.discard(session_key)
+        if not sessions:
+            del self._product_sessions[product_key]
+        self._index_agent(self._agent_col[slot], session_key, -1)
+
+    def _release_slot(self, slot: int):
+        """슬롯이 참조하는 문자열을 해제하고 슬롯을 재사용 목록에 추가"""
+        self.sessions.release(self._session_col[slot])
+        self.products.release(self._product_col[slot])
+        self.products.release(self._info_product_col[slot])
+        self.texts.release(self._description_col[slot])
+        self.texts.release(self._source_col[slot])
+        self.texts.release(self._agent_col[slot])
+        if self.extras.release(self._extras_col[slot]):
+            self._decoded_extras.pop(self._extras_col[slot], None)
+        self._session_col[slot] = NO_STRING
+        self._free_slots.append(slot)
+
+    @staticmethod
+    def _encode_extras(product_info: ProductInfo) -> Optional[str]:
+        if not product_info.attributes and not product_info.metadata:
+            return None
+        return json.dumps([product_info.attributes, product_info.metadata], ensure_ascii=False,
+                          sort_keys=True, separators=(",", ":"), default=str)
+
+    def store(self, record: ContextRecord):
+        """레코드 저장"""
+        self.put(record.session_id, record.product_id, record.timestamp, record.product_info,
+                 record.source_url, record.agent_id, record.expires_at)
+
+    def put(self, session_id: str, product_id: str, timestamp: datetime, product_info: ProductInfo,
+            source_url: Optional[str] = None, agent_id: Optional[str] = None,
+            expires_at: Optional[datetime] = None):
+        """문맥 저장 (같은 키가 있으면 덮어씀)"""
+        session_key = self.sessions.intern(session_id)
+        product_key = self.products.intern(product_id)
+        session = self._index.setdefault(session_key, {})
+        previous = session.get(product_key)
+
+        slot = self._allocate()
+        self._session_col[slot] = session_key
+        self._product_col[slot] = product_key
+        self._info_product_col[slot] = self.products.intern(product_info.product_id)
+        self._price_col[slot] = product_info.price
+        self._description_col[slot] = self.texts.intern(product_info.description)
+        self._extras_col[slot] = self.extras.intern(self._encode_extras(product_info))
+        self._timestamp_col[slot] = _to_micros(timestamp)
+        self._expires_col[slot] = _to_micros(expires_at) if expires_at is not None else 0
+        self._source_col[slot] = self.texts.intern(source_url)
+        self._agent_col[slot] = self.texts.intern(agent_id)
+        session[product_key] = slot
+        self._index_expiry(slot)
+        self._index_time(slot)
+
+        self._index_agent(self._agent_col[slot], session_key, 1)
+        if previous is not None:
+            self._index_agent(self._agent_col[previous], session_key, -1)
+            self._release_slot(previous)
+            self._mark_stale(previous)
+        else:
+            self._product_sessions.setdefault(product_key, set()).add(session_key)
+
+    def _slot_of(self, session_id: str, product_id: str) -> Optional[int]:
+        session = self._index.get(self.sessions.lookup(session_id))
+        if session is None:
+            return None
+        return session.get(self.products.lookup(product_id))
+
+    def materialize(self, slot: int) -> ContextRecord:
+        """슬롯의 컬럼 값으로 ContextRecord 생성"""
+        extras_id = self._extras_col[slot]
+        if extras_id == NO_STRING:
+            attributes, metadata = {}, {}
+        else:
+            decoded = self._decoded_extras.get(extras_id)
+            if decoded is None:
+                decoded = self._decoded_extras[extras_id] = tuple(json.loads(self.extras.get(extras_id)))
+            attributes, metadata = decoded
+        expires = self._expires_col[slot]
+        return ContextRecord.construct(
+            session_id=self.sessions.get(self._session_col[slot]),
+            product_id=self.products.get(self._product_col[slot]),
+            timestamp=_from_micros(self._timestamp_col[slot]),
+            product_info=ProductInfo.construct(
+                product_id=self.products.get(self._info_product_col[slot]),
+                price=self._price_col[slot],
+                description=self.texts.get(self._description_col[slot]),
+                attributes=attributes,
+                metadata=metadata
+            ),
+            source_url=self.texts.get(self._source_col[slot]),
+            agent_id=self.texts.get(self._agent_col[slot]),
+            expires_at=_from_micros(expires) if expires else None
+        )
+
+    def get(self, session_id: str, product_id: str) -> Optional[ContextRecord]:
+        """문맥 조회"""
+        slot = self._slot_of(session_id, product_id)
+        return self.materialize(slot) if slot is not None else None
+
+    def store_many(self, records: Iterable[ContextRecord]):
+        """여러 레코드 저장"""
+        for record in records:
+            self.store(record)
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], ContextRecord]:
+        """여러 (session_id, product_id) 문맥 조회 (없는 키는 제외)"""
+        found = {}
+        for session_id, product_id in pairs:
+            slot = self._slot_of(session_id, product_id)
+            if slot is not None:
+                found[(session_id, product_id)] = self.materialize(slot)
+        return found
+
+    def set_expiry_many(self, session_id: str, product_ids: List[str], expires_at: Optional[datetime]) -> int:
+        """세션의 여러 문맥의 개별 만료 시각 변경 (변경된 문맥 수 반환)"""
+        return sum(1 for product_id in product_ids if self.set_expiry(session_id, product_id, expires_at))
+
+    def get_session(self, session_id: str) -> List[ContextRecord]:
+        """세션의 모든 문맥 조회"""
+        session = self._index.get(self.sessions.lookup(session_id), {})
+        return [self.materialize(slot) for slot in session.values()]
+
+    def session_ids(self) -> List[str]:
+        """저장된 모든 세션 ID"""
+        return [self.sessions.get(session_key) for session_key in self._index]
+
+    def sessions_for_product(self, product_id: str) -> List[str]:
+        """상품 문맥을 가진 세션 ID"""
+        sessions = self._product_sessions.get(self.products.lookup(product_id), ())
+        return [self.sessions.get(session_key) for session_key in sessions]
+
+    def sessions_for_agent(self, agent_id: str) -> List[str]:
+        """에이전트가 문맥을 저장한 세션 ID"""
+        sessions = self._agent_sessions.get(self.texts.lookup(agent_id), ())
+        return [self.sessions.get(session_key) for session_key in sessions]
+
+    def in_range(self, start: datetime, end: datetime, limit: Optional[int] = None) -> List[ContextRecord]:
+        """저장 시각이 [start, end) 구간인 문맥을 시각 순으로 조회 (시각 인덱스에서 구간 시작 위치를 이진 탐색)"""
+        entries = self._by_time
+        end_micros = _to_micros(end)
+        index = bisect_left(entries, (_to_micros(start),))
+        records = []
+        while index < len(entries) and entries[index][0] < end_micros and (limit is None or len(records) < limit):
+            _, slot, generation = entries[index]
+            if self._session_col[slot] != NO_STRING and self._generation_col[slot] == generation:
+                records.append(self.materialize(slot))
+            index += 1
+        return records
+
+    def set_expiry(self, session_id: str, product_id: str, expires_at: Optional[datetime]) -> bool:
+        """문맥의 개별 만료 시각 변경 (존재하지 않으면 False)"""
+        slot = self._slot_of(session_id, product_id)
+        if slot is None:
+            return False
+        expires = _to_micros(expires_at) if expires_at is not None else 0
+        if expires != self._expires_col[slot]:
+            (self._deadline_index if self._expires_col[slot] else self._age_index).mark_stale()
+            self._expires_col[slot] = expires
+            self._index_expiry(slot)
+        return True
+
+    def delete(self, session_id: str, product_id: str) -> bool:
+        """문맥 삭제 (존재하지 않으면 False)"""
+        session_key = self.sessions.lookup(session_id)
+        session = self._index.get(session_key)
+        if session is None:
+            return False
+        product_key = self.products.lookup(product_id)
+        slot = session.pop(product_key, None)
+        if slot is None:
+            return False
+        if not session:
+            del self._index[session_key]
+        self._unindex(session_key, product_key, slot)
+        self._release_slot(slot)
+        self._mark_stale(slot)
+        return True
+
+    def cleanup(self, cutoff: datetime, now: Optional[datetime] = None, limit: Optional[int] = None) -> int:
+        """
+        만료된 문맥 삭제
+        만료 인덱스에서 만료된 슬롯만 꺼내므로 비용이 전체 슬롯 수가 아닌 만료된 문맥 수에 비례
+        """
+        expired = self._age_index.pop_expired(_to_micros(cutoff), limit)
+        remaining = None if limit is None else limit - len(expired)
+        expired += self._deadline_index.pop_expired(_to_micros(now or datetime.now()), remaining)
+
+        for session_key, product_key, (slot, _, _) in expired:
+            session = self._index[session_key]
+            del session[product_key]
+            if not session:
+                del self._index[session_key]
+            self._unindex(session_key, product_key, slot)
+            self._release_slot(slot)
+            # 만료 인덱스에서는 이미 꺼냈으므로 시각 인덱스만 무효 처리
+            self._mark_time_stale()
+        return len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """저장소 통계"""
+        return {
+            "contexts": len(self),
+            "slots": len(self._session_col),
+            "free_slots": len(self._free_slots),
+            "sessions": len(self._index),
+            "products": len(self.products),
+            "strings": len(self.texts),
+            "extras": len(self.extras),
+            "time_entries": len(self._by_time),
+            "stale_time_entries": self._time_stale
+        }
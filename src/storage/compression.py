@@ -0,0 +1,125 @@
+from typing import Any, Dict, Iterable, List, Union
+from collections import Counter
+import time
+import zlib
+
+# 원시 deflate 스트림 (zlib 헤더/체크섬 6바이트 생략 - 짧은 설명에서는 무시할 수 없는 크기)
+_WBITS = -15
+
+
+def train_dictionary(samples: Iterable[str], max_bytes: int = 4096, max_ngram: int = 6) -> bytes:
+    """
+    카탈로그 설명에서 공유 사전 생성
+    zlib에는 사전 학습기가 없으므로, 여러 번 등장하는 단어 n-gram을 (등장 횟수 - 1) x 길이 순으로 골라 이어붙임.
+    deflate는 가까운 위치를 더 짧게 참조하므로 가장 유용한 구절을 사전 끝에 배치.
+
+    Args:
+        samples: 학습용 설명 문자열
+        max_bytes: 사전 최대 크기 (클수록 압축 시 사전 적재 비용 증가)
+        max_ngram: 후보 구절의 최대 단어 수
+    """
+    counts: Counter = Counter()
+    for text in samples:
+        words = text.split()
+        for size in range(1, max_ngram + 1):
+            for start in range(len(words) - size + 1):
+                counts[" ".join(words[start:start + size])] += 1
+
+    scored = sorted(((count - 1) * len(phrase.encode("utf-8")), phrase)
+                    for phrase, count in counts.items() if count > 1)
+    chosen: List[bytes] = []
+    used = 0
+    for _, phrase in reversed(scored):
+        encoded = phrase.encode("utf-8") + b" "
+        if used + len(encoded) > max_bytes:
+            continue
+        # 이미 고른 더 유용한 구절에 포함되는 구절은 제외
+        if any(encoded.strip() in existing for existing in chosen):
+            continue
+        chosen.append(encoded)
+        used += len(encoded)
+    return b"".join(reversed(chosen))
+
+
+class DescriptionCompressor:
+    """
+    공유 사전 기반 설명 압축기
+    설명마다 독립적으로 압축하되 카탈로그 공통 구절을 사전으로 참조하여 짧은 문자열도 줄일 수 있게 함.
+    압축해도 줄지 않는 설명은 문자열 그대로 보관.
+    """
+
+    def __init__(self, dictionary: bytes = b"", level: int = 9):
+        """
+        Args:
+            dictionary: 공유 사전 (train_dictionary로 생성, 빈 값이면 사전 없이 압축)
+            level: zlib 압축 수준
+        """
+        self.dictionary = dictionary
+        self.level = level
+        self.stats: Dict[str, Any] = {"compressed": 0, "stored_raw": 0, "raw_bytes": 0, "stored_bytes": 0,
+                                      "decompressions": 0, "decompress_seconds": 0.0}
+
+    @classmethod
+    def train(cls, samples: Iterable[str], max_bytes: int = 4096, level: int = 9) -> "DescriptionCompressor":
+        """카탈로그 설명으로 사전을 학습한 압축기 생성"""
+        return cls(train_dictionary(samples, max_bytes), level)
+
+    def compress(self, text: str) -> Union[str, bytes]:
+        """설명 압축 (압축 결과가 더 크면 원래 문자열 반환)"""
+        raw = text.encode("utf-8")
+        if self.dictionary:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS)
+        blob = compressor.compress(raw) + compressor.flush()
+        self.stats["raw_bytes"] += len(raw)
+        if len(blob) >= len(raw):
+            self.stats["stored_raw"] += 1
+            self.stats["stored_bytes"] += len(raw)
+            return text
+        self.stats["compressed"] += 1
+        self.stats["stored_bytes"] += len(blob)
+        return blob
+
+    def decompress(self, stored: Union[str, bytes]) -> str:
+        """압축된 설명 복원 (문자열로 보관된 설명은 그대로 반환)"""
+        if isinstance(stored, str):
+            return stored
+        started = time.perf_counter()
+        if self.dictionary:
+            decompressor = zlib.decompressobj(_WBITS, zdict=self.dictionary)
+        else:
+            decompressor = zlib.decompressobj(_WBITS)
+        text = (decompressor.decompress(stored) + decompressor.flush()).decode("utf-8")
+        self.stats["decompressions"] += 1
+        self.stats["decompress_seconds"] += time.perf_counter() - started
+        return text
+
+    def get_stats(self) -> Dict[str, Any]:
+        """압축률 및 복원 지연 통계 (누적 기준, 해제된 스냅샷 포함)"""
+        decompressions = self.stats["decompressions"]
+        return {
+            **self.stats,
+            "dictionary_bytes": len(self.dictionary),
+            "ratio": self.stats["raw_bytes"] / self.stats["stored_bytes"] if self.stats["stored_bytes"] else 1.0,
+            "avg_decompress_us": (self.stats["decompress_seconds"] / decompressions * 1e6) if decompressions else 0.0
+        }
+
+
+class CompressedProduct:
+    """설명을 압축해 보관하는 상품 스냅샷 (조회 시 ProductInfo로 복원)"""
+    __slots__ = ("product_id", "price", "description", "attributes", "metadata")
+
+    def __init__(self, product_id: str, price: float, description: Union[str, bytes],
+                 attributes: Dict[str, Any], metadata: Dict[str, Any]):
+        self.product_id = product_id
+        self.price = price
+        self.description = description
+        self.attributes = attributes
+        self.metadata = metadata
+
+    def stored_description_bytes(self) -> int:
+        """보관 중인 설명 크기"""
+        if isinstance(self.description, bytes):
+            return len(self.description)
+        return len(self.description.encode("utf-8"))
@@ -0,0 +1,393 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import threading
+from loguru import logger
+from src.models.data_models import ProductInfo, ContextRecord
+from src.storage.context_storage import ContextStorage
+
+
+def stripe_of(session_id: str, stripes: int) -> int:
+    """
+    세션 ID의 잠금 구간 번호
+    프로세스 재시작 후에도 같은 값이 나와야 하므로 내장 hash 대신 blake2b 사용
+    (CRC32는 선형이라 "t0_s5"/"t1_s5"처럼 한 글자만 다른 ID들이 같은 구간에 몰림)
+    """
+    return int.from_bytes(hashlib.blake2b(session_id.encode("utf-8"), digest_size=8).digest(), "big") % stripes
+
+
+class ConcurrentContextStorage:
+    """
+    잠금 분할(lock striping) 문맥 저장소
+    세션 해시로 나눈 구간마다 독립된 ContextStorage와 잠금을 두어, 서로 다른 구간의 세션은 잠금을 공유하지 않음.
+    Flask 스레드와 asyncio 탐지기가 함께 사용해도 확인 후 변경(check-then-act) 경쟁이 생기지 않으며,
+    만료 정리는 구간 단위로 잠그므로 정리 중에도 다른 구간의 조회/저장이 진행됨.
+
+    구간마다 스냅샷 풀/메모리 예산/선행 기록이 따로 있으므로, 같은 상품 상태라도 구간이 다르면 스냅샷이 따로 저장되고
+    전체 메모리 한도는 구간 수로 나누어 적용됨.
+    """
+
+    def __init__(self, storage_type: str = "memory", stripes: int = 16, max_memory_bytes: Optional[int] = None,
+                 journal_dir: Optional[str] = None, **storage_kwargs):
+        """
+        Args:
+            storage_type: 저장소 타입 (memory, columnar, sqlite, shared)
+            stripes: 잠금 구간 수 (sqlite/shared는 자체 잠금이 있는 단일 저장소이므로 1로 고정)
+            max_memory_bytes: 전체 메모리 한도 (구간별로 균등 분할)
+            journal_dir: 선행 기록 디렉터리 (구간별 하위 디렉터리 사용)
+            storage_kwargs: 구간별 ContextStorage에 그대로 전달할 인자
+        """
+        if storage_type in ("sqlite", "shared") and stripes != 1:
+            logger.info(f"{storage_type} 저장소는 단일 저장소를 사용하므로 잠금 구간 수를 1로 설정")
+            stripes = 1
+        self.storage_type = storage_type
+        self.stripe_count = stripes
+        self.max_memory_bytes = max_memory_bytes
+        stripe_bytes = -(-max_memory_bytes // stripes) if max_memory_bytes is not None else None
+        self._stripes: List[ContextStorage] = [
+            ContextStorage(
+                storage_type=storage_type,
+                max_memory_bytes=stripe_bytes,
+                journal_dir=os.path.join(journal_dir, f"stripe-{index:02d}") if journal_dir is not None else None,
+                **storage_kwargs
+            )
+            for index in range(stripes)
+        ]
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        # 구간별 잠금 경합 횟수 (잠금을 잡은 상태에서만 갱신)
+        self._contended = [0] * stripes
+        self._sweeper_task: Optional[asyncio.Task] = None
+        logger.info(f"잠금 분할 문맥 저장소 초기화 완료 (타입: {storage_type}, 구간: {stripes}개)")
+
+    def stripe_index(self, session_id: str) -> int:
+        """세션이 속한 잠금 구간 번호"""
+        return stripe_of(session_id, self.stripe_count)
+
+    def _acquire(self, index: int):
+        lock = self._locks[index]
+        if not lock.acquire(blocking=False):
+            lock.acquire()
+            self._contended[index] += 1
+
+    def try_call(self, session_id: str, method: str, *args, **kwargs) -> Tuple[bool, Any]:
+        """
+        잠금이 비어 있을 때만 세션 구간의 메서드 호출 (대기하지 않음)
+
+        Returns:
+            (호출 여부, 반환값)
+        """
+        index = self.stripe_index(session_id)
+        lock = self._locks[index]
+        if not lock.acquire(blocking=False):
+            return False, None
+        try:
+            return True, getattr(self._stripes[index], method)(*args, **kwargs)
+        finally:
+            lock.release()
+
+    def _call(self, session_id: str, method: str, *args, **kwargs):
+        index = self.stripe_index(session_id)
+        self._acquire(index)
+        try:
+            return getattr(self._stripes[index], method)(*args, **kwargs)
+        finally:
+            self._locks[index].release()
+
+    def _each_stripe(self, fn: Callable[[ContextStorage], Any]) -> List[Any]:
+        """구간을 하나씩 잠그고 fn 호출 (한 번에 하나의 구간만 잠금)"""
+        results = []
+        for index, stripe in enumerate(self._stripes):
+            self._acquire(index)
+            try:
+                results.append(fn(stripe))
+            finally:
+                self._locks[index].release()
+        return results
+
+    def _group(self, items: Iterable, session_of: Callable[[Any], str]) -> Dict[int, list]:
+        groups: Dict[int, list] = {}
+        for item in items:
+            groups.setdefault(self.stripe_index(session_of(item)), []).append(item)
+        return groups
+
+    def store_context(self, session_id: str, product_id: str, product_info: ProductInfo,
+                      source_url: Optional[str] = None, agent_id: Optional[str] = None,
+                      ttl_hours: Optional[float] = None) -> bool:
+        """상품 정보 문맥 저장"""
+        return self._call(session_id, "store_context", session_id, product_id, product_info,
+                          source_url, agent_id, ttl_hours)
+
+    def get_context(self, session_id: str, product_id: str) -> Optional[ContextRecord]:
+        """저장된 상품 정보 문맥 조회"""
+        return self._call(session_id, "get_context", session_id, product_id)
+
+    def get_all_contexts_for_session(self, session_id: str) -> List[ContextRecord]:
+        """세션의 모든 상품 정보 문맥 조회"""
+        return self._call(session_id, "get_all_contexts_for_session", session_id)
+
+    def restore_context(self, record: ContextRecord) -> bool:
+        """타임스탬프를 유지한 채 문맥 레코드 저장"""
+        return self._call(record.session_id, "restore_context", record)
+
+    def delete_context(self, session_id: str, product_id: str) -> bool:
+        """문맥 삭제"""
+        return self._call(session_id, "delete_context", session_id, product_id)
+
+    def set_context_ttl(self, session_id: str, product_id: str, ttl_hours: float) -> bool:
+        """문맥의 개별 만료 시각 설정"""
+        return self._call(session_id, "set_context_ttl", session_id, product_id, ttl_hours)
+
+    def get_contexts(self, session_id: str, product_ids: Iterable[str]) -> Dict[str, ContextRecord]:
+        """세션의 여러 상품 문맥을 한 번에 조회"""
+        return self._call(session_id, "get_contexts", session_id, list(product_ids))
+
+    def set_contexts_ttl(self, session_id: str, product_ids: Iterable[str], ttl_hours: float) -> int:
+        """세션의 여러 문맥의 개별 만료 시각을 한 번에 설정"""
+        return self._call(session_id, "set_contexts_ttl", session_id, list(product_ids), ttl_hours)
+
+    def get_context_history(self, session_id: str, product_id: str) -> List[ContextRecord]:
+        """문맥의 모든 버전을 오래된 순으로 조회"""
+        return self._call(session_id, "get_context_history", session_id, product_id)
+
+    def get_first_seen_context(self, session_id: str, product_id: str) -> Optional[ContextRecord]:
+        """에이전트가 처음 본 버전의 문맥 조회"""
+        return self._call(session_id, "get_first_seen_context", session_id, product_id)
+
+    def get_context_at(self, session_id: str, product_id: str, at: datetime) -> Optional[ContextRecord]:
+        """시각 at에 에이전트가 보고 있던 버전의 문맥 조회"""
+        return self._call(session_id, "get_context_at", session_id, product_id, at)
+
+    def get_miss_reason(self, session_id: str, product_id: str) -> Optional[str]:
+        """문맥 조회 실패 원인"""
+        return self._call(session_id, "get_miss_reason", session_id, product_id)
+
+    def store_contexts(self, records: Iterable[ContextRecord], only_new: bool = False) -> int:
+        """여러 문맥 레코드를 구간별로 묶어 저장 (구간마다 잠금 한 번, only_new면 기존 문맥은 건너뜀)"""
+        stored = 0
+        for index, group in self._group(records, lambda record: record.session_id).items():
+            self._acquire(index)
+            try:
+                stored += self._stripes[index].store_contexts(group, only_new)
+            finally:
+                self._locks[index].release()
+        return stored
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], ContextRecord]:
+        """여러 세션에 걸친 문맥을 구간별로 묶어 조회"""
+        found = {}
+        for index, group in self._group(pairs, lambda pair: pair[0]).items():
+            self._acquire(index)
+            try:
+                found.update(self._stripes[index].get_many(group))
+            finally:
+                self._locks[index].release()
+        return found
+
+    def get_session_ids(self) -> List[str]:
+        """저장된 모든 세션 ID 조회"""
+        return list(itertools.chain.from_iterable(self._each_stripe(lambda stripe: stripe.get_session_ids())))
+
+    def get_sessions_for_product(self, product_id: str) -> List[str]:
+        """상품 문맥을 가진 세션 ID 조회"""
+        return list(itertools.chain.from_iterable(
+            self._each_stripe(lambda stripe: stripe.get_sessions_for_product(product_id))))
+
+    def get_sessions_for_agent(self, agent_id: str) -> List[str]:
+        """에이전트가 문맥을 저장한 세션 ID 조회"""
+        return list(itertools.chain.from_iterable(
+            self._each_stripe(lambda stripe: stripe.get_sessions_for_agent(agent_id))))
+
+    def get_contexts_in_range(self, start: datetime, end: Optional[datetime] = None,
+                              limit: Optional[int] = None) -> List[ContextRecord]:
+        """저장 시각이 [start, end) 구간인 문맥을 시각 순으로 조회 (구간별 결과 병합)"""
+        per_stripe = self._each_stripe(lambda stripe: stripe.get_contexts_in_range(start, end, limit))
+        merged = heapq.merge(*per_stripe, key=lambda record: record.timestamp)
+        return list(itertools.islice(merged, limit))
+
+    def cleanup_old_contexts(self, max_age_hours: int = 24, max_records: Optional[int] = None) -> int:
+        """만료된 문맥 정리 (구간을 하나씩 잠그므로 정리 중에도 다른 구간은 사용 가능)"""
+        count = 0
+        for index, stripe in enumerate(self._stripes):
+            remaining = None if max_records is None else max_records - count
+            if remaining is not None and remaining <= 0:
+                break
+            self._acquire(index)
+            try:
+                count += stripe.cleanup_old_contexts(max_age_hours, max_records=remaining)
+            finally:
+                self._locks[index].release()
+        return count
+
+    def start_sweeper(self, interval_seconds: float = 60.0, max_per_run: int = 10000,
+                      max_age_hours: int = 24) -> asyncio.Task:
+        """
+        백그라운드 만료 정리 태스크 시작
+        정리는 기본 실행기 스레드에서 수행하여 구간 잠금을 기다리는 동안 이벤트 루프를 막지 않음
+        """
+        if self._sweeper_task is not None and not self._sweeper_task.done():
+            return self._sweeper_task
+
+        async def sweep_periodically():
+            loop = asyncio.get_running_loop()
+            try:
+                while True:
+                    count = await loop.run_in_executor(None, self.cleanup_old_contexts, max_age_hours, max_per_run)
+                    await asyncio.sleep(0 if count >= max_per_run else interval_seconds)
+            except asyncio.CancelledError:
+                logger.info("문맥 만료 정리 태스크 중단")
+
+        self._sweeper_task = asyncio.create_task(sweep_periodically())
+        logger.info(f"문맥 만료 정리 태스크 시작 (주기: {interval_seconds}초, 최대 {max_per_run}개/회)")
+        return self._sweeper_task
+
+    def stop_sweeper(self):
+        """백그라운드 만료 정리 태스크 중단"""
+        if self._sweeper_task is not None and not self._sweeper_task.get_loop().is_closed():
+            self._sweeper_task.cancel()
+        self._sweeper_task = None
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """구간별 메모리 사용량 및 축출 통계 합계"""
+        per_stripe = self._each_stripe(lambda stripe: stripe.get_memory_stats())
+        stats = {key: sum(stats[key] for stats in per_stripe)
+                 for key in ("evicted_global", "evicted_session", "evicted_active", "evicted_bytes",
+                             "evicted_misses", "used_bytes", "sessions")}
+        stats["max_bytes"] = self.max_memory_bytes
+        stats["max_session_bytes"] = per_stripe[0]["max_session_bytes"]
+        stats["largest_session_bytes"] = max(stats["largest_session_bytes"] for stats in per_stripe)
+        return stats
+
+    def get_snapshot_stats(self) -> Dict[str, Any]:
+        """구간별 스냅샷 공유 통계 합계"""
+        per_stripe = self._each_stripe(lambda stripe: stripe.get_snapshot_stats())
+        stats = {key: sum(stats[key] for stats in per_stripe)
+                 for key in ("interned", "deduplicated", "released", "snapshots", "references", "bytes")}
+        stats["dedup_ratio"] = stats["references"] / stats["snapshots"] if stats["snapshots"] else 0.0
+        return stats
+
+    def get_history_stats(self) -> Dict[str, Any]:
+        """구간별 버전 이력 통계 합계"""
+        per_stripe = self._each_stripe(lambda stripe: stripe.get_history_stats())
+        return {key: sum(stats[key] for stats in per_stripe) for key in ("chains", "versions", "delta_fields")}
+
+    def get_compression_stats(self) -> Dict[str, Any]:
+        """구간별 설명 압축 통계 합계 (구간마다 같은 사전을 쓰는 압축기를 가짐)"""
+        per_stripe = [stats for stats in self._each_stripe(lambda stripe: stripe.get_compression_stats()) if stats]
+        if not per_stripe:
+            return {}
+        stats = {key: sum(stats[key] for stats in per_stripe)
+                 for key in ("compressed", "stored_raw", "raw_bytes", "stored_bytes", "decompressions",
+                             "decompress_seconds", "cache_hits", "cache_misses")}
+        lookups = stats["cache_hits"] + stats["cache_misses"]
+        stats["dictionary_bytes"] = per_stripe[0]["dictionary_bytes"]
+        stats["ratio"] = stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 1.0
+        stats["avg_decompress_us"] = (stats["decompress_seconds"] / stats["decompressions"] * 1e6
+                                      if stats["decompressions"] else 0.0)
+        stats["cache_hit_ratio"] = stats["cache_hits"] / lookups if lookups else 0.0
+        return stats
+
+    def get_lock_stats(self) -> Dict[str, Any]:
+        """잠금 경합 통계"""
+        return {
+            "stripes": self.stripe_count,
+            "contended": sum(self._contended),
+            "max_stripe_contended": max(self._contended)
+        }
+
+    def compact_journal(self):
+        """구간별 선행 기록 압축"""
+        self._each_stripe(lambda stripe: stripe.compact_journal())
+
+    def flush(self):
+        """버퍼된 쓰기를 저장소에 반영"""
+        self._each_stripe(lambda stripe: stripe.flush())
+
+    def close(self):
+        """저장소 연결 종료"""
+        self.stop_sweeper()
+        self._each_stripe(lambda stripe: stripe.close())
+
+
+class AsyncContextStorage:
+    """
+    asyncio용 잠금 분할 문맥 저장소 래퍼
+    세션 구간 잠금이 비어 있으면 이벤트 루프에서 바로 처리하고(대부분의 경우), 다른 스레드가 잡고 있거나
+    여러 구간을 거치는 연산은 실행기 스레드에서 처리하여 이벤트 루프가 잠금 대기로 멈추지 않게 함
+    """
+
+    def __init__(self, storage: ConcurrentContextStorage, max_workers: int = 4):
+        """
+        Args:
+            storage: 공유할 잠금 분할 저장소 (동기 호출자와 같은 인스턴스)
+            max_workers: 잠금 대기/다중 구간 연산용 실행기 스레드 수
+        """
+        self.storage = storage
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="context-storage")
+        self.stats: Dict[str, int] = {"fast_path": 0, "offloaded": 0}
+
+    async def _offload(self, fn: Callable, *args):
+        self.stats["offloaded"] += 1
+        return await asyncio.get_running_loop().run_in_executor(self._executor, lambda: fn(*args))
+
+    async def _session_call(self, session_id: str, method: str, *args):
+        called, result = self.storage.try_call(session_id, method, *args)
+        if called:
+            self.stats["fast_path"] += 1
+            return result
+        return await self._offload(getattr(self.storage, method), *args)
+
+    async def store_context(self, session_id: str, product_id: str, product_info: ProductInfo,
+                            source_url: Optional[str] = None, agent_id: Optional[str] = None,
+                            ttl_hours: Optional[float] = None) -> bool:
+        """상품 정보 문맥 저장"""
+        return await self._session_call(session_id, "store_context", session_id, product_id, product_info,
+                                        source_url, agent_id, ttl_hours)
+
+    async def get_context(self, session_id: str, product_id: str) -> Optional[ContextRecord]:
+        """저장된 상품 정보 문맥 조회"""
+        return await self._session_call(session_id, "get_context", session_id, product_id)
+
+    async def get_all_contexts_for_session(self, session_id: str) -> List[ContextRecord]:
+        """세션의 모든 상품 정보 문맥 조회"""
+        return await self._session_call(session_id, "get_all_contexts_for_session", session_id)
+
+    async def delete_context(self, session_id: str, product_id: str) -> bool:
+        """문맥 삭제"""
+        return await self._session_call(session_id, "delete_context", session_id, product_id)
+
+    async def set_context_ttl(self, session_id: str, product_id: str, ttl_hours: float) -> bool:
+        """문맥의 개별 만료 시각 설정"""
+        return await self._session_call(session_id, "set_context_ttl", session_id, product_id, ttl_hours)
+
+    async def get_contexts(self, session_id: str, product_ids: Iterable[str]) -> Dict[str, ContextRecord]:
+        """세션의 여러 상품 문맥을 한 번에 조회"""
+        return await self._session_call(session_id, "get_contexts", session_id, list(product_ids))
+
+    async def set_contexts_ttl(self, session_id: str, product_ids: Iterable[str], ttl_hours: float) -> int:
+        """세션의 여러 문맥의 개별 만료 시각을 한 번에 설정"""
+        return await self._session_call(session_id, "set_contexts_ttl", session_id, list(product_ids), ttl_hours)
+
+    async def store_contexts(self, records: Iterable[ContextRecord], only_new: bool = False) -> int:
+        """여러 문맥 레코드 저장"""
+        return await self._offload(self.storage.store_contexts, list(records), only_new)
+
+    async def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], ContextRecord]:
+        """여러 세션에 걸친 문맥 조회"""
+        return await self._offload(self.storage.get_many, list(pairs))
+
+    async def get_sessions_for_product(self, product_id: str) -> List[str]:
+        """상품 문맥을 가진 세션 ID 조회"""
+        return await self._offload(self.storage.get_sessions_for_product, product_id)
+
+    async def cleanup_old_contexts(self, max_age_hours: int = 24, max_records: Optional[int] = None) -> int:
+        """만료된 문맥 정리"""
+        return await self._offload(self.storage.cleanup_old_contexts, max_age_hours, max_records)
+
+    def close(self):
+        """실행기 종료 (공유 저장소는 소유자가 닫음)"""
+        self._executor.shutdown(wait=True)
@@ -1,8 +1,59 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
+import asyncio
 import json
+import pickle
+import time
 from loguru import logger
 from src.models.data_models import ProductInfo, ContextRecord
+from src.simulation.clock import Clock
+from src.storage.sqlite_backend import SQLiteContextBackend
+from src.storage.columnar_store import ColumnarContextStore
+from src.storage.shared_memory_store import SharedMemoryContextStore
+from src.storage.interning import SnapshotPool, InternedContext
+from src.storage.expiry_index import ExpiryIndex
+from src.storage.memory_budget import MemoryBudget, RECORD_OVERHEAD_BYTES
+from src.storage.reverse_index import ContextReverseIndex
+from src.storage.version_history import VersionChain, product_delta
+from src.storage.compression import DescriptionCompressor
+from src.storage.journal import ContextJournal, OP_STORE, OP_DELETE, OP_TTL, OP_PAYLOAD, OP_RECORD, OP_HISTORY
+
+
+def _product_tuple(product_info: ProductInfo) -> tuple:
+    """로그 기록용 상품 정보 튜플"""
+    return (product_info.product_id, product_info.price, product_info.description,
+            product_info.attributes, product_info.metadata)
+
+
+def _product_from_tuple(product: tuple) -> ProductInfo:
+    product_id, price, description, attributes, metadata = product
+    return ProductInfo.construct(product_id=product_id, price=price, description=description,
+                                 attributes=attributes, metadata=metadata)
+
+
+def _from_epoch(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+_RECORD_FIELDS = frozenset(ContextRecord.__fields__)
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+
+
+def _context_record(session_id: str, product_id: str, timestamp: datetime, product_info: ProductInfo,
+                    source_url: Optional[str], agent_id: Optional[str], snapshot_hash: Optional[str],
+                    expires_at: Optional[datetime]) -> ContextRecord:
+    """
+    모든 필드를 채운 ContextRecord를 검증 없이 생성 (조회 경로용)
+    ContextRecord.construct와 같은 결과지만 기본값 처리와 키워드 인자 변환을 생략해 몇 배 빠름
+    """
+    record = _new_object(ContextRecord)
+    _set_attribute(record, "__dict__", {
+        "session_id": session_id, "product_id": product_id, "timestamp": timestamp, "product_info": product_info,
+        "source_url": source_url, "agent_id": agent_id, "snapshot_hash": snapshot_hash, "expires_at": expires_at
+    })
+    _set_attribute(record, "__fields_set__", set(_RECORD_FIELDS))
+    return record
 
 class ContextStorage:
     """
@@ -10,33 +61,335 @@ class ContextStorage:
     에이전트가 처음 획득한 상품 정보의 스냅샷을 저장
     """
     
-    def __init__(self, storage_type: str = "memory"):
+    def __init__(self, storage_type: str = "memory", sqlite_path: str = "context_storage.db",
+                 sqlite_batch_size: int = 256, max_memory_bytes: Optional[int] = None,
+                 max_session_bytes: Optional[int] = None, journal_dir: Optional[str] = None,
+                 journal_fsync_interval: float = 0.05, journal_compact_bytes: int = 64 << 20,
+                 max_versions: int = 64, compress_descriptions: bool = False,
+                 description_dictionary: bytes = b"", description_cache_size: int = 1024,
+                 shared_memory_path: Optional[str] = None, shared_memory_slots: int = 1 << 17,
+                 shared_memory_bytes: int = 64 << 20, clock: Optional[Clock] = None):
         """
         Args:
-            storage_type: 저장소 타입 (memory, mongodb 등)
+            storage_type: 저장소 타입 (memory, columnar, sqlite, shared)
+            sqlite_path: sqlite 저장소의 데이터베이스 파일 경로
+            sqlite_batch_size: sqlite 저장소에서 한 트랜잭션으로 묶을 최대 쓰기 수
+            max_memory_bytes: 메모리 저장소 전체 한도 (초과 시 LRU 축출, None이면 무제한)
+            max_session_bytes: 메모리 저장소 세션별 한도 (초과 시 해당 세션에서 LRU 축출)
+            journal_dir: 메모리 저장소 선행 기록/스냅샷 디렉터리 (지정 시 시작할 때 이전 상태 복구)
+            journal_fsync_interval: 선행 기록을 묶어서 디스크에 반영하는 최대 지연 (초)
+            journal_compact_bytes: 선행 기록이 이 크기를 넘으면 스냅샷으로 압축
+            max_versions: (세션, 상품)별로 보관할 최대 버전 수 (첫 버전과 최신 버전은 항상 보존)
+            compress_descriptions: 메모리 저장소 스냅샷의 설명을 압축해 보관 (메모리 제약 환경용, 조회 시 복원 비용 발생)
+            description_dictionary: 설명 압축용 공유 사전 (train_dictionary로 카탈로그 설명에서 생성)
+            description_cache_size: 복원한 스냅샷을 보관할 캐시 크기
+            shared_memory_path: shared 저장소의 공유 파일 경로 (같은 경로를 연 프로세스끼리 저장소 공유)
+            shared_memory_slots: shared 저장소를 새로 만들 때의 해시 테이블 슬롯 수
+            shared_memory_bytes: shared 저장소를 새로 만들 때의 레코드 영역 크기
+            clock: 저장 시각과 만료 시각 계산용 시계 (가상 시계 사용 시 시뮬레이션 시간 기준)
         """
         self.storage_type = storage_type
-        self.memory_storage: Dict[str, Dict[str, ContextRecord]] = {}  # {session_id: {product_id: record}}
+        self.clock = clock or Clock()
+        self.memory_storage: Dict[str, Dict[str, InternedContext]] = {}  # {session_id: {product_id: record}}
+        # 동일한 상품 상태는 하나의 스냅샷으로 공유
+        self.snapshot_pool = SnapshotPool(
+            DescriptionCompressor(description_dictionary) if compress_descriptions else None,
+            cache_size=description_cache_size
+        )
+        # 만료 인덱스: 기본 보관 기간 레코드는 저장 시각 순, 개별 만료 시각이 있는 레코드는 만료 시각 순
+        self._age_index = ExpiryIndex(self._is_live)
+        self._deadline_index = ExpiryIndex(self._is_live)
+        # 상품/에이전트 → 세션, 저장 시각 순 보조 인덱스
+        self.reverse_index = ContextReverseIndex(self._is_stored_at)
+        # 다시 조회된 문맥의 버전 이력 {(session_id, product_id): 첫 스냅샷 + 필드 차이}
+        self.max_versions = max_versions
+        self._history: Dict[Tuple[str, str], VersionChain] = {}
+        self._sweeper_task: Optional[asyncio.Task] = None
+        self.memory_budget = MemoryBudget(max_memory_bytes, max_session_bytes)
+        self.sqlite_backend: Optional[SQLiteContextBackend] = None
+        self.columnar_store: Optional[ColumnarContextStore] = None
+        self.shared_store: Optional[SharedMemoryContextStore] = None
+        if storage_type == "sqlite":
+            self.sqlite_backend = SQLiteContextBackend(sqlite_path, batch_size=sqlite_batch_size)
+        elif storage_type == "columnar":
+            self.columnar_store = ColumnarContextStore()
+        elif storage_type == "shared":
+            self.shared_store = SharedMemoryContextStore(shared_memory_path, slots=shared_memory_slots,
+                                                         arena_bytes=shared_memory_bytes)
+        # memory 이외 저장소는 같은 인터페이스(put/get/get_session/session_ids/set_expiry/delete/cleanup,
+        # sessions_for_product/sessions_for_agent/in_range)를 제공
+        self.backend = next((backend for backend in (self.sqlite_backend, self.columnar_store, self.shared_store)
+                             if backend is not None), None)
+        
+        self.journal: Optional[ContextJournal] = None
+        if journal_dir is not None:
+            if storage_type == "memory":
+                journal = ContextJournal(journal_dir, fsync_interval=journal_fsync_interval,
+                                         compact_bytes=journal_compact_bytes)
+                self._recover_from_journal(journal)
+                self.journal = journal
+            else:
+                logger.warning(f"선행 기록은 memory 저장소에서만 지원됨 (타입: {storage_type})")
         logger.info(f"문맥 저장소 초기화 완료 (타입: {storage_type})")
         
+    def _recover_from_journal(self, journal: ContextJournal):
+        """스냅샷과 선행 기록을 재생하여 메모리 상태 복구 (스냅샷 해시를 재계산하지 않음)"""
+        started = time.perf_counter()
+        pending_payloads: Dict[str, tuple] = {}
+        
+        def adopt(key, product=None):
+            if key not in self.snapshot_pool:
+                product = product if product is not None else pending_payloads.pop(key)
+                return self.snapshot_pool.adopt(key, _product_from_tuple(product),
+                                                len(pickle.dumps(product, pickle.HIGHEST_PROTOCOL)))
+            return self.snapshot_pool.adopt(key, None, 0)
+            
+        def restore(session_id, product_id, timestamp, key, product, source_url, agent_id, expires_at):
+            key = adopt(key, product)
+            entry = InternedContext(datetime.fromtimestamp(timestamp), key, source_url, agent_id,
+                                    _from_epoch(expires_at))
+            previous = self._set_memory_entry(session_id, product_id, entry)
+            if previous is not None:
+                self._record_version(session_id, product_id, previous, entry)
+                self.snapshot_pool.release(previous.snapshot_hash)
+                
+        def on_payload(entry):
+            key, product = entry
+            pending_payloads[key] = product
+            
+        def on_record(entry):
+            # 스냅샷의 레코드는 키가 중복되지 않으므로 덮어쓰기 처리 없이 적재하고 만료 인덱스는 마지막에 한 번 정렬
+            session_id, product_id, timestamp, key, source_url, agent_id, expires_at = entry
+            key = adopt(key)
+            record = InternedContext(datetime.fromtimestamp(timestamp), key, source_url, agent_id,
+                                     _from_epoch(expires_at))
+            self.memory_storage.setdefault(session_id, {})[product_id] = record
+            self._index_of(record).push_unordered(expires_at if expires_at is not None else timestamp,
+                                                  session_id, product_id, record)
+            self.reverse_index.add_unordered(session_id, product_id, agent_id, timestamp)
+            self.memory_budget.add(session_id, product_id, *self._account(session_id, product_id, record))
+            
+        def on_history(entry):
+            # 첫 버전 스냅샷 참조는 이력이 따로 잡으므로 레코드와 같은 해시여도 참조를 하나 더 획득
+            session_id, product_id, base_hash, base_timestamp, deltas = entry
+            chain = VersionChain(adopt(base_hash), datetime.fromtimestamp(base_timestamp))
+            chain.deltas = list(deltas)
+            self._history[(session_id, product_id)] = chain
+            
+        def after_snapshot():
+            self._age_index.heapify()
+            self._deadline_index.heapify()
+            self.reverse_index.sort()
+            pending_payloads.clear()
+            
+        def on_store(entry):
+            restore(*entry)
+            
+        def on_delete(entry):
+            session_id, product_id = entry
+            if product_id in self.memory_storage.get(session_id, {}):
+                self._remove_memory(session_id, product_id)
+                
+        def on_ttl(entry):
+            session_id, product_id, expires_at = entry
+            current = self.memory_storage.get(session_id, {}).get(product_id)
+            if current is not None:
+                self._set_memory_entry(session_id, product_id, InternedContext(
+                    current.timestamp, current.snapshot_hash, current.source_url, current.agent_id,
+                    _from_epoch(expires_at)
+                ))
+                
+        counts = journal.replay({OP_PAYLOAD: on_payload, OP_RECORD: on_record, OP_HISTORY: on_history,
+                                 OP_STORE: on_store, OP_DELETE: on_delete, OP_TTL: on_ttl}, after_snapshot)
+        logger.info(f"선행 기록에서 문맥 복구 완료: 스냅샷 {counts['snapshot']}개, 로그 {counts['log']}개 "
+                    f"({time.perf_counter() - started:.2f}초)")
+        
+    def compact_journal(self):
+        """현재 메모리 상태를 버전 이력(첫 버전 해시와 필드 차이)까지 스냅샷으로 기록하고 선행 기록을 비움"""
+        if self.journal is None:
+            return
+        payloads = ((key, _product_tuple(product_info)) for key, product_info in self.snapshot_pool.items())
+        records = (
+            (session_id, product_id, entry.timestamp.timestamp(), entry.snapshot_hash, entry.source_url,
+             entry.agent_id, entry.expires_at.timestamp() if entry.expires_at is not None else None)
+            for session_id, session in self.memory_storage.items()
+            for product_id, entry in session.items()
+        )
+        histories = (
+            (session_id, product_id, chain.base_hash, chain.base_timestamp.timestamp(), chain.deltas)
+            for (session_id, product_id), chain in self._history.items()
+        )
+        self.journal.write_snapshot(payloads, records, histories)
+        logger.info(f"문맥 스냅샷 압축 완료: 문맥 {sum(len(session) for session in self.memory_storage.values())}개")
+        
+    def _is_live(self, session_id: str, product_id: str, entry: InternedContext) -> bool:
+        """만료 인덱스 항목이 현재 저장된 레코드를 가리키는지 확인"""
+        session = self.memory_storage.get(session_id)
+        return session is not None and session.get(product_id) is entry
+        
+    def _is_stored_at(self, session_id: str, product_id: str, timestamp: float) -> bool:
+        """보조 인덱스 항목의 저장 시각이 현재 저장된 레코드와 같은지 확인"""
+        entry = self.memory_storage.get(session_id, {}).get(product_id)
+        return entry is not None and entry.timestamp.timestamp() == timestamp
+        
+    def _index_of(self, entry: InternedContext) -> ExpiryIndex:
+        return self._deadline_index if entry.expires_at is not None else self._age_index
+        
+    def _account(self, session_id: str, product_id: str, entry: InternedContext):
+        """레코드의 (고정 비용, 참조 스냅샷 크기, 활성 여부) - 메모리 예산 집계용"""
+        return (RECORD_OVERHEAD_BYTES + len(session_id) + len(product_id),
+                self.snapshot_pool.size_of(entry.snapshot_hash),
+                entry.expires_at is not None)
+        
+    def _set_memory_entry(self, session_id: str, product_id: str, entry: InternedContext) -> Optional[InternedContext]:
+        """레코드를 저장하고 만료 인덱스와 메모리 예산에 등록 (덮어쓴 이전 레코드 반환)"""
+        session = self.memory_storage.setdefault(session_id, {})
+        previous = session.pop(product_id, None)
+        session[product_id] = entry  # 세션 내 순서를 최근 사용 순으로 유지
+        deadline = entry.expires_at if entry.expires_at is not None else entry.timestamp
+        self._index_of(entry).push(deadline.timestamp(), session_id, product_id, entry)
+        if previous is not None:
+            self._index_of(previous).mark_stale()
+            self.memory_budget.remove(session_id, product_id, *self._account(session_id, product_id, previous))
+        self.memory_budget.add(session_id, product_id, *self._account(session_id, product_id, entry))
+        # 만료 시각만 바뀐 경우에는 보조 인덱스 갱신 불필요
+        if previous is None or previous.timestamp != entry.timestamp or previous.agent_id != entry.agent_id:
+            if previous is not None:
+                self.reverse_index.remove(session_id, product_id, previous.agent_id)
+            self.reverse_index.add(session_id, product_id, entry.agent_id, entry.timestamp.timestamp())
+        return previous
+        
+    def _enforce_memory_limits(self, session_id: str, product_id: str):
+        """메모리 한도 초과 시 방금 저장한 레코드를 제외하고 LRU 순으로 축출"""
+        budget = self.memory_budget
+        protect = (session_id, product_id)
+        if budget.max_session_bytes is not None:
+            while budget.session_bytes.get(session_id, 0) > budget.max_session_bytes:
+                victim = self._session_victim(session_id, product_id)
+                if victim is None:
+                    break
+                self._evict(session_id, victim, "session")
+        if budget.max_bytes is not None:
+            while budget.record_bytes + self.snapshot_pool.total_bytes > budget.max_bytes:
+                victim = budget.global_victim(protect)
+                if victim is None:
+                    break
+                self._evict(victim[0], victim[1], "global")
+                
+    def _session_victim(self, session_id: str, protect: str) -> Optional[str]:
+        """세션 한도 초과 시 축출할 상품 (세션 내 가장 오래 사용되지 않은 조회 단계 문맥 우선)"""
+        fallback = None
+        for product_id, entry in self.memory_storage.get(session_id, {}).items():
+            if product_id == protect:
+                continue
+            if entry.expires_at is None:
+                return product_id
+            if fallback is None:
+                fallback = product_id
+        return fallback
+        
+    def _evict(self, session_id: str, product_id: str, scope: str):
+        """메모리 한도에 따른 레코드 축출"""
+        entry = self.memory_storage[session_id][product_id]
+        record_bytes, snapshot_bytes, active = self._account(session_id, product_id, entry)
+        self._remove_memory(session_id, product_id)
+        self.memory_budget.record_eviction(session_id, product_id, record_bytes + snapshot_bytes, active, scope)
+        logger.debug(f"메모리 한도로 문맥 축출: 세션 {session_id}, 상품 {product_id} ({scope})")
+        
+    def _put_memory(self, session_id: str, product_id: str, timestamp: datetime, product_info: ProductInfo,
+                    source_url: Optional[str], agent_id: Optional[str], expires_at: Optional[datetime] = None):
+        """메모리 저장소에 레코드 저장 (스냅샷은 풀에서 공유, 덮어쓴 이전 스냅샷은 참조 해제)"""
+        key = self.snapshot_pool.acquire(product_info)
+        entry = InternedContext(timestamp, key, source_url, agent_id, expires_at)
+        previous = self._set_memory_entry(session_id, product_id, entry)
+        if previous is not None:
+            self._record_version(session_id, product_id, previous, entry)
+            self.snapshot_pool.release(previous.snapshot_hash)
+        if self.journal is not None:
+            self.journal.append_store(session_id, product_id, timestamp.timestamp(), key,
+                                      _product_tuple(product_info), source_url, agent_id,
+                                      expires_at.timestamp() if expires_at is not None else None)
+            if self.journal.needs_compaction():
+                self.compact_journal()
+        if self.memory_budget.tracks_lru:
+            self._enforce_memory_limits(session_id, product_id)
+            
+    def _remove_memory(self, session_id: str, product_id: str, indexed: bool = True):
+        """메모리 저장소에서 레코드 삭제 (마지막 참조였던 스냅샷은 해제, 빈 세션은 삭제)"""
+        session = self.memory_storage[session_id]
+        entry = session.pop(product_id)
+        self.memory_budget.remove(session_id, product_id, *self._account(session_id, product_id, entry))
+        self.reverse_index.remove(session_id, product_id, entry.agent_id)
+        self.snapshot_pool.release(entry.snapshot_hash)
+        if self._history:
+            chain = self._history.pop((session_id, product_id), None)
+            if chain is not None:
+                self.snapshot_pool.release(chain.base_hash)
+        if self.journal is not None:
+            self.journal.append_delete(session_id, product_id)
+        if indexed:
+            self._index_of(entry).mark_stale()
+        if not session:
+            del self.memory_storage[session_id]
+            
+    def _record_version(self, session_id: str, product_id: str, previous: InternedContext,
+                        entry: InternedContext):
+        """
+        덮어쓰기 전 레코드를 버전 이력에 반영 (이전 스냅샷 참조를 해제하기 전에 호출)
+        첫 버전은 스냅샷 참조를 하나 더 잡아 보존하고, 내용이 바뀐 경우에만 필드 차이를 추가
+        """
+        chain = self._history.get((session_id, product_id))
+        if chain is None:
+            chain = self._history[(session_id, product_id)] = VersionChain(
+                self.snapshot_pool.adopt(previous.snapshot_hash, None, 0), previous.timestamp
+            )
+        if previous.snapshot_hash != entry.snapshot_hash:
+            chain.append(entry.timestamp, product_delta(self.snapshot_pool.get(previous.snapshot_hash),
+                                                        self.snapshot_pool.get(entry.snapshot_hash)),
+                         self.max_versions)
+            
+    def _version_records(self, session_id: str, product_id: str, entry: InternedContext) -> List[ContextRecord]:
+        """버전 이력을 오래된 순 ContextRecord로 복원 (이력이 없으면 현재 레코드 하나)"""
+        chain = self._history.get((session_id, product_id))
+        if chain is None:
+            return [self._materialize(session_id, product_id, entry)]
+        versions = chain.versions(self.snapshot_pool.get(chain.base_hash))
+        last = len(versions) - 1
+        return [
+            _context_record(
+                session_id, product_id, timestamp,
+                self.snapshot_pool.get(entry.snapshot_hash) if index == last else product_info,
+                entry.source_url, entry.agent_id,
+                chain.base_hash if index == 0 else entry.snapshot_hash if index == last else None,
+                entry.expires_at
+            )
+            for index, (timestamp, product_info) in enumerate(versions)
+        ]
+        
+    def _touch(self, session_id: str, product_id: str, entry: InternedContext):
+        """조회된 레코드를 최근 사용으로 표시 (세션 내 순서와 전역 LRU 갱신)"""
+        session = self.memory_storage[session_id]
+        session[product_id] = session.pop(product_id)
+        self.memory_budget.touch(session_id, product_id, entry.expires_at is not None)
+        
+    def _materialize(self, session_id: str, product_id: str, entry: InternedContext) -> ContextRecord:
+        """경량 레코드를 ContextRecord로 변환 (공유 스냅샷은 읽기 전용이므로 복사하지 않음)"""
+        return _context_record(session_id, product_id, entry.timestamp, self.snapshot_pool.get(entry.snapshot_hash),
+                               entry.source_url, entry.agent_id, entry.snapshot_hash, entry.expires_at)
+        
     def store_context(self, session_id: str, product_id: str, product_info: ProductInfo, 
-                     source_url: Optional[str] = None, agent_id: Optional[str] = None) -> bool:
-        """상품 정보 문맥 저장"""
+                     source_url: Optional[str] = None, agent_id: Optional[str] = None,
+                     ttl_hours: Optional[float] = None) -> bool:
+        """상품 정보 문맥 저장 (ttl_hours를 지정하면 기본 보관 기간 대신 개별 만료 시각 적용)"""
         try:
+            now = self.clock.now()
+            expires_at = now + timedelta(hours=ttl_hours) if ttl_hours is not None else None
             if self.storage_type == "memory":
-                if session_id not in self.memory_storage:
-                    self.memory_storage[session_id] = {}
-                
-                context_record = ContextRecord(
-                    session_id=session_id,
-                    product_id=product_id,
-                    timestamp=datetime.now(),
-                    product_info=product_info,
-                    source_url=source_url,
-                    agent_id=agent_id
-                )
-                
-                self.memory_storage[session_id][product_id] = context_record
+                self._put_memory(session_id, product_id, now, product_info, source_url, agent_id, expires_at)
+                logger.info(f"문맥 저장 완료: 세션 {session_id}, 상품 {product_id}")
+                return True
+            elif self.backend is not None:
+                self.backend.put(session_id, product_id, now, product_info, source_url, agent_id, expires_at)
                 logger.info(f"문맥 저장 완료: 세션 {session_id}, 상품 {product_id}")
                 return True
             else:
@@ -50,15 +403,26 @@ class ContextStorage:
         """저장된 상품 정보 문맥 조회"""
         try:
             if self.storage_type == "memory":
-                if session_id not in self.memory_storage:
-                    logger.warning(f"세션 ID를 찾을 수 없음: {session_id}")
-                    return None
-                    
-                if product_id not in self.memory_storage[session_id]:
-                    logger.warning(f"상품 ID를 찾을 수 없음: {product_id}")
+                session = self.memory_storage.get(session_id)
+                entry = session.get(product_id) if session is not None else None
+                if entry is None:
+                    if self.memory_budget.was_evicted(session_id, product_id):
+                        self.memory_budget.stats["evicted_misses"] += 1
+                        logger.warning(f"메모리 한도로 축출된 문맥: 세션 {session_id}, 상품 {product_id}")
+                    elif session is None:
+                        logger.warning(f"세션 ID를 찾을 수 없음: {session_id}")
+                    else:
+                        logger.warning(f"상품 ID를 찾을 수 없음: {product_id}")
                     return None
                     
-                return self.memory_storage[session_id][product_id]
+                if self.memory_budget.tracks_lru:
+                    self._touch(session_id, product_id, entry)
+                return self._materialize(session_id, product_id, entry)
+            elif self.backend is not None:
+                record = self.backend.get(session_id, product_id)
+                if record is None:
+                    logger.warning(f"문맥을 찾을 수 없음: 세션 {session_id}, 상품 {product_id}")
+                return record
             else:
                 logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
                 return None
@@ -74,7 +438,12 @@ class ContextStorage:
                     logger.warning(f"세션 ID를 찾을 수 없음: {session_id}")
                     return []
                     
-                return list(self.memory_storage[session_id].values())
+                return [
+                    self._materialize(session_id, product_id, entry)
+                    for product_id, entry in self.memory_storage[session_id].items()
+                ]
+            elif self.backend is not None:
+                return self.backend.get_session(session_id)
             else:
                 logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
                 return []
@@ -82,6 +451,304 @@ class ContextStorage:
             logger.error(f"세션 문맥 조회 중 오류 발생: {e}")
             return []
             
+    def get_session_ids(self) -> List[str]:
+        """저장된 모든 세션 ID 조회"""
+        try:
+            if self.storage_type == "memory":
+                return list(self.memory_storage.keys())
+            elif self.backend is not None:
+                return self.backend.session_ids()
+            else:
+                logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
+                return []
+        except Exception as e:
+            logger.error(f"세션 목록 조회 중 오류 발생: {e}")
+            return []
+            
+    def restore_context(self, record: ContextRecord) -> bool:
+        """기존 문맥 레코드를 타임스탬프를 유지한 채 그대로 저장 (샤드 이동, 복구 등에 사용)"""
+        try:
+            if self.storage_type == "memory":
+                self._put_memory(record.session_id, record.product_id, record.timestamp,
+                                 record.product_info, record.source_url, record.agent_id, record.expires_at)
+                return True
+            elif self.backend is not None:
+                self.backend.store(record)
+                return True
+            else:
+                logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
+                return False
+        except Exception as e:
+            logger.error(f"문맥 복원 중 오류 발생: {e}")
+            return False
+            
+    def store_contexts(self, records: Iterable[ContextRecord], only_new: bool = False) -> int:
+        """
+        여러 문맥 레코드를 한 번에 저장 (레코드의 타임스탬프 유지)
+        
+        입력 검증과 로깅은 호출당 한 번만 수행하고, 영속 저장소는 한 번의 배치 쓰기로 처리
+        
+        Args:
+            records: 저장할 문맥 레코드
+            only_new: True면 이미 문맥이 있는 (세션, 상품)은 건너뜀 (검색 결과·장바구니 목록이
+                      상품 조회 시점의 문맥을 덮어쓰지 않도록)
+        
+        Returns:
+            저장된 레코드 수
+        """
+        try:
+            records = list(records)
+            if not records:
+                return 0
+            if not all(record.session_id and record.product_id for record in records):
+                logger.error("세션 ID 또는 상품 ID가 비어 있는 레코드가 포함되어 일괄 저장 취소")
+                return 0
+            if only_new:
+                records = self._drop_existing(records)
+                if not records:
+                    return 0
+                
+            if self.storage_type == "memory":
+                for record in records:
+                    self._put_memory(record.session_id, record.product_id, record.timestamp, record.product_info,
+                                     record.source_url, record.agent_id, record.expires_at)
+            elif self.backend is not None:
+                self.backend.store_many(records)
+            else:
+                logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
+                return 0
+            logger.info(f"문맥 일괄 저장 완료: {len(records)}개")
+            return len(records)
+        except Exception as e:
+            logger.error(f"문맥 일괄 저장 중 오류 발생: {e}")
+            return 0
+            
+    def _drop_existing(self, records: List[ContextRecord]) -> List[ContextRecord]:
+        """이미 문맥이 저장된 (세션, 상품)의 레코드 제외"""
+        if self.storage_type == "memory":
+            return [record for record in records
+                    if record.product_id not in self.memory_storage.get(record.session_id, {})]
+        if self.backend is None:
+            return records
+        existing = self.backend.get_many((record.session_id, record.product_id) for record in records)
+        return [record for record in records if (record.session_id, record.product_id) not in existing]
+            
+    def get_contexts(self, session_id: str, product_ids: Iterable[str]) -> Dict[str, ContextRecord]:
+        """
+        세션의 여러 상품 문맥을 한 번에 조회
+        
+        Returns:
+            {product_id: 문맥 레코드} (저장되지 않은 상품은 제외)
+        """
+        try:
+            if self.storage_type == "memory":
+                session = self.memory_storage.get(session_id)
+                if session is None:
+                    return {}
+                found = {}
+                for product_id in product_ids:
+                    entry = session.get(product_id)
+                    if entry is None:
+                        continue
+                    if self.memory_budget.tracks_lru:
+                        self._touch(session_id, product_id, entry)
+                    found[product_id] = self._materialize(session_id, product_id, entry)
+                return found
+            elif self.backend is not None:
+                found = self.backend.get_many((session_id, product_id) for product_id in product_ids)
+                return {product_id: record for (_, product_id), record in found.items()}
+            else:
+                logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
+                return {}
+        except Exception as e:
+            logger.error(f"문맥 일괄 조회 중 오류 발생: {e}")
+            return {}
+            
+    def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], ContextRecord]:
+        """
+        여러 세션에 걸친 (session_id, product_id) 문맥을 한 번에 조회
+        
+        Returns:
+            {(session_id, product_id): 문맥 레코드} (저장되지 않은 키는 제외)
+        """
+        try:
+            if self.storage_type == "memory":
+                found = {}
+                for session_id, product_id in pairs:
+                    entry = self.memory_storage.get(session_id, {}).get(product_id)
+                    if entry is None:
+                        continue
+                    if self.memory_budget.tracks_lru:
+                        self._touch(session_id, product_id, entry)
+                    found[(session_id, product_id)] = self._materialize(session_id, product_id, entry)
+                return found
+            elif self.backend is not None:
+                return self.backend.get_many(pairs)
+            else:
+                logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
+                return {}
+        except Exception as e:
+            logger.error(f"문맥 일괄 조회 중 오류 발생: {e}")
+            return {}
+            
+    def get_context_history(self, session_id: str, product_id: str) -> List[ContextRecord]:
+        """
+        문맥의 모든 버전을 오래된 순으로 조회 (각 버전의 timestamp는 해당 상태를 처음 본 시각)
+        버전 이력은 memory 저장소에서만 유지되며, 다른 저장소는 최신 버전 하나만 반환
+        """
+        try:
+            if self.storage_type == "memory":
+                entry = self.memory_storage.get(session_id, {}).get(product_id)
+                return self._version_records(session_id, product_id, entry) if entry is not None else []
+            record = self.get_context(session_id, product_id)
+            return [record] if record is not None else []
+        except Exception as e:
+            logger.error(f"문맥 이력 조회 중 오류 발생: {e}")
+            return []
+            
+    def get_first_seen_context(self, session_id: str, product_id: str) -> Optional[ContextRecord]:
+        """에이전트가 처음 본 버전의 문맥 조회 (최신 버전은 get_context)"""
+        try:
+            if self.storage_type == "memory":
+                entry = self.memory_storage.get(session_id, {}).get(product_id)
+                if entry is None:
+                    return None
+                chain = self._history.get((session_id, product_id))
+                if chain is None:
+                    return self._materialize(session_id, product_id, entry)
+                return _context_record(session_id, product_id, chain.base_timestamp,
+                                       self.snapshot_pool.get(chain.base_hash), entry.source_url, entry.agent_id,
+                                       chain.base_hash, entry.expires_at)
+            return self.get_context(session_id, product_id)
+        except Exception as e:
+            logger.error(f"최초 문맥 조회 중 오류 발생: {e}")
+            return None
+            
+    def get_context_at(self, session_id: str, product_id: str, at: datetime) -> Optional[ContextRecord]:
+        """시각 at에 에이전트가 보고 있던 버전의 문맥 조회 (그 이전에 본 적이 없으면 None)"""
+        try:
+            if self.storage_type == "memory":
+                entry = self.memory_storage.get(session_id, {}).get(product_id)
+                if entry is None:
+                    return None
+                chain = self._history.get((session_id, product_id))
+                if chain is None:
+                    return self._materialize(session_id, product_id, entry) if entry.timestamp <= at else None
+                index = chain.index_at(at)
+                return self._version_records(session_id, product_id, entry)[index] if index is not None else None
+            record = self.get_context(session_id, product_id)
+            return record if record is not None and record.timestamp <= at else None
+        except Exception as e:
+            logger.error(f"시점별 문맥 조회 중 오류 발생: {e}")
+            return None
+            
+    def get_history_stats(self) -> Dict[str, Any]:
+        """버전 이력 통계 조회 (메모리 저장소)"""
+        return {
+            "chains": len(self._history),
+            "versions": sum(len(chain) for chain in self._history.values()),
+            "delta_fields": sum(chain.delta_fields() for chain in self._history.values())
+        }
+            
+    def get_sessions_for_product(self, product_id: str) -> List[str]:
+        """상품 문맥을 가진 세션 ID 조회 (상품 변경 시 영향받는 세션)"""
+        try:
+            if self.storage_type == "memory":
+                return list(self.reverse_index.sessions_for_product(product_id))
+            elif self.backend is not None:
+                return self.backend.sessions_for_product(product_id)
+            else:
+                logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
+                return []
+        except Exception as e:
+            logger.error(f"상품별 세션 조회 중 오류 발생: {e}")
+            return []
+            
+    def get_sessions_for_agent(self, agent_id: str) -> List[str]:
+        """에이전트가 문맥을 저장한 세션 ID 조회"""
+        try:
+            if self.storage_type == "memory":
+                return self.reverse_index.sessions_for_agent(agent_id)
+            elif self.backend is not None:
+                return self.backend.sessions_for_agent(agent_id)
+            else:
+                logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
+                return []
+        except Exception as e:
+            logger.error(f"에이전트별 세션 조회 중 오류 발생: {e}")
+            return []
+            
+    def get_contexts_in_range(self, start: datetime, end: Optional[datetime] = None,
+                              limit: Optional[int] = None) -> List[ContextRecord]:
+        """저장 시각이 [start, end) 구간인 문맥을 시각 순으로 조회 (end가 없으면 현재까지)"""
+        try:
+            end = end or self.clock.now() + timedelta(microseconds=1)
+            if self.storage_type == "memory":
+                records = []
+                for session_id, product_id in self.reverse_index.in_range(start.timestamp(), end.timestamp()):
+                    if limit is not None and len(records) >= limit:
+                        break
+                    records.append(self._materialize(session_id, product_id,
+                                                     self.memory_storage[session_id][product_id]))
+                return records
+            elif self.backend is not None:
+                return self.backend.in_range(start, end, limit)
+            else:
+                logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
+                return []
+        except Exception as e:
+            logger.error(f"시간 구간 문맥 조회 중 오류 발생: {e}")
+            return []
+            
+    def set_contexts_ttl(self, session_id: str, product_ids: Iterable[str], ttl_hours: float) -> int:
+        """세션의 여러 문맥의 개별 만료 시각을 한 번에 설정 (설정된 문맥 수 반환)"""
+        try:
+            product_ids = list(product_ids)
+            if self.storage_type == "memory":
+                return sum(1 for product_id in product_ids
+                           if product_id in self.memory_storage.get(session_id, {})
+                           and self.set_context_ttl(session_id, product_id, ttl_hours))
+            elif self.backend is not None:
+                return self.backend.set_expiry_many(session_id, product_ids,
+                                                    self.clock.now() + timedelta(hours=ttl_hours))
+            else:
+                logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
+                return 0
+        except Exception as e:
+            logger.error(f"문맥 만료 시각 일괄 설정 중 오류 발생: {e}")
+            return 0
+            
+    def set_context_ttl(self, session_id: str, product_id: str, ttl_hours: float) -> bool:
+        """
+        문맥의 개별 만료 시각을 지금부터 ttl_hours 뒤로 설정
+        (장바구니/결제 단계 문맥을 조회 단계 문맥보다 오래 보관할 때 사용)
+        """
+        try:
+            expires_at = self.clock.now() + timedelta(hours=ttl_hours)
+            if self.storage_type == "memory":
+                entry = self.memory_storage.get(session_id, {}).get(product_id)
+                if entry is None:
+                    logger.warning(f"문맥을 찾을 수 없음: 세션 {session_id}, 상품 {product_id}")
+                    return False
+                # 기존 인덱스 항목이 무효가 되도록 새 레코드 객체로 교체 (스냅샷 참조는 그대로 유지)
+                self._set_memory_entry(session_id, product_id, InternedContext(
+                    entry.timestamp, entry.snapshot_hash, entry.source_url, entry.agent_id, expires_at
+                ))
+                if self.journal is not None:
+                    self.journal.append_ttl(session_id, product_id, expires_at.timestamp())
+                return True
+            elif self.backend is not None:
+                if not self.backend.set_expiry(session_id, product_id, expires_at):
+                    logger.warning(f"문맥을 찾을 수 없음: 세션 {session_id}, 상품 {product_id}")
+                    return False
+                return True
+            else:
+                logger.error(f"지원하지 않는 저장소 타입: {self.storage_type}")
+                return False
+        except Exception as e:
+            logger.error(f"문맥 만료 시각 설정 중 오류 발생: {e}")
+            return False
+            
     def delete_context(self, session_id: str, product_id: str) -> bool:
         """상품 정보 문맥 삭제"""
         try:
@@ -94,7 +761,13 @@ class ContextStorage:
                     logger.warning(f"상품 ID를 찾을 수 없음: {product_id}")
                     return False
                     
-                del self.memory_storage[session_id][product_id]
+                self._remove_memory(session_id, product_id)
+                logger.info(f"문맥 삭제 완료: 세션 {session_id}, 상품 {product_id}")
+                return True
+            elif self.backend is not None:
+                if not self.backend.delete(session_id, product_id):
+                    logger.warning(f"문맥을 찾을 수 없음: 세션 {session_id}, 상품 {product_id}")
+                    return False
                 logger.info(f"문맥 삭제 완료: 세션 {session_id}, 상품 {product_id}")
                 return True
             else:
@@ -104,24 +777,30 @@ class ContextStorage:
             logger.error(f"문맥 삭제 중 오류 발생: {e}")
             return False
             
-    def cleanup_old_contexts(self, max_age_hours: int = 24) -> int:
-        """오래된 문맥 정보 정리"""
+    def cleanup_old_contexts(self, max_age_hours: int = 24, max_records: Optional[int] = None) -> int:
+        """
+        오래된 문맥 정보 정리
+        
+        Args:
+            max_age_hours: 개별 만료 시각이 없는 문맥의 보관 기간
+            max_records: 한 번에 정리할 최대 문맥 수 (None이면 무제한)
+        """
         try:
+            now = self.clock.now()
+            cutoff_time = now - timedelta(hours=max_age_hours)
             if self.storage_type == "memory":
-                count = 0
-                cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
-                
-                for session_id in list(self.memory_storage.keys()):
-                    for product_id in list(self.memory_storage[session_id].keys()):
-                        record = self.memory_storage[session_id][product_id]
-                        if record.timestamp < cutoff_time:
-                            del self.memory_storage[session_id][product_id]
-                            count += 1
-                    
-                    # 세션이 비어있으면 세션도 삭제
-                    if not self.memory_storage[session_id]:
-                        del self.memory_storage[session_id]
+                # 만료 인덱스에서 만료된 레코드만 꺼내므로 전체 문맥을 순회하지 않음
+                expired = self._age_index.pop_expired(cutoff_time.timestamp(), max_records)
+                remaining = None if max_records is None else max_records - len(expired)
+                expired += self._deadline_index.pop_expired(now.timestamp(), remaining)
+                for session_id, product_id, _ in expired:
+                    self._remove_memory(session_id, product_id, indexed=False)
+                count = len(expired)
                 
+                logger.info(f"오래된 문맥 {count}개 정리 완료")
+                return count
+            elif self.backend is not None:
+                count = self.backend.cleanup(cutoff_time, now, max_records)
                 logger.info(f"오래된 문맥 {count}개 정리 완료")
                 return count
             else:
@@ -129,4 +808,89 @@ class ContextStorage:
                 return 0
         except Exception as e:
             logger.error(f"문맥 정리 중 오류 발생: {e}")
-            return 0 
\ No newline at end of file
+            return 0
+            
+    def start_sweeper(self, interval_seconds: float = 60.0, max_per_run: int = 10000,
+                      max_age_hours: int = 24) -> asyncio.Task:
+        """
+        백그라운드 만료 정리 태스크 시작
+        
+        Args:
+            interval_seconds: 정리 주기 (초)
+            max_per_run: 한 번에 정리할 최대 문맥 수 (지연 급증 방지)
+            max_age_hours: 개별 만료 시각이 없는 문맥의 보관 기간
+        """
+        if self._sweeper_task is not None and not self._sweeper_task.done():
+            return self._sweeper_task
+            
+        async def sweep_periodically():
+            try:
+                while True:
+                    count = self.cleanup_old_contexts(max_age_hours, max_records=max_per_run)
+                    # 처리 한도를 채웠다면 남은 만료 문맥이 있으므로 다른 태스크에 양보 후 바로 이어서 정리
+                    await asyncio.sleep(0 if count >= max_per_run else interval_seconds)
+            except asyncio.CancelledError:
+                logger.info("문맥 만료 정리 태스크 중단")
+                
+        self._sweeper_task = asyncio.create_task(sweep_periodically())
+        logger.info(f"문맥 만료 정리 태스크 시작 (주기: {interval_seconds}초, 최대 {max_per_run}개/회)")
+        return self._sweeper_task
+        
+    def stop_sweeper(self):
+        """백그라운드 만료 정리 태스크 중단"""
+        if self._sweeper_task is not None and not self._sweeper_task.get_loop().is_closed():
+            self._sweeper_task.cancel()
+        self._sweeper_task = None
+            
+    def get_miss_reason(self, session_id: str, product_id: str) -> Optional[str]:
+        """
+        문맥 조회 실패 원인
+        
+        Returns:
+            None (저장되어 있음), "evicted" (메모리 한도로 축출됨), "not_found" (저장된 적 없거나 만료/삭제됨)
+        """
+        if self.storage_type == "memory":
+            if product_id in self.memory_storage.get(session_id, {}):
+                return None
+            return "evicted" if self.memory_budget.was_evicted(session_id, product_id) else "not_found"
+        return None if self.get_context(session_id, product_id) is not None else "not_found"
+        
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """메모리 사용량 및 축출 통계 조회 (메모리 저장소)"""
+        return self.memory_budget.get_stats(self.snapshot_pool.total_bytes)
+        
+    def get_snapshot_stats(self) -> Dict[str, Any]:
+        """스냅샷 공유 통계 조회 (메모리 저장소)"""
+        return self.snapshot_pool.get_stats()
+        
+    def get_compression_stats(self) -> Dict[str, Any]:
+        """설명 압축률, 복원 지연, 복원 캐시 적중 통계 (압축을 사용하지 않으면 빈 딕셔너리)"""
+        compressor = self.snapshot_pool.compressor
+        if compressor is None:
+            return {}
+        pool_stats = self.snapshot_pool.stats
+        lookups = pool_stats["cache_hits"] + pool_stats["cache_misses"]
+        return {
+            **compressor.get_stats(),
+            "cache_hits": pool_stats["cache_hits"],
+            "cache_misses": pool_stats["cache_misses"],
+            "cache_hit_ratio": pool_stats["cache_hits"] / lookups if lookups else 0.0
+        }
+            
+    def flush(self):
+        """버퍼된 쓰기를 저장소에 반영 (영속 저장소에서만 의미 있음)"""
+        if self.sqlite_backend is not None:
+            self.sqlite_backend.flush()
+        if self.journal is not None:
+            self.journal.flush()
+            
+    def close(self):
+        """저장소 연결 종료"""
+        self.stop_sweeper()
+        if self.sqlite_backend is not None:
+            self.sqlite_backend.close()
+        if self.shared_store is not None:
+            self.shared_store.close()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
@@ -0,0 +1,74 @@
+from typing import Any, Callable, List, Optional, Tuple
+import heapq
+import itertools
+
+
+class ExpiryIndex:
+    """
+    시각 순 만료 인덱스 (최소 힙)
+    만료 대상만 꺼내므로 정리 비용이 전체 레코드 수가 아닌 만료된 레코드 수에 비례
+
+    레코드가 덮어쓰기/삭제되어도 힙에서 즉시 제거하지 않고(지연 삭제), 꺼낼 때
+    is_live 콜백으로 유효성을 확인. 무효 항목이 많아지면 힙을 재구성.
+    """
+
+    def __init__(self, is_live: Callable[[str, str, Any], bool], min_compact: int = 1024):
+        """
+        Args:
+            is_live: (session_id, product_id, token)이 아직 유효한 레코드인지 확인하는 콜백
+            min_compact: 힙 재구성을 고려하기 시작하는 최소 무효 항목 수
+        """
+        self._is_live = is_live
+        self._min_compact = min_compact
+        # [(기준 시각, 순번, session_id, product_id, token)]
+        self._heap: List[Tuple[float, int, str, str, Any]] = []
+        self._counter = itertools.count()
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._stale
+
+    def push(self, deadline: float, session_id: str, product_id: str, token: Any):
+        """레코드를 기준 시각으로 인덱싱"""
+        heapq.heappush(self._heap, (deadline, next(self._counter), session_id, product_id, token))
+
+    def push_unordered(self, deadline: float, session_id: str, product_id: str, token: Any):
+        """대량 적재용 추가 (힙 순서를 유지하지 않으므로 적재 후 반드시 heapify 호출)"""
+        self._heap.append((deadline, next(self._counter), session_id, product_id, token))
+
+    def heapify(self):
+        """push_unordered로 적재한 항목의 힙 순서 복구 (O(n))"""
+        heapq.heapify(self._heap)
+
+    def mark_stale(self):
+        """인덱싱된 레코드 하나가 덮어쓰기/삭제되었음을 기록 (필요 시 힙 재구성)"""
+        self._stale += 1
+        if self._stale >= self._min_compact and self._stale * 2 > len(self._heap):
+            self.compact()
+
+    def compact(self):
+        """무효 항목을 제거하고 힙 재구성"""
+        self._heap = [entry for entry in self._heap if self._is_live(entry[2], entry[3], entry[4])]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def next_deadline(self) -> Optional[float]:
+        """가장 이른 기준 시각 (무효 항목일 수 있음)"""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, cutoff: float, limit: Optional[int] = None) -> List[Tuple[str, str, Any]]:
+        """
+        기준 시각이 cutoff 이전인 유효 레코드를 최대 limit개 꺼냄
+
+        Returns:
+            [(session_id, product_id, token)] - 호출자가 실제 삭제 후 mark_stale을 호출할 필요 없음
+        """
+        expired = []
+        heap = self._heap
+        while heap and heap[0][0] < cutoff and (limit is None or len(expired) < limit):
+            _, _, session_id, product_id, token = heapq.heappop(heap)
+            if self._is_live(session_id, product_id, token):
+                expired.append((session_id, product_id, token))
+            else:
+                self._stale = max(0, self._stale - 1)
+        return expired
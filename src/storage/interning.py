@@ -0,0 +1,239 @@
+from typing import Dict, Optional, Any
+from collections import OrderedDict
+from hashlib import blake2b
+import json
+from datetime import datetime
+from src.models.data_models import ProductInfo
+from src.storage.compression import DescriptionCompressor, CompressedProduct
+
+
+# 스냅샷 하나가 차지하는 메모리 추정치: 고정 객체 비용 + 직렬화 크기의 배수 (파이썬 객체 표현 비용 반영)
+SNAPSHOT_OVERHEAD_BYTES = 400
+SNAPSHOT_SIZE_FACTOR = 2
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError("공유 스냅샷은 읽기 전용 (수정하려면 dict()/list()로 복사)")
+
+
+class FrozenDict(dict):
+    """읽기 전용 딕셔너리 (공유 스냅샷의 attributes/metadata)"""
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+class FrozenList(list):
+    """읽기 전용 리스트 (공유 스냅샷 속성 값 안의 목록, 일반 list와 비교하면 내용으로 비교)"""
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return FrozenList(_freeze(item) for item in value)
+    return value
+
+
+class FrozenProductInfo(ProductInfo):
+    """
+    풀에 보관하는 공유 스냅샷 (필드 대입과 attributes/metadata 수정 시 TypeError)
+    여러 세션이 같은 객체를 참조하므로 한 세션에서 수정하면 모든 세션의 스냅샷과 해시가 어긋나게 됨
+    """
+
+    class Config:
+        allow_mutation = False
+
+
+def freeze_product(product_info: ProductInfo) -> FrozenProductInfo:
+    """상품 정보의 읽기 전용 복사본 (이미 읽기 전용이면 그대로 반환)"""
+    if isinstance(product_info, FrozenProductInfo):
+        return product_info
+    return FrozenProductInfo.construct(product_id=product_info.product_id, price=product_info.price,
+                                       description=product_info.description,
+                                       attributes=_freeze(product_info.attributes),
+                                       metadata=_freeze(product_info.metadata))
+
+
+def _canonical_bytes(product_info: ProductInfo) -> bytes:
+    # product_info.dict()와 같은 내용이지만 pydantic 변환을 거치지 않아 저장 경로에서 더 빠름
+    fields = {"product_id": product_info.product_id, "price": product_info.price,
+              "description": product_info.description, "attributes": product_info.attributes,
+              "metadata": product_info.metadata}
+    return json.dumps(fields, ensure_ascii=False, sort_keys=True,
+                      separators=(",", ":"), default=str).encode("utf-8")
+
+
+def snapshot_hash(product_info: ProductInfo) -> str:
+    """상품 정보 내용으로부터 스냅샷 해시 계산 (필드 순서와 무관)"""
+    return blake2b(_canonical_bytes(product_info), digest_size=16).hexdigest()
+
+
+class InternedContext:
+    """
+    스냅샷 해시만 참조하는 경량 문맥 레코드
+    상품 정보 본문은 SnapshotPool에 한 번만 저장됨
+    """
+    __slots__ = ("timestamp", "snapshot_hash", "source_url", "agent_id", "expires_at")
+
+    def __init__(self, timestamp: datetime, snapshot_hash: str,
+                 source_url: Optional[str] = None, agent_id: Optional[str] = None,
+                 expires_at: Optional[datetime] = None):
+        self.timestamp = timestamp
+        self.snapshot_hash = snapshot_hash
+        self.source_url = source_url
+        self.agent_id = agent_id
+        self.expires_at = expires_at
+
+
+class SnapshotPool:
+    """
+    내용 주소 기반 스냅샷 풀
+    동일한 상품 상태는 하나의 읽기 전용 공유 ProductInfo(FrozenProductInfo)로 저장하고 참조 횟수로 수명을 관리
+
+    압축기를 지정하면 설명을 압축한 CompressedProduct로 보관하고, 조회 시 복원한 ProductInfo를
+    최근 사용 순 캐시에 보관하여 자주 조회되는 스냅샷은 매번 복원하지 않음
+    """
+
+    def __init__(self, compressor: Optional[DescriptionCompressor] = None, cache_size: int = 1024):
+        """
+        Args:
+            compressor: 설명 압축기 (None이면 압축하지 않음)
+            cache_size: 복원한 스냅샷 캐시 크기 (압축 사용 시)
+        """
+        # {snapshot_hash: [해시 문자열, product_info 또는 CompressedProduct, 참조 횟수, 추정 바이트 수]}
+        self._entries: Dict[str, list] = {}
+        self.total_bytes = 0
+        self.stats: Dict[str, int] = {"interned": 0, "deduplicated": 0, "released": 0,
+                                      "cache_hits": 0, "cache_misses": 0}
+        self.compressor = compressor
+        self.cache_size = cache_size
+        self._hot: "OrderedDict[str, ProductInfo]" = OrderedDict()
+
+    def _store(self, product_info: ProductInfo, serialized_size: int):
+        """(보관 객체, 추정 바이트 수) - 읽기 전용으로 고정하고, 압축 시 설명 대신 압축 결과 크기로 집계"""
+        product_info = freeze_product(product_info)
+        if self.compressor is None:
+            return product_info, SNAPSHOT_OVERHEAD_BYTES + SNAPSHOT_SIZE_FACTOR * serialized_size
+        description = self.compressor.compress(product_info.description)
+        stored = CompressedProduct(product_info.product_id, product_info.price, description,
+                                   product_info.attributes, product_info.metadata)
+        size = serialized_size - len(product_info.description.encode("utf-8"))
+        return stored, (SNAPSHOT_OVERHEAD_BYTES + SNAPSHOT_SIZE_FACTOR * max(size, 0)
+                        + stored.stored_description_bytes())
+
+    def _expand(self, stored: CompressedProduct) -> ProductInfo:
+        return FrozenProductInfo.construct(product_id=stored.product_id, price=stored.price,
+                                           description=self.compressor.decompress(stored.description),
+                                           attributes=stored.attributes, metadata=stored.metadata)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def acquire(self, product_info: ProductInfo) -> str:
+        """스냅샷 참조 획득 후 해시 반환 (처음 보는 상태면 풀에 추가)"""
+        canonical = _canonical_bytes(product_info)
+        key = blake2b(canonical, digest_size=16).hexdigest()
+        entry = self._entries.get(key)
+        if entry is None:
+            # 호출자가 넘긴 객체를 이후에 수정해도 공유 스냅샷이 바뀌지 않도록 읽기 전용 복사본 저장
+            stored, nbytes = self._store(product_info, len(canonical))
+            self._entries[key] = [key, stored, 1, nbytes]
+            self.total_bytes += nbytes
+            self.stats["interned"] += 1
+            return key
+        entry[2] += 1
+        self.stats["deduplicated"] += 1
+        # 풀에 있는 해시 문자열 객체를 반환해 레코드마다 같은 문자열이 중복 생성되지 않도록 함
+        return entry[0]
+
+    def adopt(self, key: str, product_info: ProductInfo, size_hint: int) -> str:
+        """
+        해시를 이미 알고 있는 스냅샷의 참조 획득 (복구 시 재해싱 생략)
+
+        Args:
+            size_hint: 직렬화 크기 추정치 (메모리 예산 집계용)
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            stored, nbytes = self._store(product_info, size_hint)
+            self._entries[key] = [key, stored, 1, nbytes]
+            self.total_bytes += nbytes
+            self.stats["interned"] += 1
+            return key
+        entry[2] += 1
+        self.stats["deduplicated"] += 1
+        return entry[0]
+
+    def get(self, key: str) -> Optional[FrozenProductInfo]:
+        """해시에 해당하는 공유 스냅샷 조회 (읽기 전용 - 수정하려면 copy(update=...) 사용)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored = entry[1]
+        if self.compressor is None:
+            return stored
+        product_info = self._hot.get(key)
+        if product_info is not None:
+            self._hot.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return product_info
+        self.stats["cache_misses"] += 1
+        product_info = self._expand(stored)
+        self._hot[key] = product_info
+        if len(self._hot) > self.cache_size:
+            self._hot.popitem(last=False)
+        return product_info
+
+    def release(self, key: str) -> bool:
+        """스냅샷 참조 해제 (마지막 참조면 풀에서 제거하고 True 반환)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        entry[2] -= 1
+        if entry[2] > 0:
+            return False
+        del self._entries[key]
+        if self._hot:
+            self._hot.pop(key, None)
+        self.total_bytes -= entry[3]
+        self.stats["released"] += 1
+        return True
+
+    def size_of(self, key: str) -> int:
+        """스냅샷의 추정 바이트 수"""
+        entry = self._entries.get(key)
+        return entry[3] if entry is not None else 0
+
+    def refcount(self, key: str) -> int:
+        """스냅샷 참조 횟수"""
+        entry = self._entries.get(key)
+        return entry[2] if entry is not None else 0
+
+    def items(self):
+        """[(해시, 공유 스냅샷)] 순회 (압축된 스냅샷은 캐시에 넣지 않고 복원)"""
+        if self.compressor is not None:
+            return ((entry[0], self._expand(entry[1])) for entry in self._entries.values())
+        return ((entry[0], entry[1]) for entry in self._entries.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """풀 통계 조회"""
+        references = sum(entry[2] for entry in self._entries.values())
+        return {
+            **self.stats,
+            "snapshots": len(self._entries),
+            "references": references,
+            "bytes": self.total_bytes,
+            "dedup_ratio": references / len(self._entries) if self._entries else 0.0
+        }
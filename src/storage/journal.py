@@ -0,0 +1,219 @@
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from loguru import logger
+
+# 프레임 헤더: 본문 길이(4바이트), CRC32(4바이트), 연산 코드(1바이트)
+_HEADER = struct.Struct("<IIB")
+
+OP_STORE = ord("S")  # (session_id, product_id, timestamp, snapshot_hash, product, source_url, agent_id, expires_at)
+OP_DELETE = ord("D")  # (session_id, product_id)
+OP_TTL = ord("T")  # (session_id, product_id, expires_at)
+OP_PAYLOAD = ord("P")  # 스냅샷 파일 전용: (snapshot_hash, product)
+OP_RECORD = ord("R")  # 스냅샷 파일 전용: (session_id, product_id, timestamp, snapshot_hash, source_url, agent_id, expires_at)
+OP_HISTORY = ord("H")  # 스냅샷 파일 전용: (session_id, product_id, base_hash, base_timestamp, deltas)
+
+_SNAPSHOT_MAGIC = b"CTXSNAP1"
+_LOG_FILE = "context.journal"
+_SNAPSHOT_FILE = "context.snapshot"
+
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+def _frame(op: int, body: bytes) -> bytes:
+    return _HEADER.pack(len(body), zlib.crc32(body), op) + body
+
+
+def _iter_frames(buffer, offset: int = 0):
+    """
+    버퍼의 프레임 순회 [(연산 코드, 본문 객체, 다음 오프셋)]
+    잘리거나 손상된 프레임을 만나면 중단 (마지막 쓰기가 중간에 끊긴 경우)
+    """
+    view = memoryview(buffer)
+    end = len(view)
+    while offset + _HEADER.size <= end:
+        length, crc, op = _HEADER.unpack_from(view, offset)
+        start = offset + _HEADER.size
+        if start + length > end:
+            break
+        body = view[start:start + length]
+        if zlib.crc32(body) != crc:
+            break
+        offset = start + length
+        yield op, pickle.loads(body), offset
+
+
+class ContextJournal:
+    """
+    문맥 저장소 선행 기록(WAL)
+    저장/삭제를 길이 접두 바이너리 로그에 추가 기록하고 fsync를 묶어서 수행.
+    로그가 커지면 현재 상태를 스냅샷 파일로 압축하고, 시작 시 스냅샷(mmap) 로드 후 로그 꼬리를 재생.
+    """
+
+    def __init__(self, directory: str, fsync_interval: float = 0.05, buffer_bytes: int = 1 << 20,
+                 compact_bytes: int = 64 << 20):
+        """
+        Args:
+            directory: 로그/스냅샷 파일을 저장할 디렉터리
+            fsync_interval: 버퍼된 기록을 디스크에 반영하는 최대 지연 (초)
+            buffer_bytes: 이 크기를 넘으면 즉시 디스크에 반영
+            compact_bytes: 로그가 이 크기를 넘으면 스냅샷 압축 필요
+        """
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.buffer_bytes = buffer_bytes
+        self.compact_bytes = compact_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.log_path = os.path.join(directory, _LOG_FILE)
+        self.snapshot_path = os.path.join(directory, _SNAPSHOT_FILE)
+
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._log = open(self.log_path, "ab")
+        self.log_bytes = self._log.tell()
+        self.stats: Dict[str, int] = {"appended": 0, "fsyncs": 0, "compactions": 0}
+
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="context-journal-flusher",
+                                         daemon=True)
+        self._flusher.start()
+
+    def _append(self, op: int, entry: Tuple):
+        frame = _frame(op, pickle.dumps(entry, _PICKLE_PROTOCOL))
+        with self._lock:
+            self._buffer += frame
+            self.stats["appended"] += 1
+            if len(self._buffer) >= self.buffer_bytes:
+                self._flush_locked()
+
+    def append_store(self, session_id: str, product_id: str, timestamp: float, snapshot_hash: str,
+                     product: Tuple, source_url: Optional[str], agent_id: Optional[str],
+                     expires_at: Optional[float]):
+        """저장 기록"""
+        self._append(OP_STORE, (session_id, product_id, timestamp, snapshot_hash, product,
+                                source_url, agent_id, expires_at))
+
+    def append_delete(self, session_id: str, product_id: str):
+        """삭제 기록"""
+        self._append(OP_DELETE, (session_id, product_id))
+
+    def append_ttl(self, session_id: str, product_id: str, expires_at: Optional[float]):
+        """개별 만료 시각 변경 기록"""
+        self._append(OP_TTL, (session_id, product_id, expires_at))
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        self._log.write(self._buffer)
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self.log_bytes += len(self._buffer)
+        self._buffer.clear()
+        self.stats["fsyncs"] += 1
+
+    def flush(self):
+        """버퍼된 기록을 디스크에 반영 (fsync)"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"문맥 로그 기록 중 오류 발생: {e}")
+
+    def needs_compaction(self) -> bool:
+        """로그가 압축 기준 크기를 넘었는지 확인"""
+        return self.log_bytes + len(self._buffer) >= self.compact_bytes
+
+    def write_snapshot(self, payloads: Iterable[Tuple[str, Tuple]], records: Iterable[Tuple],
+                       histories: Iterable[Tuple] = ()):
+        """
+        현재 상태를 스냅샷 파일로 기록하고 로그를 비움
+        버전 이력은 레코드 뒤에 기록하므로, 복구 시 이력의 첫 버전 스냅샷은 레코드가 참조하지 않는 경우에만 새로 적재됨
+
+        스냅샷은 임시 파일에 쓴 뒤 원자적으로 교체하므로, 교체 직후 로그를 비우기 전에
+        중단되더라도 로그 재생은 멱등이라 상태가 손상되지 않음
+        """
+        temp_path = self.snapshot_path + ".tmp"
+        with self._lock:
+            self._flush_locked()
+            with open(temp_path, "wb") as snapshot:
+                snapshot.write(_SNAPSHOT_MAGIC)
+                chunk = bytearray()
+                for payload in payloads:
+                    chunk += _frame(OP_PAYLOAD, pickle.dumps(payload, _PICKLE_PROTOCOL))
+                    if len(chunk) >= self.buffer_bytes:
+                        snapshot.write(chunk)
+                        chunk.clear()
+                for op, entries in ((OP_RECORD, records), (OP_HISTORY, histories)):
+                    for entry in entries:
+                        chunk += _frame(op, pickle.dumps(entry, _PICKLE_PROTOCOL))
+                        if len(chunk) >= self.buffer_bytes:
+                            snapshot.write(chunk)
+                            chunk.clear()
+                snapshot.write(chunk)
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(temp_path, self.snapshot_path)
+
+            self._log.close()
+            self._log = open(self.log_path, "wb")
+            os.fsync(self._log.fileno())
+            self.log_bytes = 0
+            self.stats["compactions"] += 1
+
+    def replay(self, handlers: Dict[int, Callable[[Tuple], Any]],
+               after_snapshot: Optional[Callable[[], Any]] = None) -> Dict[str, int]:
+        """
+        스냅샷(mmap)과 로그를 순서대로 읽어 연산 코드별 핸들러 호출
+
+        Args:
+            handlers: {연산 코드: 핸들러}
+            after_snapshot: 스냅샷 적재 후, 로그 재생 전에 호출할 콜백
+
+        Returns:
+            {"snapshot": 스냅샷 프레임 수, "log": 로그 프레임 수}
+        """
+        counts = {"snapshot": 0, "log": 0}
+        if os.path.exists(self.snapshot_path) and os.path.getsize(self.snapshot_path) > len(_SNAPSHOT_MAGIC):
+            with open(self.snapshot_path, "rb") as snapshot, \
+                    mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if mapped[:len(_SNAPSHOT_MAGIC)] != _SNAPSHOT_MAGIC:
+                    raise ValueError(f"올바르지 않은 문맥 스냅샷 파일: {self.snapshot_path}")
+                for op, entry, _ in _iter_frames(mapped, len(_SNAPSHOT_MAGIC)):
+                    handlers[op](entry)
+                    counts["snapshot"] += 1
+        if after_snapshot is not None:
+            after_snapshot()
+
+        with self._lock:
+            self._flush_locked()
+            valid_end = 0
+            if os.path.getsize(self.log_path) > 0:
+                with open(self.log_path, "rb") as log, \
+                        mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for op, entry, valid_end in _iter_frames(mapped):
+                        handlers[op](entry)
+                        counts["log"] += 1
+            if valid_end < self.log_bytes:
+                # 중간에 끊긴 마지막 기록은 버리고 이후 기록이 올바른 위치에 이어지도록 잘라냄
+                logger.warning(f"문맥 로그의 손상된 꼬리 {self.log_bytes - valid_end}바이트 제거")
+                self._log.truncate(valid_end)
+                self._log.seek(valid_end)
+                self.log_bytes = valid_end
+        return counts
+
+    def close(self):
+        """남은 기록을 반영하고 로그 파일 닫기"""
+        self._stop.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._log.close()
@@ -0,0 +1,101 @@
+from typing import Dict, Optional, Any, Tuple
+from collections import OrderedDict
+
+# 레코드 하나의 고정 비용 추정치 (경량 레코드 객체, 세션 딕셔너리 항목, 만료 인덱스 항목, LRU 항목)
+RECORD_OVERHEAD_BYTES = 320
+
+Key = Tuple[str, str]
+
+
+class MemoryBudget:
+    """
+    문맥 저장소 메모리 예산
+    레코드별 추정 바이트 수를 집계하고, 전역/세션 한도 초과 시 축출할 레코드를 LRU 순으로 선정
+
+    장바구니/결제 단계의 활성 문맥과 조회 단계 문맥을 별도의 LRU로 관리하여
+    조회 단계 문맥을 먼저 축출
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, max_session_bytes: Optional[int] = None,
+                 tombstone_limit: int = 100000):
+        """
+        Args:
+            max_bytes: 전체 문맥 메모리 한도 (None이면 무제한)
+            max_session_bytes: 세션별 문맥 메모리 한도 (None이면 무제한)
+            tombstone_limit: 축출 기록을 보관할 최대 레코드 수
+        """
+        self.max_bytes = max_bytes
+        self.max_session_bytes = max_session_bytes
+        self.tombstone_limit = tombstone_limit
+
+        self.record_bytes = 0  # 레코드 고정 비용 합계 (공유 스냅샷은 풀에서 별도 집계)
+        self.session_bytes: Dict[str, int] = {}  # 세션별 사용량 (참조하는 스냅샷 크기 포함)
+        # LRU: {활성 여부: OrderedDict[(session_id, product_id)]}
+        self._lru: Dict[bool, "OrderedDict[Key, None]"] = {False: OrderedDict(), True: OrderedDict()}
+        self._tombstones: "OrderedDict[Key, None]" = OrderedDict()
+        self.stats: Dict[str, int] = {"evicted_global": 0, "evicted_session": 0, "evicted_active": 0,
+                                      "evicted_bytes": 0, "evicted_misses": 0}
+
+    @property
+    def tracks_lru(self) -> bool:
+        """접근 순서 추적 필요 여부 (한도가 설정된 경우에만)"""
+        return self.max_bytes is not None or self.max_session_bytes is not None
+
+    def add(self, session_id: str, product_id: str, record_bytes: int, snapshot_bytes: int, active: bool):
+        """레코드 추가 집계"""
+        self.record_bytes += record_bytes
+        self.session_bytes[session_id] = self.session_bytes.get(session_id, 0) + record_bytes + snapshot_bytes
+        if self.max_bytes is not None:
+            self._lru[active][(session_id, product_id)] = None
+        if self._tombstones:
+            self._tombstones.pop((session_id, product_id), None)
+
+    def remove(self, session_id: str, product_id: str, record_bytes: int, snapshot_bytes: int, active: bool):
+        """레코드 제거 집계"""
+        self.record_bytes -= record_bytes
+        remaining = self.session_bytes.get(session_id, 0) - record_bytes - snapshot_bytes
+        if remaining > 0:
+            self.session_bytes[session_id] = remaining
+        else:
+            self.session_bytes.pop(session_id, None)
+        if self.max_bytes is not None:
+            self._lru[active].pop((session_id, product_id), None)
+
+    def touch(self, session_id: str, product_id: str, active: bool):
+        """레코드 접근 기록 (LRU 갱신)"""
+        if self.max_bytes is not None:
+            self._lru[active].move_to_end((session_id, product_id))
+
+    def global_victim(self, protect: Optional[Key] = None) -> Optional[Key]:
+        """전역 한도 초과 시 축출할 레코드 (조회 단계 문맥 우선, 없으면 활성 문맥)"""
+        for active in (False, True):
+            for key in self._lru[active]:
+                # 방금 저장한 레코드는 건너뜀 (보호 대상은 하나뿐이므로 최대 한 번)
+                if key != protect:
+                    return key
+        return None
+
+    def record_eviction(self, session_id: str, product_id: str, nbytes: int, active: bool, scope: str):
+        """축출 기록 (이후 조회 실패 원인 구분용)"""
+        self.stats[f"evicted_{scope}"] += 1
+        self.stats["evicted_bytes"] += nbytes
+        if active:
+            self.stats["evicted_active"] += 1
+        self._tombstones[(session_id, product_id)] = None
+        if len(self._tombstones) > self.tombstone_limit:
+            self._tombstones.popitem(last=False)
+
+    def was_evicted(self, session_id: str, product_id: str) -> bool:
+        """메모리 한도로 축출된 레코드인지 확인"""
+        return (session_id, product_id) in self._tombstones
+
+    def get_stats(self, snapshot_bytes: int) -> Dict[str, Any]:
+        """사용량 및 축출 통계"""
+        return {
+            **self.stats,
+            "used_bytes": self.record_bytes + snapshot_bytes,
+            "max_bytes": self.max_bytes,
+            "max_session_bytes": self.max_session_bytes,
+            "largest_session_bytes": max(self.session_bytes.values(), default=0),
+            "sessions": len(self.session_bytes)
+        }
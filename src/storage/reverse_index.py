@@ -0,0 +1,107 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from bisect import bisect_left, insort
+
+
+class ContextReverseIndex:
+    """
+    문맥 저장소 보조 인덱스
+    상품 → 세션, 에이전트 → 세션, 저장 시각 순 인덱스를 저장/삭제와 함께 갱신하여
+    상품 변경 시 영향받는 세션을 전체 세션 순회 없이 찾을 수 있게 함
+    """
+
+    def __init__(self, is_live: Callable[[str, str, float], bool], min_compact: int = 1024):
+        """
+        Args:
+            is_live: (session_id, product_id, 저장 시각)의 레코드가 아직 저장되어 있는지 확인하는 콜백
+            min_compact: 시각 인덱스 재구성을 고려하기 시작하는 최소 무효 항목 수
+        """
+        self._is_live = is_live
+        self._min_compact = min_compact
+        self._product_sessions: Dict[str, Set[str]] = {}
+        # {agent_id: {session_id: 해당 에이전트가 저장한 문맥 수}}
+        self._agent_sessions: Dict[str, Dict[str, int]] = {}
+        # 저장 시각 순 정렬 목록 [(시각, session_id, product_id)] - 삭제는 지연 처리
+        # (만료 시각만 바뀌는 갱신은 저장 시각이 같으므로 재등록하지 않음)
+        self._by_time: List[Tuple[float, str, str]] = []
+        self._stale = 0
+
+    def add(self, session_id: str, product_id: str, agent_id: Optional[str], timestamp: float):
+        """레코드 등록"""
+        self._product_sessions.setdefault(product_id, set()).add(session_id)
+        if agent_id is not None:
+            sessions = self._agent_sessions.setdefault(agent_id, {})
+            sessions[session_id] = sessions.get(session_id, 0) + 1
+        entry = (timestamp, session_id, product_id)
+        # 저장 시각은 대부분 단조 증가하므로 끝에 추가되는 경우가 대부분
+        if not self._by_time or self._by_time[-1] <= entry:
+            self._by_time.append(entry)
+        else:
+            insort(self._by_time, entry)
+
+    def add_unordered(self, session_id: str, product_id: str, agent_id: Optional[str], timestamp: float):
+        """대량 적재용 등록 (시각 순서를 유지하지 않으므로 적재 후 반드시 sort 호출)"""
+        self._product_sessions.setdefault(product_id, set()).add(session_id)
+        if agent_id is not None:
+            sessions = self._agent_sessions.setdefault(agent_id, {})
+            sessions[session_id] = sessions.get(session_id, 0) + 1
+        self._by_time.append((timestamp, session_id, product_id))
+
+    def sort(self):
+        """add_unordered로 적재한 항목의 시각 순서 복구"""
+        self._by_time.sort()
+
+    def remove(self, session_id: str, product_id: str, agent_id: Optional[str]):
+        """레코드 등록 해제 (덮어쓰기 시에는 add 이전에 호출)"""
+        sessions = self._product_sessions.get(product_id)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del self._product_sessions[product_id]
+        if agent_id is not None:
+            counts = self._agent_sessions.get(agent_id)
+            if counts is not None:
+                remaining = counts.get(session_id, 0) - 1
+                if remaining > 0:
+                    counts[session_id] = remaining
+                else:
+                    counts.pop(session_id, None)
+                    if not counts:
+                        del self._agent_sessions[agent_id]
+        self._stale += 1
+        if self._stale >= self._min_compact and self._stale * 2 > len(self._by_time):
+            self.compact()
+
+    def compact(self):
+        """시각 인덱스에서 무효 항목 제거"""
+        self._by_time = [entry for entry in self._by_time if self._is_live(entry[1], entry[2], entry[0])]
+        self._stale = 0
+
+    def sessions_for_product(self, product_id: str) -> Set[str]:
+        """상품 문맥을 가진 세션 (읽기 전용)"""
+        return self._product_sessions.get(product_id, set())
+
+    def sessions_for_agent(self, agent_id: str) -> List[str]:
+        """에이전트가 문맥을 저장한 세션"""
+        return list(self._agent_sessions.get(agent_id, ()))
+
+    def in_range(self, start: float, end: float) -> Iterator[Tuple[str, str]]:
+        """저장 시각이 [start, end) 구간인 유효 레코드를 시각 순으로 순회 [(session_id, product_id)]"""
+        entries = self._by_time
+        index = bisect_left(entries, (start,))
+        seen = set()
+        while index < len(entries) and entries[index][0] < end:
+            timestamp, session_id, product_id = entries[index]
+            # 삭제 후 같은 시각으로 다시 저장된 레코드는 항목이 둘이므로 한 번만 반환
+            if self._is_live(session_id, product_id, timestamp) and (session_id, product_id) not in seen:
+                seen.add((session_id, product_id))
+                yield session_id, product_id
+            index += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """인덱스 통계"""
+        return {
+            "products": len(self._product_sessions),
+            "agents": len(self._agent_sessions),
+            "time_entries": len(self._by_time),
+            "stale_time_entries": self._stale
+        }
@@ -0,0 +1,486 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from datetime import datetime
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+from src.models.data_models import ProductInfo, ContextRecord
+
+_MAGIC = b"CTXSHM01"
+
+# 헤더: 매직, 시퀀스(쓰는 중이면 홀수), 슬롯 수, 영역 크기, 영역 사용량, 문맥 수, 삭제 표시 슬롯 수
+_HEADER = struct.Struct("<8sQQQQQQ")
+_HEADER_BYTES = 64
+_SEQ_OFFSET = 8
+_SEQ = struct.Struct("<Q")
+
+# 슬롯: 키 해시, 세션 해시, 상품 해시, 에이전트 해시(없으면 0), 저장 시각, 만료 시각(없으면 0, 둘 다 epoch 마이크로초),
+#       레코드 오프셋, 레코드 길이
+_SLOT = struct.Struct("<QQQQqqQI4x")
+_EMPTY = 0
+_TOMBSTONE = 1
+
+# 레코드 앞부분: 세션/상품 ID 길이 (키 비교 시 나머지를 디코딩하지 않도록 ID를 원문으로 먼저 저장)
+_KEYS = struct.Struct("<HH")
+
+# 삭제 표시를 포함한 슬롯 사용률이 이 값을 넘으면 재구성
+_MAX_LOAD = 0.7
+# 쓰기와 겹친 조회를 다시 시도하는 최대 횟수 (초과 시 공유 잠금으로 조회)
+_MAX_READ_RETRIES = 64
+
+_MICROS = 1_000_000
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+def default_shared_path() -> str:
+    """기본 공유 파일 경로 (/dev/shm이 있으면 메모리 파일 시스템 사용)"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "context_storage.shm")
+
+
+def _hash(value: str) -> int:
+    """64비트 해시 (0과 1은 빈 슬롯/삭제 표시용으로 예약)"""
+    digest = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest if digest > _TOMBSTONE else digest + 2
+
+
+def _to_micros(value: datetime) -> int:
+    return int(round(value.timestamp() * _MICROS))
+
+
+def _from_micros(value: int) -> datetime:
+    return datetime.fromtimestamp(value / _MICROS)
+
+
+class SharedMemoryContextStore:
+    """
+    프로세스 간 공유 문맥 저장소
+    메모리 파일(/dev/shm)을 mmap한 고정 배치의 해시 테이블(선형 탐사)과 레코드 영역으로 구성되어
+    같은 호스트의 여러 탐지 프로세스가 하나의 문맥 저장소를 공유함.
+
+    - 쓰기: 파일 잠금(fcntl)으로 프로세스 간 직렬화. 레코드는 영역 끝에 추가한 뒤 시퀀스를 홀수로 올린 상태에서
+      슬롯만 갱신하므로, 조회를 방해하는 구간이 짧음. 영역이 차면 살아 있는 레코드만 모아 다시 씀.
+    - 점 조회: 잠금 없이 시퀀스 잠금(seqlock)으로 읽음 - 조회 전후 시퀀스가 같을 때만 결과를 사용하고 아니면 재시도.
+    - 스캔(세션/상품/에이전트/시간 구간/만료 정리): 파일 공유 잠금을 잡고 슬롯의 해시/시각으로 거른 뒤 레코드를 디코딩.
+    """
+
+    def __init__(self, path: Optional[str] = None, slots: int = 1 << 17, arena_bytes: int = 64 << 20):
+        """
+        Args:
+            path: 공유 파일 경로 (이미 있으면 기존 저장소에 연결하고 slots/arena_bytes는 무시)
+            slots: 해시 테이블 슬롯 수 (2의 거듭제곱으로 올림, 최대 문맥 수는 약 70%)
+            arena_bytes: 레코드 영역 크기
+        """
+        self.path = path or default_shared_path()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        # flock은 같은 파일 기술자를 쓰는 스레드끼리는 배제하지 않으므로 프로세스 내 잠금을 함께 사용
+        self._lock = threading.Lock()
+        self.stats = {"read_retries": 0, "locked_reads": 0, "compactions": 0}
+        # 처음 여는 프로세스가 파일 크기와 헤더를 초기화하는 동안 다른 프로세스는 대기
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            self._mm = self._map(slots, arena_bytes)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        _, _, self.capacity, self.arena_bytes, _, _, _ = _HEADER.unpack_from(self._mm, 0)
+        self._mask = self.capacity - 1
+        self._table_offset = _HEADER_BYTES
+        self._arena_offset = _HEADER_BYTES + self.capacity * _SLOT.size
+
+    def _map(self, slots: int, arena_bytes: int) -> mmap.mmap:
+        """공유 파일 매핑 (빈 파일이면 크기를 정하고 헤더 초기화)"""
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            capacity = 1 << max(4, (slots - 1).bit_length())
+            size = _HEADER_BYTES + capacity * _SLOT.size + arena_bytes
+            os.ftruncate(self._fd, size)
+            mapped = mmap.mmap(self._fd, size)
+            _HEADER.pack_into(mapped, 0, _MAGIC, 0, capacity, arena_bytes, 0, 0, 0)
+            return mapped
+        mapped = mmap.mmap(self._fd, size)
+        if mapped[:len(_MAGIC)] != _MAGIC:
+            mapped.close()
+            raise ValueError(f"공유 문맥 저장소 파일이 아님: {self.path}")
+        return mapped
+
+    # ----- 잠금 / 시퀀스 -----
+
+    @contextmanager
+    def _exclusive(self):
+        """쓰기 잠금 (프로세스 내 스레드 + 프로세스 간)"""
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _shared(self):
+        """스캔용 공유 잠금 (다른 프로세스의 스캔과는 동시에, 쓰기와는 배타적으로 실행)"""
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _seq(self) -> int:
+        return _SEQ.unpack_from(self._mm, _SEQ_OFFSET)[0]
+
+    @contextmanager
+    def _publish(self):
+        """슬롯/헤더 갱신 구간 (시퀀스를 홀수로 올려 진행 중인 조회가 재시도하게 함, 쓰기 잠금 안에서만 호출)"""
+        seq = self._seq()
+        _SEQ.pack_into(self._mm, _SEQ_OFFSET, seq + 1)
+        try:
+            yield
+        finally:
+            _SEQ.pack_into(self._mm, _SEQ_OFFSET, seq + 2)
+
+    def _read_consistent(self, fn: Callable[[], Any]) -> Any:
+        """
+        잠금 없는 일관된 조회
+        시퀀스가 짝수이고 조회 전후에 같을 때만 결과를 사용 (겹친 쓰기 중에 읽은 값은 깨졌을 수 있으므로 버림)
+        """
+        for _ in range(_MAX_READ_RETRIES):
+            seq = self._seq()
+            if seq & 1:
+                self.stats["read_retries"] += 1
+                time.sleep(0)
+                continue
+            try:
+                result, error = fn(), None
+            except (struct.error, IndexError, ValueError) as e:
+                result, error = None, e
+            if self._seq() == seq:
+                if error is not None:
+                    raise error
+                return result
+            self.stats["read_retries"] += 1
+        # 쓰기가 계속 이어지면 공유 잠금으로 조회
+        self.stats["locked_reads"] += 1
+        with self._shared():
+            return fn()
+
+    # ----- 슬롯 / 레코드 -----
+
+    def _header(self) -> Tuple[int, int, int]:
+        """(영역 사용량, 문맥 수, 삭제 표시 슬롯 수)"""
+        _, _, _, _, arena_used, count, tombstones = _HEADER.unpack_from(self._mm, 0)
+        return arena_used, count, tombstones
+
+    def _set_header(self, arena_used: int, count: int, tombstones: int):
+        struct.pack_into("<QQQ", self._mm, 32, arena_used, count, tombstones)
+
+    def _slot(self, index: int) -> tuple:
+        return _SLOT.unpack_from(self._mm, self._table_offset + index * _SLOT.size)
+
+    def _write_slot(self, index: int, *fields):
+        _SLOT.pack_into(self._mm, self._table_offset + index * _SLOT.size, *fields)
+
+    def _payload(self, offset: int, length: int) -> bytes:
+        if offset + length > self.arena_bytes:
+            raise ValueError("레코드 범위 초과")
+        start = self._arena_offset + offset
+        return self._mm[start:start + length]
+
+    @staticmethod
+    def _encode(session_id: str, product_id: str, product_info: ProductInfo,
+                source_url: Optional[str], agent_id: Optional[str]) -> bytes:
+        session_bytes, product_bytes = session_id.encode("utf-8"), product_id.encode("utf-8")
+        body = pickle.dumps((product_info.product_id, product_info.price, product_info.description,
+                             product_info.attributes, product_info.metadata, source_url, agent_id),
+                            protocol=_PICKLE_PROTOCOL)
+        return _KEYS.pack(len(session_bytes), len(product_bytes)) + session_bytes + product_bytes + body
+
+    @staticmethod
+    def _keys(payload: bytes) -> Tuple[bytes, bytes]:
+        session_length, product_length = _KEYS.unpack_from(payload, 0)
+        start = _KEYS.size
+        return payload[start:start + session_length], payload[start + session_length:start + session_length + product_length]
+
+    @staticmethod
+    def _decode(payload: bytes, timestamp: int, expires: int) -> ContextRecord:
+        session_length, product_length = _KEYS.unpack_from(payload, 0)
+        start = _KEYS.size
+        body_start = start + session_length + product_length
+        (info_product_id, price, description, attributes, metadata,
+         source_url, agent_id) = pickle.loads(payload[body_start:])
+        return ContextRecord.construct(
+            session_id=payload[start:start + session_length].decode("utf-8"),
+            product_id=payload[start + session_length:body_start].decode("utf-8"),
+            timestamp=_from_micros(timestamp),
+            product_info=ProductInfo.construct(product_id=info_product_id, price=price, description=description,
+                                               attributes=attributes, metadata=metadata),
+            source_url=source_url,
+            agent_id=agent_id,
+            expires_at=_from_micros(expires) if expires else None
+        )
+
+    def _probe(self, key_hash: int, session_bytes: bytes, product_bytes: bytes) -> Tuple[Optional[int], Optional[int]]:
+        """
+        선형 탐사로 키의 슬롯 탐색
+
+        Returns:
+            (키가 있는 슬롯, 새로 저장할 수 있는 첫 슬롯)
+        """
+        free = None
+        index = key_hash & self._mask
+        for _ in range(self.capacity):
+            slot = self._slot(index)
+            if slot[0] == _EMPTY:
+                return None, free if free is not None else index
+            if slot[0] == _TOMBSTONE:
+                if free is None:
+                    free = index
+            elif slot[0] == key_hash and self._keys(self._payload(slot[6], slot[7])) == (session_bytes, product_bytes):
+                return index, free
+            index = (index + 1) & self._mask
+        return None, free
+
+    def _live_slots(self) -> Iterator[Tuple[int, tuple]]:
+        for index in range(self.capacity):
+            slot = self._slot(index)
+            if slot[0] > _TOMBSTONE:
+                yield index, slot
+
+    # ----- 쓰기 (쓰기 잠금 안에서 호출) -----
+
+    def _compact(self):
+        """살아 있는 레코드만 모아 영역과 해시 테이블을 다시 씀 (삭제 표시와 덮어쓴 레코드 공간 회수)"""
+        live = [(slot, self._payload(slot[6], slot[7])) for _, slot in self._live_slots()]
+        table = bytearray(self.capacity * _SLOT.size)
+        arena = bytearray()
+        for slot, payload in live:
+            index = slot[0] & self._mask
+            while _SLOT.unpack_from(table, index * _SLOT.size)[0] != _EMPTY:
+                index = (index + 1) & self._mask
+            _SLOT.pack_into(table, index * _SLOT.size, *slot[:6], len(arena), len(payload))
+            arena += payload
+        with self._publish():
+            self._mm[self._arena_offset:self._arena_offset + len(arena)] = arena
+            self._mm[self._table_offset:self._arena_offset] = table
+            self._set_header(len(arena), len(live), 0)
+        self.stats["compactions"] += 1
+
+    def _put_locked(self, session_id: str, product_id: str, timestamp: datetime, product_info: ProductInfo,
+                    source_url: Optional[str], agent_id: Optional[str], expires_at: Optional[datetime]):
+        payload = self._encode(session_id, product_id, product_info, source_url, agent_id)
+        session_bytes, product_bytes = self._keys(payload)
+        key_hash = _hash(f"{session_id}\x00{product_id}")
+        found, free = self._probe(key_hash, session_bytes, product_bytes)
+        arena_used, count, tombstones = self._header()
+        grows = found is None and (free is None or self._slot(free)[0] == _EMPTY)
+        if arena_used + len(payload) > self.arena_bytes or (
+                grows and count + tombstones + 1 > self.capacity * _MAX_LOAD):
+            self._compact()
+            found, free = self._probe(key_hash, session_bytes, product_bytes)
+            arena_used, count, tombstones = self._header()
+            if arena_used + len(payload) > self.arena_bytes or (
+                    found is None and count + 1 > self.capacity * _MAX_LOAD):
+                raise RuntimeError(f"공유 문맥 저장소 용량 부족 (문맥 {count}개, 영역 {arena_used}바이트)")
+
+        # 레코드는 아직 어떤 슬롯도 가리키지 않는 영역 끝에 쓰므로 조회와 겹쳐도 안전
+        start = self._arena_offset + arena_used
+        self._mm[start:start + len(payload)] = payload
+        index = found if found is not None else free
+        reused_tombstone = found is None and self._slot(index)[0] == _TOMBSTONE
+        with self._publish():
+            self._write_slot(index, key_hash, _hash(session_id), _hash(product_id),
+                             _hash(agent_id) if agent_id is not None else 0,
+                             _to_micros(timestamp), _to_micros(expires_at) if expires_at is not None else 0,
+                             arena_used, len(payload))
+            self._set_header(arena_used + len(payload), count + (found is None),
+                             tombstones - reused_tombstone)
+
+    def _find_locked(self, session_id: str, product_id: str) -> Optional[int]:
+        return self._probe(_hash(f"{session_id}\x00{product_id}"),
+                           session_id.encode("utf-8"), product_id.encode("utf-8"))[0]
+
+    def _delete_slots(self, indexes: List[int]):
+        if not indexes:
+            return
+        arena_used, count, tombstones = self._header()
+        with self._publish():
+            for index in indexes:
+                self._write_slot(index, _TOMBSTONE, 0, 0, 0, 0, 0, 0, 0)
+            self._set_header(arena_used, count - len(indexes), tombstones + len(indexes))
+
+    # ----- 백엔드 인터페이스 -----
+
+    def store(self, record: ContextRecord):
+        """레코드 저장"""
+        self.put(record.session_id, record.product_id, record.timestamp, record.product_info,
+                 record.source_url, record.agent_id, record.expires_at)
+
+    def put(self, session_id: str, product_id: str, timestamp: datetime, product_info: ProductInfo,
+            source_url: Optional[str] = None, agent_id: Optional[str] = None,
+            expires_at: Optional[datetime] = None):
+        """문맥 저장 (같은 키가 있으면 덮어씀)"""
+        with self._exclusive():
+            self._put_locked(session_id, product_id, timestamp, product_info, source_url, agent_id, expires_at)
+
+    def store_many(self, records: Iterable[ContextRecord]):
+        """여러 레코드 저장 (쓰기 잠금을 한 번만 획득)"""
+        with self._exclusive():
+            for record in records:
+                self._put_locked(record.session_id, record.product_id, record.timestamp, record.product_info,
+                                 record.source_url, record.agent_id, record.expires_at)
+
+    def _lookup(self, session_id: str, product_id: str) -> Optional[Tuple[bytes, int, int]]:
+        """잠금 없이 (레코드, 저장 시각, 만료 시각) 조회"""
+        key_hash = _hash(f"{session_id}\x00{product_id}")
+        keys = (session_id.encode("utf-8"), product_id.encode("utf-8"))
+
+        def read():
+            index = key_hash & self._mask
+            for _ in range(self.capacity):
+                slot = self._slot(index)
+                if slot[0] == _EMPTY:
+                    return None
+                if slot[0] == key_hash:
+                    payload = self._payload(slot[6], slot[7])
+                    if self._keys(payload) == keys:
+                        return payload, slot[4], slot[5]
+                index = (index + 1) & self._mask
+            return None
+
+        return self._read_consistent(read)
+
+    def get(self, session_id: str, product_id: str) -> Optional[ContextRecord]:
+        """문맥 조회 (잠금 없음)"""
+        found = self._lookup(session_id, product_id)
+        return self._decode(*found) if found is not None else None
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], ContextRecord]:
+        """여러 (session_id, product_id) 문맥 조회 (없는 키는 제외)"""
+        found = {}
+        for session_id, product_id in pairs:
+            record = self.get(session_id, product_id)
+            if record is not None:
+                found[(session_id, product_id)] = record
+        return found
+
+    def set_expiry(self, session_id: str, product_id: str, expires_at: Optional[datetime]) -> bool:
+        """문맥의 개별 만료 시각 변경 (존재하지 않으면 False)"""
+        with self._exclusive():
+            index = self._find_locked(session_id, product_id)
+            if index is None:
+                return False
+            slot = list(self._slot(index))
+            slot[5] = _to_micros(expires_at) if expires_at is not None else 0
+            with self._publish():
+                self._write_slot(index, *slot)
+            return True
+
+    def set_expiry_many(self, session_id: str, product_ids: List[str], expires_at: Optional[datetime]) -> int:
+        """세션의 여러 문맥의 개별 만료 시각 변경 (변경된 문맥 수 반환)"""
+        return sum(1 for product_id in product_ids if self.set_expiry(session_id, product_id, expires_at))
+
+    def delete(self, session_id: str, product_id: str) -> bool:
+        """문맥 삭제 (존재하지 않으면 False)"""
+        with self._exclusive():
+            index = self._find_locked(session_id, product_id)
+            if index is None:
+                return False
+            self._delete_slots([index])
+            return True
+
+    def cleanup(self, cutoff: datetime, now: Optional[datetime] = None, limit: Optional[int] = None) -> int:
+        """만료된 문맥 삭제 (슬롯의 시각 필드만 스캔하고 레코드는 디코딩하지 않음)"""
+        cutoff_micros = _to_micros(cutoff)
+        now_micros = _to_micros(now or datetime.now())
+        with self._exclusive():
+            expired = []
+            for index, slot in self._live_slots():
+                timestamp, expires = slot[4], slot[5]
+                if (expires and expires < now_micros) or (not expires and timestamp < cutoff_micros):
+                    expired.append(index)
+                    if limit is not None and len(expired) >= limit:
+                        break
+            self._delete_slots(expired)
+            return len(expired)
+
+    def _scan(self, field: int, value: int) -> List[ContextRecord]:
+        """슬롯 필드 해시가 일치하는 레코드 디코딩 (공유 잠금 안에서 호출)"""
+        return [self._decode(self._payload(slot[6], slot[7]), slot[4], slot[5])
+                for _, slot in self._live_slots() if slot[field] == value]
+
+    def get_session(self, session_id: str) -> List[ContextRecord]:
+        """세션의 모든 문맥 조회"""
+        with self._shared():
+            return [record for record in self._scan(1, _hash(session_id)) if record.session_id == session_id]
+
+    def session_ids(self) -> List[str]:
+        """저장된 모든 세션 ID"""
+        with self._shared():
+            sessions = {}
+            for _, slot in self._live_slots():
+                if slot[1] not in sessions:
+                    sessions[slot[1]] = self._keys(self._payload(slot[6], slot[7]))[0].decode("utf-8")
+            return list(sessions.values())
+
+    def sessions_for_product(self, product_id: str) -> List[str]:
+        """상품 문맥을 가진 세션 ID"""
+        product_bytes = product_id.encode("utf-8")
+        product_hash = _hash(product_id)
+        with self._shared():
+            sessions = []
+            for _, slot in self._live_slots():
+                if slot[2] == product_hash:
+                    session_bytes, stored_product = self._keys(self._payload(slot[6], slot[7]))
+                    if stored_product == product_bytes:
+                        sessions.append(session_bytes.decode("utf-8"))
+            return sessions
+
+    def sessions_for_agent(self, agent_id: str) -> List[str]:
+        """에이전트가 문맥을 저장한 세션 ID"""
+        with self._shared():
+            records = self._scan(3, _hash(agent_id))
+        return list(dict.fromkeys(record.session_id for record in records if record.agent_id == agent_id))
+
+    def in_range(self, start: datetime, end: datetime, limit: Optional[int] = None) -> List[ContextRecord]:
+        """저장 시각이 [start, end) 구간인 문맥을 시각 순으로 조회 (슬롯 시각 필드 순차 스캔)"""
+        start_micros, end_micros = _to_micros(start), _to_micros(end)
+        with self._shared():
+            slots = sorted((slot[4], index, slot) for index, slot in self._live_slots()
+                           if start_micros <= slot[4] < end_micros)
+            if limit is not None:
+                slots = slots[:limit]
+            return [self._decode(self._payload(slot[6], slot[7]), slot[4], slot[5]) for _, _, slot in slots]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """저장소 통계 (재시도/잠금 조회/압축 횟수는 현재 프로세스 기준)"""
+        arena_used, count, tombstones = self._header()
+        return {
+            "contexts": count,
+            "slots": self.capacity,
+            "tombstones": tombstones,
+            "arena_used": arena_used,
+            "arena_bytes": self.arena_bytes,
+            **self.stats
+        }
+
+    def close(self):
+        """매핑 해제 (공유 파일은 다른 프로세스가 사용할 수 있으므로 남겨 둠)"""
+        with self._lock:
+            if self._mm.closed:
+                return
+            self._mm.close()
+            os.close(self._fd)
+
+    def unlink(self):
+        """공유 파일 삭제 (모든 프로세스가 사용을 마친 뒤 호출)"""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
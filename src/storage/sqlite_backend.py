@@ -0,0 +1,290 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Any
+from datetime import datetime
+import json
+import sqlite3
+import threading
+import time
+from loguru import logger
+from src.models.data_models import ProductInfo, ContextRecord
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS contexts (
+        session_id TEXT NOT NULL,
+        product_id TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        source_url TEXT,
+        agent_id TEXT,
+        payload BLOB NOT NULL,
+        expires_at REAL,
+        PRIMARY KEY (session_id, product_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_contexts_timestamp ON contexts (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_contexts_expires_at ON contexts (expires_at) WHERE expires_at IS NOT NULL",
+    # 상품 변경 시 영향받는 세션 / 에이전트별 세션 조회용 역방향 인덱스
+    "CREATE INDEX IF NOT EXISTS idx_contexts_product ON contexts (product_id, session_id)",
+    "CREATE INDEX IF NOT EXISTS idx_contexts_agent ON contexts (agent_id, session_id) WHERE agent_id IS NOT NULL",
+)
+
+_COLUMNS = "session_id, product_id, timestamp, source_url, agent_id, payload, expires_at"
+_QUALIFIED_COLUMNS = ", ".join(f"c.{column}" for column in _COLUMNS.split(", "))
+_UPSERT = f"INSERT OR REPLACE INTO contexts ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_DELETE = "DELETE FROM contexts WHERE session_id = ? AND product_id = ?"
+_SELECT_ONE = f"SELECT {_COLUMNS} FROM contexts WHERE session_id = ? AND product_id = ?"
+_SELECT_SESSION = f"SELECT {_COLUMNS} FROM contexts WHERE session_id = ?"
+_SELECT_SESSION_IDS = "SELECT DISTINCT session_id FROM contexts"
+_SELECT_PRODUCT_SESSIONS = "SELECT session_id FROM contexts WHERE product_id = ?"
+_SELECT_AGENT_SESSIONS = "SELECT DISTINCT session_id FROM contexts WHERE agent_id = ?"
+_SELECT_RANGE = (f"SELECT {_COLUMNS} FROM contexts WHERE timestamp >= ? AND timestamp < ? "
+                 "ORDER BY timestamp LIMIT ?")
+# 한 문장에 넣을 최대 키 수 (SQLite 바인딩 변수 한도 999 이내)
+_CHUNK = 400
+# 기본 보관 기간이 지난 레코드와 개별 만료 시각이 지난 레코드를 각각의 인덱스로 찾아 삭제 (LIMIT -1은 무제한)
+_DELETE_OLDER = ("DELETE FROM contexts WHERE (session_id, product_id) IN ("
+                 "SELECT session_id, product_id FROM contexts "
+                 "WHERE timestamp < ? AND expires_at IS NULL LIMIT ?)")
+_DELETE_EXPIRED = ("DELETE FROM contexts WHERE (session_id, product_id) IN ("
+                   "SELECT session_id, product_id FROM contexts WHERE expires_at < ? LIMIT ?)")
+
+# 배치 버퍼에서 삭제 예정임을 나타내는 표식
+_DELETED = object()
+
+
+def encode_product_info(product_info: ProductInfo) -> bytes:
+    """ProductInfo를 압축된 JSON 바이트로 인코딩"""
+    return json.dumps(product_info.dict(), ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def decode_product_info(payload: bytes) -> ProductInfo:
+    """인코딩된 바이트를 ProductInfo로 복원 (직접 저장한 데이터이므로 검증 생략)"""
+    return ProductInfo.construct(**json.loads(payload))
+
+
+class SQLiteContextBackend:
+    """
+    SQLite 문맥 저장소 백엔드
+    WAL 모드와 배치 트랜잭션으로 문맥 레코드를 디스크에 영속화
+    """
+
+    def __init__(self, path: str = "context_storage.db", batch_size: int = 256, flush_interval: float = 0.05):
+        """
+        Args:
+            path: 데이터베이스 파일 경로 (":memory:"는 메모리 DB)
+            batch_size: 한 트랜잭션으로 묶을 최대 쓰기 수
+            flush_interval: 버퍼된 쓰기를 커밋하는 최대 지연 (초)
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=64)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+        # 아직 커밋되지 않은 쓰기 {(session_id, product_id): row 또는 _DELETED}
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        self._last_flush = time.monotonic()
+        logger.info(f"SQLite 문맥 저장소 연결 완료: {path}")
+
+    @staticmethod
+    def _to_row(session_id: str, product_id: str, timestamp: datetime, product_info: ProductInfo,
+                source_url: Optional[str], agent_id: Optional[str], expires_at: Optional[datetime]) -> Tuple:
+        return (session_id, product_id, timestamp.timestamp(), source_url, agent_id,
+                encode_product_info(product_info), expires_at.timestamp() if expires_at else None)
+
+    @staticmethod
+    def _from_row(row: Tuple) -> ContextRecord:
+        session_id, product_id, timestamp, source_url, agent_id, payload, expires_at = row
+        return ContextRecord.construct(
+            session_id=session_id,
+            product_id=product_id,
+            timestamp=datetime.fromtimestamp(timestamp),
+            product_info=decode_product_info(payload),
+            source_url=source_url,
+            agent_id=agent_id,
+            expires_at=datetime.fromtimestamp(expires_at) if expires_at is not None else None
+        )
+
+    def _maybe_flush(self):
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """버퍼된 쓰기를 하나의 트랜잭션으로 커밋"""
+        with self._lock:
+            if not self._pending:
+                self._last_flush = time.monotonic()
+                return
+            upserts = [row for row in self._pending.values() if row is not _DELETED]
+            deletes = [key for key, row in self._pending.items() if row is _DELETED]
+            self._conn.execute("BEGIN")
+            try:
+                if upserts:
+                    self._conn.executemany(_UPSERT, upserts)
+                if deletes:
+                    self._conn.executemany(_DELETE, deletes)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._pending.clear()
+            self._last_flush = time.monotonic()
+
+    def store(self, record: ContextRecord):
+        """레코드 저장 (배치 버퍼에 추가)"""
+        self.put(record.session_id, record.product_id, record.timestamp, record.product_info,
+                 record.source_url, record.agent_id, record.expires_at)
+
+    def put(self, session_id: str, product_id: str, timestamp: datetime, product_info: ProductInfo,
+            source_url: Optional[str] = None, agent_id: Optional[str] = None,
+            expires_at: Optional[datetime] = None):
+        """필드 단위 저장 (배치 버퍼에 추가)"""
+        row = self._to_row(session_id, product_id, timestamp, product_info, source_url, agent_id, expires_at)
+        with self._lock:
+            self._pending[(session_id, product_id)] = row
+            self._maybe_flush()
+
+    def store_many(self, records: Iterable[ContextRecord]):
+        """여러 레코드 저장 (배치 버퍼에 한 번에 추가)"""
+        rows = [self._to_row(record.session_id, record.product_id, record.timestamp, record.product_info,
+                             record.source_url, record.agent_id, record.expires_at) for record in records]
+        with self._lock:
+            for row in rows:
+                self._pending[(row[0], row[1])] = row
+            self._maybe_flush()
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], ContextRecord]:
+        """
+        여러 (session_id, product_id) 레코드 조회
+        커밋 전 쓰기는 버퍼에서 찾고, 나머지는 키 목록과 조인하는 쿼리로 묶어서 조회
+        """
+        rows: Dict[Tuple[str, str], Tuple] = {}
+        with self._lock:
+            missing = []
+            for key in dict.fromkeys(pairs):
+                pending = self._pending.get(key)
+                if pending is _DELETED:
+                    continue
+                if pending is not None:
+                    rows[key] = pending
+                else:
+                    missing.append(key)
+            for start in range(0, len(missing), _CHUNK):
+                chunk = missing[start:start + _CHUNK]
+                query = (f"SELECT {_QUALIFIED_COLUMNS} FROM (VALUES {', '.join(['(?, ?)'] * len(chunk))}) AS keys "
+                         "JOIN contexts c ON c.session_id = keys.column1 AND c.product_id = keys.column2")
+                for row in self._conn.execute(query, [value for key in chunk for value in key]):
+                    rows[(row[0], row[1])] = row
+        return {key: self._from_row(row) for key, row in rows.items()}
+
+    def set_expiry_many(self, session_id: str, product_ids: List[str], expires_at: Optional[datetime]) -> int:
+        """세션의 여러 레코드의 개별 만료 시각 변경 (변경된 레코드 수 반환)"""
+        value = expires_at.timestamp() if expires_at else None
+        with self._lock:
+            self.flush()
+            count = 0
+            for start in range(0, len(product_ids), _CHUNK):
+                chunk = product_ids[start:start + _CHUNK]
+                count += self._conn.execute(
+                    f"UPDATE contexts SET expires_at = ? WHERE session_id = ? "
+                    f"AND product_id IN ({', '.join(['?'] * len(chunk))})",
+                    [value, session_id, *chunk]
+                ).rowcount
+            return count
+
+    def _get_row(self, session_id: str, product_id: str) -> Optional[Tuple]:
+        pending = self._pending.get((session_id, product_id))
+        if pending is _DELETED:
+            return None
+        return pending or self._conn.execute(_SELECT_ONE, (session_id, product_id)).fetchone()
+
+    def get(self, session_id: str, product_id: str) -> Optional[ContextRecord]:
+        """레코드 조회 (커밋 전 쓰기도 반영)"""
+        with self._lock:
+            row = self._get_row(session_id, product_id)
+        return self._from_row(row) if row else None
+
+    def set_expiry(self, session_id: str, product_id: str, expires_at: Optional[datetime]) -> bool:
+        """레코드의 개별 만료 시각 변경 (존재하지 않으면 False)"""
+        with self._lock:
+            row = self._get_row(session_id, product_id)
+            if row is None:
+                return False
+            self._pending[(session_id, product_id)] = tuple(row[:6]) + (
+                expires_at.timestamp() if expires_at else None,)
+            self._maybe_flush()
+            return True
+
+    def get_session(self, session_id: str) -> List[ContextRecord]:
+        """세션의 모든 레코드 조회"""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(_SELECT_SESSION, (session_id,)).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def session_ids(self) -> List[str]:
+        """저장된 모든 세션 ID 조회"""
+        with self._lock:
+            self.flush()
+            return [row[0] for row in self._conn.execute(_SELECT_SESSION_IDS)]
+
+    def sessions_for_product(self, product_id: str) -> List[str]:
+        """상품 레코드를 가진 세션 ID 조회"""
+        with self._lock:
+            self.flush()
+            return [row[0] for row in self._conn.execute(_SELECT_PRODUCT_SESSIONS, (product_id,))]
+
+    def sessions_for_agent(self, agent_id: str) -> List[str]:
+        """에이전트가 레코드를 저장한 세션 ID 조회"""
+        with self._lock:
+            self.flush()
+            return [row[0] for row in self._conn.execute(_SELECT_AGENT_SESSIONS, (agent_id,))]
+
+    def in_range(self, start: datetime, end: datetime, limit: Optional[int] = None) -> List[ContextRecord]:
+        """저장 시각이 [start, end) 구간인 레코드를 시각 순으로 조회"""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(_SELECT_RANGE, (start.timestamp(), end.timestamp(),
+                                                      -1 if limit is None else limit)).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def delete(self, session_id: str, product_id: str) -> bool:
+        """레코드 삭제 (존재하지 않으면 False)"""
+        with self._lock:
+            if self._get_row(session_id, product_id) is None:
+                return False
+            self._pending[(session_id, product_id)] = _DELETED
+            self._maybe_flush()
+            return True
+
+    def cleanup(self, cutoff: datetime, now: Optional[datetime] = None, limit: Optional[int] = None) -> int:
+        """
+        만료된 레코드 삭제
+
+        Args:
+            cutoff: 개별 만료 시각이 없는 레코드의 기준 시각 (이전에 저장된 레코드 삭제)
+            now: 개별 만료 시각과 비교할 현재 시각
+            limit: 한 번에 삭제할 최대 레코드 수 (None이면 무제한)
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self.flush()
+            remaining = -1 if limit is None else limit
+            count = self._conn.execute(_DELETE_OLDER, (cutoff.timestamp(), remaining)).rowcount
+            if limit is not None:
+                remaining = limit - count
+                if remaining <= 0:
+                    return count
+            count += self._conn.execute(_DELETE_EXPIRED, (now.timestamp(), remaining)).rowcount
+            return count
+
+    def close(self):
+        """남은 쓰기를 커밋하고 연결 종료"""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+        logger.info(f"SQLite 문맥 저장소 연결 종료: {self.path}")
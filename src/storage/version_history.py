@@ -0,0 +1,73 @@
+from typing import Any, List, Optional, Tuple
+from datetime import datetime
+from src.models.data_models import ProductInfo
+from src.storage.interning import FrozenProductInfo
+
+# 버전 간 차이를 비교하는 ProductInfo 필드
+DELTA_FIELDS = ("product_id", "price", "description", "attributes", "metadata")
+
+
+Delta = Tuple[Tuple[str, Any], ...]
+
+
+def product_delta(previous: ProductInfo, current: ProductInfo) -> Delta:
+    """
+    이전 스냅샷 대비 바뀐 필드만 담은 차이 ((필드, 값) 튜플 - 딕셔너리보다 작음)
+    속성/메타데이터는 바뀌면 딕셔너리 전체를 참조 (공유 스냅샷의 객체이므로 복사하지 않음)
+    """
+    return tuple((field, getattr(current, field)) for field in DELTA_FIELDS
+                 if getattr(current, field) != getattr(previous, field))
+
+
+class VersionChain:
+    """
+    (세션, 상품) 문맥의 버전 이력
+    첫 버전은 스냅샷 풀의 공유 스냅샷 해시로만 참조하고, 이후 버전은 직전 버전 대비 바뀐 필드만 보관
+    """
+    __slots__ = ("base_hash", "base_timestamp", "deltas")
+
+    def __init__(self, base_hash: str, base_timestamp: datetime):
+        self.base_hash = base_hash
+        self.base_timestamp = base_timestamp
+        # [(해당 상태를 처음 본 시각(epoch 초), 직전 버전 대비 바뀐 필드)]
+        self.deltas: List[Tuple[float, Delta]] = []
+
+    def __len__(self) -> int:
+        return len(self.deltas) + 1
+
+    def append(self, timestamp: datetime, delta: Delta, max_versions: int):
+        """
+        버전 추가
+        버전 수가 max_versions를 넘으면 가장 오래된 두 차이를 합쳐 첫 버전과 최신 버전은 항상 보존
+        """
+        self.deltas.append((timestamp.timestamp(), delta))
+        if len(self.deltas) >= max_versions and len(self.deltas) >= 2:
+            (_, older), (newer_timestamp, newer) = self.deltas[0], self.deltas[1]
+            merged = dict(older)
+            merged.update(newer)
+            self.deltas[0:2] = [(newer_timestamp, tuple(merged.items()))]
+
+    def versions(self, base: ProductInfo) -> List[Tuple[datetime, ProductInfo]]:
+        """모든 버전을 오래된 순으로 복원 [(시각, 읽기 전용 상품 정보)] - 속성/메타데이터는 공유 스냅샷의 객체"""
+        fields = {field: getattr(base, field) for field in DELTA_FIELDS}
+        restored = [(self.base_timestamp, base)]
+        for timestamp, delta in self.deltas:
+            fields.update(delta)
+            restored.append((datetime.fromtimestamp(timestamp), FrozenProductInfo.construct(**fields)))
+        return restored
+
+    def index_at(self, at: datetime) -> Optional[int]:
+        """시각 at에 유효했던 버전 번호 (첫 버전 이전이면 None)"""
+        if at < self.base_timestamp:
+            return None
+        at = at.timestamp()
+        index = 0
+        for position, (timestamp, _) in enumerate(self.deltas, start=1):
+            if timestamp > at:
+                break
+            index = position
+        return index
+
+    def delta_fields(self) -> int:
+        """보관 중인 차이 필드 수 (통계용)"""
+        return sum(len(delta) for _, delta in self.deltas)
@@ -1,15 +1,26 @@
 from typing import Dict, Any, Optional, List, Callable
 import asyncio
-from datetime import datetime
+import uuid
 from loguru import logger
 
 from src.models.data_models import ProductInfo, DetectionResult, ContextRecord, NotificationMessage
 from src.interfaces.mcp_interface import MCPInterface, MCPProxy
 from src.storage.context_storage import ContextStorage
+from src.storage.concurrent_storage import ConcurrentContextStorage
+from src.storage.compression import train_dictionary
 from src.detectors.data_collector import DataCollector
 from src.detectors.comparator import ProductComparator
 from src.detectors.fraud_detector import FraudDetector
 from src.notification.notifier import Notifier, DefaultNotificationHandlers
+from src.notification.persistence import NotificationStore
+from src.notification.webhook import AgentWebhookHandler
+from src.notification.subscriptions import SubscriptionHub, Subscription
+from src.scheduler.verification_scheduler import PriorityVerificationExecutor, VerificationPriority
+from src.simulation.clock import create_clock
+from src.simulation.latency import create_latency_model
+
+# 여러 상품을 담는 MCP 응답 필드 (검색 결과, 장바구니 항목)
+PRODUCT_LIST_KEYS = ("results", "items", "products")
 
 class FraudDetectionSystem:
     """
@@ -24,30 +35,126 @@ class FraudDetectionSystem:
         """
         config = config or {}
         
+        # 시계 및 통신 지연 모델 (시뮬레이션 시 가상 시계로 교체 가능)
+        self.clock = create_clock(config.get("clock"))
+        self.latency_model = create_latency_model(config.get("latency_model"))
+        self.review_delay = config.get("review_delay", 1.0)
+        
+        # 문맥 보관 기간 (장바구니/결제 단계 문맥은 조회 단계보다 오래 보관) 및 백그라운드 만료 정리 설정
+        self.context_max_age_hours = config.get("context_max_age_hours", 24)
+        self.checkout_context_ttl_hours = config.get("checkout_context_ttl_hours", 72)
+        self.context_sweep_interval = config.get("context_sweep_interval")  # None이면 비활성화
+        self.context_sweep_max_per_run = config.get("context_sweep_max_per_run", 10000)
+        
         # 컴포넌트 초기화
         self.mcp_interface = MCPInterface()
-        self.mcp_proxy = MCPProxy(self.mcp_interface)
-        self.context_storage = ContextStorage(
-            storage_type=config.get("storage_type", "memory")
+        # 업스트림 쇼핑몰을 지정하면 프록시가 실제로 요청을 전달 (start()로 역방향 프록시 서버 실행)
+        self.mcp_proxy = MCPProxy(
+            self.mcp_interface,
+            upstream_url=config.get("mcp_upstream_url"),
+            pool_size=config.get("mcp_proxy_pool_size", 100)
+        )
+        storage_options = dict(
+            storage_type=config.get("storage_type", "memory"),
+            sqlite_path=config.get("sqlite_path", "context_storage.db"),
+            sqlite_batch_size=config.get("sqlite_batch_size", 256),
+            max_memory_bytes=config.get("max_context_memory_bytes"),
+            max_session_bytes=config.get("max_session_memory_bytes"),
+            journal_dir=config.get("context_journal_dir"),
+            journal_fsync_interval=config.get("context_journal_fsync_interval", 0.05),
+            compress_descriptions=config.get("compress_descriptions", False),
+            # storage_type이 shared이면 같은 경로를 쓰는 탐지 프로세스끼리 문맥 저장소 공유
+            shared_memory_path=config.get("shared_memory_path"),
+            clock=self.clock
         )
+        # 설명 압축 시 카탈로그 설명 표본으로 공유 사전을 한 번 학습 (잠금 분할 시 모든 구간이 같은 사전 사용)
+        if storage_options["compress_descriptions"] and config.get("description_dictionary_samples"):
+            storage_options["description_dictionary"] = train_dictionary(config["description_dictionary_samples"])
+        # 여러 스레드(Flask 등)와 공유할 때는 세션 해시로 잠금을 분할한 저장소 사용
+        if config.get("context_storage_stripes"):
+            self.context_storage = ConcurrentContextStorage(stripes=config["context_storage_stripes"],
+                                                            **storage_options)
+        else:
+            self.context_storage = ContextStorage(**storage_options)
         self.data_collector = DataCollector(
-            mcp_interface=self.mcp_interface
+            mcp_interface=self.mcp_interface,
+            clock=self.clock,
+            latency_model=self.latency_model
         )
         self.product_comparator = ProductComparator(
             price_threshold=config.get("price_threshold", 0.05),
-            description_similarity_threshold=config.get("description_threshold", 0.8)
+            description_similarity_threshold=config.get("description_threshold", 0.8),
+            process_pool_workers=config.get("comparison_process_workers", 0),
+            offload_threshold=config.get("comparison_offload_threshold", 4096)
         )
         self.fraud_detector = FraudDetector(
             context_storage=self.context_storage,
             data_collector=self.data_collector,
             product_comparator=self.product_comparator
         )
-        self.notifier = Notifier()
+        # 핸들러는 발송 스레드에서 실행되므로 느린 핸들러가 검증을 지연시키지 않음
+        # 메모리 알림 기록은 전체 기록을 조회할 수 있는 영속 저장소가 있을 때만 최근 알림으로 제한
+        persist_notifications = bool(config.get("notification_db_path"))
+        self.notifier = Notifier(
+            async_dispatch=config.get("notification_async_dispatch", True),
+            queue_size=config.get("notification_queue_size", 10000),
+            handler_timeout=config.get("notification_handler_timeout", 5.0),
+            workers=config.get("notification_workers", 4),
+            # 자동 검증이 같은 속임수를 반복 탐지해도 억제 기간 안에는 한 번만 알림 (악화 시에는 즉시 알림)
+            dedup_window=config.get("notification_dedup_window", 900),
+            digest_window=config.get("notification_digest_window", 0.0),
+            clock=self.clock,
+            history_per_session=config.get("notification_history_per_session", 100) if persist_notifications else None,
+            history_sessions=config.get("notification_history_sessions", 10000) if persist_notifications else None
+        )
+        # 알림/탐지 결과 영속화 (지정 시 전체 기록은 SQLite에 모아서 저장하고 메모리에는 최근 알림만 보관)
+        self.notification_store: Optional[NotificationStore] = None
+        if persist_notifications:
+            self.notification_store = NotificationStore(
+                config["notification_db_path"],
+                batch_size=config.get("notification_db_batch_size", 1000),
+                flush_interval=config.get("notification_db_flush_interval", 1.0)
+            )
+        # 세션 이벤트 구독 (에이전트가 알림/탐지 결과를 폴링 없이 기다릴 수 있도록)
+        self.subscriptions = SubscriptionHub(queue_size=config.get("subscription_queue_size", 100))
+        # 에이전트 웹훅 (에이전트별 콜백 주소로 알림을 묶어서 POST, 전달 실패 알림은 유출 파일에 기록)
+        self.agent_webhook: Optional[AgentWebhookHandler] = None
+        if config.get("agent_webhooks"):
+            self.agent_webhook = AgentWebhookHandler(
+                spill_path=config.get("agent_webhook_spill_path", "agent_webhook_spill.jsonl"),
+                batch_window=config.get("agent_webhook_batch_window", 0.2),
+                max_retries=config.get("agent_webhook_max_retries", 4),
+                request_timeout=config.get("agent_webhook_timeout", 5.0),
+                pool_size=config.get("agent_webhook_pool_size", 100),
+                default_rate_limit=config.get("agent_webhook_rate_limit", 10.0)
+            )
+            for agent_id, endpoint in config["agent_webhooks"].items():
+                # 주소 문자열 또는 {"url": ..., "rate_limit": ...}
+                if isinstance(endpoint, str):
+                    endpoint = {"url": endpoint}
+                self.agent_webhook.register_agent(agent_id, endpoint["url"], endpoint.get("rate_limit"))
+        
+        # 우선순위 검증 실행기 (결제 > 장바구니 > 백그라운드)
+        self.verification_executor = PriorityVerificationExecutor(
+            max_workers=config.get("verification_workers", 8),
+            reserved_workers=config.get("reserved_verification_workers", 2),
+            queue_latency_target=config.get("queue_latency_target", 0.5),
+            background_policy=config.get("background_policy", "defer"),
+            defer_delay=config.get("background_defer_delay", 1.0),
+            max_defers=config.get("background_max_defers", 3)
+        )
         
         # 기본 알림 핸들러 등록
+        self.console_notifications = config.get("console_notifications", True)
         self._setup_default_handlers()
         
-        # 인터셉터 등록
+        # 인터셉터 등록 (문맥 저장 인터셉터를 관찰 전용으로 실행할지 여부)
+        # 루프 밖 동기 호출의 관찰 전용 인터셉터는 관찰 스레드에서 실행되어 호출자 스레드와 동시에 저장소에 쓰므로,
+        # 스레드 안전한 잠금 분할 저장소(context_storage_stripes)를 쓸 때만 허용
+        self.observe_only_context_capture = config.get("observe_only_context_capture", False)
+        if self.observe_only_context_capture and not isinstance(self.context_storage, ConcurrentContextStorage):
+            logger.warning("관찰 전용 문맥 저장은 잠금 분할 저장소(context_storage_stripes)가 필요하여 응답 경로에서 저장")
+            self.observe_only_context_capture = False
         self._setup_interceptors()
         
         # 자동 검증 타이머 초기화
@@ -59,9 +166,10 @@ class FraudDetectionSystem:
         
     def _setup_default_handlers(self):
         """기본 알림 핸들러 설정"""
-        self.notifier.register_handler("info", DefaultNotificationHandlers.console_handler)
-        self.notifier.register_handler("warning", DefaultNotificationHandlers.console_handler)
-        self.notifier.register_handler("error", DefaultNotificationHandlers.console_handler)
+        if self.console_notifications:
+            self.notifier.register_handler("info", DefaultNotificationHandlers.console_handler)
+            self.notifier.register_handler("warning", DefaultNotificationHandlers.console_handler)
+            self.notifier.register_handler("error", DefaultNotificationHandlers.console_handler)
         
         self.notifier.register_handler("info", DefaultNotificationHandlers.log_handler)
         self.notifier.register_handler("warning", DefaultNotificationHandlers.log_handler)
@@ -70,46 +178,86 @@ class FraudDetectionSystem:
         self.notifier.register_handler("warning", DefaultNotificationHandlers.agent_response_handler)
         self.notifier.register_handler("error", DefaultNotificationHandlers.agent_response_handler)
         
+        if self.notification_store is not None:
+            for severity in ("info", "warning", "error"):
+                self.notifier.register_handler(severity, self.notification_store.handler, batch=True)
+        
+        for severity in ("info", "warning", "error"):
+            self.notifier.register_handler(severity, self.subscriptions.handler, batch=True)
+        
+        if self.agent_webhook is not None:
+            self.notifier.register_handler("warning", self.agent_webhook.handler, batch=True)
+            self.notifier.register_handler("error", self.agent_webhook.handler, batch=True)
+        
     def _setup_interceptors(self):
         """MCP 인터셉터 설정"""
         # 응답 인터셉터 - 상품 정보 추출 및 저장
-        def product_response_interceptor(response_data: Dict[str, Any]) -> Dict[str, Any]:
+        # 상품 조회(product), 검색 결과(results), 장바구니 항목(items)을 한 번에 추출하여 일괄 저장 한 번으로 기록
+        # 검색 결과와 장바구니 목록은 문맥이 없는 상품만 저장 (상품 조회 시점의 문맥을 목록 조회가 덮어쓰면
+        # 조회 이후의 변경을 장바구니 담기 검증에서 놓치게 됨)
+        def capture_contexts(response_data: Dict[str, Any], only_new: bool) -> Dict[str, Any]:
             try:
-                session_id = response_data.get("session_id", "unknown")
-                product_data = response_data.get("product", {})
-                
-                if not product_data:
+                products = []
+                if response_data.get("product"):
+                    products.append(response_data["product"])
+                for key in PRODUCT_LIST_KEYS:
+                    items = response_data.get(key)
+                    if isinstance(items, list):
+                        products.extend(items)
+                if not products:
                     return response_data
                     
-                product_info = self.mcp_interface.extract_product_info(product_data)
-                if product_info:
-                    self.context_storage.store_context(
-                        session_id=session_id,
-                        product_id=product_info.product_id,
-                        product_info=product_info,
-                        source_url=response_data.get("source_url")
+                session_id = response_data.get("session_id", "unknown")
+                source_url = response_data.get("source_url")
+                agent_id = response_data.get("agent_id")
+                now = self.clock.now()
+                # 같은 응답에 중복된 상품은 마지막 항목만 저장
+                records = {
+                    product_info.product_id: ContextRecord.construct(
+                        session_id=session_id, product_id=product_info.product_id, timestamp=now,
+                        product_info=product_info, source_url=source_url, agent_id=agent_id,
+                        snapshot_hash=None, expires_at=None
                     )
+                    for product_info in self.mcp_interface.extract_product_infos(products)
+                }
+                if records:
+                    self.context_storage.store_contexts(records.values(), only_new=only_new)
             except Exception as e:
                 logger.error(f"응답 인터셉터 오류: {e}")
                 
             return response_data
             
-        # 상품 응답 인터셉터 등록
-        self.mcp_interface.register_response_interceptor("get_product", product_response_interceptor)
-        self.mcp_interface.register_response_interceptor("search_products", product_response_interceptor)
+        def product_response_interceptor(response_data: Dict[str, Any]) -> Dict[str, Any]:
+            return capture_contexts(response_data, only_new=False)
+            
+        def listing_response_interceptor(response_data: Dict[str, Any]) -> Dict[str, Any]:
+            return capture_contexts(response_data, only_new=True)
+            
+        # 상품 응답 인터셉터 등록 (관찰 전용으로 설정하면 에이전트가 문맥 저장을 기다리지 않음)
+        observe_only = self.observe_only_context_capture
+        self.mcp_interface.register_response_interceptor("get_product", product_response_interceptor, observe_only)
+        for endpoint in ("search_products", "get_cart"):
+            self.mcp_interface.register_response_interceptor(endpoint, listing_response_interceptor, observe_only)
         
-    async def on_product_view(self, session_id: str, product_id: str, product_data: Dict[str, Any]) -> bool:
+    async def on_product_view(self, session_id: str, product_id: str, product_data: Dict[str, Any],
+                              agent_id: Optional[str] = None) -> bool:
         """상품 조회 시 핸들러 - 상품 정보 저장"""
         try:
             product_info = self.mcp_interface.extract_product_info(product_data)
             if not product_info:
                 logger.warning(f"상품 정보를 추출할 수 없음: {product_id}")
                 return False
+            
+            if self.context_sweep_interval is not None:
+                self.context_storage.start_sweeper(
+                    self.context_sweep_interval, self.context_sweep_max_per_run, self.context_max_age_hours
+                )
                 
             success = self.context_storage.store_context(
                 session_id=session_id,
                 product_id=product_id,
-                product_info=product_info
+                product_info=product_info,
+                agent_id=agent_id
             )
             
             logger.info(f"상품 조회 처리: 세션 {session_id}, 상품 {product_id}")
@@ -118,39 +266,87 @@ class FraudDetectionSystem:
             logger.error(f"상품 조회 처리 중 오류 발생: {e}")
             return False
     
-    async def verify_product_now(self, session_id: str, product_id: str) -> Optional[DetectionResult]:
-        """즉시 상품 검증 수행"""
+    async def verify_product_now(self, session_id: str, product_id: str,
+                                 priority: VerificationPriority = VerificationPriority.ADD_TO_CART,
+                                 context_record: Optional[ContextRecord] = None) -> Optional[DetectionResult]:
+        """즉시 상품 검증 수행 (우선순위 실행기를 통해 처리)"""
         try:
-            detection_result = await self.fraud_detector.verify_product(session_id, product_id)
-            
-            if detection_result and detection_result.is_fraud_detected:
-                # 알림 발송
-                notification = self.fraud_detector.create_notification(detection_result)
-                if notification:
-                    self.notifier.notify(notification)
-                    
-            return detection_result
+            return await self.verification_executor.submit(
+                priority, lambda: self._verify_and_notify(session_id, product_id, context_record)
+            )
         except Exception as e:
             logger.error(f"상품 검증 중 오류 발생: {e}")
             return None
             
+    async def _verify_and_notify(self, session_id: str, product_id: str,
+                                 context_record: Optional[ContextRecord] = None) -> Optional[DetectionResult]:
+        """상품 검증 후 속임수가 탐지되면 알림 발송"""
+        detection_result = await self.fraud_detector.verify_product(session_id, product_id, context_record)
+        if detection_result:
+            if self.notification_store is not None:
+                self.notification_store.record_detection(detection_result)
+            self.subscriptions.publish(detection_result)
+        
+        if detection_result and detection_result.is_fraud_detected:
+            # 알림 발송
+            notification = self.fraud_detector.create_notification(detection_result)
+            if notification:
+                # 문맥을 저장한 에이전트에게 알림이 전달되도록 수신 에이전트 지정
+                if context_record is None:
+                    context_record = self.context_storage.get_context(session_id, product_id)
+                if context_record is not None and context_record.agent_id is not None:
+                    notification = notification.copy(update={"agent_id": context_record.agent_id})
+                self.notifier.notify(notification)
+                
+        return detection_result
+            
     async def on_add_to_cart(self, session_id: str, product_id: str) -> Optional[DetectionResult]:
         """장바구니 추가 이벤트 핸들러 - 상품 검증"""
         logger.info(f"장바구니 추가: 세션 {session_id}, 상품 {product_id}")
-        return await self.verify_product_now(session_id, product_id)
+        self.context_storage.set_context_ttl(session_id, product_id, self.checkout_context_ttl_hours)
+        return await self.verify_product_now(session_id, product_id, VerificationPriority.ADD_TO_CART)
         
     async def on_checkout(self, session_id: str, product_ids: List[str]) -> Dict[str, DetectionResult]:
         """결제 진행 이벤트 핸들러 - 모든 상품 검증"""
         logger.info(f"결제 진행: 세션 {session_id}, 상품 {len(product_ids)}개")
+        # 장바구니 전체 문맥을 한 번에 조회하고 만료 시각도 한 번에 연장
+        contexts = self.context_storage.get_contexts(session_id, product_ids)
+        self.context_storage.set_contexts_ttl(session_id, list(contexts), self.checkout_context_ttl_hours)
+        missing = [product_id for product_id in product_ids if product_id not in contexts]
+        if missing:
+            logger.warning(f"문맥 정보가 없는 결제 상품: 세션 {session_id}, 상품 {missing}")
+        
+        verifiable = [product_id for product_id in product_ids if product_id in contexts]
+        verified = await asyncio.gather(*[
+            self.verify_product_now(session_id, product_id, VerificationPriority.CHECKOUT, contexts[product_id])
+            for product_id in verifiable
+        ])
         
         results = {}
-        for product_id in product_ids:
-            result = await self.verify_product_now(session_id, product_id)
+        for product_id, result in zip(verifiable, verified):
             if result:
                 results[product_id] = result
                 
         return results
         
+    async def on_product_change(self, product_id: str) -> Dict[str, DetectionResult]:
+        """상품 변경 이벤트 핸들러 - 해당 상품 문맥을 가진 세션만 재검증"""
+        session_ids = self.context_storage.get_sessions_for_product(product_id)
+        logger.info(f"상품 변경: 상품 {product_id}, 영향받는 세션 {len(session_ids)}개")
+        contexts = self.context_storage.get_many((session_id, product_id) for session_id in session_ids)
+        
+        verified = await asyncio.gather(*[
+            self.verify_product_now(session_id, product_id, VerificationPriority.BACKGROUND, record)
+            for (session_id, _), record in contexts.items()
+        ])
+        
+        results = {}
+        for (session_id, _), result in zip(contexts, verified):
+            if result:
+                results[session_id] = result
+                
+        return results
+        
     async def start_auto_verification(self, session_id: str, product_ids: List[str]):
         """자동 검증 시작"""
         if not self.auto_verify_enabled:
@@ -162,8 +358,8 @@ class FraudDetectionSystem:
                 while True:
                     logger.info(f"자동 검증 시작: 세션 {session_id}")
                     for product_id in product_ids:
-                        await self.verify_product_now(session_id, product_id)
-                    await asyncio.sleep(self.auto_verify_interval)
+                        await self.verify_product_now(session_id, product_id, VerificationPriority.BACKGROUND)
+                    await self.clock.sleep(self.auto_verify_interval)
             except asyncio.CancelledError:
                 logger.info(f"자동 검증 중단: 세션 {session_id}")
             except Exception as e:
@@ -184,21 +380,76 @@ class FraudDetectionSystem:
             self._verify_tasks[session_id].cancel()
             del self._verify_tasks[session_id]
             logger.info(f"자동 검증 중단됨: 세션 {session_id}")
-            
+
+    def subscribe(self, session_id: Optional[str] = None, queue_size: Optional[int] = None) -> Subscription:
+        """
+        세션의 알림과 탐지 결과 구독
+
+        반환된 구독은 async for로 이벤트(NotificationMessage 또는 DetectionResult)를 기다리며,
+        Flask 등 동기 코드에서는 for 또는 get(timeout)으로 소비. 다 쓰면 close()로 해지.
+
+        Args:
+            session_id: 구독할 세션 ID (None이면 모든 세션)
+            queue_size: 구독자 대기열 크기 (가득 차면 가장 오래된 이벤트를 버림)
+        """
+        return self.subscriptions.subscribe(session_id, queue_size)
+
     def cleanup(self):
-        """시스템 정리"""
+        """
+        시스템 정리
+        MCP 프록시 서버와 업스트림 커넥션 풀은 이벤트 루프에서 닫아야 하므로 정리하지 않음
+        (이벤트 루프 안에서는 aclose()를 사용)
+        """
+        if self.mcp_proxy.is_open:
+            logger.warning("MCP 프록시가 열려 있음 - aclose()로 정리해야 함")
+        self._stop_tasks()
+        self._close_components()
+        
+    def _stop_tasks(self):
+        """이벤트 루프에 묶인 자동 검증/검증 실행기/만료 정리 태스크 취소 (루프 스레드에서 호출)"""
         # 모든 자동 검증 태스크 취소
         for session_id, task in self._verify_tasks.items():
             task.cancel()
         self._verify_tasks.clear()
         
-        # 오래된 문맥 정리
-        count = self.context_storage.cleanup_old_contexts()
+        # 검증 실행기 워커 및 비교 프로세스 풀 중단
+        self.verification_executor.shutdown()
+        self.product_comparator.shutdown()
+        self.context_storage.stop_sweeper()
+        
+    def _close_components(self):
+        """스레드를 기다리는 컴포넌트 종료와 문맥 정리 (블로킹, 최대 알림 핸들러 제한 시간만큼 대기)"""
+        # 대기 중인 알림을 핸들러에 전달한 뒤 발송 스레드 종료
+        self.notifier.close()
+        if self.notification_store is not None:
+            self.notification_store.close()
+        if self.agent_webhook is not None:
+            self.agent_webhook.close()
+        self.subscriptions.close()
+        self.mcp_interface.close()
+        
+        # 오래된 문맥 정리 후 버퍼된 쓰기 반영
+        count = self.context_storage.cleanup_old_contexts(self.context_max_age_hours)
+        self.context_storage.flush()
         logger.info(f"시스템 정리 완료: {count}개의 오래된 문맥 삭제됨")
         
+    async def aclose(self):
+        """
+        MCP 프록시 서버와 업스트림 커넥션 풀을 닫은 뒤 시스템 정리
+        알림 발송 스레드 등 블로킹 종료는 별도 스레드에서 기다리므로 이벤트 루프를 막지 않음
+        """
+        await self.mcp_proxy.close()
+        self._stop_tasks()
+        await asyncio.to_thread(self._close_components)
+        
     async def simulate_fraud_scenario(self, scenario_type: str = "price_change") -> Dict[str, Any]:
         """사기 시나리오 시뮬레이션"""
-        session_id = f"sim_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        # 하나의 시스템에서 여러 시나리오가 동시에 실행되어도 세션이 겹치지 않도록 고유 접미사 추가
+        session_id = f"sim_{self.clock.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        
+        # 시나리오별 시간축 시작 (가상 시계 사용 시 시뮬레이션 지연 측정용)
+        self.clock.start_timeline()
+        started_at = self.clock.monotonic()
         
         # 시나리오별로 다른 상품 ID 사용하여 수집 모듈에서 구분 가능하게 함
         if scenario_type == "price_change":
@@ -231,21 +482,6 @@ class FraudDetectionSystem:
                 "brand": "브랜드X",
                 "category": "전자제품"
             }
-            
-            # 데이터 수집기 확장 - 다양한 마케팅 표현 테스트용
-            class WordingVariationCollector(DataCollector):
-                async def collect_via_web(self, product_id, url_template=None):
-                    # 원래 메서드 호출
-                    product_info = await super().collect_via_web(product_id, url_template)
-                    
-                    # 판매자가 마케팅 문구를 약간 변경한 케이스 시뮬레이션
-                    if product_info and product_id == "PROD_WORDING_VAR":
-                        product_info.description = "고급 스마트폰 - 1년 정품 보증 포함, 기술지원 서비스"
-                    
-                    return product_info
-            
-            # 확장된 데이터 수집기 사용
-            self.data_collector = WordingVariationCollector()
         else:
             product_id = "PROD_NORMAL"
             # 정상 시나리오
@@ -262,7 +498,7 @@ class FraudDetectionSystem:
         await self.on_product_view(session_id, product_id, original_product)
         
         # 3. 일정 시간 대기 (실제 상황에서는 사용자가 상품을 검토하는 시간)
-        await asyncio.sleep(1)
+        await self.clock.sleep(self.review_delay)
         
         # 4. 장바구니 추가 시뮬레이션
         detection_result = await self.on_add_to_cart(session_id, product_id)
@@ -274,7 +510,8 @@ class FraudDetectionSystem:
             "product_id": product_id,
             "original_info": original_product,
             "detection_result": detection_result.dict() if detection_result else None,
-            "is_fraud_detected": detection_result.is_fraud_detected if detection_result else False
+            "is_fraud_detected": detection_result.is_fraud_detected if detection_result else False,
+            "simulated_latency": self.clock.monotonic() - started_at
         }
         
         logger.info(f"시뮬레이션 완료: {scenario_type}")
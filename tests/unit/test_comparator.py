@@ -0,0 +1,72 @@
+import pytest
+import asyncio
+from src.models.data_models import ProductInfo
+from src.detectors.comparator import ProductComparator
+
+# 오프로드 기준(4096자)을 넘는 긴 설명
+LONG_DESCRIPTION = "고급 스마트폰 - 정품 1년 보증 포함, 무상 수리 서비스, 배터리 교체 지원. " * 80
+CHANGED_LONG_DESCRIPTION = "고급 스마트폰 - 보증 없음, 수리 서비스 유료, 배터리 교체 불가. " * 80
+
+
+class TestProductComparatorOffload:
+    """ProductComparator 프로세스 풀 오프로드 유닛 테스트"""
+
+    @pytest.fixture
+    def comparator(self):
+        """프로세스 풀 워커 1개를 쓰는 비교기 (LLM 비교 비활성화)"""
+        comparator = ProductComparator(use_llm_for_description=False, process_pool_workers=1)
+        yield comparator
+        comparator.shutdown()
+
+    def test_should_offload_by_input_size(self, comparator):
+        """입력 크기와 풀 설정에 따라 오프로드 여부가 결정되는지 테스트"""
+        assert comparator._should_offload(LONG_DESCRIPTION, CHANGED_LONG_DESCRIPTION)
+        assert not comparator._should_offload("짧은 설명", "짧은 설명 변경")
+        assert not comparator._should_offload(LONG_DESCRIPTION, "")
+        assert not ProductComparator(use_llm_for_description=False)._should_offload(
+            LONG_DESCRIPTION, CHANGED_LONG_DESCRIPTION)
+
+    @pytest.mark.asyncio
+    async def test_small_input_stays_inline(self, comparator, monkeypatch):
+        """작은 입력은 프로세스 풀을 만들지 않고 이벤트 루프에서 직접 비교하는지 테스트"""
+        async def fail_offload(*args):
+            raise AssertionError("작은 입력이 프로세스 풀로 전달됨")
+
+        monkeypatch.setattr(comparator, "_run_cpu_stage", fail_offload)
+
+        changed, similarity = await comparator.compare_description_async("정품 1년 보증", "보증 없음")
+
+        assert (changed, similarity) == comparator.compare_description("정품 1년 보증", "보증 없음")
+        assert comparator._process_pool is None
+
+    @pytest.mark.asyncio
+    async def test_large_input_uses_pool_with_same_verdict(self, comparator):
+        """큰 입력은 프로세스 풀에서 비교하고 직접 비교와 같은 판정을 내리는지 테스트"""
+        for current in (LONG_DESCRIPTION, CHANGED_LONG_DESCRIPTION):
+            assert await comparator.compare_description_async(LONG_DESCRIPTION, current) == \
+                comparator.compare_description(LONG_DESCRIPTION, current)
+        assert comparator._process_pool is not None
+
+        original = ProductInfo(product_id="PROD001", price=100000, description=LONG_DESCRIPTION)
+        current = ProductInfo(product_id="PROD001", price=100000, description=CHANGED_LONG_DESCRIPTION)
+        offloaded = await comparator.compare_product_info_async(original, current)
+        inline = comparator.compare_product_info(original, current)
+
+        assert offloaded.is_fraud_detected and inline.is_fraud_detected
+        assert offloaded.changes == inline.changes
+        assert offloaded.confidence_score == inline.confidence_score
+
+    @pytest.mark.asyncio
+    async def test_shutdown_releases_pool(self, comparator):
+        """shutdown 후 프로세스 풀이 종료되고, 다음 큰 입력에서 새 풀을 만드는지 테스트"""
+        await comparator.compare_description_async(LONG_DESCRIPTION, CHANGED_LONG_DESCRIPTION)
+        pool = comparator._process_pool
+
+        comparator.shutdown()
+
+        assert comparator._process_pool is None
+        with pytest.raises(RuntimeError):
+            pool.submit(len, "")
+        changed, _ = await comparator.compare_description_async(LONG_DESCRIPTION, CHANGED_LONG_DESCRIPTION)
+        assert changed
+        assert comparator._process_pool is not None and comparator._process_pool is not pool
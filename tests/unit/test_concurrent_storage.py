@@ -0,0 +1,164 @@
+import pytest
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from loguru import logger
+from src.models.data_models import ProductInfo, ContextRecord
+from src.storage.concurrent_storage import ConcurrentContextStorage, AsyncContextStorage
+
+THREADS = 8
+SESSIONS_PER_THREAD = 20
+OPS_PER_THREAD = 3000
+
+
+@pytest.fixture(autouse=True)
+def quiet_logger():
+    """스트레스 테스트 중에는 로그 출력 비활성화 (로거 잠금이 처리량 측정을 왜곡하지 않도록)"""
+    logger.disable("src")
+    yield
+    logger.enable("src")
+
+
+def make_product(product_id, price):
+    return ProductInfo(product_id=product_id, price=price, description=f"{product_id} 설명")
+
+
+def run_workload(storage, threads, ops_per_thread, with_cleanup=True):
+    """
+    스레드별 세션에 저장/조회/삭제를 섞어 수행하고 기대 상태 반환
+
+    Returns:
+        (소요 시간, {session_id: {product_id: price}}, 발생한 예외 목록)
+    """
+    expected = [dict() for _ in range(threads)]
+    errors = []
+    barrier = threading.Barrier(threads + (1 if with_cleanup else 0))
+    done = threading.Event()
+
+    def worker(index):
+        try:
+            state = expected[index]
+            barrier.wait()
+            for op in range(ops_per_thread):
+                session_id = f"t{index}_s{op % SESSIONS_PER_THREAD}"
+                product_id = f"PROD{op % 7:03d}"
+                kind = op % 10
+                if kind < 5:
+                    assert storage.store_context(session_id, product_id, make_product(product_id, op))
+                    state.setdefault(session_id, {})[product_id] = op
+                elif kind < 9:
+                    record = storage.get_context(session_id, product_id)
+                    expected_price = state.get(session_id, {}).get(product_id)
+                    assert (record.product_info.price if record else None) == expected_price
+                elif product_id in state.get(session_id, {}):
+                    assert storage.delete_context(session_id, product_id)
+                    del state[session_id][product_id]
+                    if not state[session_id]:
+                        del state[session_id]
+        except Exception as e:
+            errors.append(e)
+
+    def cleaner():
+        try:
+            barrier.wait()
+            while not done.is_set():
+                storage.cleanup_old_contexts(max_age_hours=24, max_records=50)
+                storage.get_sessions_for_product("PROD000")
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    background = threading.Thread(target=cleaner) if with_cleanup else None
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    if background is not None:
+        background.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    if background is not None:
+        background.join()
+
+    merged = {}
+    for state in expected:
+        merged.update(state)
+    return elapsed, merged, errors
+
+
+class TestConcurrentContextStorage:
+    """잠금 분할 문맥 저장소 스트레스 테스트"""
+
+    def test_mixed_workload_is_consistent(self):
+        """여러 스레드의 저장/조회/삭제와 동시 만료 정리 후 상태가 일관되는지 테스트"""
+        storage = ConcurrentContextStorage(stripes=16)
+        old = datetime.now() - timedelta(hours=48)
+        storage.store_contexts(
+            ContextRecord(session_id=f"stale_{index}", product_id="PROD000", timestamp=old,
+                          product_info=make_product("PROD000", 1))
+            for index in range(2000)
+        )
+
+        _, expected, errors = run_workload(storage, THREADS, OPS_PER_THREAD)
+        storage.cleanup_old_contexts(max_age_hours=24)
+
+        assert errors == []
+        assert sorted(storage.get_session_ids()) == sorted(expected)
+        for session_id, products in expected.items():
+            stored = storage.get_contexts(session_id, products)
+            assert {product_id: record.product_info.price for product_id, record in stored.items()} == products
+        assert sorted(storage.get_sessions_for_product("PROD000")) == sorted(
+            session_id for session_id, products in expected.items() if "PROD000" in products)
+        total = sum(len(products) for products in expected.values())
+        # 다시 저장된 문맥은 버전 이력이 첫 스냅샷 참조를 하나씩 더 가짐
+        assert storage.get_snapshot_stats()["references"] == total + storage.get_history_stats()["chains"]
+        assert storage.get_memory_stats()["sessions"] == len(expected)
+
+    def test_striping_reduces_contention(self):
+        """구간을 나누면 전역 잠금보다 경합이 적고, 스레드 수를 늘려도 처리량이 무너지지 않는지 테스트"""
+        single = ConcurrentContextStorage(stripes=1)
+        striped = ConcurrentContextStorage(stripes=1024)
+
+        baseline, _, errors = run_workload(ConcurrentContextStorage(stripes=1024), 1, OPS_PER_THREAD,
+                                           with_cleanup=False)
+        _, _, single_errors = run_workload(single, THREADS, OPS_PER_THREAD, with_cleanup=False)
+        elapsed, _, striped_errors = run_workload(striped, THREADS, OPS_PER_THREAD, with_cleanup=False)
+
+        assert errors == single_errors == striped_errors == []
+        assert striped.get_lock_stats()["contended"] < single.get_lock_stats()["contended"]
+        # 스레드당 작업량이 같으므로 처리량 비율 = (스레드 수 * 단일 스레드 시간) / 다중 스레드 시간
+        assert THREADS * baseline / elapsed > 0.3
+
+    def test_async_variant_shares_storage_with_threads(self):
+        """asyncio 래퍼가 스레드와 같은 저장소를 공유하고, 잠금 경합 시 실행기로 넘기는지 테스트"""
+        storage = ConcurrentContextStorage(stripes=4)
+        async_storage = AsyncContextStorage(storage)
+        index = storage.stripe_index("session_0")
+
+        async def scenario():
+            # 다른 스레드가 구간 잠금을 잡고 있는 동안의 호출은 실행기로 넘어가 잠금 해제 후 완료
+            storage._locks[index].acquire()
+            pending = asyncio.ensure_future(
+                async_storage.store_context("session_0", "PROD001", make_product("PROD001", 10)))
+            await asyncio.sleep(0.05)
+            assert not pending.done()
+            storage._locks[index].release()
+            assert await pending
+
+            await asyncio.gather(*[
+                async_storage.store_context(f"session_{n}", "PROD001", make_product("PROD001", n))
+                for n in range(1, 50)
+            ])
+            records = await async_storage.get_many((f"session_{n}", "PROD001") for n in range(50))
+            return records
+
+        records = asyncio.run(scenario())
+
+        assert len(records) == 50
+        assert records[("session_7", "PROD001")].product_info.price == 7
+        assert async_storage.stats["offloaded"] >= 2
+        assert async_storage.stats["fast_path"] >= 49
+        assert storage.get_context("session_0", "PROD001").product_info.price == 10
+        async_storage.close()
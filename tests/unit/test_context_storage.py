@@ -0,0 +1,798 @@
+import pytest
+import asyncio
+import multiprocessing
+from datetime import datetime, timedelta
+from src.models.data_models import ProductInfo, ContextRecord
+from src.storage.context_storage import ContextStorage
+from src.storage.columnar_store import ColumnarContextStore
+from src.storage.compression import DescriptionCompressor, train_dictionary
+from src.storage.interning import snapshot_hash
+from src.storage.shared_memory_store import SharedMemoryContextStore
+from src.simulation.clock import VirtualClock
+
+def _shared_writer(path, worker, count):
+    """다른 프로세스에서 공유 저장소에 문맥 저장 (프로세스 간 테스트용)"""
+    storage = ContextStorage(storage_type="shared", shared_memory_path=path)
+    for index in range(count):
+        storage.store_context(f"worker{worker}_session", f"PROD{index:03d}",
+                              ProductInfo(product_id=f"PROD{index:03d}", price=worker * 1000 + index,
+                                          description="공유 설명"))
+    storage.close()
+
+
+def _shared_reader(path, queue):
+    """다른 프로세스에서 공유 저장소 문맥 조회 (프로세스 간 테스트용)"""
+    storage = ContextStorage(storage_type="shared", shared_memory_path=path)
+    record = storage.get_context("parent_session", "PROD001")
+    queue.put(record.product_info.price if record else None)
+    storage.close()
+
+
+class TestSQLiteContextStorage:
+    """sqlite 타입 ContextStorage 유닛 테스트"""
+
+    @pytest.fixture
+    def product_info(self):
+        """ProductInfo 객체 생성"""
+        return ProductInfo(
+            product_id="PROD001",
+            price=100000,
+            description="고급 스마트폰 - 정품 1년 보증 포함",
+            attributes={"brand": "브랜드X"}
+        )
+
+    def test_store_and_get(self, tmp_path, product_info):
+        """저장 후 커밋 전에도 조회되는지 테스트"""
+        storage = ContextStorage(storage_type="sqlite", sqlite_path=str(tmp_path / "ctx.db"))
+
+        assert storage.store_context("session_1", "PROD001", product_info, agent_id="agent_1")
+        record = storage.get_context("session_1", "PROD001")
+
+        assert record is not None
+        assert record.product_info.price == 100000
+        assert record.product_info.attributes == {"brand": "브랜드X"}
+        assert record.agent_id == "agent_1"
+        storage.close()
+
+    def test_persists_across_restart(self, tmp_path, product_info):
+        """재시작 후에도 문맥이 유지되는지 테스트"""
+        path = str(tmp_path / "ctx.db")
+        storage = ContextStorage(storage_type="sqlite", sqlite_path=path)
+        storage.store_context("session_1", "PROD001", product_info)
+        storage.store_context("session_2", "PROD001", product_info)
+        storage.delete_context("session_2", "PROD001")
+        storage.close()
+
+        reopened = ContextStorage(storage_type="sqlite", sqlite_path=path)
+
+        assert reopened.get_context("session_1", "PROD001").product_info.description == product_info.description
+        assert reopened.get_context("session_2", "PROD001") is None
+        assert reopened.get_session_ids() == ["session_1"]
+        reopened.close()
+
+    def test_cleanup_old_contexts(self, tmp_path, product_info):
+        """오래된 문맥 정리 테스트"""
+        storage = ContextStorage(storage_type="sqlite", sqlite_path=str(tmp_path / "ctx.db"))
+        storage.restore_context(ContextRecord(
+            session_id="old_session",
+            product_id="PROD001",
+            timestamp=datetime.now() - timedelta(hours=48),
+            product_info=product_info
+        ))
+        storage.store_context("new_session", "PROD001", product_info)
+
+        assert storage.cleanup_old_contexts(max_age_hours=24) == 1
+        assert storage.get_context("old_session", "PROD001") is None
+        assert storage.get_context("new_session", "PROD001") is not None
+        storage.close()
+
+
+class TestSnapshotInterning:
+    """메모리 저장소 스냅샷 공유 유닛 테스트"""
+
+    def make_product(self, price=100000):
+        return ProductInfo(product_id="PROD001", price=price, description="고급 스마트폰 - 정품 1년 보증 포함")
+
+    def test_identical_snapshots_are_shared(self):
+        """동일한 상품 상태는 하나의 스냅샷을 공유하는지 테스트"""
+        storage = ContextStorage()
+        for index in range(100):
+            storage.store_context(f"session_{index}", "PROD001", self.make_product())
+        storage.store_context("session_x", "PROD001", self.make_product(price=90000))
+
+        first = storage.get_context("session_0", "PROD001")
+        last = storage.get_context("session_99", "PROD001")
+
+        assert first.product_info is last.product_info
+        assert first.snapshot_hash == last.snapshot_hash
+        assert storage.get_context("session_x", "PROD001").snapshot_hash != first.snapshot_hash
+        assert storage.get_snapshot_stats()["snapshots"] == 2
+        assert storage.get_snapshot_stats()["references"] == 101
+
+    def test_snapshot_released_with_last_reference(self):
+        """마지막 참조가 사라지면 스냅샷이 해제되는지 테스트"""
+        storage = ContextStorage()
+        storage.store_context("session_1", "PROD001", self.make_product())
+        storage.store_context("session_2", "PROD001", self.make_product())
+        key = storage.get_context("session_1", "PROD001").snapshot_hash
+
+        storage.delete_context("session_1", "PROD001")
+        assert storage.snapshot_pool.refcount(key) == 1
+
+        # 덮어쓴 이전 스냅샷은 버전 이력의 첫 버전으로만 참조되고, 문맥이 삭제되면 함께 해제
+        storage.store_context("session_2", "PROD001", self.make_product(price=1))
+        assert storage.snapshot_pool.refcount(key) == 1
+        storage.delete_context("session_2", "PROD001")
+        assert storage.snapshot_pool.get(key) is None
+        assert storage.get_snapshot_stats()["snapshots"] == 0
+
+    def test_caller_mutation_does_not_leak(self):
+        """저장 후 원본 객체를 수정해도 저장된 스냅샷이 바뀌지 않는지 테스트"""
+        storage = ContextStorage()
+        product_info = self.make_product()
+        storage.store_context("session_1", "PROD001", product_info)
+
+        product_info.price = 1
+
+        assert storage.get_context("session_1", "PROD001").product_info.price == 100000
+
+    def test_shared_snapshot_is_read_only(self):
+        """조회한 공유 스냅샷을 수정하면 오류가 나고, 다른 세션의 스냅샷과 해시는 그대로인지 테스트"""
+        storage = ContextStorage()
+        product_info = ProductInfo(product_id="PROD001", price=100000, description="정품",
+                                   attributes={"brand": "브랜드X", "tags": ["신상품"]}, metadata={"seller": {"id": 1}})
+        storage.store_context("session_1", "PROD001", product_info)
+        storage.store_context("session_2", "PROD001", product_info)
+        shared = storage.get_context("session_1", "PROD001").product_info
+
+        with pytest.raises(TypeError):
+            shared.price = 1
+        with pytest.raises(TypeError):
+            shared.attributes["brand"] = "브랜드Y"
+        with pytest.raises(TypeError):
+            shared.attributes["tags"].append("할인")
+        with pytest.raises(TypeError):
+            shared.metadata["seller"]["id"] = 2
+
+        other = storage.get_context("session_2", "PROD001")
+        assert other.product_info == product_info
+        assert other.snapshot_hash == snapshot_hash(product_info) == snapshot_hash(shared)
+        # 수정이 필요하면 일반 ProductInfo로 복사해서 사용
+        copied = ProductInfo(**shared.dict())
+        copied.attributes["brand"] = "브랜드Y"
+        assert storage.get_context("session_2", "PROD001").product_info.attributes["brand"] == "브랜드X"
+
+
+class TestContextExpiry:
+    """만료 인덱스 기반 문맥 정리 유닛 테스트"""
+
+    def make_record(self, session_id, hours_ago, expires_in_hours=None):
+        now = datetime.now()
+        return ContextRecord(
+            session_id=session_id,
+            product_id="PROD001",
+            timestamp=now - timedelta(hours=hours_ago),
+            product_info=ProductInfo(product_id="PROD001", price=1000, description="상품"),
+            expires_at=now + timedelta(hours=expires_in_hours) if expires_in_hours is not None else None
+        )
+
+    @pytest.mark.parametrize("storage_type", ["memory", "sqlite"])
+    def test_ttl_override_outlives_default_age(self, tmp_path, storage_type):
+        """개별 만료 시각이 있는 문맥은 기본 보관 기간이 지나도 유지되는지 테스트"""
+        storage = ContextStorage(storage_type=storage_type, sqlite_path=str(tmp_path / "ctx.db"))
+        storage.restore_context(self.make_record("browsing", hours_ago=48))
+        storage.restore_context(self.make_record("checkout", hours_ago=48))
+        storage.restore_context(self.make_record("expired_checkout", hours_ago=100, expires_in_hours=-1))
+        assert storage.set_context_ttl("checkout", "PROD001", ttl_hours=72)
+
+        assert storage.cleanup_old_contexts(max_age_hours=24) == 2
+        assert storage.get_context("browsing", "PROD001") is None
+        assert storage.get_context("expired_checkout", "PROD001") is None
+        assert storage.get_context("checkout", "PROD001").expires_at > datetime.now()
+        storage.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("storage_type", ["memory", "sqlite"])
+    async def test_timestamps_and_ttl_follow_injected_clock(self, tmp_path, storage_type):
+        """저장 시각, 개별 만료 시각, 보관 기간 정리가 주입한 가상 시계 기준으로 계산되는지 테스트"""
+        clock = VirtualClock()
+        storage = ContextStorage(storage_type=storage_type, sqlite_path=str(tmp_path / "ctx.db"), clock=clock)
+        product = ProductInfo(product_id="PROD001", price=1000, description="상품")
+        storage.store_context("browsing", "PROD001", product)
+        storage.store_context("checkout", "PROD001", product, ttl_hours=72)
+        assert storage.get_context("browsing", "PROD001").timestamp == clock.now()
+
+        await clock.sleep(25 * 3600)
+
+        assert storage.cleanup_old_contexts(max_age_hours=24) == 1
+        assert storage.get_context("browsing", "PROD001") is None
+        assert storage.get_context("checkout", "PROD001").expires_at == clock.now() + timedelta(hours=47)
+        storage.close()
+
+    def test_cleanup_respects_work_cap(self):
+        """한 번에 정리하는 문맥 수가 제한되는지 테스트"""
+        storage = ContextStorage()
+        for index in range(10):
+            storage.restore_context(self.make_record(f"session_{index}", hours_ago=48))
+        # 덮어쓴 레코드는 이전 시각으로 정리되지 않아야 함
+        storage.store_context("session_0", "PROD001", ProductInfo(product_id="PROD001", price=1, description="새 상품"))
+
+        assert storage.cleanup_old_contexts(max_age_hours=24, max_records=4) == 4
+        assert storage.cleanup_old_contexts(max_age_hours=24) == 5
+        assert storage.get_session_ids() == ["session_0"]
+
+    @pytest.mark.asyncio
+    async def test_background_sweeper(self):
+        """백그라운드 정리 태스크가 만료 문맥을 나누어 정리하는지 테스트"""
+        storage = ContextStorage()
+        for index in range(25):
+            storage.restore_context(self.make_record(f"session_{index}", hours_ago=48))
+
+        storage.start_sweeper(interval_seconds=60, max_per_run=10)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        storage.stop_sweeper()
+
+        assert storage.get_session_ids() == []
+
+
+class TestMemoryBudget:
+    """메모리 한도 및 LRU 축출 유닛 테스트"""
+
+    def make_product(self, index):
+        return ProductInfo(product_id=f"PROD{index:03d}", price=1000 + index, description=f"상품 {index}")
+
+    def test_global_cap_evicts_browsing_before_checkout(self):
+        """전역 한도 초과 시 장바구니/결제 문맥보다 조회 문맥을 먼저 축출하는지 테스트"""
+        storage = ContextStorage()
+        storage.store_context("session_1", "PROD000", self.make_product(0))
+        per_context = storage.get_memory_stats()["used_bytes"]
+        storage.memory_budget.max_bytes = per_context * 3
+
+        storage.set_context_ttl("session_1", "PROD000", ttl_hours=72)
+        for index in range(1, 6):
+            storage.store_context("session_1", f"PROD{index:03d}", self.make_product(index))
+
+        stats = storage.get_memory_stats()
+        assert stats["used_bytes"] <= stats["max_bytes"]
+        assert stats["evicted_global"] == 3
+        assert stats["evicted_active"] == 0
+        assert storage.get_context("session_1", "PROD000") is not None
+
+    def test_session_cap_uses_lru_order(self):
+        """세션 한도 초과 시 가장 오래 사용되지 않은 문맥을 축출하는지 테스트"""
+        storage = ContextStorage()
+        storage.store_context("probe", "PROD000", self.make_product(0))
+        per_context = storage.get_memory_stats()["largest_session_bytes"]
+        storage.delete_context("probe", "PROD000")
+        storage.memory_budget.max_session_bytes = per_context * 2 + 16  # 세션 ID 길이 차이 여유분
+
+        storage.store_context("crawler", "PROD000", self.make_product(0))
+        storage.store_context("crawler", "PROD001", self.make_product(1))
+        storage.get_context("crawler", "PROD000")  # PROD000을 최근 사용으로 갱신
+        storage.store_context("crawler", "PROD002", self.make_product(2))
+        storage.store_context("other", "PROD001", self.make_product(1))
+
+        assert storage.get_context("crawler", "PROD000") is not None
+        assert storage.get_context("crawler", "PROD001") is None
+        assert storage.get_context("other", "PROD001") is not None
+        assert storage.get_memory_stats()["evicted_session"] == 1
+
+    def test_evicted_miss_is_distinguishable(self):
+        """축출로 인한 조회 실패와 저장된 적 없는 문맥을 구분하는지 테스트"""
+        storage = ContextStorage(max_session_bytes=1)
+        storage.store_context("session_1", "PROD000", self.make_product(0))
+        storage.store_context("session_1", "PROD001", self.make_product(1))
+
+        assert storage.get_miss_reason("session_1", "PROD000") == "evicted"
+        assert storage.get_miss_reason("session_1", "PROD999") == "not_found"
+        assert storage.get_miss_reason("session_1", "PROD001") is None
+
+        storage.get_context("session_1", "PROD000")
+        assert storage.get_memory_stats()["evicted_misses"] == 1
+
+
+class TestColumnarContextStorage:
+    """columnar 타입 ContextStorage 유닛 테스트"""
+
+    def test_round_trip_preserves_fields(self):
+        """컬럼 저장 후 조회 시 모든 필드가 복원되는지 테스트"""
+        storage = ContextStorage(storage_type="columnar")
+        product_info = ProductInfo(
+            product_id="PROD001",
+            price=129000.5,
+            description="고급 스마트폰 - 정품 1년 보증 포함",
+            attributes={"brand": "브랜드X", "colors": ["black", "white"]},
+            metadata={"source": "mcp"}
+        )
+        storage.store_context("session_1", "PROD001", product_info, source_url="https://shop/p/1", agent_id="agent_1")
+
+        record = storage.get_context("session_1", "PROD001")
+
+        assert record.product_info.dict() == product_info.dict()
+        assert record.source_url == "https://shop/p/1"
+        assert record.agent_id == "agent_1"
+        assert abs((datetime.now() - record.timestamp).total_seconds()) < 5
+
+    def test_strings_and_slots_are_reused(self):
+        """덮어쓰기/삭제 후 슬롯과 문자열이 재사용되는지 테스트"""
+        storage = ContextStorage(storage_type="columnar")
+        for index in range(10):
+            storage.store_context(f"session_{index}", "PROD001",
+                                  ProductInfo(product_id="PROD001", price=1000, description="공통 설명"))
+        storage.store_context("session_0", "PROD001",
+                              ProductInfo(product_id="PROD001", price=900, description="변경된 설명"))
+        storage.delete_context("session_9", "PROD001")
+
+        stats = storage.columnar_store.get_stats()
+        assert stats["contexts"] == 9
+        assert stats["slots"] == 11
+        assert stats["strings"] == 2
+        assert stats["products"] == 1
+        assert "session_9" not in storage.get_session_ids()
+        assert storage.get_context("session_0", "PROD001").product_info.price == 900
+
+    def test_cleanup_with_ttl(self):
+        """만료 인덱스 기반 만료 정리 테스트"""
+        storage = ContextStorage(storage_type="columnar")
+        product_info = ProductInfo(product_id="PROD001", price=1000, description="상품")
+        old = datetime.now() - timedelta(hours=48)
+        for session_id in ("browsing", "checkout"):
+            storage.restore_context(ContextRecord(session_id=session_id, product_id="PROD001",
+                                                  timestamp=old, product_info=product_info))
+        storage.set_context_ttl("checkout", "PROD001", ttl_hours=72)
+
+        assert storage.cleanup_old_contexts(max_age_hours=24) == 1
+        assert storage.get_session_ids() == ["checkout"]
+
+    def test_indexes_follow_overwrites_and_reused_slots(self):
+        """덮어쓰기/만료 시각 변경/슬롯 재사용 후에도 만료 정리와 구간 조회가 현재 레코드만 반환하는지 테스트"""
+        store = ColumnarContextStore(min_compact=4)
+        product_info = ProductInfo(product_id="PROD001", price=1000, description="상품")
+        base = datetime.now() - timedelta(hours=48)
+        for index in range(10):
+            store.put(f"session_{index}", "PROD001", base + timedelta(minutes=index), product_info)
+        # 오래된 문맥을 최근 시각으로 덮어쓰고, 삭제한 슬롯을 최근 문맥이 재사용
+        store.put("session_0", "PROD001", datetime.now(), product_info)
+        store.delete("session_1", "PROD001")
+        store.put("session_new", "PROD001", datetime.now(), product_info)
+        store.set_expiry("session_2", "PROD001", datetime.now() + timedelta(hours=1))
+        store.set_expiry("session_3", "PROD001", datetime.now() - timedelta(hours=1))
+
+        in_range = store.in_range(base, base + timedelta(hours=1))
+        assert [record.session_id for record in in_range] == [f"session_{index}" for index in range(2, 10)]
+        assert [record.session_id for record in store.in_range(base, datetime.now(), limit=3)] == [
+            "session_2", "session_3", "session_4"]
+
+        assert store.cleanup(datetime.now() - timedelta(hours=24), limit=2) == 2
+        assert store.cleanup(datetime.now() - timedelta(hours=24)) == 5
+        assert sorted(store.session_ids()) == ["session_0", "session_2", "session_new"]
+        assert [record.session_id for record in store.in_range(base, datetime.now() + timedelta(seconds=1))] == [
+            "session_2", "session_0", "session_new"]
+        # 무효 항목이 많아지면 시각 인덱스를 재구성
+        assert store.get_stats()["time_entries"] < 12
+
+
+class TestContextJournal:
+    """선행 기록 기반 메모리 저장소 복구 유닛 테스트"""
+
+    def make_product(self, price=1000):
+        return ProductInfo(product_id="PROD001", price=price, description="상품", attributes={"brand": "X"})
+
+    def test_recover_after_restart(self, tmp_path):
+        """저장/삭제/만료 시각 변경이 재시작 후 복구되는지 테스트"""
+        storage = ContextStorage(journal_dir=str(tmp_path))
+        storage.store_context("session_1", "PROD001", self.make_product(), agent_id="agent_1")
+        storage.store_context("session_2", "PROD001", self.make_product())
+        storage.store_context("session_3", "PROD001", self.make_product(price=900))
+        storage.delete_context("session_2", "PROD001")
+        storage.set_context_ttl("session_3", "PROD001", ttl_hours=72)
+        storage.close()
+
+        recovered = ContextStorage(journal_dir=str(tmp_path))
+
+        assert sorted(recovered.get_session_ids()) == ["session_1", "session_3"]
+        record = recovered.get_context("session_1", "PROD001")
+        assert record.product_info.attributes == {"brand": "X"}
+        assert record.agent_id == "agent_1"
+        assert recovered.get_context("session_3", "PROD001").expires_at is not None
+        assert recovered.get_snapshot_stats()["snapshots"] == 2
+        recovered.close()
+
+    def test_recover_snapshot_and_log_tail(self, tmp_path):
+        """스냅샷 압축 이후의 기록까지 복구되는지 테스트"""
+        storage = ContextStorage(journal_dir=str(tmp_path))
+        for index in range(20):
+            storage.store_context(f"session_{index}", "PROD001", self.make_product())
+        storage.compact_journal()
+        storage.store_context("session_20", "PROD001", self.make_product(price=1))
+        storage.delete_context("session_0", "PROD001")
+        storage.close()
+
+        recovered = ContextStorage(journal_dir=str(tmp_path))
+
+        assert len(recovered.get_session_ids()) == 20
+        assert recovered.get_context("session_0", "PROD001") is None
+        assert recovered.get_context("session_20", "PROD001").product_info.price == 1
+        assert recovered.get_snapshot_stats()["references"] == 20
+        recovered.close()
+
+    def test_compaction_keeps_version_history(self, tmp_path):
+        """스냅샷 압축과 재시작 후에도 처음 본 버전과 버전 이력이 유지되는지 테스트"""
+        storage = ContextStorage(journal_dir=str(tmp_path))
+        for price in (1000, 1100, 1200):
+            storage.store_context("session_1", "PROD001", self.make_product(price=price))
+        first_seen = storage.get_first_seen_context("session_1", "PROD001")
+        storage.store_context("session_2", "PROD001", self.make_product(price=1200))
+        storage.compact_journal()
+        storage.store_context("session_1", "PROD001", self.make_product(price=1300))
+        storage.close()
+
+        recovered = ContextStorage(journal_dir=str(tmp_path))
+
+        recovered_first = recovered.get_first_seen_context("session_1", "PROD001")
+        assert recovered_first.product_info.price == 1000
+        assert recovered_first.timestamp == first_seen.timestamp
+        assert [record.product_info.price for record in recovered.get_context_history("session_1", "PROD001")] == [
+            1000, 1100, 1200, 1300]
+        # 첫 버전 스냅샷 참조와 현재 레코드 참조가 압축 전과 같게 복구
+        assert recovered.get_snapshot_stats()["references"] == 3
+        recovered.delete_context("session_1", "PROD001")
+        assert recovered.get_snapshot_stats()["snapshots"] == 1
+        recovered.close()
+
+    def test_torn_tail_is_discarded(self, tmp_path):
+        """마지막 기록이 중간에 끊겨도 그 이전까지 복구되는지 테스트"""
+        storage = ContextStorage(journal_dir=str(tmp_path))
+        storage.store_context("session_1", "PROD001", self.make_product())
+        storage.store_context("session_2", "PROD001", self.make_product())
+        storage.close()
+        log_path = tmp_path / "context.journal"
+        log_path.write_bytes(log_path.read_bytes()[:-5])
+
+        recovered = ContextStorage(journal_dir=str(tmp_path))
+        recovered.store_context("session_3", "PROD001", self.make_product())
+        recovered.close()
+
+        reopened = ContextStorage(journal_dir=str(tmp_path))
+        assert sorted(reopened.get_session_ids()) == ["session_1", "session_3"]
+        reopened.close()
+
+
+class TestBulkContextAPIs:
+    """ContextStorage 일괄 저장/조회 유닛 테스트"""
+
+    @pytest.fixture(params=["memory", "columnar", "sqlite", "shared"])
+    def storage(self, request, tmp_path):
+        storage = ContextStorage(storage_type=request.param, sqlite_path=str(tmp_path / "ctx.db"),
+                                 shared_memory_path=str(tmp_path / "ctx.shm"), shared_memory_slots=1024,
+                                 shared_memory_bytes=1 << 20)
+        yield storage
+        storage.close()
+
+    @staticmethod
+    def make_record(session_id, product_id, price=1000):
+        return ContextRecord(session_id=session_id, product_id=product_id,
+                             timestamp=datetime.now() - timedelta(hours=1),
+                             product_info=ProductInfo(product_id=product_id, price=price,
+                                                      description=f"{product_id} 설명"))
+
+    def test_store_and_get_contexts(self, storage):
+        """일괄 저장한 문맥이 타임스탬프를 유지한 채 일괄 조회되는지 테스트"""
+        records = [self.make_record("session_1", f"PROD{index:03d}", price=index) for index in range(500)]
+        records.append(self.make_record("session_2", "PROD000", price=7))
+
+        assert storage.store_contexts(records) == 501
+        found = storage.get_contexts("session_1", ["PROD000", "PROD499", "MISSING"])
+
+        assert set(found) == {"PROD000", "PROD499"}
+        assert found["PROD499"].product_info.price == 499
+        assert found["PROD000"].timestamp == records[0].timestamp
+
+        pairs = storage.get_many([("session_1", "PROD001"), ("session_2", "PROD000"), ("session_3", "PROD000")])
+        assert set(pairs) == {("session_1", "PROD001"), ("session_2", "PROD000")}
+        assert pairs[("session_2", "PROD000")].product_info.price == 7
+
+    def test_invalid_batch_is_rejected(self, storage):
+        """ID가 비어 있는 레코드가 있으면 아무것도 저장하지 않는지 테스트"""
+        records = [self.make_record("session_1", "PROD001"), self.make_record("", "PROD002")]
+
+        assert storage.store_contexts(records) == 0
+        assert storage.get_contexts("session_1", ["PROD001"]) == {}
+
+    def test_store_only_new_contexts(self, storage):
+        """only_new면 이미 문맥이 있는 (세션, 상품)은 덮어쓰지 않고 새 문맥만 저장하는지 테스트"""
+        storage.store_contexts([self.make_record("session_1", "PROD001", price=1000)])
+
+        stored = storage.store_contexts([self.make_record("session_1", "PROD001", price=1300),
+                                         self.make_record("session_1", "PROD002", price=500),
+                                         self.make_record("session_2", "PROD001", price=1300)], only_new=True)
+
+        assert stored == 2
+        assert storage.get_context("session_1", "PROD001").product_info.price == 1000
+        assert storage.get_context("session_1", "PROD002").product_info.price == 500
+        assert storage.get_context("session_2", "PROD001").product_info.price == 1300
+
+    def test_set_contexts_ttl(self, storage):
+        """여러 문맥의 만료 시각이 한 번에 설정되는지 테스트"""
+        storage.store_contexts([self.make_record("session_1", f"PROD{index:03d}") for index in range(3)])
+
+        assert storage.set_contexts_ttl("session_1", ["PROD000", "PROD002", "MISSING"], 72) == 2
+        found = storage.get_contexts("session_1", ["PROD000", "PROD001", "PROD002"])
+        assert found["PROD000"].expires_at is not None
+        assert found["PROD001"].expires_at is None
+        assert found["PROD002"].expires_at is not None
+
+
+class TestReverseIndex:
+    """ContextStorage 상품/에이전트/시간 구간 보조 인덱스 유닛 테스트"""
+
+    @pytest.fixture(params=["memory", "columnar", "sqlite", "shared"])
+    def storage(self, request, tmp_path):
+        storage = ContextStorage(storage_type=request.param, sqlite_path=str(tmp_path / "ctx.db"),
+                                 shared_memory_path=str(tmp_path / "ctx.shm"), shared_memory_slots=1024,
+                                 shared_memory_bytes=1 << 20)
+        yield storage
+        storage.close()
+
+    @staticmethod
+    def make_record(session_id, product_id, hours_ago=0, agent_id=None):
+        return ContextRecord(session_id=session_id, product_id=product_id,
+                             timestamp=datetime.now() - timedelta(hours=hours_ago),
+                             product_info=ProductInfo(product_id=product_id, price=1000, description="설명"),
+                             agent_id=agent_id)
+
+    def test_sessions_for_product_and_agent(self, storage):
+        """저장/덮어쓰기/삭제 후 역방향 인덱스가 일관되게 유지되는지 테스트"""
+        storage.store_contexts([
+            self.make_record("session_1", "PROD001", agent_id="agent_a"),
+            self.make_record("session_1", "PROD002", agent_id="agent_a"),
+            self.make_record("session_2", "PROD001", agent_id="agent_b"),
+            self.make_record("session_3", "PROD002"),
+        ])
+
+        assert sorted(storage.get_sessions_for_product("PROD001")) == ["session_1", "session_2"]
+        assert sorted(storage.get_sessions_for_agent("agent_a")) == ["session_1"]
+
+        storage.delete_context("session_1", "PROD001")
+        assert storage.get_sessions_for_product("PROD001") == ["session_2"]
+        assert storage.get_sessions_for_agent("agent_a") == ["session_1"]
+
+        storage.store_context("session_1", "PROD002", self.make_record("x", "PROD002").product_info,
+                              agent_id="agent_b")
+        assert storage.get_sessions_for_agent("agent_a") == []
+        assert sorted(storage.get_sessions_for_agent("agent_b")) == ["session_1", "session_2"]
+        assert storage.get_sessions_for_product("PROD404") == []
+
+    def test_cleanup_updates_indexes(self, storage):
+        """만료 정리 후 삭제된 문맥이 인덱스에서 빠지는지 테스트"""
+        storage.store_contexts([
+            self.make_record("old", "PROD001", hours_ago=48, agent_id="agent_a"),
+            self.make_record("new", "PROD001", agent_id="agent_a"),
+        ])
+
+        assert storage.cleanup_old_contexts(max_age_hours=24) == 1
+        assert storage.get_sessions_for_product("PROD001") == ["new"]
+        assert storage.get_sessions_for_agent("agent_a") == ["new"]
+        assert [record.session_id for record in storage.get_contexts_in_range(datetime.now() - timedelta(days=7))] \
+            == ["new"]
+
+    def test_contexts_in_range(self, storage):
+        """시간 구간 조회가 시각 순으로 정렬되고 만료 시각 변경에 영향받지 않는지 테스트"""
+        storage.store_contexts([self.make_record(f"session_{hours}", "PROD001", hours_ago=hours)
+                                for hours in (5, 1, 3, 10)])
+        storage.set_context_ttl("session_3", "PROD001", 72)
+
+        now = datetime.now()
+        records = storage.get_contexts_in_range(now - timedelta(hours=6), now - timedelta(hours=2))
+        assert [record.session_id for record in records] == ["session_5", "session_3"]
+        assert len(storage.get_contexts_in_range(now - timedelta(hours=24), limit=2)) == 2
+
+
+class TestVersionHistory:
+    """문맥 버전 이력 유닛 테스트"""
+
+    @staticmethod
+    def make_record(price, minutes_ago, description="고급 스마트폰 - 정품 1년 보증 포함"):
+        return ContextRecord(session_id="session_1", product_id="PROD001",
+                             timestamp=datetime.now() - timedelta(minutes=minutes_ago),
+                             product_info=ProductInfo(product_id="PROD001", price=price, description=description,
+                                                      attributes={"brand": "브랜드X"}))
+
+    def test_drip_pricing_keeps_first_seen_and_small_deltas(self):
+        """50번 조회하며 가격이 조금씩 바뀌어도 첫 스냅샷 하나와 가격 차이만 보관하는지 테스트"""
+        storage = ContextStorage()
+        for view in range(50):
+            storage.restore_context(self.make_record(100000 + view * 100, minutes_ago=50 - view))
+
+        history = storage.get_context_history("session_1", "PROD001")
+
+        assert [record.product_info.price for record in history] == [100000 + view * 100 for view in range(50)]
+        assert storage.get_first_seen_context("session_1", "PROD001").product_info.price == 100000
+        assert storage.get_context("session_1", "PROD001").product_info.price == 104900
+        # 첫 버전과 최신 버전만 전체 스냅샷으로 보관
+        assert storage.get_snapshot_stats()["snapshots"] == 2
+        assert storage.get_history_stats() == {"chains": 1, "versions": 50, "delta_fields": 49}
+
+    def test_context_at_time(self):
+        """시점별 조회가 그 시각에 보고 있던 버전을 반환하는지 테스트"""
+        storage = ContextStorage()
+        storage.restore_context(self.make_record(100000, minutes_ago=30))
+        storage.restore_context(self.make_record(100000, minutes_ago=20, description="설명 변경"))
+        storage.restore_context(self.make_record(90000, minutes_ago=10, description="설명 변경"))
+
+        now = datetime.now()
+        assert storage.get_context_at("session_1", "PROD001", now - timedelta(minutes=40)) is None
+        assert storage.get_context_at("session_1", "PROD001", now - timedelta(minutes=25)).product_info.description \
+            == "고급 스마트폰 - 정품 1년 보증 포함"
+        middle = storage.get_context_at("session_1", "PROD001", now - timedelta(minutes=15))
+        assert (middle.product_info.price, middle.product_info.description) == (100000, "설명 변경")
+        assert storage.get_context_at("session_1", "PROD001", now).product_info.price == 90000
+
+    def test_unchanged_view_keeps_first_seen_time(self):
+        """내용이 같은 재조회는 버전을 늘리지 않고 처음 본 시각을 유지하는지 테스트"""
+        storage = ContextStorage()
+        first = self.make_record(100000, minutes_ago=30)
+        storage.restore_context(first)
+        storage.restore_context(self.make_record(100000, minutes_ago=5))
+
+        assert len(storage.get_context_history("session_1", "PROD001")) == 1
+        assert storage.get_first_seen_context("session_1", "PROD001").timestamp == first.timestamp
+
+    def test_version_cap_and_delete(self):
+        """버전 수 한도를 넘으면 첫/최신 버전을 보존하며 합치고, 삭제 시 이력도 해제되는지 테스트"""
+        storage = ContextStorage(max_versions=5)
+        for view in range(20):
+            storage.restore_context(self.make_record(1000 + view, minutes_ago=20 - view))
+
+        prices = [record.product_info.price for record in storage.get_context_history("session_1", "PROD001")]
+        assert len(prices) == 5
+        assert (prices[0], prices[-1]) == (1000, 1019)
+
+        storage.delete_context("session_1", "PROD001")
+        assert storage.get_context_history("session_1", "PROD001") == []
+        assert storage.get_snapshot_stats()["snapshots"] == 0
+
+
+class TestDescriptionCompression:
+    """공유 사전 기반 설명 압축 유닛 테스트"""
+
+    BENEFITS = ["정품 1년 보증 포함", "무상 A/S", "무료 배송", "방수 기능 포함", "3년 무상 A/S"]
+
+    def make_product(self, index, price=1000):
+        description = (f"상품 {index} - {self.BENEFITS[index % 5]}, {self.BENEFITS[(index * 7) % 5]}. "
+                       f"공식 판매처에서 구매한 정품만 보증 대상이며 교환 및 반품은 수령 후 7일 이내 가능합니다.")
+        return ProductInfo(product_id=f"PROD{index:03d}", price=price, description=description,
+                           attributes={"brand": "X"})
+
+    def make_storage(self, **options):
+        dictionary = train_dictionary(self.make_product(index).description for index in range(50))
+        return ContextStorage(compress_descriptions=True, description_dictionary=dictionary, **options)
+
+    def test_trained_dictionary_round_trip(self):
+        """학습한 사전으로 압축한 설명이 원문 그대로 복원되고, 사전 없이 압축할 때보다 작은지 테스트"""
+        descriptions = [self.make_product(index).description for index in range(50)]
+        trained = DescriptionCompressor(train_dictionary(descriptions))
+        plain = DescriptionCompressor()
+
+        for description in descriptions:
+            assert trained.decompress(trained.compress(description)) == description
+            assert plain.decompress(plain.compress(description)) == description
+
+        assert trained.get_stats()["ratio"] > 2
+        assert trained.get_stats()["stored_bytes"] < plain.get_stats()["stored_bytes"]
+        # 압축해도 줄지 않는 짧은 설명은 문자열 그대로 보관
+        assert trained.compress("짧음") == "짧음"
+
+    def test_storage_returns_original_product(self):
+        """압축 저장소에서 조회한 문맥이 저장한 상품과 같고, 반복 조회는 복원 캐시를 쓰는지 테스트"""
+        storage = self.make_storage()
+        for index in range(10):
+            storage.store_context("session_1", f"PROD{index:03d}", self.make_product(index))
+
+        for _ in range(3):
+            for index in range(10):
+                assert storage.get_context("session_1", f"PROD{index:03d}").product_info == self.make_product(index)
+
+        stats = storage.get_compression_stats()
+        assert stats["compressed"] == 10
+        assert stats["cache_misses"] == 10
+        assert stats["cache_hits"] >= 20
+        assert ContextStorage().get_compression_stats() == {}
+
+    def test_release_evicts_cached_snapshot(self):
+        """스냅샷 해제 시 복원 캐시에서도 제거되는지 테스트"""
+        storage = self.make_storage(max_versions=1)
+        storage.store_context("session_1", "PROD001", self.make_product(1))
+        storage.get_context("session_1", "PROD001")
+        storage.delete_context("session_1", "PROD001")
+
+        assert storage.get_snapshot_stats()["snapshots"] == 0
+        assert len(storage.snapshot_pool._hot) == 0
+
+    def test_history_and_journal_recovery(self, tmp_path):
+        """압축 저장소에서도 버전 이력과 재시작 후 복구가 원문으로 동작하는지 테스트"""
+        storage = self.make_storage(journal_dir=str(tmp_path))
+        storage.store_context("session_1", "PROD001", self.make_product(1))
+        storage.store_context("session_1", "PROD001", self.make_product(2))
+        storage.close()
+
+        recovered = self.make_storage(journal_dir=str(tmp_path))
+
+        history = recovered.get_context_history("session_1", "PROD001")
+        assert [record.product_info.description for record in history] == [
+            self.make_product(1).description, self.make_product(2).description]
+        recovered.close()
+
+
+class TestSharedMemoryContextStorage:
+    """프로세스 간 공유 문맥 저장소 유닛 테스트"""
+
+    def make_product(self, product_id="PROD001", price=1000):
+        return ProductInfo(product_id=product_id, price=price, description="공유 설명", attributes={"brand": "X"})
+
+    def test_contexts_visible_across_processes(self, tmp_path):
+        """한 프로세스가 저장한 문맥을 다른 프로세스에서 조회할 수 있는지 테스트"""
+        path = str(tmp_path / "ctx.shm")
+        storage = ContextStorage(storage_type="shared", shared_memory_path=path)
+        storage.store_context("parent_session", "PROD001", self.make_product(price=4321))
+
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        reader = context.Process(target=_shared_reader, args=(path, queue))
+        reader.start()
+        reader.join(timeout=30)
+        assert queue.get(timeout=5) == 4321
+
+        writer = context.Process(target=_shared_writer, args=(path, 7, 3))
+        writer.start()
+        writer.join(timeout=30)
+        record = storage.get_context("worker7_session", "PROD002")
+        assert record.product_info.price == 7002
+        assert record.product_info.description == "공유 설명"
+        storage.close()
+
+    def test_concurrent_writers_are_serialized(self, tmp_path):
+        """여러 프로세스가 동시에 쓰고 조회하는 중에도 모든 쓰기가 반영되는지 테스트"""
+        path = str(tmp_path / "ctx.shm")
+        storage = ContextStorage(storage_type="shared", shared_memory_path=path, shared_memory_slots=4096,
+                                 shared_memory_bytes=1 << 20)
+        context = multiprocessing.get_context("fork")
+        writers = [context.Process(target=_shared_writer, args=(path, worker, 200)) for worker in range(4)]
+        for writer in writers:
+            writer.start()
+        # 쓰기와 겹친 조회는 깨진 값을 반환하지 않고 재시도
+        while any(writer.is_alive() for writer in writers):
+            record = storage.get_context("worker0_session", "PROD000")
+            assert record is None or record.product_info.price == 0
+        for writer in writers:
+            writer.join(timeout=30)
+
+        assert sorted(storage.get_session_ids()) == [f"worker{worker}_session" for worker in range(4)]
+        for worker in range(4):
+            found = storage.get_contexts(f"worker{worker}_session", [f"PROD{index:03d}" for index in range(200)])
+            assert {record.product_info.price for record in found.values()} == \
+                {worker * 1000 + index for index in range(200)}
+        assert storage.shared_store.get_stats()["contexts"] == 800
+        storage.close()
+
+    def test_compaction_reclaims_overwritten_records(self, tmp_path):
+        """영역이 차면 덮어쓴 레코드와 삭제 표시 공간을 회수하고, 살아 있는 문맥 수가 한도를 넘으면 저장에 실패하는지 테스트"""
+        store = SharedMemoryContextStore(str(tmp_path / "ctx.shm"), slots=16, arena_bytes=4096)
+        now = datetime.now()
+        for version in range(200):
+            store.put("session_1", "PROD001", now, self.make_product(price=version))
+            store.put(f"temp_{version}", "PROD002", now, self.make_product("PROD002"))
+            store.delete(f"temp_{version}", "PROD002")
+
+        assert store.get("session_1", "PROD001").product_info.price == 199
+        stats = store.get_stats()
+        assert stats["compactions"] > 0
+        assert stats["contexts"] == 1
+
+        with pytest.raises(RuntimeError):
+            for index in range(16):
+                store.put(f"session_{index}", "PROD001", now, self.make_product())
+        assert store.get_stats()["contexts"] == 11
+        store.close()
+        store.unlink()
@@ -0,0 +1,24 @@
+import pytest
+from src.sharding.hash_ring import ConsistentHashRing
+
+class TestConsistentHashRing:
+    """ConsistentHashRing 유닛 테스트"""
+
+    def test_stable_assignment(self):
+        """같은 세션은 항상 같은 샤드에 배정되는지 테스트"""
+        ring = ConsistentHashRing(4)
+        assert all(ring.get_shard(f"session_{i}") == ConsistentHashRing(4).get_shard(f"session_{i}")
+                   for i in range(100))
+
+    def test_minimal_movement_on_resize(self):
+        """샤드 추가 시 일부 세션만 이동하는지 테스트"""
+        session_ids = [f"session_{i}" for i in range(5000)]
+        before = ConsistentHashRing(4)
+        after = ConsistentHashRing(5)
+
+        moved = [s for s in session_ids if before.get_shard(s) != after.get_shard(s)]
+
+        # 이동한 세션은 모두 새 샤드로 가야 하며, 전체의 약 1/5만 이동
+        assert all(after.get_shard(s) == 4 for s in moved)
+        assert len(moved) < len(session_ids) * 0.35
+        assert min(after.distribution(session_ids).values()) > 0
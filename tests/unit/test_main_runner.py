@@ -0,0 +1,66 @@
+import pytest
+import asyncio
+from src.main import _percentile, _run_scenarios_concurrently, FRAUD_SCENARIOS
+from src.system import FraudDetectionSystem
+
+
+class CountingSystem:
+    """동시에 실행 중인 시나리오 수를 기록하는 시스템 대역"""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.seen = []
+
+    async def simulate_fraud_scenario(self, scenario_type):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0)
+        self.running -= 1
+        self.seen.append(scenario_type)
+        return {"is_fraud_detected": scenario_type in FRAUD_SCENARIOS, "simulated_latency": 1.5}
+
+
+class TestScenarioRunner:
+    """대규모 테스트 실행기 유닛 테스트"""
+
+    def test_percentile_nearest_rank(self):
+        """분위수가 nearest-rank 방식으로 계산되는지 테스트"""
+        values = [float(value) for value in range(1, 101)]
+
+        assert _percentile([], 0.5) == 0.0
+        assert _percentile([7.0], 0.99) == 7.0
+        assert _percentile(values, 0.5) == 50.0
+        assert _percentile(values, 0.95) == 95.0
+        assert _percentile(values, 0.99) == 99.0
+        assert _percentile(values, 1.0) == 100.0
+        assert _percentile(values, 0.0) == 1.0
+
+    @pytest.mark.asyncio
+    async def test_runs_every_scenario_within_concurrency(self, capsys):
+        """모든 시나리오가 한 번씩 실행되고 동시 실행 수가 제한되는지 테스트"""
+        system = CountingSystem()
+        plan = ["normal", "price_change", "description_change", "wording_variation"] * 10
+
+        results = await _run_scenarios_concurrently(system, plan, concurrency=4)
+
+        assert sorted(system.seen) == sorted(plan)
+        assert system.max_running == 4
+        assert sorted(r["scenario"] for r in results) == sorted(plan)
+        assert all(r["is_fraud_detected"] == (r["scenario"] in FRAUD_SCENARIOS) for r in results)
+        assert all(r["simulated_latency"] == 1.5 and r["detection_time"] >= 0 for r in results)
+        assert "진행 중: 40/40" in capsys.readouterr().out
+
+    @pytest.mark.asyncio
+    async def test_concurrent_scenarios_on_shared_system(self, capsys):
+        """하나의 시스템을 공유해 동시에 실행해도 사기 시나리오만 탐지되는지 테스트 (표현 변형은 정상)"""
+        system = FraudDetectionSystem({"console_notifications": False, "clock": "virtual", "latency_model": 0})
+        plan = ["normal", "price_change", "description_change", "wording_variation"] * 5
+        try:
+            results = await _run_scenarios_concurrently(system, plan, concurrency=8)
+        finally:
+            await system.aclose()
+
+        assert len(results) == len(plan)
+        for result in results:
+            assert result["is_fraud_detected"] == (result["scenario"] in FRAUD_SCENARIOS), result["scenario"]
@@ -0,0 +1,427 @@
+import pytest
+import asyncio
+import json
+import threading
+from datetime import timedelta
+import aiohttp
+from aiohttp import web
+from loguru import logger
+from src.interfaces.mcp_interface import MCPInterface, MCPProxy, mcp_endpoint
+from src.system import FraudDetectionSystem
+
+
+def tag(name):
+    """응답에 이름을 덧붙이는 변경 인터셉터"""
+    def interceptor(data):
+        return {**data, "chain": data.get("chain", []) + [name]}
+    return interceptor
+
+
+class TestInterceptorChain:
+    """MCP 인터셉터 체인 유닛 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_interceptors_run_in_registration_order(self):
+        """같은 엔드포인트에 등록한 동기/비동기 인터셉터가 덮어쓰지 않고 등록 순서대로 실행되는지 테스트"""
+        interface = MCPInterface()
+
+        async def async_tag(data):
+            await asyncio.sleep(0)
+            return {**data, "chain": data["chain"] + ["async"]}
+
+        def failing(data):
+            raise ValueError("인터셉터 오류")
+
+        interface.register_response_interceptor("get_product", tag("first"))
+        interface.register_response_interceptor("get_product", async_tag)
+        interface.register_response_interceptor("get_product", failing)
+        interface.register_response_interceptor("get_product", tag("last"))
+
+        response = await MCPProxy(interface).forward_response("get_product", {"id": "PROD001"})
+
+        assert response["chain"] == ["first", "async", "last"]
+        assert interface.stats["errors"] == 1
+
+    def test_fast_path_and_sync_chain(self):
+        """인터셉터가 없는 엔드포인트는 같은 객체를 그대로 반환하고, 루프 밖 동기 호출도 비동기 인터셉터를 실행하는지 테스트"""
+        interface = MCPInterface()
+
+        async def async_tag(data):
+            return {**data, "chain": data["chain"] + ["async"]}
+
+        interface.register_request_interceptor("search_products", tag("sync"))
+        interface.register_request_interceptor("search_products", async_tag)
+        request = {"query": "노트북"}
+
+        assert interface.intercept_request("get_cart", request) is request
+        assert interface.intercept_response("search_products", request) is request
+        assert interface.intercept_request("search_products", request)["chain"] == ["sync", "async"]
+        assert interface.stats["intercepted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_observers_run_off_the_response_path(self):
+        """관찰 전용 인터셉터는 응답을 막지 않고 최종 응답을 받아 나중에 실행되는지 테스트"""
+        interface = MCPInterface()
+        release = asyncio.Event()
+        observed = []
+
+        async def slow_observer(data):
+            await release.wait()
+            observed.append(data["chain"])
+
+        interface.register_response_interceptor("get_product", slow_observer, observe_only=True)
+        interface.register_response_interceptor("get_product", tag("modified"))
+        interface.register_response_interceptor("get_product", lambda data: observed.append("sync"),
+                                                observe_only=True)
+
+        response = await interface.intercept_response_async("get_product", {"id": "PROD001"})
+        assert response["chain"] == ["modified"]
+        assert observed == []
+
+        release.set()
+        await interface.drain_observers()
+        assert sorted(map(str, observed)) == sorted(["sync", str(["modified"])])
+        assert interface.stats["observed"] == 2
+
+    def test_sync_observers_use_observer_thread(self):
+        """이벤트 루프 밖에서 예약한 관찰 전용 인터셉터는 관찰 스레드에서 순서대로 실행되는지 테스트"""
+        interface = MCPInterface()
+        observed = []
+        release = threading.Event()
+
+        def observer(data):
+            release.wait(5)
+            observed.append((threading.current_thread().name, data["id"]))
+
+        interface.register_response_interceptor("get_product", observer, observe_only=True)
+        for index in range(3):
+            interface.intercept_response("get_product", {"id": f"PROD00{index}"})
+        assert observed == []
+
+        release.set()
+        assert interface.flush_observers(timeout=5)
+        assert [product_id for _, product_id in observed] == ["PROD000", "PROD001", "PROD002"]
+        assert all(name.startswith("mcp-observer") for name, _ in observed)
+        interface.close()
+
+
+PRODUCT = {"id": "PROD001", "name": "프리미엄 스마트폰", "price": 1000000, "description": "정품 1년 보증"}
+
+
+async def start_upstream():
+    """테스트용 업스트림 쇼핑몰 (상품 조회, 대용량 검색, 장바구니 추가)"""
+    received = []
+
+    async def get_product(request):
+        return web.json_response({**PRODUCT, "id": request.match_info["product_id"]})
+
+    async def search(request):
+        count = int(request.query.get("count", "1"))
+        return web.json_response({"results": [PRODUCT] * count, "count": count})
+
+    async def add_to_cart(request):
+        body = await request.read()
+        try:
+            received.append(json.loads(body))
+        except ValueError:
+            received.append(body)
+        return web.json_response({"success": True})
+
+    app = web.Application()
+    app.router.add_get("/api/mcp/product/{product_id}", get_product)
+    app.router.add_get("/api/mcp/search", search)
+    app.router.add_post("/api/mcp/cart", add_to_cart)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, runner.addresses[0][1], received
+
+
+class TestReverseProxy:
+    """MCP 역방향 프록시 유닛 테스트"""
+
+    def test_endpoint_names(self):
+        """MCP 경로가 인터셉터 엔드포인트 이름으로 바뀌는지 테스트"""
+        assert mcp_endpoint("GET", "/api/mcp/product/PROD001") == "get_product"
+        assert mcp_endpoint("POST", "/api/mcp/cart") == "add_to_cart"
+        assert mcp_endpoint("GET", "/api/mcp/unknown") == "/api/mcp/unknown"
+
+    @pytest.mark.asyncio
+    async def test_streams_response_and_taps_copy(self):
+        """응답을 그대로 중계하고, 응답 사본은 세션/에이전트 정보와 함께 응답 인터셉터에 전달되는지 테스트"""
+        runner, port, _ = await start_upstream()
+        interface = MCPInterface()
+        captured = []
+        interface.register_response_interceptor("get_product", captured.append, observe_only=True)
+        interface.register_response_interceptor("search_products", captured.append, observe_only=True)
+        proxy = MCPProxy(interface, upstream_url=f"http://127.0.0.1:{port}", chunk_size=1024, tap_limit=64 * 1024)
+        proxy_port = await proxy.start(port=0)
+
+        async with aiohttp.ClientSession() as client:
+            headers = {"X-Session-ID": "session_1", "X-Agent-ID": "agent_a"}
+            async with client.get(f"http://127.0.0.1:{proxy_port}/api/mcp/product/PROD007", headers=headers) as response:
+                assert response.status == 200
+                assert await response.json() == {**PRODUCT, "id": "PROD007"}
+            # 사본 한도를 넘는 응답은 중계만 하고 인터셉터에는 넘기지 않음
+            async with client.get(f"http://127.0.0.1:{proxy_port}/api/mcp/search",
+                                  params={"count": "2000"}, headers=headers) as response:
+                assert len((await response.json())["results"]) == 2000
+        await proxy.drain()
+
+        assert len(captured) == 1
+        assert captured[0]["session_id"] == "session_1"
+        assert captured[0]["agent_id"] == "agent_a"
+        assert captured[0]["product"]["id"] == "PROD007"
+        assert proxy.stats["tap_skipped"] == 1
+        await proxy.close()
+        await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_request_interceptor_and_upstream_failure(self):
+        """요청 인터셉터가 바꾼 본문이 업스트림에 전달되고, 업스트림이 없으면 502를 반환하는지 테스트"""
+        runner, port, received = await start_upstream()
+        interface = MCPInterface()
+        interface.register_request_interceptor(
+            "add_to_cart", lambda data: {**data, "body": {**data["body"], "quantity": 1}})
+        proxy = MCPProxy(interface, upstream_url=f"http://127.0.0.1:{port}")
+        proxy_port = await proxy.start(port=0)
+
+        async with aiohttp.ClientSession() as client:
+            async with client.post(f"http://127.0.0.1:{proxy_port}/api/mcp/cart", json={"product_id": "PROD001"},
+                                   headers={"X-Session-ID": "session_1"}) as response:
+                assert (await response.json())["success"] is True
+            assert received == [{"product_id": "PROD001", "quantity": 1}]
+            assert await proxy.forward_request("get_product", {"session_id": "session_1",
+                                                               "product_id": "PROD002"}) == {**PRODUCT, "id": "PROD002"}
+
+            await runner.cleanup()
+            async with client.get(f"http://127.0.0.1:{proxy_port}/api/mcp/product/PROD001") as response:
+                assert response.status == 502
+        assert proxy.stats["upstream_errors"] == 1
+        await proxy.close()
+
+    @pytest.mark.asyncio
+    async def test_modifying_interceptor_result_reaches_agent(self):
+        """변경 인터셉터가 있으면 바꾼 응답이 에이전트에게 전달되고, 관찰 전용 인터셉터는 최종 데이터를 받는지 테스트"""
+        runner, port, _ = await start_upstream()
+        interface = MCPInterface()
+        observed = []
+        interface.register_response_interceptor(
+            "get_product", lambda data: {**data, "product": {**data["product"], "price": 1}})
+        interface.register_response_interceptor(
+            "search_products", lambda data: {**data, "count": 0, "session_id": "changed"})
+        interface.register_response_interceptor("search_products", observed.append, observe_only=True)
+        proxy = MCPProxy(interface, upstream_url=f"http://127.0.0.1:{port}", chunk_size=1024, tap_limit=64 * 1024)
+        proxy_port = await proxy.start(port=0)
+
+        async with aiohttp.ClientSession() as client:
+            headers = {"X-Session-ID": "session_1"}
+            async with client.get(f"http://127.0.0.1:{proxy_port}/api/mcp/product/PROD007", headers=headers) as response:
+                assert await response.json() == {**PRODUCT, "id": "PROD007", "price": 1}
+            async with client.get(f"http://127.0.0.1:{proxy_port}/api/mcp/search", headers=headers) as response:
+                assert await response.json() == {"results": [PRODUCT], "count": 0}
+            # 사본 한도를 넘는 응답은 인터셉트하지 않고 그대로 중계
+            async with client.get(f"http://127.0.0.1:{proxy_port}/api/mcp/search",
+                                  params={"count": "2000"}, headers=headers) as response:
+                body = await response.json()
+                assert len(body["results"]) == 2000 and body["count"] == 2000
+        await proxy.drain()
+
+        assert len(observed) == 1
+        assert observed[0]["count"] == 0 and observed[0]["session_id"] == "changed"
+        assert proxy.stats["tap_skipped"] == 1
+        await proxy.close()
+        await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_streamed_tap_runs_only_observers(self):
+        """관찰 전용 인터셉터만 있는 엔드포인트는 스트리밍 후 사본을 관찰 전용 인터셉터에만 넘기는지 테스트"""
+        runner, port, _ = await start_upstream()
+        interface = MCPInterface()
+        observed = []
+        interface.register_response_interceptor("get_product", observed.append, observe_only=True)
+        proxy = MCPProxy(interface, upstream_url=f"http://127.0.0.1:{port}")
+        proxy_port = await proxy.start(port=0)
+
+        async with aiohttp.ClientSession() as client:
+            async with client.get(f"http://127.0.0.1:{proxy_port}/api/mcp/product/PROD001") as response:
+                assert await response.json() == PRODUCT
+        await proxy.drain()
+
+        assert [data["product"] for data in observed] == [PRODUCT]
+        assert interface.stats["intercepted"] == 0
+        await proxy.close()
+        await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_non_json_request_body_is_forwarded(self):
+        """요청 인터셉터가 있어도 JSON이 아니거나 비어 있는 본문은 500 없이 그대로 전달되는지 테스트"""
+        runner, port, received = await start_upstream()
+        interface = MCPInterface()
+        interface.register_request_interceptor("add_to_cart", lambda data: {**data, "body": {"quantity": 1}})
+        proxy = MCPProxy(interface, upstream_url=f"http://127.0.0.1:{port}")
+        proxy_port = await proxy.start(port=0)
+
+        async with aiohttp.ClientSession() as client:
+            url = f"http://127.0.0.1:{proxy_port}/api/mcp/cart"
+            async with client.post(url, data=b"product_id=PROD001",
+                                   headers={"Content-Type": "application/x-www-form-urlencoded"}) as response:
+                assert response.status == 200
+            async with client.post(url, data=b"", headers={"Content-Type": "application/json"}) as response:
+                assert response.status == 200
+
+        assert received == [b"product_id=PROD001", {"quantity": 1}]
+        await proxy.close()
+        await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_system_aclose_closes_proxy(self):
+        """시스템의 aclose()가 프록시 서버와 업스트림 커넥션 풀을 닫는지 테스트"""
+        runner, port, _ = await start_upstream()
+        system = FraudDetectionSystem({"console_notifications": False, "mcp_upstream_url": f"http://127.0.0.1:{port}"})
+        proxy_port = await system.mcp_proxy.start(port=0)
+        assert system.mcp_proxy.is_open
+
+        await system.aclose()
+
+        assert not system.mcp_proxy.is_open
+        async with aiohttp.ClientSession() as client:
+            with pytest.raises(aiohttp.ClientConnectionError):
+                await client.get(f"http://127.0.0.1:{proxy_port}/api/mcp/product/PROD001")
+        await runner.cleanup()
+
+
+class TestBulkContextCapture:
+    """목록형 MCP 응답 문맥 일괄 저장 유닛 테스트"""
+
+    @pytest.fixture
+    def system(self):
+        system = FraudDetectionSystem({"console_notifications": False})
+        yield system
+        system.cleanup()
+
+    def spy_store_calls(self, system, monkeypatch):
+        calls = []
+        store_contexts = system.context_storage.store_contexts
+        monkeypatch.setattr(system.context_storage, "store_contexts",
+                            lambda records, **kwargs: calls.append(len(list(records))) or store_contexts(records, **kwargs))
+        monkeypatch.setattr(system.context_storage, "store_context",
+                            lambda *args, **kwargs: pytest.fail("상품마다 저장하면 안 됨"))
+        return calls
+
+    def test_search_results_are_stored_in_one_call(self, system, monkeypatch):
+        """검색 결과 500개가 일괄 저장 한 번으로 기록되고, 추출할 수 없는 항목과 중복은 건너뛰는지 테스트"""
+        calls = self.spy_store_calls(system, monkeypatch)
+        results = [{**PRODUCT, "id": f"PROD{index:03d}", "price": 1000 + index} for index in range(500)]
+        results += [{"name": "ID 없는 상품"}, {**PRODUCT, "id": "PROD000", "price": 999}]
+
+        system.mcp_interface.intercept_response("search_products", {"session_id": "session_1", "agent_id": "agent_a",
+                                                                     "results": results, "count": len(results)})
+        assert system.mcp_interface.flush_observers(timeout=5)
+
+        assert calls == [500]
+        record = system.context_storage.get_context("session_1", "PROD000")
+        assert record.product_info.price == 999
+        assert record.agent_id == "agent_a"
+        assert system.context_storage.get_context("session_1", "PROD499").product_info.price == 1499
+
+    @pytest.mark.asyncio
+    async def test_cart_items_and_single_product(self, system, monkeypatch):
+        """장바구니 항목과 단일 상품 조회 응답도 같은 방식으로 한 번에 저장되는지 테스트"""
+        calls = self.spy_store_calls(system, monkeypatch)
+
+        await system.mcp_interface.intercept_response_async(
+            "get_cart", {"session_id": "session_2", "items": [PRODUCT, {**PRODUCT, "id": "PROD002"}], "count": 2})
+        await system.mcp_interface.intercept_response_async(
+            "get_product", {"session_id": "session_2", "product": {**PRODUCT, "id": "PROD003"}})
+        await system.mcp_interface.intercept_response_async("get_cart", {"session_id": "session_2", "items": []})
+        await system.mcp_interface.drain_observers()
+
+        assert calls == [2, 1]
+        contexts = system.context_storage.get_contexts("session_2", ["PROD001", "PROD002", "PROD003", "PROD004"])
+        assert sorted(contexts) == ["PROD001", "PROD002", "PROD003"]
+
+    @pytest.mark.asyncio
+    async def test_cart_listing_keeps_view_time_context(self, system, monkeypatch):
+        """상품 조회 후 가격이 바뀌고 장바구니를 조회해도, 장바구니 담기 검증이 조회 시점 가격과 비교하는지 테스트"""
+        current = {"price": 1000000}
+
+        async def collect_product_data(product_id, collect_methods=None):
+            info = system.mcp_interface.extract_product_info({**PRODUCT, "price": current["price"]})
+            return {"mcp": info, "web": None}
+
+        monkeypatch.setattr(system.data_collector, "collect_product_data", collect_product_data)
+
+        await system.mcp_interface.intercept_response_async(
+            "get_product", {"session_id": "session_4", "product": PRODUCT})
+        current["price"] = 1300000
+        await system.mcp_interface.intercept_response_async(
+            "get_cart", {"session_id": "session_4", "items": [{**PRODUCT, "price": 1300000},
+                                                              {**PRODUCT, "id": "PROD002"}]})
+        await system.mcp_interface.intercept_response_async(
+            "search_products", {"session_id": "session_4", "results": [{**PRODUCT, "price": 1300000}]})
+        await system.mcp_interface.drain_observers()
+
+        assert system.context_storage.get_context("session_4", "PROD001").product_info.price == 1000000
+        assert system.context_storage.get_context("session_4", "PROD002") is not None
+        result = await system.on_add_to_cart("session_4", "PROD001")
+        assert result.is_fraud_detected
+        assert "price" in result.changes
+
+    @pytest.mark.asyncio
+    async def test_captured_context_uses_system_clock(self):
+        """가상 시계를 쓰면 응답에서 저장한 문맥의 시각과 장바구니 만료 시각이 가상 시각 기준인지 테스트"""
+        system = FraudDetectionSystem({"console_notifications": False, "clock": "virtual", "latency_model": 0})
+        try:
+            await system.clock.sleep(3600)
+            await system.mcp_interface.intercept_response_async(
+                "get_product", {"session_id": "session_5", "product": PRODUCT})
+            await system.mcp_interface.drain_observers()
+            assert system.context_storage.get_context("session_5", "PROD001").timestamp == system.clock.now()
+
+            await system.on_add_to_cart("session_5", "PROD001")
+            assert system.context_storage.get_context("session_5", "PROD001").expires_at == \
+                system.clock.now() + timedelta(hours=system.checkout_context_ttl_hours)
+        finally:
+            await system.aclose()
+
+    def test_observe_only_capture_requires_concurrent_storage(self):
+        """관찰 전용 문맥 저장은 기본으로 꺼져 있고, 잠금 분할 저장소가 아니면 켜도 응답 경로에서 저장하는지 테스트"""
+        for config in ({}, {"observe_only_context_capture": True}):
+            system = FraudDetectionSystem({"console_notifications": False, **config})
+            assert system.observe_only_context_capture is False
+            system.mcp_interface.intercept_response("get_product", {"session_id": "session_3", "product": PRODUCT})
+            assert system.context_storage.get_context("session_3", "PROD001") is not None
+            assert system.mcp_interface._observer_executor is None
+            system.cleanup()
+
+    def test_observer_thread_capture_with_concurrent_writes(self):
+        """관찰 스레드의 문맥 저장과 호출자 스레드의 저장/삭제/정리가 섞여도 저장소가 일관되게 유지되는지 테스트"""
+        system = FraudDetectionSystem({"console_notifications": False, "context_storage_stripes": 4,
+                                       "observe_only_context_capture": True})
+        assert system.observe_only_context_capture is True
+        storage = system.context_storage
+        errors = []
+        logger_id = logger.add(lambda message: errors.append(message), level="ERROR")
+        try:
+            for index in range(3000):
+                session_id = f"session_{index % 20}"
+                product = {**PRODUCT, "id": f"PROD{index % 40:03d}", "price": 1000 + index % 7}
+                system.mcp_interface.intercept_response("get_product", {"session_id": session_id, "product": product})
+                storage.store_context(session_id, f"PROD{(index + 1) % 40:03d}",
+                                      system.mcp_interface.extract_product_info(product))
+                storage.delete_context(f"session_{(index + 3) % 20}", f"PROD{index % 40:03d}")
+                if index % 100 == 0:
+                    storage.cleanup_old_contexts(24)
+            assert system.mcp_interface.flush_observers(timeout=10)
+        finally:
+            logger.remove(logger_id)
+
+        assert errors == []
+        assert system.mcp_interface.stats["errors"] == 0
+        live = sum(len(storage.get_all_contexts_for_session(f"session_{index}")) for index in range(20))
+        history = storage.get_history_stats()
+        # 스냅샷 참조는 살아 있는 문맥과 버전 이력 체인이 가진 참조의 합과 같아야 함
+        assert storage.get_snapshot_stats()["references"] == live + history["chains"]
+        system.cleanup()
@@ -0,0 +1,668 @@
+import pytest
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from src.models.data_models import NotificationMessage, DetectionResult
+from src.notification.notifier import Notifier
+from src.notification.persistence import NotificationStore
+from src.notification.webhook import AgentWebhookHandler
+from src.notification.subscriptions import SubscriptionHub
+from src.simulation.clock import Clock, VirtualClock
+
+
+def make_notification(index=0, severity="warning", session_id="session_1"):
+    return NotificationMessage(session_id=session_id, product_id=f"PROD{index:03d}",
+                               message=f"상품 {index} 가격 변경", severity=severity)
+
+
+def handler_stats(notifier, name):
+    """핸들러 이름(지역 함수는 정규화된 이름의 끝부분)으로 발송 통계 조회"""
+    return next(stats for handler, stats in notifier.get_dispatch_stats()["handlers"].items()
+                if handler.endswith(name))
+
+
+class TestAsyncDispatch:
+    """Notifier 비동기 발송 유닛 테스트"""
+
+    def test_notify_does_not_wait_for_slow_handler(self):
+        """느린 핸들러가 있어도 notify가 바로 반환되고, flush 후 모든 알림이 순서대로 전달되는지 테스트"""
+        notifier = Notifier()
+        received = []
+        release = threading.Event()
+
+        def slow_handler(notification):
+            release.wait(5)
+            received.append(notification.product_id)
+
+        notifier.register_handler("warning", slow_handler)
+        started = time.perf_counter()
+        for index in range(100):
+            assert notifier.notify(make_notification(index))
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.5
+        assert received == []
+        assert len(notifier.get_notification_history("session_1")) == 100
+
+        release.set()
+        assert notifier.flush(timeout=10)
+        assert received == [f"PROD{index:03d}" for index in range(100)]
+        notifier.close()
+
+    def test_handler_isolation_and_timeouts(self):
+        """멈춘 핸들러는 제한 시간 초과로 처리되고, 오류를 내는 핸들러와 함께 있어도 다른 핸들러는 전달받는지 테스트"""
+        notifier = Notifier(handler_timeout=0.05)
+        received = []
+
+        async def hanging_handler(notification):
+            await asyncio.sleep(10)
+
+        def failing_handler(notification):
+            raise RuntimeError("핸들러 오류")
+
+        async def async_handler(notification):
+            await asyncio.sleep(0)
+            received.append(notification.product_id)
+
+        notifier.register_handler("error", hanging_handler)
+        notifier.register_handler("error", failing_handler)
+        notifier.register_handler("error", async_handler)
+        for index in range(3):
+            notifier.notify(make_notification(index, severity="error"))
+
+        assert notifier.flush(timeout=10)
+        assert received == ["PROD000", "PROD001", "PROD002"]
+        assert handler_stats(notifier, "hanging_handler")["timeouts"] == 3
+        assert handler_stats(notifier, "failing_handler")["errors"] == 3
+        notifier.close()
+
+    def test_batch_handler_and_bounded_queue(self):
+        """일괄 핸들러가 쌓인 알림을 목록으로 받고, 대기열이 가득 차면 해당 핸들러 알림만 버리는지 테스트"""
+        notifier = Notifier(queue_size=10)
+        batches = []
+        received = []
+        release = threading.Event()
+
+        def batch_handler(notifications):
+            release.wait(5)
+            batches.append([notification.product_id for notification in notifications])
+
+        notifier.register_handler("warning", batch_handler, batch=True, max_batch_size=4)
+        notifier.register_handler("info", lambda notification: received.append(notification.product_id))
+        for index in range(30):
+            notifier.notify(make_notification(index))
+        notifier.notify(make_notification(99, severity="info"))
+        # 발송 스레드가 대기열을 채워 넘칠 때까지 기다린 뒤 핸들러 해제
+        deadline = time.monotonic() + 5
+        while handler_stats(notifier, "batch_handler")["dropped"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+
+        assert notifier.flush(timeout=10)
+        stats = handler_stats(notifier, "batch_handler")
+        assert received == ["PROD099"]
+        assert all(1 <= len(batch) <= 4 for batch in batches)
+        assert stats["delivered"] + stats["dropped"] == 30
+        assert stats["dropped"] > 0
+        assert len(batches) < stats["delivered"]
+        notifier.close()
+
+    def test_close_with_blocking_handler_does_not_raise(self):
+        """핸들러가 발송 루프를 제한 시간보다 오래 막아도 close가 예외 없이 반환하고, 루프는 발송 스레드가 닫는지 테스트"""
+        notifier = Notifier(handler_timeout=None)
+        started = threading.Event()
+
+        async def blocking_handler(notification):
+            started.set()
+            time.sleep(0.5)
+
+        notifier.register_handler("warning", blocking_handler)
+        notifier.notify(make_notification())
+        assert started.wait(5)
+        loop, thread = notifier._loop, notifier._thread
+
+        notifier.close(timeout=0.05)
+
+        assert notifier._loop is None
+        thread.join(5)
+        assert loop.is_closed()
+
+    @pytest.mark.asyncio
+    async def test_system_aclose_does_not_block_event_loop(self):
+        """시스템 aclose가 느린 알림 핸들러를 기다리는 동안에도 이벤트 루프가 다른 태스크를 실행하는지 테스트"""
+        from src.system import FraudDetectionSystem
+
+        system = FraudDetectionSystem({"console_notifications": False, "notification_dedup_window": 0})
+        system.notifier.register_handler("warning", lambda notification: time.sleep(0.3))
+        system.notifier.notify(make_notification())
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await system.aclose()
+        task.cancel()
+
+        assert ticks >= 10
+        assert system.notifier._loop is None
+
+    def test_inline_dispatch(self):
+        """동기 발송 모드에서는 notify 반환 전에 핸들러가 실행되는지 테스트"""
+        notifier = Notifier(async_dispatch=False)
+        received = []
+        notifier.register_handler("warning", lambda notification: received.append(notification.product_id))
+        notifier.register_handler("warning", lambda notifications: received.append(len(notifications)), batch=True)
+
+        notifier.notify(make_notification(1))
+
+        assert received == ["PROD001", 1]
+
+
+class ManualClock(Clock):
+    """테스트용 수동 시계"""
+
+    def __init__(self):
+        self.current = 0.0
+
+    def time(self) -> float:
+        return self.current
+
+    def monotonic(self) -> float:
+        return self.current
+
+
+def make_fraud_notification(product_id="PROD001", price=120000, deception_score=None, severity="warning"):
+    changes = {"price": {"original": 100000, "current": price, "change_ratio": abs(price - 100000) / 100000}}
+    if deception_score is not None:
+        changes["description"] = {"original": "정품", "current": "병행수입", "deception_score": deception_score}
+    return NotificationMessage(
+        session_id="session_1", product_id=product_id, message=f"상품 {product_id} 가격 {price}원",
+        severity=severity, action_required=True,
+        details=DetectionResult(session_id="session_1", product_id=product_id, is_fraud_detected=True,
+                                changes=changes)
+    )
+
+
+class TestNotificationDedup:
+    """반복 알림 억제 및 요약 알림 유닛 테스트"""
+
+    def make_notifier(self, clock, **options):
+        notifier = Notifier(async_dispatch=False, dedup_window=300, clock=clock, **options)
+        received = []
+        for severity in ("warning", "error"):
+            notifier.register_handler(severity, received.append)
+        return notifier, received
+
+    def test_repeated_fraud_is_suppressed_within_window(self):
+        """억제 기간 안의 같은 알림은 생략하고, 기간이 지나면 생략 횟수를 덧붙여 다시 보내는지 테스트"""
+        clock = ManualClock()
+        notifier, received = self.make_notifier(clock)
+
+        for _ in range(5):
+            notifier.notify(make_fraud_notification())
+            clock.current += 60
+
+        assert len(received) == 1
+        assert notifier.get_suppressed_counts("session_1") == {"PROD001": 4}
+        assert len(notifier.get_notification_history("session_1")) == 1
+
+        clock.current += 300
+        notifier.notify(make_fraud_notification())
+        assert len(received) == 2
+        assert "4회 생략" in received[-1].message
+        assert notifier.get_dispatch_stats()["dedup"]["suppressed"] == 4
+
+    @pytest.mark.asyncio
+    async def test_window_uses_shared_time_across_timelines(self):
+        """가상 시계에서 시간축이 다른 태스크가 알림을 보내도 억제 기간이 같은 기준 시각으로 계산되는지 테스트"""
+        clock = VirtualClock(start=1000.0)
+        notifier, received = self.make_notifier(clock)
+
+        async def scenario(delay):
+            clock.start_timeline()
+            await clock.sleep(delay)
+            notifier.notify(make_fraud_notification())
+
+        await scenario(500)
+        notifier.notify(make_fraud_notification())
+        await scenario(400)
+
+        assert len(received) == 2
+        assert "1회 생략" in received[-1].message
+
+    def test_worsening_change_escalates(self):
+        """억제 기간 안이라도 가격 변화율/기만성 점수가 커지면 바로 보내고, 다시 작아지면 생략하는지 테스트"""
+        clock = ManualClock()
+        notifier, received = self.make_notifier(clock)
+
+        notifier.notify(make_fraud_notification(price=110000))
+        notifier.notify(make_fraud_notification(price=130000))
+        notifier.notify(make_fraud_notification(price=120000))
+        notifier.notify(make_fraud_notification(price=130000, deception_score=5))
+        notifier.notify(make_fraud_notification(price=130000, deception_score=9, severity="error"))
+
+        assert [notification.message.startswith("[악화]") for notification in received] == [False, True, False, True]
+        assert received[-1].severity == "error"
+        # 가격만 바뀐 알림과 가격+설명이 바뀐 알림은 지문이 다름
+        assert notifier.get_suppressed_counts("session_1") == {"PROD001": 1}
+
+    def test_digest_coalesces_session_notifications(self):
+        """요약 기간 동안 한 세션의 여러 상품 알림이 하나의 요약 알림으로 합쳐지는지 테스트"""
+        notifier = Notifier(digest_window=0.05)
+        received = []
+        notifier.register_handler("warning", received.append)
+        notifier.register_handler("error", received.append)
+
+        for index in range(3):
+            notifier.notify(make_fraud_notification(f"PROD{index:03d}", severity="error" if index == 1 else "warning"))
+        notifier.notify(make_notification(7, session_id="session_2"))
+        time.sleep(0.2)
+        assert notifier.flush(timeout=5)
+
+        digests = {notification.session_id: notification for notification in received}
+        assert len(received) == 2
+        assert digests["session_1"].product_id == "PROD000"
+        assert digests["session_1"].product_ids == ["PROD000", "PROD001", "PROD002"]
+        assert [item.details.product_id for item in digests["session_1"].items] == ["PROD000", "PROD001", "PROD002"]
+        assert digests["session_1"].severity == "error"
+        assert digests["session_2"].product_id == "PROD007"
+        assert digests["session_2"].items == []
+        assert notifier.get_dispatch_stats()["digests"] == 1
+        notifier.close()
+
+    def test_digest_keeps_per_product_identity_downstream(self, tmp_path):
+        """요약 알림이 저장소에는 상품별로 저장되고, 웹훅에는 상품별 변경 내역과 함께 전달되는지 테스트"""
+        receiver = StubReceiver()
+        store = NotificationStore(str(tmp_path / "notifications.db"), batch_size=1000, flush_interval=60)
+        webhook = AgentWebhookHandler(batch_window=0.01, default_rate_limit=1000)
+        webhook.register_agent("agent_a", receiver.url("agent_a"))
+        notifier = Notifier(digest_window=0.05)
+        for severity in ("warning", "error"):
+            notifier.register_handler(severity, store.handler, batch=True)
+            notifier.register_handler(severity, webhook.handler, batch=True)
+
+        for index, price in enumerate((110000, 130000)):
+            notifier.notify(make_fraud_notification(f"PROD{index:03d}", price=price).copy(update={"agent_id": "agent_a"}))
+        time.sleep(0.2)
+        assert notifier.flush(timeout=5)
+        assert webhook.flush(timeout=10)
+        store.flush()
+
+        second, _ = store.query_notifications(product_id="PROD001")
+        assert len(second) == 1
+        assert second[0].details.changes["price"]["current"] == 130000
+        assert len(store.query_notifications(session_id="session_1")[0]) == 2
+
+        [(_, body)] = receiver.requests
+        [alert] = body["alerts"]
+        assert alert["product_id"] == "PROD000"
+        assert alert["product_ids"] == ["PROD000", "PROD001"]
+        assert [item["changes"]["price"]["current"] for item in alert["items"]] == [110000, 130000]
+        notifier.close()
+        webhook.close()
+        store.close()
+        receiver.close()
+
+
+class TestNotificationStore:
+    """알림/탐지 결과 영속화 유닛 테스트"""
+
+    def test_batched_persistence_and_pagination(self, tmp_path):
+        """비동기 일괄 핸들러로 기록한 알림이 세션별로 최신순 페이지 조회되는지 테스트"""
+        store = NotificationStore(str(tmp_path / "notifications.db"), batch_size=100)
+        notifier = Notifier()
+        notifier.register_handler("warning", store.handler, batch=True)
+
+        base = datetime.now() - timedelta(hours=1)
+        for index in range(1000):
+            notification = make_fraud_notification(f"PROD{index:03d}")
+            notifier.notify(notification.copy(update={"session_id": f"session_{index % 4}",
+                                                      "timestamp": base + timedelta(seconds=index)}))
+        assert notifier.flush(timeout=10)
+
+        pages = []
+        cursor = None
+        while True:
+            page, cursor = store.query_notifications(session_id="session_1", limit=60, cursor=cursor)
+            pages.append(page)
+            if cursor is None:
+                break
+
+        product_ids = [notification.product_id for page in pages for notification in page]
+        assert len(pages) == 5
+        assert product_ids == [f"PROD{index:03d}" for index in range(997, 0, -4)]
+        assert pages[0][0].details.changes["price"]["current"] == 120000
+        recent, _ = store.query_notifications(product_id="PROD999", start=base)
+        assert [notification.session_id for notification in recent] == ["session_3"]
+        assert store.get_stats()["notifications"] == 1000
+        notifier.close()
+        store.close()
+
+    def test_detections_are_flushed_on_interval(self, tmp_path):
+        """크기 기준에 못 미친 탐지 결과도 시간 기준으로 기록되고, 재연결 후 조회되는지 테스트"""
+        path = str(tmp_path / "notifications.db")
+        store = NotificationStore(path, batch_size=1000, flush_interval=0.05)
+        store.record_detection(DetectionResult(session_id="session_1", product_id="PROD001", is_fraud_detected=True,
+                                               changes={"price": {"original": 1, "current": 2}}))
+        store.record_detection(DetectionResult(session_id="session_1", product_id="PROD002"))
+
+        deadline = time.monotonic() + 5
+        while store.get_stats()["detections"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store.get_stats()["detections"] == 2
+        store.close()
+
+        reopened = NotificationStore(path)
+        frauds, cursor = reopened.query_detections(session_id="session_1", fraud_only=True)
+        assert [result.product_id for result in frauds] == ["PROD001"]
+        assert cursor is None
+        reopened.close()
+
+    def test_agent_id_is_persisted(self, tmp_path):
+        """알림을 받을 에이전트가 기록되어 에이전트별로 조회되고, 에이전트 열이 없던 데이터베이스도 열리는지 테스트"""
+        path = str(tmp_path / "notifications.db")
+        # 에이전트 열이 추가되기 전 형식의 데이터베이스
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE notifications (id INTEGER PRIMARY KEY, session_id TEXT NOT NULL, "
+                     "product_id TEXT NOT NULL, timestamp REAL NOT NULL, severity TEXT NOT NULL, "
+                     "action_required INTEGER NOT NULL, message TEXT NOT NULL, details TEXT)")
+        conn.execute("INSERT INTO notifications (session_id, product_id, timestamp, severity, action_required, "
+                     "message) VALUES ('session_1', 'PROD000', ?, 'warning', 0, '이전 알림')",
+                     (time.time() - 60,))
+        conn.commit()
+        conn.close()
+
+        store = NotificationStore(path)
+        store.handler([make_notification(1).copy(update={"agent_id": "agent_a"}),
+                       make_notification(2).copy(update={"agent_id": "agent_b"}),
+                       make_notification(3)])
+
+        mine, _ = store.query_notifications(agent_id="agent_a")
+        assert [(notification.product_id, notification.agent_id) for notification in mine] == [("PROD001", "agent_a")]
+        everything, _ = store.query_notifications(session_id="session_1")
+        assert [notification.agent_id for notification in everything] == [None, "agent_b", "agent_a", None]
+        store.close()
+
+    def test_in_memory_history_is_bounded(self):
+        """메모리 알림 기록이 세션별 최근 알림 수와 세션 수 한도를 지키는지 테스트"""
+        notifier = Notifier(async_dispatch=False, history_per_session=3, history_sessions=2)
+        for session_index in range(3):
+            for index in range(5):
+                notifier.notify(make_notification(index, session_id=f"session_{session_index}"))
+
+        assert notifier.get_notification_history("session_0") == []
+        assert [notification.product_id for notification in notifier.get_notification_history("session_2")] == \
+            ["PROD002", "PROD003", "PROD004"]
+
+    def test_history_is_unbounded_without_store(self, tmp_path):
+        """영속 저장소가 없으면 메모리 알림 기록을 자르지 않고, 있을 때만 최근 알림으로 제한하는지 테스트"""
+        from src.system import FraudDetectionSystem
+        for config, expected in (({}, 150), ({"notification_db_path": str(tmp_path / "n.db")}, 100)):
+            system = FraudDetectionSystem({"console_notifications": False, "notification_async_dispatch": False,
+                                           "notification_dedup_window": 0, **config})
+            for index in range(150):
+                system.notifier.notify(make_notification(index))
+            assert len(system.notifier.get_notification_history("session_1")) == expected
+            system.cleanup()
+
+
+class StubReceiver:
+    """테스트용 로컬 웹훅 수신 서버 (처음 fail_first건의 요청은 status로 실패 응답)"""
+
+    def __init__(self, fail_first=0, status=500):
+        from aiohttp import web
+        self.fail_first = fail_first
+        self.status = status
+        self.requests = []
+        self.loop = asyncio.new_event_loop()
+
+        async def receive(request):
+            body = await request.json()
+            self.requests.append((request.match_info["agent_id"], body))
+            if len(self.requests) <= self.fail_first:
+                return web.Response(status=self.status)
+            return web.Response(status=204)
+
+        app = web.Application()
+        app.router.add_post("/hooks/{agent_id}", receive)
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        self.port = self.runner.addresses[0][1]
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, agent_id):
+        return f"http://127.0.0.1:{self.port}/hooks/{agent_id}"
+
+    def alerts(self, agent_id):
+        return [alert["product_id"] for agent, body in self.requests if agent == agent_id for alert in body["alerts"]]
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class TestAgentWebhook:
+    """에이전트 웹훅 핸들러 유닛 테스트"""
+
+    def test_alerts_are_batched_per_agent(self):
+        """에이전트별 알림이 묶음 기간 동안 모여 각 콜백 주소로 순서대로 전달되는지 테스트"""
+        receiver = StubReceiver()
+        webhook = AgentWebhookHandler(batch_window=0.05, max_batch_size=50, default_rate_limit=1000)
+        webhook.register_agent("agent_a", receiver.url("agent_a"))
+        webhook.register_agent("agent_b", receiver.url("agent_b"))
+        notifier = Notifier()
+        notifier.register_handler("warning", webhook.handler, batch=True)
+
+        for index in range(120):
+            agent_id = "agent_a" if index % 3 else "agent_b"
+            notifier.notify(make_notification(index).copy(update={"agent_id": agent_id}))
+        notifier.notify(make_notification(999))
+        assert notifier.flush(timeout=10)
+        assert webhook.flush(timeout=10)
+
+        assert receiver.alerts("agent_a") == [f"PROD{index:03d}" for index in range(120) if index % 3]
+        assert receiver.alerts("agent_b") == [f"PROD{index:03d}" for index in range(0, 120, 3)]
+        assert len(receiver.requests) < 10
+        stats = webhook.get_stats()
+        assert stats["delivered"] == 120
+        assert stats["unrouted"] == 1
+        notifier.close()
+        webhook.close()
+        receiver.close()
+
+    def test_retries_with_backoff(self):
+        """서버 오류 응답은 백오프 후 재시도하여 전달하고, 요청 오류(4xx)는 재시도하지 않는지 테스트"""
+        receiver = StubReceiver(fail_first=2)
+        webhook = AgentWebhookHandler(batch_window=0.01, backoff_base=0.01, default_rate_limit=1000)
+        webhook.register_agent("agent_a", receiver.url("agent_a"))
+
+        webhook.handler([make_notification(1).copy(update={"agent_id": "agent_a"})])
+        assert webhook.flush(timeout=10)
+        assert receiver.alerts("agent_a") == ["PROD001"] * 3
+        assert webhook.get_stats()["agents"]["agent_a"]["retries"] == 2
+        assert webhook.get_stats()["delivered"] == 1
+
+        receiver.fail_first, receiver.status = 10, 400
+        webhook.handler([make_notification(2).copy(update={"agent_id": "agent_a"})])
+        assert webhook.flush(timeout=10)
+        assert receiver.alerts("agent_a")[3:] == ["PROD002"]
+        assert webhook.get_stats()["failed"] == 1
+        webhook.close()
+        receiver.close()
+
+    def test_undelivered_alerts_spill_and_redeliver(self, tmp_path):
+        """재시도 끝에 전달하지 못한 알림은 유출 파일에 남고, 수신 서버가 복구되면 재전달되는지 테스트"""
+        receiver = StubReceiver(fail_first=1000)
+        spill_path = str(tmp_path / "spill.jsonl")
+        webhook = AgentWebhookHandler(spill_path=spill_path, batch_window=0.01, max_retries=1,
+                                      backoff_base=0.01, default_rate_limit=1000)
+        webhook.register_agent("agent_a", receiver.url("agent_a"))
+
+        webhook.handler([make_notification(index).copy(update={"agent_id": "agent_a"}) for index in range(5)])
+        assert webhook.flush(timeout=10)
+        with open(spill_path, encoding="utf-8") as spill_file:
+            spilled = [json.loads(line) for line in spill_file]
+        assert [alert["product_id"] for alert in spilled[0]["alerts"]] == [f"PROD{index:03d}" for index in range(5)]
+        assert webhook.get_stats()["spilled"] == 5
+
+        receiver.fail_first = 0
+        receiver.requests.clear()
+        assert webhook.redeliver_spilled(timeout=10) == 5
+        assert receiver.alerts("agent_a") == [f"PROD{index:03d}" for index in range(5)]
+        assert webhook.redeliver_spilled(timeout=10) == 0
+        webhook.close()
+        receiver.close()
+
+    def test_rate_limit_spaces_requests(self):
+        """에이전트별 전송률 한도를 넘는 요청은 토큰이 찰 때까지 기다렸다가 보내는지 테스트"""
+        receiver = StubReceiver()
+        webhook = AgentWebhookHandler(batch_window=0.0, max_batch_size=1)
+        webhook.register_agent("agent_a", receiver.url("agent_a"), rate_limit=20, burst=1)
+
+        started = time.perf_counter()
+        webhook.handler([make_notification(index).copy(update={"agent_id": "agent_a"}) for index in range(5)])
+        assert webhook.flush(timeout=10)
+        elapsed = time.perf_counter() - started
+
+        assert len(receiver.requests) == 5
+        assert elapsed >= 0.18
+        webhook.close()
+        receiver.close()
+
+
+class TestSubscriptions:
+    """세션 이벤트 구독 유닛 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_async_subscriber_receives_session_events(self):
+        """구독자가 알림 모듈을 거친 알림과 직접 발행한 탐지 결과를 자기 세션 것만 순서대로 받는지 테스트"""
+        hub = SubscriptionHub()
+        notifier = Notifier()
+        notifier.register_handler("warning", hub.handler, batch=True)
+        subscription = hub.subscribe("session_1")
+        everything = hub.subscribe()
+
+        async def consume():
+            received = []
+            async for event in subscription:
+                received.append(event)
+                if len(received) == 3:
+                    return received
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        hub.publish(DetectionResult(session_id="session_1", product_id="PROD001"))
+        notifier.notify(make_notification(2, session_id="session_2"))
+        notifier.notify(make_notification(3))
+        assert notifier.flush(timeout=5)
+        hub.publish(DetectionResult(session_id="session_1", product_id="PROD004", is_fraud_detected=True))
+        received = await asyncio.wait_for(consumer, timeout=5)
+
+        assert [(type(event).__name__, event.product_id) for event in received] == [
+            ("DetectionResult", "PROD001"), ("NotificationMessage", "PROD003"), ("DetectionResult", "PROD004")]
+        assert everything.get(timeout=1).product_id == "PROD001"
+        subscription.close()
+        assert hub.subscriber_count("session_1") == 0
+        notifier.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_oldest(self):
+        """대기열이 가득 차면 가장 오래된 이벤트를 버리고, 해지하면 남은 이벤트를 받은 뒤 반복이 끝나는지 테스트"""
+        hub = SubscriptionHub(queue_size=3)
+        subscription = hub.subscribe("session_1")
+        for index in range(5):
+            hub.publish(make_notification(index))
+        subscription.close()
+
+        received = [event.product_id async for event in subscription]
+        assert received == ["PROD002", "PROD003", "PROD004"]
+        assert subscription.dropped == 2
+        hub.publish(make_notification(9))
+        assert subscription.get(timeout=0.01) is None
+
+    def test_sync_get_waits_for_publisher_thread(self):
+        """동기 소비자가 다른 스레드의 발행을 기다렸다 받고, 제한 시간이 지나면 None을 받는지 테스트"""
+        hub = SubscriptionHub()
+        subscription = hub.subscribe("session_1")
+        assert subscription.get(timeout=0.01) is None
+
+        timer = threading.Timer(0.05, hub.publish, args=(make_notification(1),))
+        timer.start()
+        assert subscription.get(timeout=5).product_id == "PROD001"
+        timer.join()
+        hub.close()
+        assert list(subscription) == []
+
+    def test_sse_endpoint_streams_events(self):
+        """쇼핑몰 SSE 엔드포인트가 세션 이벤트를 이벤트 유형과 JSON 데이터로 전송하는지 테스트"""
+        from src.mock_shop import app as shop
+
+        hub = SubscriptionHub()
+        client = shop.app.test_client()
+        shop.attach_fraud_system(None)
+        assert client.get("/api/events/session_1").status_code == 503
+
+        shop.attach_fraud_system(hub)
+        try:
+            response = client.get("/api/events/session_1", buffered=False)
+            stream = response.response
+            assert next(stream) == b"retry: 3000\n\n"
+            hub.publish(make_notification(1))
+            hub.publish(DetectionResult(session_id="session_1", product_id="PROD001", is_fraud_detected=True))
+            notification_frame = next(stream).decode("utf-8")
+            detection_frame = next(stream).decode("utf-8")
+            response.close()
+        finally:
+            shop.attach_fraud_system(None)
+
+        assert response.mimetype == "text/event-stream"
+        assert notification_frame.startswith("id: 1\nevent: notification\ndata: ")
+        assert json.loads(notification_frame.split("data: ", 1)[1])["message"] == "상품 1 가격 변경"
+        assert "event: detection" in detection_frame
+        assert hub.subscriber_count() == 0
+
+    def test_shop_streams_events_from_connected_system(self):
+        """쇼핑몰에 연결한 탐지 시스템이 MCP 조회 문맥으로 장바구니 담기를 검증하고 결과를 이벤트 스트림으로 전송하는지 테스트"""
+        from src.mock_shop import app as shop
+
+        shop.connect_fraud_system({"console_notifications": False, "latency_model": 0})
+        client = shop.app.test_client()
+        headers = {"X-Session-ID": "session_shop"}
+        try:
+            response = client.get("/api/events/session_shop", buffered=False)
+            stream = response.response
+            assert next(stream) == b"retry: 3000\n\n"
+            # 할인된 가격으로 광고하고 원래 가격으로 결제하는 가격 속임수
+            client.get("/admin/toggle_fraud/PROD001/price")
+            assert client.get("/api/mcp/product/PROD001", headers=headers).json["price"] == 800000
+            assert client.post("/api/mcp/cart", json={"product_id": "PROD001"}, headers=headers).json["success"]
+            frames = {}
+            for _ in range(2):
+                frame = next(stream).decode("utf-8")
+                event_type = frame.split("event: ", 1)[1].split("\n", 1)[0]
+                frames[event_type] = json.loads(frame.split("data: ", 1)[1])
+            response.close()
+        finally:
+            client.get("/admin/toggle_fraud/PROD001/none")
+            shop.clear_cart("session_shop")
+            shop.disconnect_fraud_system()
+
+        assert frames["detection"]["is_fraud_detected"]
+        assert frames["detection"]["changes"]["price"]["original"] == 800000
+        assert frames["detection"]["changes"]["price"]["current"] == 1000000
+        assert frames["notification"]["session_id"] == "session_shop"
+        assert frames["notification"]["product_id"] == "PROD001"
+        assert shop.FRAUD_SYSTEM is None
+
@@ -0,0 +1,112 @@
+import pytest
+from src.sharding import sharded_system
+from src.sharding.sharded_system import ShardedFraudDetectionSystem
+
+# 워커 시스템 설정 (통신 지연 없이, 콘솔 알림 없이)
+WORKER_CONFIG = {"console_notifications": False, "latency_model": 0}
+PRODUCT = {"id": "PROD001", "price": 100000, "description": "고급 스마트폰 - 정품 1년 보증"}
+
+
+async def start_with_sessions(num_workers, count=40):
+    system = ShardedFraudDetectionSystem(num_workers, WORKER_CONFIG)
+    await system.start()
+    session_ids = [f"session_{index}" for index in range(count)]
+    for session_id in session_ids:
+        assert await system.on_product_view(session_id, "PROD001", PRODUCT)
+    return system, session_ids
+
+
+async def shard_sessions(system):
+    return {stats["shard_id"]: stats["sessions"] for stats in await system.get_stats()}
+
+
+class TestShardedSystem:
+    """샤드 기반 탐지 시스템 유닛 테스트 (워커 프로세스 사용)"""
+
+    @pytest.mark.asyncio
+    async def test_routing_and_resize_moves_sessions(self):
+        """세션이 해시 링의 담당 샤드에 저장되고, 2→3 재배치 후 옮겨진 세션을 새 샤드에서 검증할 수 있는지 테스트"""
+        system, session_ids = await start_with_sessions(2)
+        try:
+            before = {session_id: system.get_shard(session_id) for session_id in session_ids}
+            assert await shard_sessions(system) == {
+                shard: sum(1 for owner in before.values() if owner == shard) for shard in range(2)}
+
+            moved = await system.resize(3)
+
+            after = {session_id: system.get_shard(session_id) for session_id in session_ids}
+            moved_sessions = [session_id for session_id in session_ids if before[session_id] != after[session_id]]
+            assert moved == len(moved_sessions) > 0
+            assert all(after[session_id] == 2 for session_id in moved_sessions)
+            # 원본 샤드에서는 삭제되어 전체 세션 수가 그대로
+            assert await shard_sessions(system) == {
+                shard: sum(1 for owner in after.values() if owner == shard) for shard in range(3)}
+            result = await system.verify_product_now(moved_sessions[0], "PROD001")
+            assert result is not None
+            assert result.session_id == moved_sessions[0]
+        finally:
+            await system.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failed_import_keeps_sessions(self, monkeypatch):
+        """대상 샤드가 가져오기에 실패하면 원본 샤드의 세션이 남고 이전 배치가 유지되는지 테스트"""
+        system, session_ids = await start_with_sessions(2)
+        try:
+            before = await shard_sessions(system)
+            call = sharded_system._ShardClient.call
+
+            async def failing_import(client, op, *args):
+                if op == "import_sessions":
+                    raise RuntimeError("대상 샤드 연결 종료")
+                return await call(client, op, *args)
+
+            monkeypatch.setattr(sharded_system._ShardClient, "call", failing_import)
+            with pytest.raises(RuntimeError):
+                await system.resize(3)
+            monkeypatch.setattr(sharded_system._ShardClient, "call", call)
+
+            assert system.num_workers == 2
+            assert await shard_sessions(system) == before
+            for session_id in session_ids[:5]:
+                assert await system.verify_product_now(session_id, "PROD001") is not None
+        finally:
+            await system.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_resize_moves_history_only_sessions_and_surfaces_notifications(self):
+        """워커의 알림이 프론트로 전달되고, 문맥 없이 탐지/알림 기록만 남은 세션도 재배치 때 함께 옮겨지는지 테스트"""
+        system, _ = await start_with_sessions(2, count=4)
+        try:
+            received = []
+            system.register_notification_handler(received.append)
+            fraud_product = {**PRODUCT, "id": "PROD_PRICE_CHANGE"}
+            assert await system.on_product_view("session_0", "PROD_PRICE_CHANGE", fraud_product)
+            result = await system.verify_product_now("session_0", "PROD_PRICE_CHANGE")
+            assert result.is_fraud_detected
+            assert await system.flush_notifications()
+
+            notifications = system.get_notification_history("session_0")
+            assert [notification.product_id for notification in notifications] == ["PROD_PRICE_CHANGE"]
+            assert received == notifications
+
+            # 문맥은 없고 탐지/알림 기록만 가진 세션
+            history_only = [f"history_{index}" for index in range(40)]
+            for session_id in history_only:
+                state = {"contexts": [],
+                         "detections": [result.copy(update={"session_id": session_id}).dict()],
+                         "notifications": [notifications[0].copy(update={"session_id": session_id}).dict()]}
+                await system._clients[system.get_shard(session_id)].call("import_sessions", {session_id: state})
+            before = {session_id: system.get_shard(session_id) for session_id in history_only}
+
+            await system.resize(3)
+
+            moved = [session_id for session_id in history_only if system.get_shard(session_id) != before[session_id]]
+            assert moved
+            for session_id in moved:
+                state = (await system._clients[system.get_shard(session_id)].call(
+                    "export_sessions", [session_id]))[session_id]
+                assert len(state["detections"]) == 1 and len(state["notifications"]) == 1
+                state = (await system._clients[before[session_id]].call("export_sessions", [session_id]))[session_id]
+                assert state == {"contexts": [], "detections": [], "notifications": []}
+        finally:
+            await system.shutdown()
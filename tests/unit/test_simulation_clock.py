@@ -0,0 +1,70 @@
+import pytest
+import asyncio
+import time
+from src.simulation.clock import VirtualClock
+from src.simulation.latency import ReplayLatency, create_latency_model, FixedLatency
+
+class TestVirtualClock:
+    """VirtualClock 및 지연 모델 유닛 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_sleep_advances_virtual_time_only(self):
+        """가상 시계 대기는 실제로 대기하지 않는지 테스트"""
+        clock = VirtualClock(start=1000.0)
+        started = time.perf_counter()
+
+        await clock.sleep(3600)
+
+        assert time.perf_counter() - started < 1.0
+        assert clock.time() == 4600.0
+        assert clock.total_slept == 3600
+
+    @pytest.mark.asyncio
+    async def test_timelines_are_isolated_per_scenario(self):
+        """동시에 실행되는 시나리오가 각자의 시간축을 갖는지 테스트"""
+        clock = VirtualClock()
+
+        async def scenario(delay):
+            clock.start_timeline()
+            started = clock.monotonic()
+            await clock.sleep(delay)
+            # 하위 태스크의 대기도 같은 시간축에 반영
+            await asyncio.create_task(clock.sleep(delay))
+            return clock.monotonic() - started
+
+        results = await asyncio.gather(scenario(1.0), scenario(2.5))
+
+        assert results == [2.0, 5.0]
+
+    @pytest.mark.asyncio
+    async def test_current_time_is_shared_across_timelines(self):
+        """경과 시간은 시간축별로 재지만, 현재 시각은 모든 시간축이 공유하는 하나의 기준인지 테스트"""
+        clock = VirtualClock(start=1000.0)
+
+        async def scenario(delay):
+            clock.start_timeline()
+            await clock.sleep(delay)
+            return clock.monotonic()
+
+        assert await asyncio.gather(scenario(100), scenario(200)) == [100, 200]
+        assert clock.monotonic() == 0
+        assert clock.time() == 1300.0
+
+    def test_replay_latency_from_csv(self, tmp_path):
+        """기록 파일 재생 지연 모델 테스트"""
+        trace_file = tmp_path / "trace.csv"
+        trace_file.write_text("channel,seconds\nweb,0.1\nweb,0.3\nmcp,0.05\n", encoding="utf-8")
+
+        model = ReplayLatency.from_file(str(trace_file))
+
+        assert [model.sample("web") for _ in range(3)] == [0.1, 0.3, 0.1]
+        assert model.sample("mcp") == 0.05
+        assert model.sample("unknown") == 0.0
+
+    def test_create_latency_model_from_config(self):
+        """설정값으로 지연 모델 생성 테스트"""
+        model = create_latency_model({"type": "fixed", "default": 0.0, "channels": {"web": 0.2}})
+
+        assert isinstance(model, FixedLatency)
+        assert model.sample("web") == 0.2
+        assert model.sample("mcp") == 0.0
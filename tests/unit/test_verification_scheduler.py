@@ -0,0 +1,93 @@
+import pytest
+import asyncio
+from src.scheduler.verification_scheduler import PriorityVerificationExecutor, VerificationPriority
+
+class TestPriorityVerificationExecutor:
+    """PriorityVerificationExecutor 유닛 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_priority_order(self):
+        """결제 > 장바구니 > 백그라운드 순서 처리 테스트"""
+        executor = PriorityVerificationExecutor(max_workers=1, reserved_workers=0, queue_latency_target=10)
+        order = []
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+            return "blocker"
+
+        def job(name):
+            async def run():
+                order.append(name)
+                return name
+            return run
+
+        # 1. 워커를 점유한 상태에서 우선순위가 다른 작업 제출
+        first = asyncio.create_task(executor.submit(VerificationPriority.CHECKOUT, blocker))
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(executor.submit(VerificationPriority.BACKGROUND, job("background"))),
+            asyncio.create_task(executor.submit(VerificationPriority.ADD_TO_CART, job("cart"))),
+            asyncio.create_task(executor.submit(VerificationPriority.CHECKOUT, job("checkout")))
+        ]
+        await asyncio.sleep(0.01)
+
+        # 2. 워커 해제 후 처리 순서 확인
+        release.set()
+        await asyncio.gather(first, *tasks)
+
+        assert order == ["checkout", "cart", "background"]
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_background_shed_under_overload(self):
+        """큐 지연 초과 시 백그라운드 작업 차단 테스트"""
+        executor = PriorityVerificationExecutor(max_workers=2, reserved_workers=1,
+                                                queue_latency_target=0.01, background_policy="shed")
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "done"
+
+        # 1. 모든 워커를 점유하고 결제 작업을 대기시켜 큐 지연 유발
+        busy = [asyncio.create_task(executor.submit(VerificationPriority.CHECKOUT, slow)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert executor.queue_latency() > 0.01
+
+        # 2. 백그라운드 작업은 차단되고 결제 작업은 정상 처리
+        shed_result = await executor.submit(VerificationPriority.BACKGROUND, slow)
+        release.set()
+        results = await asyncio.gather(*busy)
+
+        assert shed_result is None
+        assert results == ["done", "done", "done"]
+        assert executor.stats["shed"] == 1
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_items_are_not_counted_as_completed(self):
+        """호출자가 대기를 취소한 작업은 완료가 아닌 취소로 집계되는지 테스트"""
+        executor = PriorityVerificationExecutor(max_workers=1, reserved_workers=0, queue_latency_target=10)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "done"
+
+        # 1. 실행 중에 취소되는 작업과 실행 전에 취소되는 작업
+        running = asyncio.create_task(executor.submit(VerificationPriority.CHECKOUT, slow))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(executor.submit(VerificationPriority.CHECKOUT, slow))
+        await asyncio.sleep(0.01)
+        running.cancel()
+        queued.cancel()
+        await asyncio.sleep(0)
+
+        # 2. 워커 해제 후 정상 작업 하나 처리
+        release.set()
+        assert await executor.submit(VerificationPriority.CHECKOUT, slow) == "done"
+
+        assert executor.stats["completed"] == 1
+        assert executor.stats["cancelled"] == 2
+        executor.shutdown()